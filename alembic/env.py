@@ -32,6 +32,20 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Colunas e índices que um modelo cria por DDL próprio, só no PostgreSQL
+    (Table.info["ddl_postgresql"], ex: catalogo_itens.busca_documento), não
+    estão no metadata: o autogenerate não deve propor removê-los.
+    """
+    if reflected and compare_to is None and type_ in ("column", "index"):
+        tabela = target_metadata.tables.get(object.table.name)
+        if tabela is not None and name in tabela.info.get("ddl_postgresql", ()):
+            return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +92,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
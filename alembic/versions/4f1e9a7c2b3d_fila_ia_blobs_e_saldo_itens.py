@@ -0,0 +1,104 @@
+"""fila_ia_blobs_e_saldo_itens
+
+Revision ID: 4f1e9a7c2b3d
+Revises: cb869fa5ee74
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1e9a7c2b3d'
+down_revision: Union[str, Sequence[str], None] = 'cb869fa5ee74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Fila de jobs de IA em lote (AIJob)
+    op.create_table('ia_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('lote_id', sa.String(length=36), nullable=False),
+        sa.Column('tipo_alvo', sa.String(length=10), nullable=False),
+        sa.Column('alvo_id', sa.Integer(), nullable=False),
+        sa.Column('secao', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='pendente', nullable=False, comment='pendente, executando, concluido, erro'),
+        sa.Column('tentativas', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('proxima_tentativa_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('resultado', sa.Text(), nullable=True),
+        sa.Column('erro', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), server_default='false', nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ia_jobs_id'), 'ia_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_ia_jobs_lote_id'), 'ia_jobs', ['lote_id'], unique=False)
+    op.create_index('ix_ia_jobs_fila', 'ia_jobs', ['status', 'proxima_tentativa_em'], unique=False)
+
+    # 2. Conteúdo deduplicado dos anexos (AnexoBlob) e o hash no anexo
+    op.create_table('anexo_blobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('hash_sha256', sa.String(length=64), nullable=False),
+        sa.Column('tamanho_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('caminho', sa.String(length=500), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), server_default='false', nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_anexo_blobs_id'), 'anexo_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_anexo_blobs_hash_sha256'), 'anexo_blobs', ['hash_sha256'], unique=True)
+
+    op.add_column('anexos', sa.Column('hash_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_anexos_hash_sha256'), 'anexos', ['hash_sha256'], unique=False)
+
+    # 3. Índice de variáveis dos templates (hash do arquivo indexado)
+    op.add_column('templates', sa.Column('hash_conteudo', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_templates_hash_conteudo'), 'templates', ['hash_conteudo'], unique=False)
+
+    # 4. Razão de saldo por item de contrato (SaldoItemContrato)
+    op.create_table('saldos_itens_contrato',
+        sa.Column('id_item_contrato', sa.Integer(), nullable=False),
+        sa.Column('quantidade_pedida', sa.Numeric(precision=15, scale=3), server_default='0', nullable=False),
+        sa.Column('quantidade_entregue', sa.Numeric(precision=15, scale=3), server_default='0', nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['id_item_contrato'], ['itens_contrato.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id_item_contrato')
+    )
+    # Carga inicial a partir dos pedidos existentes (mesma soma da reconciliação).
+    # Pedidos de itens inexistentes ficam de fora, como na reconciliação.
+    op.execute("""
+        INSERT INTO saldos_itens_contrato (id_item_contrato, quantidade_pedida, quantidade_entregue)
+        SELECT p.id_item_contrato, SUM(p.quantidade_pedida), SUM(p.quantidade_entregue)
+        FROM pedido p
+        JOIN itens_contrato i ON i.id = p.id_item_contrato
+        GROUP BY p.id_item_contrato
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('saldos_itens_contrato')
+
+    op.drop_index(op.f('ix_templates_hash_conteudo'), table_name='templates')
+    op.drop_column('templates', 'hash_conteudo')
+
+    op.drop_index(op.f('ix_anexos_hash_sha256'), table_name='anexos')
+    op.drop_column('anexos', 'hash_sha256')
+    op.drop_index(op.f('ix_anexo_blobs_hash_sha256'), table_name='anexo_blobs')
+    op.drop_index(op.f('ix_anexo_blobs_id'), table_name='anexo_blobs')
+    op.drop_table('anexo_blobs')
+
+    op.drop_index('ix_ia_jobs_fila', table_name='ia_jobs')
+    op.drop_index(op.f('ix_ia_jobs_lote_id'), table_name='ia_jobs')
+    op.drop_index(op.f('ix_ia_jobs_id'), table_name='ia_jobs')
+    op.drop_table('ia_jobs')
@@ -0,0 +1,143 @@
+"""indices_consultas_frequentes
+
+Revision ID: 8b2d6c0e5a91
+Revises: 4f1e9a7c2b3d
+Create Date: 2026-10-18 09:47:05.402377
+
+Índices guiados pelas consultas da aplicação (planos antes/depois:
+scripts/benchmark_indices.py) e a FK que faltava em pedido.id_item_contrato.
+
+Os índices são criados com CREATE INDEX CONCURRENTLY (não bloqueia escritas),
+fora da transação da migração. Se um deles falhar no meio, o Postgres deixa um
+índice INVALID com o mesmo nome: remova-o (DROP INDEX CONCURRENTLY) e rode de novo.
+
+Índices cujas colunas não existem no banco (esquemas antigos, anteriores ao
+soft delete do DefaultModel) são pulados com aviso no log. No modo offline
+(--sql) não há banco para inspecionar: o SQL gerado cria todos os índices.
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d6c0e5a91'
+down_revision: Union[str, Sequence[str], None] = '4f1e9a7c2b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+FK_PEDIDO_ITEM = 'pedido_id_item_contrato_fkey'
+
+# (nome, tabela, colunas, opções do create_index, colunas exigidas além das indexadas)
+INDICES = [
+    # Saldo (reconciliação, GROUP BY) e painel de AOCS: joins por item e por AOCS
+    ('ix_pedido_id_item_contrato', 'pedido', ['id_item_contrato'], {}, ()),
+    ('ix_pedido_id_aocs', 'pedido', ['id_aocs'], {}, ()),
+    # Painel de pendentes: WHERE status_entrega <> 'Entregue' ORDER BY data_pedido, id
+    ('ix_pedido_pendentes_data_pedido', 'pedido', ['data_pedido', 'id'],
+     {'postgresql_where': sa.text("status_entrega <> 'Entregue' AND is_deleted = false")},
+     ('status_entrega', 'is_deleted')),
+    # Itens de um contrato em ordem; também serve ao ON DELETE CASCADE de contratos
+    ('ix_itens_contrato_id_contrato_numero_item', 'itens_contrato', ['id_contrato', 'numero_item'], {}, ()),
+    # Listagem de contratos: vigência/vencimento e paginação por (data_fim_vigencia, id)
+    ('ix_contratos_data_fim_vigencia_id', 'contratos', ['data_fim_vigencia', 'id'], {}, ()),
+    ('ix_contratos_ativo_data_fim_vigencia', 'contratos', ['ativo', 'data_fim_vigencia'], {}, ()),
+    # Itens com saldo por categoria: só contratos ativos
+    ('ix_contratos_id_categoria_ativos', 'contratos', ['id_categoria'],
+     {'postgresql_where': sa.text('ativo')}, ('ativo',)),
+    # Anexos por contrato/AOCS (cada anexo preenche só uma das FKs)
+    ('ix_anexos_id_contrato_data_upload', 'anexos', ['id_contrato', 'data_upload'],
+     {'postgresql_where': sa.text('id_contrato IS NOT NULL')}, ()),
+    ('ix_anexos_id_aocs_data_upload', 'anexos', ['id_aocs', 'data_upload'],
+     {'postgresql_where': sa.text('id_aocs IS NOT NULL')}, ()),
+]
+
+# Buscas com ILIKE '%termo%': GIN de trigramas (pg_trgm). Só em colunas texto.
+INDICES_TRGM = [
+    ('ix_catalogo_itens_nome_item_trgm', 'catalogo_itens', 'nome_item'),
+    ('ix_fornecedores_razao_social_trgm', 'fornecedores', 'razao_social'),
+    ('ix_contratos_numero_contrato_trgm', 'contratos', 'numero_contrato'),
+    ('ix_aocs_numero_aocs_trgm', 'aocs', 'numero_aocs'),
+]
+
+
+def _colunas(tabela: str) -> dict | None:
+    """Colunas da tabela no banco ({nome: tipo}). None no modo offline: nada a inspecionar."""
+    if context.is_offline_mode():
+        return None
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(tabela):
+        return {}
+    return {c['name']: c['type'] for c in inspector.get_columns(tabela)}
+
+
+def _adicionar_fk_pedido_item() -> None:
+    """
+    FK criada NOT VALID (vale para as novas linhas sem varrer a tabela com lock)
+    e validada depois. Com pedidos órfãos a validação é adiada: corrigir os
+    dados e rodar ALTER TABLE pedido VALIDATE CONSTRAINT pedido_id_item_contrato_fkey.
+    A verificação dos órfãos roda no próprio banco (bloco DO), então o mesmo
+    SQL serve ao upgrade online e ao gerado com --sql.
+    """
+    op.execute(
+        f"ALTER TABLE pedido ADD CONSTRAINT {FK_PEDIDO_ITEM} "
+        "FOREIGN KEY (id_item_contrato) REFERENCES itens_contrato (id) NOT VALID"
+    )
+    op.execute(f"""
+        DO $$
+        DECLARE
+            orfaos bigint;
+        BEGIN
+            SELECT count(*) INTO orfaos FROM pedido p
+            WHERE p.id_item_contrato IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM itens_contrato i WHERE i.id = p.id_item_contrato);
+            IF orfaos > 0 THEN
+                RAISE WARNING '% pedidos apontam para itens inexistentes: {FK_PEDIDO_ITEM} ficou NOT VALID.', orfaos;
+            ELSE
+                ALTER TABLE pedido VALIDATE CONSTRAINT {FK_PEDIDO_ITEM};
+            END IF;
+        END
+        $$
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Requer permissão para criar extensões (ou a extensão já instalada pelo DBA)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    _adicionar_fk_pedido_item()
+
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas, opcoes, exigidas in INDICES:
+            existentes = _colunas(tabela)
+            faltando = [] if existentes is None else [c for c in (*colunas, *exigidas) if c not in existentes]
+            if faltando:
+                logger.warning(f"Índice {nome} pulado: {tabela} sem as colunas {faltando}.")
+                continue
+            op.create_index(nome, tabela, colunas, postgresql_concurrently=True, if_not_exists=True, **opcoes)
+
+        for nome, tabela, coluna in INDICES_TRGM:
+            existentes = _colunas(tabela)
+            if existentes is not None and not isinstance(existentes.get(coluna), sa.String):
+                logger.warning(f"Índice {nome} pulado: {tabela}.{coluna} não é texto.")
+                continue
+            op.create_index(
+                nome, tabela, [coluna],
+                postgresql_using='gin', postgresql_ops={coluna: 'gin_trgm_ops'},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # A extensão pg_trgm fica: pode ser usada por outros objetos do banco
+    with op.get_context().autocommit_block():
+        for nome, tabela, *_ in [*INDICES_TRGM, *INDICES]:
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_constraint(FK_PEDIDO_ITEM, 'pedido', type_='foreignkey')
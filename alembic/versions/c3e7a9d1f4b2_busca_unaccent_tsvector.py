@@ -0,0 +1,125 @@
+"""busca_unaccent_tsvector
+
+Revision ID: c3e7a9d1f4b2
+Revises: 8b2d6c0e5a91
+Create Date: 2026-10-18 10:31:52.640913
+
+Busca unificada (GET /busca) e listagens sem diferenciar acentos:
+- extensão unaccent e f_unaccent(text), wrapper IMMUTABLE usável em índices;
+- configuração de texto pt_unaccent (portuguese + unaccent);
+- catalogo_itens.busca_documento: tsvector gerado de nome + descrição, com GIN;
+- os GIN de trigramas da 8b2d6c0e5a91 passam a indexar f_unaccent(coluna),
+  a expressão usada nas consultas (índice na coluna crua não serve a elas).
+
+Índices com CREATE/DROP INDEX CONCURRENTLY, como na 8b2d6c0e5a91. No modo
+offline (--sql) não há banco para inspecionar: o SQL gerado cria todos.
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a9d1f4b2'
+down_revision: Union[str, Sequence[str], None] = '8b2d6c0e5a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# (índice novo sobre f_unaccent, índice antigo na coluna crua, tabela, coluna)
+INDICES_TRGM = [
+    ('ix_catalogo_itens_nome_item_unaccent_trgm', 'ix_catalogo_itens_nome_item_trgm', 'catalogo_itens', 'nome_item'),
+    ('ix_fornecedores_razao_social_unaccent_trgm', 'ix_fornecedores_razao_social_trgm', 'fornecedores', 'razao_social'),
+    ('ix_contratos_numero_contrato_unaccent_trgm', 'ix_contratos_numero_contrato_trgm', 'contratos', 'numero_contrato'),
+    ('ix_aocs_numero_aocs_unaccent_trgm', 'ix_aocs_numero_aocs_trgm', 'aocs', 'numero_aocs'),
+]
+
+IX_BUSCA_DOCUMENTO = 'ix_catalogo_itens_busca_documento'
+
+BUSCA_DOCUMENTO = (
+    "setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(nome_item, '')), 'A') || "
+    "setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(descricao_detalhada, '')), 'B')"
+)
+
+
+def _colunas(tabela: str) -> dict | None:
+    """Colunas da tabela no banco ({nome: tipo}). None no modo offline: nada a inspecionar."""
+    if context.is_offline_mode():
+        return None
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(tabela):
+        return {}
+    return {c['name']: c['type'] for c in inspector.get_columns(tabela)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Requer permissão para criar extensões (ou a extensão já instalada pelo DBA)
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() é STABLE (depende do search_path); com o dicionário explícito
+    # o resultado é fixo e a função pode ser IMMUTABLE, requisito de índice
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'pt_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION pt_unaccent (COPY = portuguese);
+                ALTER TEXT SEARCH CONFIGURATION pt_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+            END IF;
+        END
+        $$
+    """)
+
+    op.add_column('catalogo_itens', sa.Column(
+        'busca_documento', postgresql.TSVECTOR(),
+        sa.Computed(BUSCA_DOCUMENTO, persisted=True), nullable=True,
+    ), if_not_exists=True)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            IX_BUSCA_DOCUMENTO, 'catalogo_itens', ['busca_documento'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+        for nome, antigo, tabela, coluna in INDICES_TRGM:
+            op.drop_index(antigo, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+            existentes = _colunas(tabela)
+            if existentes is not None and not isinstance(existentes.get(coluna), sa.String):
+                logger.warning(f"Índice {nome} pulado: {tabela}.{coluna} não é texto.")
+                continue
+            op.create_index(
+                nome, tabela, [sa.text(f"f_unaccent({coluna}) gin_trgm_ops")],
+                postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for nome, antigo, tabela, coluna in INDICES_TRGM:
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+            existentes = _colunas(tabela)
+            if existentes is not None and not isinstance(existentes.get(coluna), sa.String):
+                continue
+            op.create_index(
+                antigo, tabela, [coluna],
+                postgresql_using='gin', postgresql_ops={coluna: 'gin_trgm_ops'},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        op.drop_index(IX_BUSCA_DOCUMENTO, table_name='catalogo_itens', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('catalogo_itens', 'busca_documento')
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS pt_unaccent")
+    op.execute("DROP FUNCTION IF EXISTS public.f_unaccent(text)")
+    # A extensão unaccent fica: pode ser usada por outros objetos do banco
@@ -0,0 +1,100 @@
+"""telemetria_ia_log_geracao
+
+Revision ID: d5f1b3a7c9e2
+Revises: c3e7a9d1f4b2
+Create Date: 2026-10-18 11:42:17.305188
+
+Colunas de telemetria das chamadas à IA em log_geracao_documentos (LogDocumento):
+secao, tokens_prompt, tokens_resposta, latencia_ms, cache_hit e erro, e
+user_id opcional (as rotas de IA não identificam o usuário).
+
+Bancos criados só pelas migrações têm a tabela antiga generation_logs e não
+log_geracao_documentos; nesse caso a tabela é criada como no modelo, e o
+downgrade a remove inteira. Nos demais o downgrade remove só as colunas.
+
+No modo offline (--sql) não há banco para inspecionar: o SQL gerado segue a
+cadeia de migrações, ou seja, cria a tabela (e o downgrade a remove).
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1b3a7c9e2'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a9d1f4b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELA = 'log_geracao_documentos'
+
+
+def _colunas_telemetria() -> list[sa.Column]:
+    return [
+        sa.Column('secao', sa.String(length=50), nullable=True, comment='Seção do prompt. Ex: etp_need'),
+        sa.Column('tokens_prompt', sa.Integer(), nullable=True),
+        sa.Column('tokens_resposta', sa.Integer(), nullable=True),
+        sa.Column('latencia_ms', sa.Integer(), nullable=True),
+        sa.Column('cache_hit', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('erro', sa.String(length=100), nullable=True, comment='Classe do erro, se a chamada falhou'),
+    ]
+
+
+def _tabela_desta_revisao() -> bool:
+    """
+    No downgrade: a tabela foi criada pelo upgrade desta revisão? Sim nos bancos
+    da cadeia de migrações, reconhecidos pela generation_logs da migração
+    inicial (nenhum modelo cria essa tabela). Offline segue a cadeia: sim.
+    """
+    if context.is_offline_mode():
+        return True
+    return sa.inspect(op.get_bind()).has_table('generation_logs')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table(TABELA):
+        op.create_table(TABELA,
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('nome_arquivo_gerado', sa.String(length=255), nullable=False),
+            sa.Column('tipo_arquivo', sa.String(length=50), nullable=False, comment='docx, pdf, txt'),
+            sa.Column('ia_model', sa.String(length=50), nullable=True, comment='Ex: gemini-pro-1.5'),
+            sa.Column('tokens_utilizados', sa.Integer(), nullable=True, comment='Custo da operação'),
+            sa.Column('parametros_usados', sa.JSON(), nullable=True, comment='Snapshot dos dados usados no prompt'),
+            *_colunas_telemetria(),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('template_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('is_deleted', sa.Boolean(), server_default='false', nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['usuarios.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_log_geracao_documentos_id'), TABELA, ['id'], unique=False)
+        op.create_index(op.f('ix_log_geracao_documentos_secao'), TABELA, ['secao'], unique=False)
+        return
+
+    inspector = sa.inspect(op.get_bind())
+    existentes = {c['name'] for c in inspector.get_columns(TABELA)}
+    for coluna in _colunas_telemetria():
+        if coluna.name not in existentes:
+            op.add_column(TABELA, coluna)
+    op.alter_column(TABELA, 'user_id', existing_type=sa.Integer(), nullable=True)
+
+    if 'ix_log_geracao_documentos_secao' not in {i['name'] for i in inspector.get_indexes(TABELA)}:
+        op.create_index(op.f('ix_log_geracao_documentos_secao'), TABELA, ['secao'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _tabela_desta_revisao():
+        op.drop_index(op.f('ix_log_geracao_documentos_secao'), table_name=TABELA)
+        op.drop_index(op.f('ix_log_geracao_documentos_id'), table_name=TABELA)
+        op.drop_table(TABELA)
+        return
+
+    # user_id continua opcional: os registros de chamadas à IA não têm usuário
+    op.drop_index(op.f('ix_log_geracao_documentos_secao'), table_name=TABELA)
+    for coluna in reversed(_colunas_telemetria()):
+        op.drop_column(TABELA, coluna.name)
@@ -7,6 +7,43 @@ class Settings(BaseSettings):
 
     # Definimos aqui EXATAMENTE o que tem no seu .env
     DB_URL: str
+    # Pool único (async) da aplicação, por processo: pool_size conexões fixas +
+    # max_overflow sob pico. Com N workers do uvicorn o banco vê até
+    # N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) conexões.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Espera máxima por uma conexão livre antes de falhar a requisição
+    DB_POOL_TIMEOUT: float = 30.0
+    # Recicla conexões mais velhas que isso (fica abaixo do idle timeout de proxies/pgbouncer)
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Métricas do banco (pool e tempo por consulta, em /metrics/db). Consultas acima
+    # de DB_SLOW_QUERY_MS vão para o log com os parâmetros mascarados
+    DB_METRICS_ENABLED: bool = True
+    DB_SLOW_QUERY_MS: float = 500.0
+    DB_METRICS_MAX_FINGERPRINTS: int = 500
+
+    # Reconciliação do razão de saldo dos itens com os pedidos (0 = desligada; com
+    # vários workers do uvicorn, prefira o cron: python -m app.services.gestao.saldo_service)
+    SALDO_RECONCILIACAO_MINUTOS: int = 0
+    SALDO_RECONCILIACAO_CORRIGIR: bool = True
+
+    # Busca unificada (GET /busca): similaridade mínima de palavra (pg_trgm, 0 a 1)
+    # para aceitar um resultado com erro de digitação. Menor = mais tolerante.
+    BUSCA_SIMILARIDADE_MINIMA: float = 0.4
+
+    # Perfil por requisição (middleware, desligado por padrão). Fração das requisições
+    # amostradas (0.01 = 1%): recebem Server-Timing (db, ai, render, total) e vão para
+    # /metrics/requests. Com PROFILING_TOKEN, o cabeçalho X-Profile-Token força a
+    # amostragem e grava a pilha para flamegraph (/metrics/profiles/{id})
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_TOKEN: str = ""
+    PROFILING_INTERVAL_MS: float = 5.0
+    # Mesmo SQL repetido N vezes numa requisição é registrado no log como possível N+1
+    PROFILING_N_PLUS_ONE: int = 10
+    PROFILING_HISTORY: int = 200
+    PROFILING_MAX_PROFILES: int = 20
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -20,7 +57,93 @@ class Settings(BaseSettings):
     
     # Opcional (None) caso você ainda não tenha colocado, para não quebrar
     GEMINI_API_KEY: str | None = None 
-    
+
+    # Modelo de IA: 'gemini' (produção) ou 'stub' (modelo local determinístico, sem rede)
+    AI_MODEL_BACKEND: str = "gemini"
+    AI_STUB_LATENCY_SECONDS: float = 0.0
+
+    # IA: máximo de chamadas simultâneas ao modelo e tempo limite (segundos) por chamada
+    AI_MAX_CONCURRENCY: int = 8
+    AI_TIMEOUT_SECONDS: float = 60.0
+    # Geração do ETP completo: seções disparadas em paralelo por requisição
+    AI_ETP_FANOUT: int = 6
+
+    # Disjuntor do provedor: falhas seguidas até abrir e tempo aberto antes de testar de novo
+    AI_BREAKER_FAILURES: int = 5
+    AI_BREAKER_RESET_SECONDS: float = 30.0
+    # Chamada mínima ao modelo no startup (em segundo plano) para abrir a conexão
+    AI_WARMUP_ON_STARTUP: bool = False
+
+    # Orçamento de contexto (tokens estimados) para listas longas nos prompts:
+    # limite por item, limite total da lista, tamanho do grupo resumido no map-reduce
+    # e similaridade mínima para considerar dois textos duplicados
+    AI_CONTEXT_ITEM_TOKENS: int = 400
+    AI_CONTEXT_BUDGET_TOKENS: int = 6000
+    AI_CONTEXT_GROUP_TOKENS: int = 3000
+    AI_CONTEXT_DEDUP_THRESHOLD: float = 0.85
+
+    # Cache de respostas da IA: 'memory' (LRU por processo), 'sqlite' (disco local) ou 'none'
+    AI_CACHE_BACKEND: str = "memory"
+    AI_CACHE_TTL_SECONDS: int = 3600
+    AI_CACHE_MAX_ENTRIES: int = 1000
+    AI_CACHE_PATH: str = "cache/ai_cache.sqlite3"
+
+    # Telemetria da IA (tokens/latência) gravada em lote em log_geracao_documentos
+    AI_USAGE_LOG_ENABLED: bool = True
+    AI_USAGE_BATCH_SIZE: int = 200
+    AI_USAGE_FLUSH_SECONDS: float = 2.0
+    AI_USAGE_QUEUE_MAX: int = 10000
+
+    # Fila de jobs de IA em lote (ia_jobs)
+    AI_JOBS_WORKER_ENABLED: bool = True
+    AI_JOBS_WORKERS: int = 4
+    AI_JOBS_RATE_PER_MINUTE: int = 60  # por processo (N workers do uvicorn = N x este limite)
+    AI_JOBS_MAX_ATTEMPTS: int = 5
+    AI_JOBS_BACKOFF_SECONDS: float = 5.0
+    AI_JOBS_POLL_SECONDS: float = 2.0
+
+    # Templates .docx compilados mantidos em memória (chave: caminho + mtime)
+    DOCX_TEMPLATE_CACHE_SIZE: int = 64
+    # Processos que renderizam os .docx do kit de documentos (0 = um por CPU)
+    DOCX_RENDER_WORKERS: int = 0
+
+    # Conversão para PDF: DOCX via LibreOffice headless, HTML via WeasyPrint.
+    # PDFs gerados ficam num cache em disco endereçado por conteúdo (template + dados)
+    PDF_SOFFICE_BINARY: str = "soffice"
+    PDF_WORKERS: int = 2
+    PDF_TIMEOUT_SECONDS: float = 120.0
+    PDF_CACHE_DIR: str = "cache/pdf"
+    PDF_CACHE_MAX_MB: int = 1024
+
+    # Anexos: upload em partes (retomável) e conteúdo deduplicado por SHA-256.
+    # Tamanho máximo de cada parte, do arquivo inteiro e validade de uploads abandonados
+    ANEXO_CHUNK_MAX_MB: int = 16
+    ANEXO_MAX_MB: int = 200
+    ANEXO_UPLOAD_EXPIRE_HOURS: int = 24
+    # Pasta das partes de uploads em andamento (vazio = junto dos anexos locais).
+    # Com vários nós atrás do balanceador, use um volume compartilhado
+    ANEXO_PARTES_DIR: str = ""
+    # Com nginx na frente: prefixo da location 'internal' que aponta para a pasta de
+    # uploads (ex: /_uploads/). Vazio = o próprio app envia os arquivos
+    ANEXO_ACCEL_REDIRECT_PREFIX: str = ""
+
+    # Armazenamento de arquivos (anexos, templates, documentos gerados): 'local' ou 's3'.
+    # STORAGE_LOCAL_ROOT vazio mantém as pastas atuais; preenchido, usa <raiz>/<namespace>
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = ""
+    # S3 ou compatível (MinIO): path-style por padrão, que é o que o MinIO espera
+    STORAGE_S3_ENDPOINT: str | None = None
+    STORAGE_S3_BUCKET: str | None = None
+    STORAGE_S3_REGION: str = "us-east-1"
+    STORAGE_S3_ACCESS_KEY: str | None = None
+    STORAGE_S3_SECRET_KEY: str | None = None
+    STORAGE_S3_PREFIX: str = ""
+    STORAGE_S3_PATH_STYLE: bool = True
+    # Validade das URLs de download direto e cache local dos arquivos lidos do S3
+    STORAGE_PRESIGN_SECONDS: int = 300
+    STORAGE_CACHE_DIR: str = "cache/storage"
+    STORAGE_CACHE_MAX_MB: int = 2048
+
     # Se o código antigo tinha variaveis separadas (POSTGRES_USER), 
     # nós removemos daqui porque vamos usar a URL completa.
 
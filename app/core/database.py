@@ -1,16 +1,37 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.core.db_metrics import InstrumentedAsyncQueuePool, db_metrics
+from app.core import profiling
 
-# Sync Engine (Legacy/Compatibility)
-engine = create_engine(settings.DB_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _async_url(url: str) -> str:
+    # Ensure URL uses asyncpg driver
+    return url.replace("postgresql://", "postgresql+asyncpg://")
 
-# Async Engine (New Standard)
-# Ensure URL uses asyncpg driver
-async_db_url = settings.DB_URL.replace("postgresql://", "postgresql+asyncpg://")
-async_engine = create_async_engine(async_db_url, echo=False)
+def _pool_options(url: str) -> dict:
+    """Parâmetros do pool; SQLite (testes/scripts) usa o pool padrão do dialeto."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        # Mesmo pool padrão do asyncpg, com o tempo de espera pelo checkout medido
+        "poolclass": InstrumentedAsyncQueuePool if settings.DB_METRICS_ENABLED else None,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Async Engine: único pool da aplicação (todas as rotas e repositórios)
+async_db_url = _async_url(settings.DB_URL)
+async_engine = create_async_engine(async_db_url, echo=False, **_pool_options(async_db_url))
+if settings.DB_METRICS_ENABLED:
+    db_metrics.instrument(async_engine.sync_engine, "async")
+if settings.PROFILING_ENABLED:
+    profiling.instrument(async_engine.sync_engine)
 
 AsyncSessionLocal = sessionmaker(
     bind=async_engine,
@@ -22,15 +43,22 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
-def get_db():
-    """
-    Sync Dependency.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Sync Engine: só para o Alembic e escritas de threads em segundo plano.
+# Criado no primeiro uso e sem pool (NullPool): não mantém conexões abertas
+# ao lado do pool async.
+_sync_engine = None
+
+def get_sync_engine():
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(settings.DB_URL, poolclass=NullPool)
+        if settings.DB_METRICS_ENABLED:
+            db_metrics.instrument(_sync_engine, "sync", pool=False)
+    return _sync_engine
+
+def SessionLocal():
+    """Sessão sync avulsa (fora das rotas). Nas rotas use get_db/get_async_db."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())()
 
 async def get_async_db():
     """
@@ -38,3 +66,6 @@ async def get_async_db():
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+# Nome antigo da dependência: as rotas que usavam a sessão sync recebem a async
+get_db = get_async_db
@@ -0,0 +1,275 @@
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Limites (ms) dos buckets dos histogramas; o último bucket é "acima de 5000"
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# --- Fingerprint do SQL ---
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_BIND = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS = re.compile(r"(\((?:\?|\.\.\.)(?:, (?:\?|\.\.\.))*\))(?:\s*,\s*\((?:\?|\.\.\.)(?:, (?:\?|\.\.\.))*\))+")
+_SPACES = re.compile(r"\s+")
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    SQL normalizado: literais e parâmetros viram '?', listas IN e linhas de
+    VALUES repetidas são colapsadas. A mesma consulta com valores diferentes
+    (ou IN com tamanhos diferentes) cai no mesmo fingerprint.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _BIND.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1, ...", sql)
+    return sql[:1000]
+
+def _redact_value(value) -> object:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+def redact_params(parameters) -> object:
+    """Parâmetros sem os valores (só tipo e tamanho): o log não guarda CPF, senha, etc."""
+    if isinstance(parameters, dict):
+        return {k: _redact_value(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: mostra só o primeiro conjunto
+            return {"conjuntos": len(parameters), "primeiro": redact_params(parameters[0])}
+        return [_redact_value(v) for v in parameters]
+    return _redact_value(parameters)
+
+# --- Coletor ---
+
+class _Histogram:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        for i, limite in enumerate(BUCKETS_MS):
+            if ms <= limite:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Percentil aproximado pelo limite superior do bucket (nunca acima do máximo visto)."""
+        if not self.count:
+            return None
+        alvo = p * self.count
+        acumulado = 0
+        for i, n in enumerate(self.buckets):
+            acumulado += n
+            if acumulado >= alvo:
+                return min(float(BUCKETS_MS[i]), self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets_ms": {
+                **{f"le_{limite}": n for limite, n in zip(BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+        }
+
+class _StatementStats(_Histogram):
+    __slots__ = ("errors", "rows")
+
+    def __init__(self):
+        super().__init__()
+        self.errors = 0
+        self.rows = 0
+
+class DbMetrics:
+    """
+    Métricas do banco no processo, alimentadas pelos eventos do SQLAlchemy:
+    - pool: tempo de espera pelo checkout, timeouts (pool esgotado), pico de
+      conexões em uso; conexões em uso/overflow atuais são lidas do pool na consulta;
+    - statements: contagem, tempo e erros por fingerprint do SQL.
+    Statements acima de DB_SLOW_QUERY_MS vão para o log com os parâmetros
+    mascarados. Contadores são por processo (cada worker do uvicorn tem os seus).
+    """
+
+    def __init__(self, slow_query_ms: float, max_fingerprints: int):
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._pools: Dict[str, object] = {}
+        # Conexões em uso agora: não zera no reset (continuam emprestadas)
+        self.in_use = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkout_wait = _Histogram()
+            self.checkout_timeouts = 0
+            self.in_use_peak = self.in_use
+            self.slow_queries = 0
+            self.statements: Dict[str, _StatementStats] = {}
+            self.started_at = time.time()
+
+    # --- Pool ---
+    def observe_checkout_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkout_wait.observe(seconds * 1000)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        with self._lock:
+            self.in_use += 1
+            if self.in_use > self.in_use_peak:
+                self.in_use_peak = self.in_use
+
+    def _on_checkin(self, dbapi_conn, record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    # --- Statements ---
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["_metrics_start"].pop()
+        ms = (time.perf_counter() - inicio) * 1000
+        rows = cursor.rowcount if cursor is not None and cursor.rowcount and cursor.rowcount > 0 else 0
+        self._record(statement, ms, rows=rows)
+        if ms >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(
+                f"Consulta lenta ({ms:.1f} ms): {fingerprint(statement)} "
+                f"| parâmetros: {redact_params(parameters)}"
+            )
+
+    def _on_error(self, context):
+        conn = context.connection
+        if conn is None or not conn.info.get("_metrics_start") or context.statement is None:
+            return
+        inicio = conn.info["_metrics_start"].pop()
+        self._record(context.statement, (time.perf_counter() - inicio) * 1000, error=True)
+
+    def _record(self, statement: str, ms: float, rows: int = 0, error: bool = False):
+        chave = fingerprint(statement)
+        with self._lock:
+            stats = self.statements.get(chave)
+            if stats is None:
+                # Limite de fingerprints: SQL gerado dinamicamente não cresce a memória sem fim
+                if len(self.statements) >= self.max_fingerprints:
+                    chave = "<outros>"
+                    stats = self.statements.get(chave)
+                if stats is None:
+                    stats = self.statements[chave] = _StatementStats()
+            stats.observe(ms)
+            stats.rows += rows
+            if error:
+                stats.errors += 1
+
+    # --- Registro nos engines ---
+    def instrument(self, engine, name: str, pool: bool = True):
+        """
+        Liga os eventos a um engine (sync ou o .sync_engine de um AsyncEngine).
+        pool=False mede só os statements (engine sem pool, ex: o sync com NullPool).
+        """
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._on_error)
+        if pool:
+            event.listen(engine.pool, "checkout", self._on_checkout)
+            event.listen(engine.pool, "checkin", self._on_checkin)
+            self._pools[name] = engine.pool
+
+    def _pool_status(self) -> dict:
+        status = {}
+        for name, pool in self._pools.items():
+            info = {"class": type(pool).__name__}
+            # QueuePool e derivados expõem os contadores; NullPool/StaticPool não
+            for attr in ("size", "checkedin", "checkedout", "overflow"):
+                fn = getattr(pool, attr, None)
+                if callable(fn):
+                    info[attr] = fn()
+            if "overflow" in info:
+                # overflow() é negativo enquanto o pool não criou todas as pool_size conexões
+                info["overflow"] = max(0, info["overflow"])
+            status[name] = info
+        return status
+
+    def snapshot(self, top: int = 20, order_by: str = "total_ms") -> dict:
+        with self._lock:
+            statements = [
+                {"fingerprint": chave, "errors": s.errors, "rows": s.rows, **s.as_dict()}
+                for chave, s in self.statements.items()
+            ]
+            pool = {
+                "checkout_wait": self.checkout_wait.as_dict(),
+                "checkout_timeouts": self.checkout_timeouts,
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak,
+            }
+            slow_queries = self.slow_queries
+            started_at = self.started_at
+
+        if order_by not in ("total_ms", "count", "max_ms", "avg_ms", "errors"):
+            order_by = "total_ms"
+        statements.sort(key=lambda s: s[order_by] or 0, reverse=True)
+        return {
+            "since": started_at,
+            "pool": {**pool, "engines": self._pool_status()},
+            "slow_query_ms": self.slow_query_ms,
+            "slow_queries": slow_queries,
+            "fingerprints": len(statements),
+            "statements": statements[:top],
+        }
+
+db_metrics = DbMetrics(settings.DB_SLOW_QUERY_MS, settings.DB_METRICS_MAX_FINGERPRINTS)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool async padrão com a espera pelo checkout medida.
+    O SQLAlchemy não tem evento "antes do checkout": o tempo é medido em volta
+    de _do_get, que é onde a requisição espera uma conexão livre (ou abre uma nova).
+    """
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            db_metrics.observe_checkout_wait(time.perf_counter() - inicio, timed_out=True)
+            raise
+        db_metrics.observe_checkout_wait(time.perf_counter() - inicio)
+        return conn
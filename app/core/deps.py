@@ -1,4 +1,3 @@
-from typing import AsyncGenerator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
@@ -7,9 +6,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
+from app.core.database import get_async_db
 from app.models.core.user_model import User
 from app.repositories.core.user_repository import UserRepository
+from app.services.planejamento.ai_service import AIService
+from app.services.planejamento.ai_client_registry import ai_registry, AIUnavailableError
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -26,13 +27,22 @@ def get_file_service(): return MockService("FileService")
 def get_document_service(): return MockService("DocumentService")
 def get_zip_service(): return MockService("ZipService")
 
+def get_ai_service() -> AIService:
+    """
+    Cliente de IA compartilhado (criado no primeiro uso).
+    Sem provedor configurado, só as rotas de IA falham, com 503.
+    """
+    try:
+        return ai_registry.get()
+    except AIUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Serviço de IA indisponível: {e}"
+        )
+
 # --- Dependências de Banco ---
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# Mesma dependência de app.core.database: um override em get_async_db vale para todas as rotas
+get_db = get_async_db
 
 async def get_user_repo(session: AsyncSession = Depends(get_db)) -> UserRepository:
     return UserRepository(session)
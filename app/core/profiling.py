@@ -0,0 +1,315 @@
+import asyncio
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import jinja2
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.db_metrics import fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Perfil da requisição amostrada em andamento (None = requisição não amostrada).
+# Tarefas filhas (asyncio.gather) e a greenlet do SQLAlchemy async herdam o contexto,
+# então tudo o que a requisição disparar soma no mesmo objeto.
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class RequestProfile:
+    """Tempos acumulados de uma requisição: categoria -> (ms, ocorrências)."""
+
+    __slots__ = ("timings", "statements")
+
+    def __init__(self):
+        self.timings: Dict[str, list] = {}
+        self.statements: Counter = Counter()
+
+    def add(self, name: str, ms: float):
+        entry = self.timings.setdefault(name, [0.0, 0])
+        entry[0] += ms
+        entry[1] += 1
+
+    def server_timing(self, total_ms: float) -> str:
+        partes = []
+        for name, (ms, count) in self.timings.items():
+            partes.append(f'{name};dur={ms:.1f};desc="{count}x"')
+        partes.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(partes)
+
+    def as_dict(self) -> dict:
+        return {name: {"ms": round(ms, 1), "count": count} for name, (ms, count) in self.timings.items()}
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+@contextmanager
+def timed(name: str):
+    """
+    Soma o tempo do bloco na categoria `name` da requisição amostrada
+    (ex: with timed("ai"): await ...). Sem amostragem é só um get do ContextVar.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - inicio) * 1000)
+
+class TimedTemplate(jinja2.Template):
+    """Template Jinja que soma o tempo de render() em 'render' (usar como env.template_class)."""
+
+    def render(self, *args, **kwargs):
+        with timed("render"):
+            return super().render(*args, **kwargs)
+
+# --- Banco ---
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._profiling_start = time.perf_counter()
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    inicio = getattr(context, "_profiling_start", None)
+    if profile is None or inicio is None:
+        return
+    profile.add("db", (time.perf_counter() - inicio) * 1000)
+    profile.statements[fingerprint(statement)] += 1
+
+def instrument(engine):
+    """Tempo e número de statements do engine na requisição amostrada (categoria 'db')."""
+    event.listen(engine, "before_cursor_execute", _before_cursor)
+    event.listen(engine, "after_cursor_execute", _after_cursor)
+
+# --- Amostragem de pilha (flamegraph) ---
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[-1]
+    elif path.startswith(_PROJECT_ROOT):
+        path = os.path.relpath(path, _PROJECT_ROOT)
+    # co_firstlineno (e não a linha atual) agrupa as amostras por função
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+def _await_chain(coro) -> list:
+    """Frames de uma corrotina suspensa seguindo cr_await até o ponto de espera."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+class StackSampler:
+    """
+    Amostra a pilha de uma tarefa asyncio a cada interval segundos, em uma thread.
+    Tarefa executando: pilha real da thread do event loop a partir da corrotina
+    da tarefa. Tarefa suspensa: cadeia de awaits até o ponto de espera (banco,
+    IA, threadpool), com folha '[espera]'. O resultado é tempo de relógio,
+    no formato "folded" (flamegraph.pl, speedscope).
+    Trabalho de tarefas filhas (gather) aparece como espera na tarefa principal.
+    As pilhas começam em root (o frame do middleware), sem o servidor ASGI acima.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float, root=None):
+        self.task = task
+        self.root = root
+        self.loop = task.get_loop()
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # Leitura concorrente de frames pode falhar no meio; perde-se uma amostra
+                continue
+
+    def _sample(self):
+        if self.task.done():
+            return
+        coro = self.task.get_coro()
+        root = self.root or coro.cr_frame
+        if asyncio.current_task(self.loop) is self.task:
+            frames = []
+            frame = sys._current_frames().get(self.thread_id)
+            while frame is not None:
+                frames.append(frame)
+                if frame is root:
+                    break
+                frame = frame.f_back
+            frames.reverse()
+            leaf = []
+        else:
+            frames = _await_chain(coro)
+            if root in frames:
+                frames = frames[frames.index(root):]
+            leaf = ["[espera]"]
+        if frames:
+            self.stacks[";".join([_frame_label(f) for f in frames] + leaf)] += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+# --- Middleware ---
+
+class ProfilingMiddleware:
+    """
+    Perfil por requisição (opt-in, PROFILING_ENABLED), amostrando PROFILING_SAMPLE_RATE
+    das requisições. Nas amostradas:
+    - cabeçalho Server-Timing com db (tempo e nº de statements), ai, render e total
+      (medido até o envio dos cabeçalhos; o DevTools mostra em Timing);
+    - resumo guardado em recent (GET /metrics/requests) e aviso no log quando o
+      mesmo SQL se repete PROFILING_N_PLUS_ONE vezes (padrão N+1).
+    Com o cabeçalho X-Profile-Token igual a PROFILING_TOKEN a requisição é sempre
+    amostrada e também tem a pilha amostrada: o id volta em X-Profile-Id e o
+    flamegraph sai em GET /metrics/profiles/{id}. Um perfil de pilha por vez.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0, token: str = "", interval_ms: float = 5.0,
+                 n_plus_one: int = 10, history: int = 200, max_profiles: int = 20):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval_ms / 1000
+        self.n_plus_one = n_plus_one
+        profiler.configure(history, max_profiles)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        on_demand = bool(self.token) and hmac.compare_digest(
+            Headers(scope=scope).get("x-profile-token", ""), self.token
+        )
+        if not on_demand and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        sampler = profiler.acquire_sampler(self.interval, root=sys._getframe()) if on_demand else None
+        profile_id = uuid.uuid4().hex if sampler else None
+        inicio = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing((time.perf_counter() - inicio) * 1000))
+                if profile_id:
+                    headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        if sampler:
+            sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            total_ms = (time.perf_counter() - inicio) * 1000
+            _current.reset(token)
+            if sampler:
+                # join curto (no máximo um intervalo); não usa await para não
+                # deixar o sampler preso se a requisição for cancelada aqui
+                sampler.stop()
+                profiler.release_sampler()
+            self._finish(scope, status_code, profile, total_ms, sampler, profile_id)
+
+    def _finish(self, scope, status_code, profile: RequestProfile, total_ms: float,
+                sampler: Optional[StackSampler], profile_id: Optional[str]):
+        path = scope.get("path", "")
+        repetidos = [(sql, n) for sql, n in profile.statements.most_common(3) if n >= self.n_plus_one]
+        for sql, n in repetidos:
+            logger.warning(f"Possível N+1 em {scope.get('method')} {path}: {n}x {sql[:300]}")
+
+        resumo = {
+            "method": scope.get("method"),
+            "path": path,
+            "status": status_code,
+            "total_ms": round(total_ms, 1),
+            "timings": profile.as_dict(),
+            "statements_repetidos": [{"sql": sql, "count": n} for sql, n in repetidos],
+            "profile_id": profile_id,
+            "at": time.time(),
+        }
+        profiler.record(resumo, sampler.folded() if sampler else None)
+
+class Profiler:
+    """Histórico das requisições amostradas e perfis de pilha (por processo, em memória)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sampling = False
+        self.configure(200, 20)
+
+    def configure(self, history: int, max_profiles: int):
+        self.recent = deque(maxlen=history)
+        self.max_profiles = max_profiles
+        self.profiles: "OrderedDict[str, dict]" = OrderedDict()
+
+    def acquire_sampler(self, interval: float, root=None) -> Optional[StackSampler]:
+        with self._lock:
+            if self._sampling:
+                return None
+            self._sampling = True
+        return StackSampler(asyncio.current_task(), interval, root=root)
+
+    def release_sampler(self):
+        with self._lock:
+            self._sampling = False
+
+    def record(self, resumo: dict, folded: Optional[str]):
+        with self._lock:
+            self.recent.append(resumo)
+            if folded is not None and resumo["profile_id"]:
+                self.profiles[resumo["profile_id"]] = {**resumo, "folded": folded}
+                while len(self.profiles) > self.max_profiles:
+                    self.profiles.popitem(last=False)
+
+    def list_recent(self, limit: int = 50, min_ms: float = 0) -> list:
+        with self._lock:
+            itens = [r for r in self.recent if r["total_ms"] >= min_ms]
+        return list(reversed(itens))[:limit]
+
+    def list_profiles(self) -> list:
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "folded"} for p in reversed(self.profiles.values())]
+
+    def get_profile(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+profiler = Profiler()
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    """
+    Formata um evento Server-Sent Events. O payload vai em JSON para que
+    quebras de linha do texto não quebrem o protocolo.
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _text_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        async for chunk in chunks:
+            yield sse_event({"delta": chunk})
+        yield sse_event({}, event="done")
+    except asyncio.CancelledError:
+        # Cliente desconectou: o cancelamento segue até a chamada ao modelo
+        raise
+    except asyncio.TimeoutError:
+        yield sse_event({"detail": "Tempo limite excedido na geração."}, event="error")
+    except Exception as e:
+        yield sse_event({"detail": f"Erro na geração: {str(e)}"}, event="error")
+
+def text_event_stream(chunks: AsyncIterator[str]) -> StreamingResponse:
+    """
+    Resposta SSE para um gerador de texto parcial.
+    Eventos: 'message' com {"delta": ...} a cada parte, 'done' ao final
+    e 'error' com {"detail": ...} se a geração falhar no meio do caminho.
+    Quando o cliente desconecta, o Starlette cancela a tarefa e o gerador
+    é interrompido (a chamada ao modelo deixa de consumir cota).
+    """
+    return StreamingResponse(
+        _text_events(chunks),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Desliga o buffer do Nginx para o primeiro byte chegar de imediato
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,15 +1,23 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
 
 from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.services.planejamento.ai_client_registry import ai_registry
+from app.services.planejamento.ai_job_service import AIJobWorker
+from app.services.gestao.saldo_service import SaldoReconciliacaoJob
+from app.services.core.document_batch_service import shutdown_render_executor
+from app.services.core.storage_service import close_storages
 
 # Core Routers
 from app.routers.core import (
     auth_router,
     user_router,
     unidade_router,
-    agente_router
+    agente_router,
+    metrics_router
 )
 
 # Planejamento Routers
@@ -19,7 +27,10 @@ from app.routers.planejamento import (
     risk_router,
     tr_router,
     ai_router,
-    cadastro_router
+    ai_job_router,
+    cadastro_router,
+    documento_router,
+    template_router
 )
 
 # Gestão Routers
@@ -38,7 +49,8 @@ from app.routers.gestao import (
     numero_modalidade_router,
     processo_licitatorio_router,
     tipo_documento_router,
-    ui_router
+    ui_router,
+    busca_router
 )
 # Gestão specific Auth/User
 from app.routers.gestao import auth_router as gestao_auth_router
@@ -49,6 +61,62 @@ app = FastAPI(
     openapi_url="/api/v1/openapi.json"
 )
 
+# Perfil por requisição (opt-in): Server-Timing e flamegraph sob demanda
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        token=settings.PROFILING_TOKEN,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+        n_plus_one=settings.PROFILING_N_PLUS_ONE,
+        history=settings.PROFILING_HISTORY,
+        max_profiles=settings.PROFILING_MAX_PROFILES,
+    )
+
+# --- IA: warm-up opcional e fila em lote (workers no mesmo processo da API) ---
+# O startup não depende do provedor: sem chave/conexão a API sobe e só a IA fica indisponível.
+# O worker resolve o cliente no ai_registry a cada job, então a fila volta sozinha
+# quando o provedor (ou a configuração) se recupera.
+ai_job_worker = None
+# Referência forte: o event loop só guarda referência fraca às tasks
+ai_warm_up_task = None
+
+@app.on_event("startup")
+async def start_ai_job_worker():
+    global ai_job_worker, ai_warm_up_task
+    if settings.AI_WARMUP_ON_STARTUP:
+        ai_warm_up_task = asyncio.create_task(ai_registry.warm_up(), name="ai-warm-up")
+
+    if settings.AI_JOBS_WORKER_ENABLED:
+        ai_job_worker = AIJobWorker.from_settings()
+        await ai_job_worker.start()
+
+@app.on_event("shutdown")
+async def stop_ai_job_worker():
+    if ai_warm_up_task is not None and not ai_warm_up_task.done():
+        ai_warm_up_task.cancel()
+    if ai_job_worker is not None:
+        await ai_job_worker.stop()
+
+# Reconciliação periódica do razão de saldo dos itens (SALDO_RECONCILIACAO_MINUTOS > 0)
+saldo_reconciliacao = SaldoReconciliacaoJob.from_settings()
+
+@app.on_event("startup")
+async def start_saldo_reconciliacao():
+    await saldo_reconciliacao.start()
+
+@app.on_event("shutdown")
+async def stop_saldo_reconciliacao():
+    await saldo_reconciliacao.stop()
+
+@app.on_event("shutdown")
+def stop_render_pool():
+    shutdown_render_executor()
+
+@app.on_event("shutdown")
+async def stop_storage_clients():
+    await close_storages()
+
 # Mount static files if directory exists
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(static_dir):
@@ -61,6 +129,7 @@ app.include_router(auth_router.router)
 app.include_router(user_router.router)
 app.include_router(unidade_router.router)
 app.include_router(agente_router.router)
+app.include_router(metrics_router.router)
 
 # Planejamento
 app.include_router(dfd_router.router)
@@ -68,7 +137,10 @@ app.include_router(etp_router.router)
 app.include_router(risk_router.router)
 app.include_router(tr_router.router)
 app.include_router(ai_router.router)
+app.include_router(ai_job_router.router)
 app.include_router(cadastro_router.router)
+app.include_router(documento_router.router)
+app.include_router(template_router.router)
 
 # Gestão
 app.include_router(contrato_router.router)
@@ -86,6 +158,7 @@ app.include_router(numero_modalidade_router.router)
 app.include_router(processo_licitatorio_router.router)
 app.include_router(tipo_documento_router.router)
 app.include_router(ui_router.router)
+app.include_router(busca_router.router)
 app.include_router(gestao_auth_router.router)
 app.include_router(gestao_user_router.router)
 
@@ -21,6 +21,7 @@ from .planejamento.etp_model import ETP
 from .planejamento.item_etp_model import ItemETP
 from .planejamento.etp_equipe_model import ETPEquipe
 from .planejamento.etp_dotacao_model import ETPDotacao
+from .planejamento.etp_dfd_model import ETPDFD
 
 from .planejamento.matriz_risco_model import MatrizRisco
 from .planejamento.item_risco_model import ItemRisco
@@ -29,9 +30,11 @@ from .planejamento.tr_model import TR
 from .planejamento.processo_licitatorio_model import ProcessoLicitatorio
 from .planejamento.processo_documento_model import ProcessoDocumento
 from .planejamento.template_model import Template
+from .planejamento.ai_job_model import AIJob
 
 # 3. Gestão Models (Execução e Contratos)
 from .gestao.anexo_model import Anexo
+from .gestao.anexo_blob_model import AnexoBlob
 from .gestao.tipo_documento_model import TipoDocumento
 from .gestao.categoria_model import Categoria
 from .gestao.grupo_model import Grupo
@@ -45,6 +48,7 @@ from .gestao.local_model import Local
 from .gestao.contrato_model import Contrato
 from .gestao.instrumento_model import InstrumentoContratual
 from .gestao.item_model import ItemContrato
+from .gestao.saldo_item_contrato_model import SaldoItemContrato
 
 from .gestao.pedido_model import Pedido # Antigo Aocs (Verificar se renomeamos a classe)
 from .gestao.itens_aocs_model import ItensAocs
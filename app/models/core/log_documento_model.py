@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, ForeignKey, JSON
+from sqlalchemy import String, Integer, ForeignKey, JSON, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 
@@ -19,6 +19,8 @@ class LogDocumento(DefaultModel, Base):
     Regras de Negócio:
     - Deve registrar qual modelo de IA foi utilizado.
     - Deve registrar o consumo de tokens (se disponível) para cálculo de custo.
+    - Chamadas ao modelo (AIService) também são registradas aqui, com a seção
+      do prompt, tokens de entrada/saída, latência, cache hit e classe do erro.
     """
     __tablename__ = "log_geracao_documentos"
 
@@ -31,8 +33,17 @@ class LogDocumento(DefaultModel, Base):
     tokens_utilizados: Mapped[int | None] = mapped_column(Integer, default=0, comment="Custo da operação")
     parametros_usados: Mapped[dict | None] = mapped_column(JSON, nullable=True, comment="Snapshot dos dados usados no prompt")
 
+    # Telemetria por chamada ao modelo
+    secao: Mapped[str | None] = mapped_column(String(50), nullable=True, index=True, comment="Seção do prompt. Ex: etp_need")
+    tokens_prompt: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    tokens_resposta: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    latencia_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cache_hit: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+    erro: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="Classe do erro, se a chamada falhou")
+
     # Relacionamentos
-    user_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
+    # Opcional: as rotas de IA ainda não identificam o usuário
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("usuarios.id"), nullable=True)
     user: Mapped["User"] = relationship("User", back_populates="logs")
     
     # Template é opcional (pode ser geração livre)
@@ -0,0 +1,22 @@
+from sqlalchemy import String, BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from app.core.base_model import DefaultModel
+
+class AnexoBlob(DefaultModel, Base):
+    """
+    Conteúdo físico de anexos, endereçado pelo SHA-256.
+    Vários anexos com o mesmo arquivo (ex: a mesma certidão enviada para
+    vários contratos) apontam para um único blob; ref_count conta quantos.
+    Quando o último anexo é excluído o blob sai do banco e do disco.
+    """
+    __tablename__ = "anexo_blobs"
+
+    hash_sha256: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    tamanho_bytes: Mapped[int] = mapped_column(BigInteger)
+    # Caminho relativo à pasta de uploads (ex: blobs/ab/ab12...)
+    caminho: Mapped[str] = mapped_column(String(500))
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+
+    def __repr__(self):
+        return f"<AnexoBlob {self.hash_sha256[:12]} refs={self.ref_count}>"
@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import String, ForeignKey, BigInteger, TIMESTAMP, CheckConstraint
+from sqlalchemy import String, ForeignKey, BigInteger, TIMESTAMP, CheckConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -18,6 +18,12 @@ class Anexo(DefaultModel, Base):
             "(id_contrato IS NOT NULL AND id_aocs IS NULL) OR (id_contrato IS NULL AND id_aocs IS NOT NULL)",
             name="check_origem_anexo"
         ),
+        # Anexos de um contrato/AOCS, mais recentes primeiro; parciais porque
+        # cada anexo preenche só uma das duas FKs
+        Index("ix_anexos_id_contrato_data_upload", "id_contrato", "data_upload",
+              postgresql_where=text("id_contrato IS NOT NULL")),
+        Index("ix_anexos_id_aocs_data_upload", "id_aocs", "data_upload",
+              postgresql_where=text("id_aocs IS NOT NULL")),
     )
     
     nome_original: Mapped[str] = mapped_column(String(255))
@@ -25,6 +31,8 @@ class Anexo(DefaultModel, Base):
     caminho_arquivo: Mapped[str | None] = mapped_column(String(500), nullable=True)
     tamanho_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     mimetype: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    # Conteúdo deduplicado: caminho_arquivo aponta para o blob (ver AnexoBlob)
+    hash_sha256: Mapped[str | None] = mapped_column(String(64), index=True, nullable=True)
     
     id_tipo_documento: Mapped[int | None] = mapped_column(ForeignKey("tipos_documento.id"), nullable=True)
     
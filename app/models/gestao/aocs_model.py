@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import String, Integer, ForeignKey, Text, Date, TIMESTAMP
+from sqlalchemy import String, Integer, ForeignKey, Text, Date, TIMESTAMP, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,6 +13,12 @@ if TYPE_CHECKING:
 
 class Aocs(DefaultModel, Base):
     __tablename__ = "aocs"
+
+    __table_args__ = (
+        # Busca por número sem acentos (ILIKE e similaridade): trigramas (pg_trgm + unaccent)
+        Index("ix_aocs_numero_aocs_unaccent_trgm", text("f_unaccent(numero_aocs) gin_trgm_ops"),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     numero_aocs: Mapped[str] = mapped_column(String(100), unique=True)
     ano_aocs: Mapped[int] = mapped_column(Integer)
@@ -21,7 +27,7 @@ class Aocs(DefaultModel, Base):
     
     data_emissao: Mapped[date] = mapped_column(Date, default=func.current_date())
     
-    id_unidade_requisitante: Mapped[int] = mapped_column(ForeignKey("unidades_requisitantes.id"))
+    id_unidade_requisitante: Mapped[int] = mapped_column(ForeignKey("unidades.id"))
     
     id_solicitante: Mapped[int | None] = mapped_column(ForeignKey("agentes_responsaveis.id"), nullable=True)
     id_agente_responsavel: Mapped[int | None] = mapped_column(ForeignKey("agentes_responsaveis.id"), nullable=True)
@@ -30,7 +36,7 @@ class Aocs(DefaultModel, Base):
     agente_responsavel: Mapped["Agente"] = relationship("Agente", foreign_keys=[id_agente_responsavel], lazy="selectin")
     
     id_local_entrega: Mapped[int | None] = mapped_column(ForeignKey("locais_entrega.id"), nullable=True)
-    id_dotacao: Mapped[int | None] = mapped_column(ForeignKey("dotacao.id"), nullable=True)
+    id_dotacao: Mapped[int | None] = mapped_column(ForeignKey("dotacoes.id"), nullable=True)
     
     empenho: Mapped[str | None] = mapped_column(String(50), nullable=True)
     
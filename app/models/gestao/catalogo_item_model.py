@@ -1,5 +1,6 @@
 from datetime import date
-from sqlalchemy import String, Boolean, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import DDL, String, Boolean, Text, TIMESTAMP, ForeignKey, Index, event, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +13,14 @@ if TYPE_CHECKING:
 
 class CatalogoItem(DefaultModel, Base): 
     __tablename__ = "catalogo_itens"
+
+    __table_args__ = (
+        # Busca por nome sem acentos (ILIKE e similaridade): trigramas (pg_trgm + unaccent)
+        Index("ix_catalogo_itens_nome_item_unaccent_trgm", text("f_unaccent(nome_item) gin_trgm_ops"),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Criados pelo DDL só do PostgreSQL no fim do arquivo; o autogenerate não os remove (alembic/env.py)
+        {"info": {"ddl_postgresql": ("busca_documento", "ix_catalogo_itens_busca_documento")}},
+    )
     
     id_subgrupo: Mapped[int] = mapped_column(ForeignKey("subgrupos.id"))
     subgrupo: Mapped["Subgrupo"] = relationship("Subgrupo", lazy="selectin")
@@ -25,6 +34,26 @@ class CatalogoItem(DefaultModel, Base):
     codigo_identificacao_completo: Mapped[str | None] = mapped_column(String(10), unique=True, nullable=True)
     
     descricao_detalhada: Mapped[str | None] = mapped_column(Text, nullable=True)
+
     ativo: Mapped[bool] = mapped_column(Boolean, default=True)
     
-    data_criacao: Mapped[date] = mapped_column(TIMESTAMP(timezone=True), server_default=func.current_timestamp())
\ No newline at end of file
+    data_criacao: Mapped[date] = mapped_column(TIMESTAMP(timezone=True), server_default=func.current_timestamp())
+
+# Documento de busca em português sem acentos (nome pesa mais que a descrição),
+# gerado pelo banco. Só existe no PostgreSQL (migração c3e7a9d1f4b2), por isso
+# fica fora do Table: não entra no CREATE TABLE do SQLite dos testes nem nos
+# SELECT do catálogo. As consultas usam a expressão abaixo.
+BUSCA_DOCUMENTO_SQL = (
+    "setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(nome_item, '')), 'A') || "
+    "setweight(to_tsvector('pt_unaccent'::regconfig, coalesce(descricao_detalhada, '')), 'B')"
+)
+busca_documento = literal_column("catalogo_itens.busca_documento", TSVECTOR)
+
+# create_all no PostgreSQL: coluna e índice GIN (GET /busca), como na migração
+event.listen(CatalogoItem.__table__, "after_create", DDL(
+    f"ALTER TABLE catalogo_itens ADD COLUMN busca_documento tsvector "
+    f"GENERATED ALWAYS AS ({BUSCA_DOCUMENTO_SQL}) STORED"
+).execute_if(dialect="postgresql"))
+event.listen(CatalogoItem.__table__, "after_create", DDL(
+    "CREATE INDEX ix_catalogo_itens_busca_documento ON catalogo_itens USING gin (busca_documento)"
+).execute_if(dialect="postgresql"))
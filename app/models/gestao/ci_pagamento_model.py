@@ -21,7 +21,7 @@ class CiPagamento(DefaultModel, Base):
     data_ci: Mapped[date] = mapped_column(Date)
     
     id_solicitante: Mapped[int | None] = mapped_column(ForeignKey("agentes_responsaveis.id"), nullable=True)
-    id_dotacao_pagamento: Mapped[int | None] = mapped_column(ForeignKey("dotacao.id"), nullable=True)
+    id_dotacao_pagamento: Mapped[int | None] = mapped_column(ForeignKey("dotacoes.id"), nullable=True)
     
     numero_nota_fiscal: Mapped[str] = mapped_column(String(100))
     serie_nota_fiscal: Mapped[str | None] = mapped_column(String(50), nullable=True)
@@ -1,6 +1,6 @@
 from datetime import date
 from decimal import Decimal
-from sqlalchemy import ForeignKey, String, Integer, Boolean, Date, Numeric, TIMESTAMP
+from sqlalchemy import ForeignKey, String, Integer, Boolean, Date, Numeric, TIMESTAMP, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,6 +17,18 @@ if TYPE_CHECKING:
 class Contrato(DefaultModel, Base): 
     __tablename__ = "contratos"
 
+    __table_args__ = (
+        # Listagem: filtros de vigência/vencimento e paginação por (data_fim_vigencia, id).
+        # numero_contrato já tem o índice da constraint unique
+        Index("ix_contratos_data_fim_vigencia_id", "data_fim_vigencia", "id"),
+        Index("ix_contratos_ativo_data_fim_vigencia", "ativo", "data_fim_vigencia"),
+        # Itens com saldo por categoria: só contratos ativos
+        Index("ix_contratos_id_categoria_ativos", "id_categoria", postgresql_where=text("ativo")),
+        # Busca por número sem acentos (ILIKE e similaridade): trigramas (pg_trgm + unaccent)
+        Index("ix_contratos_numero_contrato_unaccent_trgm", text("f_unaccent(numero_contrato) gin_trgm_ops"),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
     numero_contrato: Mapped[str] = mapped_column(String(50), unique=True)
     ano_contrato: Mapped[int] = mapped_column(Integer)
     objeto: Mapped[str | None] = mapped_column(String(255), nullable=True)
@@ -1,5 +1,5 @@
 from datetime import date
-from sqlalchemy import String, Boolean, TIMESTAMP
+from sqlalchemy import String, Boolean, TIMESTAMP, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,12 @@ if TYPE_CHECKING:
 
 class Fornecedor(DefaultModel, Base): 
     __tablename__ = "fornecedores"
+
+    __table_args__ = (
+        # Busca pelo fornecedor sem acentos (ILIKE e similaridade): trigramas (pg_trgm + unaccent)
+        Index("ix_fornecedores_razao_social_unaccent_trgm", text("f_unaccent(razao_social) gin_trgm_ops"),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     razao_social: Mapped[str] = mapped_column(String(255))
     nome_fantasia: Mapped[str | None] = mapped_column(String(255), nullable=True)
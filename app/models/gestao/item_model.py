@@ -1,5 +1,5 @@
 from decimal import Decimal
-from sqlalchemy import ForeignKey, String, Integer, Numeric, Computed
+from sqlalchemy import ForeignKey, String, Integer, Numeric, Computed, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 from app.core.base_model import DefaultModel 
@@ -12,6 +12,11 @@ if TYPE_CHECKING:
 class ItemContrato(DefaultModel, Base): # <--- Herança
     __tablename__ = "itens_contrato"
 
+    __table_args__ = (
+        # Itens de um contrato em ordem (e o lado filho do ON DELETE CASCADE do contrato)
+        Index("ix_itens_contrato_id_contrato_numero_item", "id_contrato", "numero_item"),
+    )
+
     id_contrato: Mapped[int] = mapped_column(ForeignKey("contratos.id", ondelete="CASCADE"))
     contrato: Mapped["Contrato"] = relationship("Contrato", backref="itens", lazy="selectin")
     
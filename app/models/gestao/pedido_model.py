@@ -1,6 +1,6 @@
 from datetime import date
 from decimal import Decimal
-from sqlalchemy import String, Date, Numeric, Integer, ForeignKey
+from sqlalchemy import String, Date, Numeric, Integer, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 from app.core.base_model import DefaultModel 
@@ -13,9 +13,16 @@ if TYPE_CHECKING:
 class Pedido(DefaultModel, Base): 
     __tablename__ = "pedido"
 
-    id_item_contrato: Mapped[int] = mapped_column(Integer) 
+    __table_args__ = (
+        # Painel de pendentes: só pedidos não entregues, na ordem da listagem
+        Index("ix_pedido_pendentes_data_pedido", "data_pedido", "id",
+              postgresql_where=text("status_entrega <> 'Entregue' AND is_deleted = false")),
+    )
+
+    # Índices: joins/GROUP BY do saldo e do painel de AOCS
+    id_item_contrato: Mapped[int] = mapped_column(ForeignKey("itens_contrato.id"), index=True)
     
-    id_aocs: Mapped[int] = mapped_column(ForeignKey("aocs.id"))
+    id_aocs: Mapped[int] = mapped_column(ForeignKey("aocs.id"), index=True)
     aocs: Mapped["Aocs"] = relationship("Aocs", lazy="selectin")
     
     quantidade_pedida: Mapped[Decimal] = mapped_column(Numeric(10, 2))
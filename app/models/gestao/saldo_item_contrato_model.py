@@ -0,0 +1,26 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import DateTime, ForeignKey, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class SaldoItemContrato(Base):
+    """
+    Razão de saldo por item de contrato, mantido incrementalmente pelo
+    PedidoRepository na mesma transação de cada pedido (criação, alteração,
+    exclusão e entregas). Uma linha por item: consultar o saldo é ler pela PK,
+    sem somar a tabela de pedidos. O job de reconciliação (saldo_service)
+    confere os totais com os pedidos e corrige divergências.
+    """
+    __tablename__ = "saldos_itens_contrato"
+
+    id_item_contrato: Mapped[int] = mapped_column(ForeignKey("itens_contrato.id", ondelete="CASCADE"), primary_key=True)
+
+    quantidade_pedida: Mapped[Decimal] = mapped_column(Numeric(15, 3), default=0, server_default="0")
+    quantidade_entregue: Mapped[Decimal] = mapped_column(Numeric(15, 3), default=0, server_default="0")
+
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SaldoItemContrato item={self.id_item_contrato} pedida={self.quantidade_pedida} entregue={self.quantidade_entregue}>"
@@ -0,0 +1,42 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Text, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.core.base_model import DefaultModel
+
+class AIJob(DefaultModel, Base):
+    """
+    Job de geração de texto por IA em lote (fila persistente no banco).
+    Cada job gera UMA seção para UM documento (DFD ou ETP).
+
+    Ciclo de vida: pendente -> executando -> concluido | erro
+    Falhas transitórias (timeout, 429, 5xx) voltam para 'pendente' com
+    proxima_tentativa_em no futuro (backoff exponencial).
+    """
+    __tablename__ = "ia_jobs"
+
+    __table_args__ = (
+        # Índice da consulta do worker: próximos pendentes já liberados para execução
+        Index("ix_ia_jobs_fila", "status", "proxima_tentativa_em"),
+    )
+
+    # Agrupa os jobs criados na mesma requisição (usado no polling)
+    lote_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+
+    # Alvo: 'dfd' ou 'etp' + id do documento + seção do AIService (ex: 'dfd_object')
+    tipo_alvo: Mapped[str] = mapped_column(String(10), nullable=False)
+    alvo_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    secao: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), default="pendente", server_default="pendente", comment="pendente, executando, concluido, erro")
+    tentativas: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    proxima_tentativa_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    iniciado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    concluido_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    resultado: Mapped[str | None] = mapped_column(Text, nullable=True)
+    erro: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<AIJob {self.id} {self.tipo_alvo}:{self.alvo_id} {self.secao} ({self.status})>"
@@ -33,6 +33,10 @@ class Template(DefaultModel, Base):
     # Ex: ["numero_processo", "data_abertura", "nome_pregoeiro"]
     # Isso ajuda o frontend a gerar o formulário dinâmico para o usuário.
     variaveis_esperadas: Mapped[List[str] | None] = mapped_column(JSON, nullable=True)
+
+    # SHA-256 do arquivo indexado em variaveis_esperadas (None = índice ainda não gerado).
+    # Arquivo com o mesmo hash reaproveita o índice sem abrir o .docx de novo.
+    hash_conteudo: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     
     # Controle
     ativo: Mapped[bool] = mapped_column(Boolean, default=True)
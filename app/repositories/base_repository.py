@@ -26,12 +26,26 @@ class BaseRepository(Generic[ModelT, CreateSchemaT, UpdateSchemaT]):
         result = await self.db_session.execute(query)
         return result.scalars().first()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelT]:
-        query = select(self.model).offset(skip).limit(limit)
+    def _active_clause(self):
+        # Modelos de cadastro têm 'ativo'; os demais usam o soft delete do DefaultModel
+        if hasattr(self.model, "ativo"):
+            return self.model.ativo == True
+        return self.model.is_deleted == False
+
+    async def get_all(self, skip: int = 0, limit: Optional[int] = 100, mostrar_inativos: bool = True) -> List[ModelT]:
+        query = select(self.model)
+        if not mostrar_inativos:
+            query = query.where(self._active_clause())
+        query = query.order_by(self.model.id).offset(skip).limit(limit)
         result = await self.db_session.execute(query)
         return result.scalars().all()
 
-    async def update(self, db_obj: ModelT, obj_in: UpdateSchemaT | dict) -> ModelT:
+    async def update(self, db_obj: ModelT | Any, obj_in: UpdateSchemaT | dict) -> Optional[ModelT]:
+        # Aceita o objeto ou o id (rotas que só têm o id); id inexistente -> None
+        if not isinstance(db_obj, self.model):
+            db_obj = await self.get_by_id(db_obj)
+            if db_obj is None:
+                return None
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -45,6 +59,12 @@ class BaseRepository(Generic[ModelT, CreateSchemaT, UpdateSchemaT]):
         await self.db_session.refresh(db_obj)
         return db_obj
 
+    async def set_active_status(self, id: Any, ativo: bool) -> Optional[ModelT]:
+        """Ativa/desativa: coluna 'ativo' quando existe, senão o soft delete (is_deleted)."""
+        if hasattr(self.model, "ativo"):
+            return await self.update(id, {"ativo": ativo})
+        return await self.update(id, {"is_deleted": not ativo})
+
     async def delete(self, id: Any) -> bool:
         obj = await self.get_by_id(id)
         if obj:
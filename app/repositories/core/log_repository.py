@@ -1,19 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func, case, cast, Date
+from datetime import datetime, timedelta, timezone
 import sys
 import logging
 
-from app.models.core.log_documento_model import GenerationLog
+from app.models.core.log_documento_model import LogDocumento
 from app.schemas.core.log_schema import LogCreate, LogUpdate
 from app.repositories.base_repository import BaseRepository
 
 logger = logging.getLogger(__name__)
 
-class LogRepository(BaseRepository[GenerationLog, LogCreate, LogUpdate]):
+class LogRepository(BaseRepository[LogDocumento, LogCreate, LogUpdate]):
     def __init__(self, db_session: AsyncSession):
-        super().__init__(GenerationLog, db_session)
+        super().__init__(LogDocumento, db_session)
 
-    async def create_log(self, user_id: int, template_id: int, filename: str) -> GenerationLog:
+    async def create_log(self, user_id: int, template_id: int, filename: str) -> LogDocumento:
         """
         Registra que um documento foi gerado.
         Mantém compatibilidade com assinatura antiga (agora async).
@@ -33,9 +35,39 @@ class LogRepository(BaseRepository[GenerationLog, LogCreate, LogUpdate]):
     async def list_by_user(self, user_id: int):
         """Histórico de gerações de um usuário específico."""
         try:
-            query = select(GenerationLog).where(GenerationLog.user_id == user_id)
+            query = select(LogDocumento).where(LogDocumento.user_id == user_id)
             result = await self.db_session.execute(query)
             return result.scalars().all()
         except Exception as e:
             logger.exception(f"Erro ao listar logs do usuário {user_id}: {e}")
             return []
+
+    async def ai_usage_stats(self, days: int = 7) -> list[dict]:
+        """
+        Agregado da telemetria da IA por dia e seção: volume, latência p50/p95,
+        tokens e taxa de cache hit. Mostra quais prompts dominam custo e tempo.
+        """
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        dia = cast(LogDocumento.created_at, Date).label("dia")
+        query = (
+            select(
+                dia,
+                LogDocumento.secao,
+                func.count(LogDocumento.id).label("chamadas"),
+                func.percentile_cont(0.5).within_group(LogDocumento.latencia_ms).label("latencia_p50_ms"),
+                func.percentile_cont(0.95).within_group(LogDocumento.latencia_ms).label("latencia_p95_ms"),
+                func.coalesce(func.sum(LogDocumento.tokens_prompt), 0).label("tokens_prompt"),
+                func.coalesce(func.sum(LogDocumento.tokens_resposta), 0).label("tokens_resposta"),
+                func.sum(case((LogDocumento.cache_hit == True, 1), else_=0)).label("cache_hits"),
+                func.count(LogDocumento.erro).label("erros"),
+            )
+            .where(LogDocumento.secao.isnot(None), LogDocumento.created_at >= since)
+            .group_by(dia, LogDocumento.secao)
+            .order_by(dia.desc(), LogDocumento.secao)
+        )
+        try:
+            result = await self.db_session.execute(query)
+            return [dict(row._mapping) for row in result]
+        except Exception as e:
+            logger.exception(f"Erro ao agregar telemetria da IA: {e}")
+            raise e
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 import sys
 import logging
 
@@ -49,3 +50,23 @@ class UserRepository(BaseRepository[User, UserCreate, UserBase]): # Using UserBa
         except Exception as e:
             logger.exception(f"Erro ao buscar usuário por email {email}: {e}")
             return None
+
+    def _active_clause(self):
+        return User.is_active == True
+
+    async def get_by_username(self, username: str) -> User | None:
+        query = select(User).where(User.username == username, User.is_deleted == False)
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    async def update_password(self, user_id: int, password_hash: str) -> bool:
+        """Grava o novo hash de senha (troca pelo próprio usuário)."""
+        result = await self.db_session.execute(
+            update(User).where(User.id == user_id).values(password_hash=password_hash)
+        )
+        await self.db_session.commit()
+        return result.rowcount > 0
+
+    async def reset_password(self, user_id: int, password_hash: str) -> bool:
+        """Redefinição feita pelo administrador."""
+        return await self.update_password(user_id, password_hash)
@@ -1,8 +1,11 @@
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 import logging
 
 from app.models.gestao.anexo_model import Anexo
+from app.models.gestao.anexo_blob_model import AnexoBlob
 from app.schemas.gestao.anexo_schema import AnexoCreate
 from app.repositories.base_repository import BaseRepository
 from app.repositories.gestao.tipo_documento_repository import TipoDocumentoRepository
@@ -25,24 +28,27 @@ class AnexoRepository(BaseRepository[Anexo, AnexoCreate, AnexoCreate]):
             # Model has id_contrato, id_aocs.
             # We need to map 'id_entidade' + 'tipo_entidade' -> 'id_contrato' or 'id_aocs'.
 
-            data = anexo_create_data.model_dump()
+            data = anexo_create_data.model_dump(exclude={'data_upload'})
             
             tipo_entidade = data.pop('tipo_entidade', None)
             id_entidade = data.pop('id_entidade', None)
+            tipo_documento = data.pop('tipo_documento', None)
             
+            # O modelo não guarda tipo/id genéricos: cada origem tem sua FK
             if tipo_entidade == 'contrato':
                 data['id_contrato'] = id_entidade
-                data['tipo_entidade'] = 'contrato' # If model has this field
             elif tipo_entidade == 'aocs':
                 data['id_aocs'] = id_entidade
-                data['tipo_entidade'] = 'aocs'
             else:
-                 # If we allow other types or fallback
-                 if tipo_entidade: data['tipo_entidade'] = tipo_entidade
-            
-            # Remove any fields not in model if present
-            # Assumption: Anexo model matches SQL columns used in original repo:
-            # nome_original, nome_seguro, data_upload, tipo_documento, tipo_entidade, id_contrato, id_aocs
+                raise ValueError(f"Tipo de entidade inválido para anexo: {tipo_entidade}")
+
+            if tipo_documento:
+                tipo = await self.tipodocumento_repo.get_or_create(tipo_documento)
+                data['id_tipo_documento'] = tipo.id
+
+            # Conteúdo deduplicado: referência ao blob na mesma transação do anexo
+            if data.get('hash_sha256'):
+                await self.registrar_blob(data['hash_sha256'], data['tamanho_bytes'], data['caminho_arquivo'])
             
             db_obj = Anexo(**data)
             self.db_session.add(db_obj)
@@ -59,14 +65,13 @@ class AnexoRepository(BaseRepository[Anexo, AnexoCreate, AnexoCreate]):
 
     async def get_by_entidade(self, id_entidade: int, tipo_entidade: str) -> list[Anexo]:
         try:
-            query = select(Anexo).where(Anexo.tipo_entidade == tipo_entidade)
-            
-            if tipo_entidade == 'contrato':
-                query = query.where(Anexo.id_contrato == id_entidade)
-            elif tipo_entidade == 'aocs':
-                query = query.where(Anexo.id_aocs == id_entidade)
-            
-            query = query.order_by(Anexo.data_upload.desc())
+            # O modelo não tem tipo_entidade: a origem é a FK preenchida
+            fk = Anexo.id_contrato if tipo_entidade == 'contrato' else Anexo.id_aocs
+            query = (
+                select(Anexo)
+                .where(fk == id_entidade, Anexo.is_deleted == False)
+                .order_by(Anexo.data_upload.desc())
+            )
             
             result = await self.db_session.execute(query)
             return result.scalars().all()
@@ -74,3 +79,73 @@ class AnexoRepository(BaseRepository[Anexo, AnexoCreate, AnexoCreate]):
         except Exception as error:
              logger.exception(f"Erro ao buscar anexos ({tipo_entidade}={id_entidade}): {error}")
              return []
+
+    # --- Blobs deduplicados (sem commit: entram na transação do anexo) ---
+
+    async def registrar_blob(self, hash_sha256: str, tamanho_bytes: int, caminho: str) -> bool:
+        """
+        Soma uma referência ao blob do conteúdo, criando-o se for novo.
+        Retorna True se o blob foi criado (o arquivo ainda precisa ir para o disco).
+        """
+        result = await self.db_session.execute(
+            update(AnexoBlob)
+            .where(AnexoBlob.hash_sha256 == hash_sha256)
+            .values(ref_count=AnexoBlob.ref_count + 1)
+        )
+        if result.rowcount:
+            return False
+        try:
+            # Savepoint: dois uploads simultâneos do mesmo arquivo novo disputam o INSERT
+            async with self.db_session.begin_nested():
+                self.db_session.add(AnexoBlob(hash_sha256=hash_sha256, tamanho_bytes=tamanho_bytes, caminho=caminho, ref_count=1))
+            return True
+        except IntegrityError:
+            await self.db_session.execute(
+                update(AnexoBlob)
+                .where(AnexoBlob.hash_sha256 == hash_sha256)
+                .values(ref_count=AnexoBlob.ref_count + 1)
+            )
+            return False
+
+    async def liberar_blob(self, hash_sha256: str) -> str | None:
+        """
+        Tira uma referência do blob. Se era a última, remove o registro e
+        retorna o caminho do arquivo para ser apagado após o commit.
+        """
+        result = await self.db_session.execute(
+            update(AnexoBlob)
+            .where(AnexoBlob.hash_sha256 == hash_sha256)
+            .values(ref_count=AnexoBlob.ref_count - 1)
+            .returning(AnexoBlob.ref_count, AnexoBlob.caminho)
+        )
+        row = result.first()
+        if row is None or row.ref_count > 0:
+            return None
+        await self.db_session.execute(
+            delete(AnexoBlob).where(AnexoBlob.hash_sha256 == hash_sha256, AnexoBlob.ref_count <= 0)
+        )
+        return row.caminho
+
+    async def blob_existe(self, hash_sha256: str) -> bool:
+        result = await self.db_session.execute(select(AnexoBlob.id).where(AnexoBlob.hash_sha256 == hash_sha256))
+        return result.first() is not None
+
+    async def delete_anexo(self, anexo: Anexo) -> str | None:
+        """
+        Exclui o anexo e libera seu blob na mesma transação.
+        Retorna o caminho relativo do arquivo que ficou sem referências (ou None).
+        """
+        try:
+            orfao = None
+            if anexo.hash_sha256:
+                orfao = await self.liberar_blob(anexo.hash_sha256)
+            elif anexo.nome_seguro:
+                # Anexo antigo (antes da deduplicação): arquivo exclusivo dele
+                orfao = anexo.nome_seguro
+            await self.db_session.execute(delete(Anexo).where(Anexo.id == anexo.id))
+            await self.db_session.commit()
+            return orfao
+        except Exception as error:
+            await self.db_session.rollback()
+            logger.exception(f"Erro ao excluir anexo ID {anexo.id}: {error}")
+            raise
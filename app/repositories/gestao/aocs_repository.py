@@ -1,10 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import case, func, or_
 from datetime import date
 import logging
 
 from app.models.gestao.aocs_model import Aocs
+from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.pedido_model import Pedido
 from app.schemas.gestao.aocs_schema import AocsCreateRequest, AocsUpdateRequest
 from app.repositories.base_repository import BaseRepository
+from app.repositories.gestao.busca_repository import contem
 from app.repositories.core.unidade_repository import UnidadeRepository
 from app.repositories.gestao.local_repository import LocalRepository
 from app.repositories.core.agente_repository import AgenteRepository
@@ -87,3 +94,83 @@ class AocsRepository(BaseRepository[Aocs, AocsCreateRequest, AocsUpdateRequest])
             await self.db_session.rollback()
             logger.exception(f"Erro inesperado ao criar Aocs (Req: {aocs_req}): {error}")
             raise
+
+    async def get_by_numero_aocs(self, numero_aocs: str) -> Aocs | None:
+        query = select(Aocs).where(Aocs.numero_aocs == numero_aocs)
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    async def get_painel(
+        self, page: int, per_page: int,
+        busca: str = "", sort_by: str = "data", order: str = "desc",
+    ) -> tuple[list[dict], int]:
+        """
+        Painel de AOCS (tela de pedidos): por AOCS, valor total, quantidades pedida
+        e entregue, fornecedor e status consolidado (Entregue/Parcial/Pendente/Vazio).
+        Agrega os pedidos no banco, filtra, ordena e pagina numa consulta só;
+        o total vem de COUNT(*) OVER().
+        """
+        # Pedidos sem item de contrato contam para 'Vazio' mas não entram nos totais
+        tem_item = ItemContrato.id.isnot(None)
+        por_aocs = (
+            select(
+                Pedido.id_aocs,
+                func.count(Pedido.id).label("qtd_pedidos"),
+                func.sum(Pedido.quantidade_pedida * ItemContrato.valor_unitario_final).label("valor_total"),
+                func.sum(case((tem_item, Pedido.quantidade_pedida), else_=0)).label("qtd_pedida"),
+                func.sum(case((tem_item, Pedido.quantidade_entregue), else_=0)).label("qtd_entregue"),
+                func.min(Fornecedor.razao_social).label("fornecedor"),
+            )
+            .outerjoin(ItemContrato, ItemContrato.id == Pedido.id_item_contrato)
+            .outerjoin(Contrato, Contrato.id == ItemContrato.id_contrato)
+            .outerjoin(Fornecedor, Fornecedor.id == Contrato.id_fornecedor)
+            .group_by(Pedido.id_aocs)
+            .subquery()
+        )
+
+        qtd_pedida = func.coalesce(por_aocs.c.qtd_pedida, 0)
+        qtd_entregue = func.coalesce(por_aocs.c.qtd_entregue, 0)
+        fornecedor = func.coalesce(por_aocs.c.fornecedor, "N/D").label("fornecedor")
+        valor_total = func.coalesce(por_aocs.c.valor_total, 0).label("valor_total")
+        status_entrega = case(
+            (func.coalesce(por_aocs.c.qtd_pedidos, 0) == 0, "Vazio"),
+            ((qtd_pedida > 0) & (qtd_entregue >= qtd_pedida), "Entregue"),
+            ((qtd_pedida > 0) & (qtd_entregue > 0), "Parcial"),
+            else_="Pendente",
+        ).label("status_entrega")
+
+        colunas_ordenaveis = {
+            "aocs": Aocs.numero_aocs,
+            "fornecedor": fornecedor,
+            "valor": valor_total,
+            "status": status_entrega,
+            "data": Aocs.data_criacao,
+        }
+        coluna = colunas_ordenaveis.get(sort_by, Aocs.data_criacao)
+        ordem = (coluna.desc(), Aocs.id.desc()) if order == "desc" else (coluna.asc(), Aocs.id.asc())
+
+        query = (
+            select(
+                Aocs.id,
+                Aocs.numero_aocs,
+                Aocs.numero_pedido_externo.label("numero_pedido"),
+                Aocs.data_criacao.label("data_pedido"),
+                fornecedor,
+                valor_total,
+                qtd_pedida.label("qtd_pedida"),
+                qtd_entregue.label("qtd_entregue"),
+                status_entrega,
+                func.count().over().label("total_geral"),
+            )
+            .outerjoin(por_aocs, por_aocs.c.id_aocs == Aocs.id)
+            .where(Aocs.is_deleted == False)
+            .order_by(*ordem)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        if busca:
+            query = query.where(or_(contem(Aocs.numero_aocs, busca), contem(por_aocs.c.fornecedor, busca)))
+
+        rows = (await self.db_session.execute(query)).mappings().all()
+        total = rows[0]["total_geral"] if rows else 0
+        return [dict(row) for row in rows], total
@@ -0,0 +1,133 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import case, func, literal, literal_column, or_
+import logging
+
+from app.models.gestao.catalogo_item_model import CatalogoItem, busca_documento
+from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.gestao.aocs_model import Aocs
+
+logger = logging.getLogger(__name__)
+
+# Configuração de texto em português sem acentos (migração c3e7a9d1f4b2)
+CONFIG_BUSCA = literal_column("'pt_unaccent'::regconfig")
+
+TIPOS_BUSCA = ("item", "contrato", "fornecedor", "aocs")
+
+def sem_acento(expr):
+    """f_unaccent(expr): wrapper IMMUTABLE do unaccent, o mesmo dos índices de trigramas."""
+    return func.f_unaccent(expr)
+
+def escapar_like(termo: str) -> str:
+    """
+    Escapa os curingas do LIKE (% e _) e o próprio caractere de escape: o termo
+    digitado vale literalmente. '/' como no autoescape do SQLAlchemy (a barra
+    invertida depende de standard_conforming_strings no literal do ESCAPE).
+    """
+    return termo.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+def contem(coluna, termo: str):
+    """
+    Filtro 'contém o termo' das listagens, sem diferenciar acentos nem maiúsculas.
+    Usa o índice GIN de trigramas em f_unaccent(coluna).
+    """
+    return sem_acento(coluna).ilike(sem_acento(f"%{escapar_like(termo.strip())}%"), escape="/")
+
+class BuscaRepository:
+    """
+    Busca unificada (GET /busca) em itens do catálogo, contratos, fornecedores e AOCS.
+    - Itens: texto completo em português (tsvector de nome + descrição, com stemming)
+      somado à similaridade de trigramas do nome, que tolera erros de digitação.
+    - Números de contrato/AOCS e nomes de fornecedor: trecho contido no texto
+      ou palavra parecida (word_similarity >= similaridade_minima).
+    Tudo sem acentos (unaccent) e resolvido por índices GIN; cada tipo é uma consulta
+    ordenada pela pontuação e limitada em `limite` linhas.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def buscar(self, termo: str, tipos: tuple = TIPOS_BUSCA, limite: int = 10,
+                     similaridade_minima: float = 0.4) -> list[dict]:
+        termo = termo.strip()
+        if not termo:
+            return []
+        # Limiar do operador <% (vale só para esta transação)
+        await self.db_session.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(similaridade_minima), True))
+        )
+
+        resultados = []
+        if "item" in tipos:
+            resultados += await self._itens(termo, limite)
+        if "contrato" in tipos:
+            resultados += await self._por_trigramas(
+                "contrato", Contrato.id, Contrato.numero_contrato, Fornecedor.razao_social, termo, limite,
+                joins=[(Fornecedor, Fornecedor.id == Contrato.id_fornecedor)],
+                filtros=[Contrato.is_deleted == False],
+            )
+        if "fornecedor" in tipos:
+            resultados += await self._por_trigramas(
+                "fornecedor", Fornecedor.id, Fornecedor.razao_social, Fornecedor.cpf_cnpj, termo, limite,
+                filtros=[Fornecedor.ativo == True],
+            )
+        if "aocs" in tipos:
+            resultados += await self._por_trigramas(
+                "aocs", Aocs.id, Aocs.numero_aocs, Aocs.status, termo, limite,
+                filtros=[Aocs.is_deleted == False],
+            )
+        resultados.sort(key=lambda r: r["score"], reverse=True)
+        return resultados
+
+    async def _itens(self, termo: str, limite: int) -> list[dict]:
+        consulta = func.websearch_to_tsquery(CONFIG_BUSCA, termo)
+        nome = sem_acento(CatalogoItem.nome_item)
+        termo_norm = sem_acento(termo)
+        score = (
+            func.ts_rank_cd(busca_documento, consulta)
+            + func.word_similarity(termo_norm, nome)
+        ).label("score")
+        query = (
+            select(
+                literal("item").label("tipo"),
+                CatalogoItem.id,
+                CatalogoItem.nome_item.label("titulo"),
+                CatalogoItem.unidade_medida.label("detalhe"),
+                score,
+            )
+            .where(
+                CatalogoItem.ativo == True,
+                or_(busca_documento.op("@@")(consulta), termo_norm.op("<%")(nome)),
+            )
+            .order_by(score.desc(), CatalogoItem.id)
+            .limit(limite)
+        )
+        rows = (await self.db_session.execute(query)).mappings().all()
+        return [dict(row) for row in rows]
+
+    async def _por_trigramas(self, tipo: str, id_col, coluna, detalhe, termo: str, limite: int,
+                             joins: list = (), filtros: list = ()) -> list[dict]:
+        """Trecho contido (ILIKE) vale 1 ponto a mais que a melhor palavra parecida."""
+        valor = sem_acento(coluna)
+        termo_norm = sem_acento(termo)
+        contido = contem(coluna, termo)
+        score = (
+            func.word_similarity(termo_norm, valor) + case((contido, 1.0), else_=0.0)
+        ).label("score")
+        query = select(
+            literal(tipo).label("tipo"),
+            id_col.label("id"),
+            coluna.label("titulo"),
+            detalhe.label("detalhe"),
+            score,
+        )
+        for tabela, condicao in joins:
+            query = query.outerjoin(tabela, condicao)
+        query = (
+            query.where(*filtros, or_(contido, termo_norm.op("<%")(valor)))
+            .order_by(score.desc(), id_col)
+            .limit(limite)
+        )
+        rows = (await self.db_session.execute(query)).mappings().all()
+        return [dict(row) for row in rows]
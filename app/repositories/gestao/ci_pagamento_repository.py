@@ -3,6 +3,7 @@ from sqlalchemy.future import select
 import logging
 
 from app.models.gestao.ci_pagamento_model import CiPagamento
+from app.models.gestao.pedido_model import Pedido
 from app.schemas.gestao.ci_pagamento_schema import CiPagamentoCreateRequest
 from app.repositories.base_repository import BaseRepository
 from app.repositories.core.unidade_repository import UnidadeRepository
@@ -16,14 +17,22 @@ class CiPagamentoRepository(BaseRepository[CiPagamento, CiPagamentoCreateRequest
         self.unidade_repo = UnidadeRepository(db_session)
         self.aocs_repo = AocsRepository(db_session)
 
-    async def create(self, ci_req: CiPagamentoCreateRequest) -> CiPagamento:
+    async def create(self, ci_req: CiPagamentoCreateRequest, id_pedido: int | None = None) -> CiPagamento:
         try:
             # Assumes ci_req contains IDs. If manual resolution needed, add here.
             # Assuming generic create is sufficient if Schema fields match Model fields or are strictly mapped.
             # CiPagamentoCreateRequest -> CiPagamento
             # Check fields used in original sql: numero_ci, id_aocs, id_unidade, data_emissao
             
-            db_obj = CiPagamento(**ci_req.model_dump())
+            data = ci_req.model_dump()
+            if id_pedido is not None:
+                # A CI é da AOCS do pedido
+                id_aocs = await self.db_session.scalar(select(Pedido.id_aocs).where(Pedido.id == id_pedido))
+                if id_aocs is None:
+                    raise ValueError(f"Pedido {id_pedido} não encontrado.")
+                data['id_aocs'] = id_aocs
+
+            db_obj = CiPagamento(**data)
             self.db_session.add(db_obj)
             await self.db_session.commit()
             await self.db_session.refresh(db_obj)
@@ -32,3 +41,15 @@ class CiPagamentoRepository(BaseRepository[CiPagamento, CiPagamentoCreateRequest
             await self.db_session.rollback()
             logger.error(f"Erro create CI: {e}")
             raise e
+
+    async def get_by_pedido_id(self, id_pedido: int) -> CiPagamento | None:
+        """CI mais recente da AOCS do pedido (uma consulta, com join)."""
+        query = (
+            select(CiPagamento)
+            .join(Pedido, Pedido.id_aocs == CiPagamento.id_aocs)
+            .where(Pedido.id == id_pedido)
+            .order_by(CiPagamento.id.desc())
+            .limit(1)
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
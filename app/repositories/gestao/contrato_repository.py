@@ -1,10 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import and_, not_, or_, tuple_
+from datetime import date, timedelta
+from typing import Optional
+import base64
+import json
 import logging
 
 from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.planejamento.processo_licitatorio_model import ProcessoLicitatorio
 from app.schemas.gestao.contrato_schema import ContratoRequest, ContratoCreateRequest
 from app.repositories.base_repository import BaseRepository
+from app.repositories.gestao.busca_repository import contem
 
 # Dep Imports
 from app.repositories.gestao.fornecedor_repository import FornecedorRepository
@@ -108,3 +116,139 @@ class ContratoRepository(BaseRepository[Contrato, ContratoCreateRequest, Contrat
     async def create(self, obj_in: ContratoCreateRequest) -> Contrato:
          # Override generic create to use the complex logic
          return await self.create_with_relationships(obj_in)
+
+    async def get_by_numero_contrato(self, numero_contrato: str) -> Contrato | None:
+        query = select(Contrato).where(Contrato.numero_contrato == numero_contrato)
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    # --- Listagem paginada (tela de contratos) ---
+
+    # Ordenação da listagem: parâmetro -> (coluna, campo do item com o valor).
+    # O id desempata e completa a chave do cursor
+    ORDENACAO_LISTAGEM = {
+        "numero_contrato": (Contrato.numero_contrato, "numero_contrato"),
+        "fornecedor": (Fornecedor.razao_social, "fornecedor"),
+        "data_vigencia_fim": (Contrato.data_fim_vigencia, "data_fim_vigencia"),
+        "status_ativo": (Contrato.ativo, "ativo"),
+    }
+
+    @staticmethod
+    def _encode_cursor(sort_by: str, valor, id_: int, direcao: str) -> str:
+        if isinstance(valor, date):
+            valor = valor.isoformat()
+        payload = json.dumps([sort_by, valor, id_, direcao], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str):
+        """(valor, id, direcao) do cursor, ou None se inválido ou de outra ordenação."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            cursor_sort, valor, id_, direcao = json.loads(raw)
+        except (ValueError, TypeError):
+            return None
+        if cursor_sort != sort_by or direcao not in ("next", "prev") or not isinstance(id_, int):
+            return None
+        if sort_by == "data_vigencia_fim" and valor is not None:
+            try:
+                valor = date.fromisoformat(valor)
+            except (TypeError, ValueError):
+                return None
+        return valor, id_, direcao
+
+    async def listar_paginado(
+        self,
+        busca: Optional[str] = None,
+        status: Optional[str] = None,
+        mostrar_vencidos: bool = True,
+        vencendo_em_dias: Optional[int] = None,
+        sort_by: str = "numero_contrato",
+        order: str = "asc",
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        hoje: Optional[date] = None,
+    ) -> dict:
+        """
+        Listagem de contratos com filtro, ordenação e paginação no banco.
+        Uma consulta: contrato + fornecedor + processo (só as colunas exibidas).
+
+        Paginação por chave (keyset): o cursor guarda (valor da ordenação, id) da
+        borda da página e a próxima página continua de WHERE (col, id) > (valor, id),
+        usando o índice; o custo não cresce com o número de contratos nem com a
+        página. Sem cursor, offset atende links antigos por número de página.
+        Não há COUNT: tem_proxima vem da linha extra (limit + 1).
+
+        status: 'ativo' (ativo e vigente), 'inativo' (inativo ou vencido), 'expirado'.
+        Retorna {"itens", "proximo_cursor", "cursor_anterior", "tem_proxima", "tem_anterior"}.
+        """
+        hoje = hoje or date.today()
+        if sort_by not in self.ORDENACAO_LISTAGEM:
+            sort_by = "numero_contrato"
+        coluna, campo = self.ORDENACAO_LISTAGEM[sort_by]
+        desc = order == "desc"
+
+        filtros = [Contrato.is_deleted == False]
+        if busca:
+            filtros.append(or_(contem(Contrato.numero_contrato, busca), contem(Fornecedor.razao_social, busca)))
+        if status == "ativo":
+            filtros.append(and_(Contrato.ativo == True, Contrato.data_fim_vigencia >= hoje))
+        elif status == "inativo":
+            filtros.append(or_(Contrato.ativo == False, Contrato.data_fim_vigencia < hoje))
+        elif status == "expirado":
+            filtros.append(Contrato.data_fim_vigencia < hoje)
+        if not mostrar_vencidos:
+            filtros.append(Contrato.data_fim_vigencia >= hoje)
+        if vencendo_em_dias is not None:
+            filtros.append(and_(
+                Contrato.ativo == True,
+                Contrato.data_fim_vigencia.between(hoje, hoje + timedelta(days=vencendo_em_dias)),
+            ))
+
+        # Página anterior: percorre no sentido inverso e desvira o resultado
+        chave = self._decode_cursor(cursor, sort_by) if cursor else None
+        voltando = chave is not None and chave[2] == "prev"
+        crescente = desc == voltando
+        if chave is not None:
+            valor, id_, _ = chave
+            borda = tuple_(coluna, Contrato.id)
+            filtros.append(borda > tuple_(valor, id_) if crescente else borda < tuple_(valor, id_))
+
+        query = (
+            select(
+                Contrato.id,
+                Contrato.numero_contrato,
+                Contrato.data_fim_vigencia,
+                Contrato.ativo,
+                Fornecedor.razao_social.label("fornecedor"),
+                ProcessoLicitatorio.numero_processo,
+                ProcessoLicitatorio.ano_processo,
+            )
+            .join(Fornecedor, Fornecedor.id == Contrato.id_fornecedor)
+            .outerjoin(ProcessoLicitatorio, ProcessoLicitatorio.id == Contrato.id_processo_licitatorio)
+            .where(*filtros)
+            .order_by(*((coluna.asc(), Contrato.id.asc()) if crescente else (coluna.desc(), Contrato.id.desc())))
+            .limit(limit + 1)
+        )
+        if chave is None and offset:
+            query = query.offset(offset)
+
+        rows = (await self.db_session.execute(query)).mappings().all()
+        mais = len(rows) > limit
+        itens = [dict(row) for row in rows[:limit]]
+        if voltando:
+            itens.reverse()
+
+        def cursor_de(item: dict, direcao: str) -> str:
+            return self._encode_cursor(sort_by, item[campo], item["id"], direcao)
+
+        tem_proxima = mais if not voltando else True
+        tem_anterior = (chave is not None or offset > 0) if not voltando else mais
+        return {
+            "itens": itens,
+            "tem_proxima": tem_proxima and bool(itens),
+            "tem_anterior": tem_anterior and bool(itens),
+            "proximo_cursor": cursor_de(itens[-1], "next") if itens and tem_proxima else None,
+            "cursor_anterior": cursor_de(itens[0], "prev") if itens and tem_anterior else None,
+        }
@@ -1,11 +1,18 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import func
 from typing import List, Optional
 import logging
 
 from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.gestao.saldo_item_contrato_model import SaldoItemContrato
+from app.models.gestao.catalogo_item_model import CatalogoItem
+from app.models.planejamento.item_dfd_model import ItemDFD
 from app.schemas.gestao.item_schema import ItemRequest
 from app.repositories.base_repository import BaseRepository
+from app.repositories.gestao.busca_repository import contem
 
 logger = logging.getLogger(__name__)
 
@@ -21,3 +28,75 @@ class ItemRepository(BaseRepository[ItemContrato, ItemRequest, ItemRequest]):
         except Exception as e:
              logger.error(f"Erro get_by_contrato: {e}")
              return []
+
+    async def get_by_contrato_id(self, id_contrato: int, mostrar_inativos: bool = False) -> List[ItemContrato]:
+        query = select(ItemContrato).where(ItemContrato.id_contrato == id_contrato)
+        if not mostrar_inativos:
+            query = query.where(self._active_clause())
+        result = await self.db_session.execute(query.order_by(ItemContrato.numero_item))
+        return result.scalars().all()
+
+    async def get_by_descricao(self, descricao: str) -> Optional[ItemContrato]:
+        """Item pelo nome do item do catálogo (via item do DFD)."""
+        query = (
+            select(ItemContrato)
+            .join(ItemDFD, ItemDFD.id == ItemContrato.id_item_dfd)
+            .join(CatalogoItem, CatalogoItem.id == ItemDFD.catalogo_item_id)
+            .where(CatalogoItem.nome_item == descricao)
+            .limit(1)
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    async def get_com_saldo_por_categoria(
+        self, id_categoria: int, page: int, per_page: int,
+        busca: str = "", sort_by: str = "descricao", order: str = "asc",
+    ) -> tuple[list[dict], int]:
+        """
+        Itens ativos dos contratos ativos da categoria com o saldo (contratado - pedido),
+        paginados. Uma consulta: o total pedido vem do razão de saldo (join pela PK,
+        sem agregar pedidos) e o total de linhas de COUNT(*) OVER().
+        """
+        total_pedido = func.coalesce(SaldoItemContrato.quantidade_pedida, 0)
+        saldo = (ItemContrato.quantidade_contratada - total_pedido).label("saldo")
+        colunas_ordenaveis = {
+            "descricao": CatalogoItem.nome_item,
+            "contrato": Contrato.numero_contrato,
+            "saldo": saldo,
+            "valor_unitario": ItemContrato.valor_unitario_final,
+            "numero_item": ItemContrato.numero_item,
+        }
+        coluna = colunas_ordenaveis.get(sort_by, CatalogoItem.nome_item)
+
+        query = (
+            select(
+                ItemContrato.id,
+                ItemContrato.numero_item,
+                ItemContrato.marca,
+                ItemContrato.quantidade_contratada.label("quantidade"),
+                ItemContrato.valor_unitario_final.label("valor_unitario"),
+                CatalogoItem.nome_item.label("descricao"),
+                CatalogoItem.unidade_medida,
+                Contrato.id.label("id_contrato"),
+                Contrato.numero_contrato,
+                Fornecedor.razao_social.label("fornecedor"),
+                total_pedido.label("total_pedido"),
+                saldo,
+                func.count().over().label("total_geral"),
+            )
+            .join(Contrato, Contrato.id == ItemContrato.id_contrato)
+            .join(ItemDFD, ItemDFD.id == ItemContrato.id_item_dfd)
+            .join(CatalogoItem, CatalogoItem.id == ItemDFD.catalogo_item_id)
+            .outerjoin(Fornecedor, Fornecedor.id == Contrato.id_fornecedor)
+            .outerjoin(SaldoItemContrato, SaldoItemContrato.id_item_contrato == ItemContrato.id)
+            .where(Contrato.id_categoria == id_categoria, Contrato.ativo == True, ItemContrato.is_deleted == False)
+            .order_by(coluna.desc() if order == "desc" else coluna.asc(), ItemContrato.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        if busca:
+            query = query.where(contem(CatalogoItem.nome_item, busca))
+
+        rows = (await self.db_session.execute(query)).mappings().all()
+        total = rows[0]["total_geral"] if rows else 0
+        return [dict(row) for row in rows], total
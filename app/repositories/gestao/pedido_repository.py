@@ -1,16 +1,43 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import case, func, update
+from datetime import date
+from decimal import Decimal
+from typing import Any, List, Optional
 import logging
 
 from app.models.gestao.pedido_model import Pedido
-from app.schemas.gestao.pedido_schema import PedidoCreateRequest
+from app.models.gestao.aocs_model import Aocs
+from app.schemas.gestao.pedido_schema import PedidoCreateRequest, RegistrarEntregaLoteRequest
 from app.repositories.base_repository import BaseRepository
+from app.repositories.gestao.saldo_item_repository import SaldoItemRepository
 
 logger = logging.getLogger(__name__)
 
 class PedidoRepository(BaseRepository[Pedido, PedidoCreateRequest, PedidoCreateRequest]):
+    """
+    Toda escrita em pedidos também atualiza o razão de saldo do item
+    (SaldoItemRepository.aplicar) antes do commit, na mesma transação.
+    """
     def __init__(self, db_session: AsyncSession):
         super().__init__(Pedido, db_session)
+        self.saldos = SaldoItemRepository(db_session)
+
+    async def _get_for_update(self, id: Any) -> Optional[Pedido]:
+        # Trava a linha e recarrega os valores: os deltas do saldo partem do valor gravado
+        query = (
+            select(Pedido)
+            .where(Pedido.id == id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
+    async def _reload(self, id: Any) -> Optional[Pedido]:
+        query = select(Pedido).where(Pedido.id == id).execution_options(populate_existing=True)
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
 
     async def create_pedido(self, id_aocs: int, pedido_req: PedidoCreateRequest) -> Pedido:
         # Override or specific method to handle id_aocs injection
@@ -19,6 +46,7 @@ class PedidoRepository(BaseRepository[Pedido, PedidoCreateRequest, PedidoCreateR
             data['id_aocs'] = id_aocs
             data['status_entrega'] = "Pendente"
             data['quantidade_entregue'] = 0
+            data['data_pedido'] = date.today()
             
             # id_item_contrato comes from pedido_req?
             # Schema has item_contrato_id? Model has id_item_contrato.
@@ -28,6 +56,7 @@ class PedidoRepository(BaseRepository[Pedido, PedidoCreateRequest, PedidoCreateR
             
             db_obj = Pedido(**data)
             self.db_session.add(db_obj)
+            await self.saldos.aplicar(db_obj.id_item_contrato, delta_pedida=db_obj.quantidade_pedida)
             await self.db_session.commit()
             await self.db_session.refresh(db_obj)
             return db_obj
@@ -35,3 +64,136 @@ class PedidoRepository(BaseRepository[Pedido, PedidoCreateRequest, PedidoCreateR
             await self.db_session.rollback()
             logger.error(f"Erro create pedido: {e}")
             raise e
+
+    async def update(self, db_obj: Pedido | Any, obj_in: PedidoCreateRequest | dict) -> Optional[Pedido]:
+        """Update genérico com o saldo do item ajustado pela diferença (ou movido, se o item mudar)."""
+        try:
+            pedido = await self._get_for_update(db_obj.id if isinstance(db_obj, Pedido) else db_obj)
+            if pedido is None:
+                return None
+            update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+
+            item_antes = pedido.id_item_contrato
+            pedida_antes = pedido.quantidade_pedida or Decimal(0)
+            entregue_antes = pedido.quantidade_entregue or Decimal(0)
+            for field, value in update_data.items():
+                setattr(pedido, field, value)
+            pedida = pedido.quantidade_pedida or Decimal(0)
+            entregue = pedido.quantidade_entregue or Decimal(0)
+
+            if pedido.id_item_contrato == item_antes:
+                await self.saldos.aplicar(item_antes, pedida - pedida_antes, entregue - entregue_antes)
+            else:
+                await self.saldos.aplicar(item_antes, -pedida_antes, -entregue_antes)
+                await self.saldos.aplicar(pedido.id_item_contrato, pedida, entregue)
+
+            await self.db_session.commit()
+            await self.db_session.refresh(pedido)
+            return pedido
+        except Exception:
+            await self.db_session.rollback()
+            raise
+
+    async def delete(self, id: Any) -> bool:
+        try:
+            pedido = await self._get_for_update(id)
+            if pedido is None:
+                return False
+            await self.saldos.aplicar(
+                pedido.id_item_contrato,
+                -(pedido.quantidade_pedida or Decimal(0)),
+                -(pedido.quantidade_entregue or Decimal(0)),
+            )
+            await self.db_session.delete(pedido)
+            await self.db_session.commit()
+            return True
+        except Exception:
+            await self.db_session.rollback()
+            raise
+
+    async def get_by_aocs_id(self, id_aocs: int) -> List[Pedido]:
+        query = select(Pedido).where(Pedido.id_aocs == id_aocs).order_by(Pedido.id)
+        result = await self.db_session.execute(query)
+        return result.scalars().all()
+
+    def _somar_entrega(self, id_pedido: int, quantidade: Decimal):
+        """UPDATE atômico da entrega (status calculado no banco); devolve o item do pedido."""
+        nova_qtd = Pedido.quantidade_entregue + quantidade
+        return (
+            update(Pedido)
+            .where(Pedido.id == id_pedido)
+            .values(
+                quantidade_entregue=nova_qtd,
+                status_entrega=case(
+                    (nova_qtd >= Pedido.quantidade_pedida, "Entregue"),
+                    else_="Entrega Parcial",
+                ),
+            )
+            .returning(Pedido.id_item_contrato)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def registrar_entrega(self, id: int, quantidade: Decimal) -> Optional[Pedido]:
+        """Soma uma entrega ao pedido e ao saldo do item. None se o pedido não existe."""
+        try:
+            id_item = (await self.db_session.execute(self._somar_entrega(id, quantidade))).scalar_one_or_none()
+            if id_item is None:
+                await self.db_session.rollback()
+                return None
+            await self.saldos.aplicar(id_item, delta_entregue=quantidade)
+            await self.db_session.commit()
+            return await self._reload(id)
+        except Exception:
+            await self.db_session.rollback()
+            raise
+
+    async def registrar_entrega_lote(self, lote_req: RegistrarEntregaLoteRequest) -> dict:
+        """
+        Soma as quantidades entregues de vários pedidos numa única transação
+        (um UPDATE por pedido, status calculado no próprio banco) e depois
+        um incremento de saldo por item, em ordem de id (evita deadlock entre lotes).
+        """
+        try:
+            entregue_por_item: dict[int, Decimal] = {}
+            for item in lote_req.itens:
+                id_item = (await self.db_session.execute(
+                    self._somar_entrega(item.id_pedido, item.quantidade)
+                )).scalar_one_or_none()
+                if id_item is None:
+                    raise ValueError(f"Pedido {item.id_pedido} não encontrado.")
+                entregue_por_item[id_item] = entregue_por_item.get(id_item, Decimal(0)) + item.quantidade
+            for id_item in sorted(entregue_por_item):
+                await self.saldos.aplicar(id_item, delta_entregue=entregue_por_item[id_item])
+            await self.db_session.commit()
+            return {
+                "qtd_itens": len(lote_req.itens),
+                "nota_fiscal": lote_req.nota_fiscal,
+                "data_entrega": lote_req.data_entrega,
+            }
+        except Exception:
+            await self.db_session.rollback()
+            raise
+
+    async def get_pendentes_paginados(self, page: int = 1, limit: int = 10) -> dict:
+        """Pedidos ainda não entregues (mais antigos primeiro) e o total, numa consulta."""
+        query = (
+            select(
+                Pedido.id,
+                Pedido.id_aocs,
+                Aocs.numero_aocs,
+                Pedido.id_item_contrato,
+                Pedido.quantidade_pedida,
+                Pedido.quantidade_entregue,
+                Pedido.status_entrega,
+                Pedido.data_pedido,
+                func.count().over().label("total"),
+            )
+            .join(Aocs, Aocs.id == Pedido.id_aocs)
+            .where(Pedido.status_entrega != "Entregue", Pedido.is_deleted == False)
+            .order_by(Pedido.data_pedido, Pedido.id)
+            .offset((max(page, 1) - 1) * limit)
+            .limit(limit)
+        )
+        rows = (await self.db_session.execute(query)).mappings().all()
+        total = rows[0]["total"] if rows else 0
+        return {"itens": [dict(row) for row in rows], "total": total}
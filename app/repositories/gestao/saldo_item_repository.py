@@ -0,0 +1,159 @@
+from decimal import Decimal
+from typing import Optional
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.gestao.saldo_item_contrato_model import SaldoItemContrato
+from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.pedido_model import Pedido
+
+logger = logging.getLogger(__name__)
+
+class SaldoItemRepository:
+    """
+    Razão de saldo dos itens de contrato (saldos_itens_contrato).
+    aplicar() não faz commit: é chamado pelo PedidoRepository dentro da
+    transação do próprio pedido, então pedido e saldo mudam juntos ou nenhum muda.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    def _insert(self):
+        # UPSERT é específico do dialeto; SQLite só aparece em testes e scripts
+        if self.db_session.get_bind().dialect.name == "sqlite":
+            return sqlite.insert(SaldoItemContrato)
+        return postgresql.insert(SaldoItemContrato)
+
+    async def aplicar(self, id_item_contrato: int, delta_pedida: Decimal = 0, delta_entregue: Decimal = 0):
+        """
+        Soma os deltas ao saldo do item num único INSERT ... ON CONFLICT DO UPDATE.
+        O incremento é feito pelo banco (coluna = coluna + delta): pedidos
+        simultâneos do mesmo item não perdem atualização.
+        """
+        if not delta_pedida and not delta_entregue:
+            return
+        stmt = self._insert().values(
+            id_item_contrato=id_item_contrato,
+            quantidade_pedida=delta_pedida,
+            quantidade_entregue=delta_entregue,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SaldoItemContrato.id_item_contrato],
+            set_={
+                "quantidade_pedida": SaldoItemContrato.quantidade_pedida + stmt.excluded.quantidade_pedida,
+                "quantidade_entregue": SaldoItemContrato.quantidade_entregue + stmt.excluded.quantidade_entregue,
+                "atualizado_em": func.now(),
+            },
+        )
+        await self.db_session.execute(stmt)
+
+    async def get_saldo(self, id_item_contrato: int) -> Optional[dict]:
+        """Saldo do item (contratado - pedido) lido pela PK do razão. None se o item não existe."""
+        pedida = func.coalesce(SaldoItemContrato.quantidade_pedida, 0)
+        query = (
+            select(
+                ItemContrato.id.label("id_item_contrato"),
+                ItemContrato.id_contrato,
+                ItemContrato.quantidade_contratada,
+                pedida.label("quantidade_pedida"),
+                func.coalesce(SaldoItemContrato.quantidade_entregue, 0).label("quantidade_entregue"),
+                (ItemContrato.quantidade_contratada - pedida).label("saldo"),
+            )
+            .outerjoin(SaldoItemContrato, SaldoItemContrato.id_item_contrato == ItemContrato.id)
+            .where(ItemContrato.id == id_item_contrato)
+        )
+        row = (await self.db_session.execute(query)).mappings().first()
+        return dict(row) if row else None
+
+    async def saldo_contrato(self, id_contrato: int) -> dict:
+        """Totais do contrato (itens ativos): valor contratado, valor já pedido e saldo, em R$."""
+        pedida = func.coalesce(SaldoItemContrato.quantidade_pedida, 0)
+        query = (
+            select(
+                func.count(ItemContrato.id).label("qtd_itens"),
+                func.coalesce(func.sum(ItemContrato.quantidade_contratada * ItemContrato.valor_unitario_final), 0).label("valor_contratado"),
+                func.coalesce(func.sum(pedida * ItemContrato.valor_unitario_final), 0).label("valor_pedido"),
+            )
+            .outerjoin(SaldoItemContrato, SaldoItemContrato.id_item_contrato == ItemContrato.id)
+            .where(ItemContrato.id_contrato == id_contrato, ItemContrato.is_deleted == False)
+        )
+        row = (await self.db_session.execute(query)).mappings().one()
+        return {**row, "saldo": row["valor_contratado"] - row["valor_pedido"]}
+
+    async def reconciliar(self, corrigir: bool = True) -> list[dict]:
+        """
+        Confere o razão com a soma dos pedidos de cada item e devolve as divergências.
+        Com corrigir=True grava os valores recalculados (e cria as linhas que faltam,
+        ex: logo depois da migração). Pedidos de itens inexistentes são ignorados.
+        """
+        esperado = (
+            select(
+                Pedido.id_item_contrato,
+                func.sum(Pedido.quantidade_pedida).label("quantidade_pedida"),
+                func.sum(Pedido.quantidade_entregue).label("quantidade_entregue"),
+            )
+            .join(ItemContrato, ItemContrato.id == Pedido.id_item_contrato)
+            .group_by(Pedido.id_item_contrato)
+        )
+        calculado = {
+            row.id_item_contrato: (row.quantidade_pedida or Decimal(0), row.quantidade_entregue or Decimal(0))
+            for row in await self.db_session.execute(esperado)
+        }
+        razao = {
+            s.id_item_contrato: (s.quantidade_pedida, s.quantidade_entregue)
+            for s in (await self.db_session.execute(select(SaldoItemContrato))).scalars()
+        }
+
+        divergencias = []
+        zero = (Decimal(0), Decimal(0))
+        for id_item in sorted(calculado.keys() | razao.keys()):
+            real = calculado.get(id_item, zero)
+            atual = razao.get(id_item, zero)
+            if real[0] != atual[0] or real[1] != atual[1]:
+                divergencias.append({
+                    "id_item_contrato": id_item,
+                    "razao_pedida": atual[0], "razao_entregue": atual[1],
+                    "pedidos_pedida": real[0], "pedidos_entregue": real[1],
+                })
+
+        if divergencias and corrigir:
+            for d in divergencias:
+                await self._recalcular(d["id_item_contrato"])
+            await self.db_session.commit()
+        return divergencias
+
+    async def _recalcular(self, id_item_contrato: int):
+        """
+        Regrava o saldo do item a partir dos pedidos. A linha do razão é travada
+        antes da soma: um pedido em andamento no mesmo item (que já travou a linha
+        no aplicar) termina primeiro e entra na soma, em vez de ser sobrescrito.
+        """
+        await self.db_session.execute(
+            select(SaldoItemContrato.id_item_contrato)
+            .where(SaldoItemContrato.id_item_contrato == id_item_contrato)
+            .with_for_update()
+        )
+        pedida, entregue = (await self.db_session.execute(
+            select(
+                func.coalesce(func.sum(Pedido.quantidade_pedida), 0),
+                func.coalesce(func.sum(Pedido.quantidade_entregue), 0),
+            ).where(Pedido.id_item_contrato == id_item_contrato)
+        )).one()
+
+        stmt = self._insert().values(
+            id_item_contrato=id_item_contrato, quantidade_pedida=pedida, quantidade_entregue=entregue,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SaldoItemContrato.id_item_contrato],
+            set_={
+                "quantidade_pedida": stmt.excluded.quantidade_pedida,
+                "quantidade_entregue": stmt.excluded.quantidade_entregue,
+                "atualizado_em": func.now(),
+            },
+        )
+        await self.db_session.execute(stmt)
@@ -0,0 +1,108 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, or_
+from datetime import datetime, timedelta, timezone
+import uuid
+import logging
+
+from app.models.planejamento.ai_job_model import AIJob
+from app.schemas.planejamento.ai_job_schema import AIJobBatchCreate
+from app.repositories.base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+class AIJobRepository(BaseRepository[AIJob, AIJobBatchCreate, AIJobBatchCreate]):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(AIJob, db_session)
+
+    async def create_batch(self, tipo_alvo: str, ids: list[int], secoes: list[str]) -> tuple[str, int]:
+        """Enfileira um job por (documento, seção). Retorna (lote_id, total)."""
+        lote_id = str(uuid.uuid4())
+        try:
+            jobs = [
+                AIJob(lote_id=lote_id, tipo_alvo=tipo_alvo, alvo_id=alvo_id, secao=secao, status="pendente", tentativas=0)
+                for alvo_id in ids
+                for secao in secoes
+            ]
+            self.db_session.add_all(jobs)
+            await self.db_session.commit()
+            return lote_id, len(jobs)
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(f"Erro ao enfileirar lote de IA: {e}")
+            raise e
+
+    async def claim_next(self) -> AIJob | None:
+        """
+        Reserva o próximo job pendente liberado para execução.
+        FOR UPDATE SKIP LOCKED: vários workers (e processos) disputam a fila
+        sem pegar o mesmo job e sem esperar uns pelos outros.
+        """
+        now = datetime.now(timezone.utc)
+        query = (
+            select(AIJob)
+            .where(
+                AIJob.status == "pendente",
+                or_(AIJob.proxima_tentativa_em.is_(None), AIJob.proxima_tentativa_em <= now)
+            )
+            .order_by(AIJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            result = await self.db_session.execute(query)
+            job = result.scalars().first()
+            if not job:
+                await self.db_session.rollback()
+                return None
+
+            job.status = "executando"
+            job.tentativas += 1
+            job.iniciado_em = now
+            await self.db_session.commit()
+            return job
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(f"Erro ao reservar job de IA: {e}")
+            raise e
+
+    async def mark_done(self, job: AIJob, resultado: str, aviso: str | None = None):
+        job.status = "concluido"
+        job.resultado = resultado
+        job.erro = aviso
+        job.concluido_em = datetime.now(timezone.utc)
+        await self.db_session.commit()
+
+    async def mark_retry(self, job: AIJob, erro: str, delay_seconds: float):
+        job.status = "pendente"
+        job.erro = erro
+        job.proxima_tentativa_em = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+        await self.db_session.commit()
+
+    async def mark_failed(self, job: AIJob, erro: str):
+        job.status = "erro"
+        job.erro = erro
+        job.concluido_em = datetime.now(timezone.utc)
+        await self.db_session.commit()
+
+    async def requeue_stale(self, older_than_seconds: float) -> int:
+        """Devolve para a fila jobs presos em 'executando' (worker caiu no meio)."""
+        limite = datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)
+        try:
+            result = await self.db_session.execute(
+                update(AIJob)
+                .where(AIJob.status == "executando", AIJob.iniciado_em < limite)
+                .values(status="pendente", proxima_tentativa_em=None)
+            )
+            await self.db_session.commit()
+            return result.rowcount or 0
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(f"Erro ao reenfileirar jobs de IA: {e}")
+            return 0
+
+    async def get_lote(self, lote_id: str) -> list[AIJob]:
+        result = await self.db_session.execute(
+            select(AIJob).where(AIJob.lote_id == lote_id).order_by(AIJob.id)
+        )
+        return result.scalars().all()
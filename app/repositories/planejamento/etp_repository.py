@@ -119,7 +119,7 @@ class ETPRepository(BaseRepository[ETP, ETPCreate, ETPCreate]):
 
     async def update(self, etp_id: int, etp_data: dict) -> ETP:
         try:
-             db_etp = await self.get(etp_id)
+             db_etp = await self.get_by_id(etp_id)
              if not db_etp: return None
              
              for key, value in etp_data.items():
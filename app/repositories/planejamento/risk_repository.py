@@ -1,8 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import insert, delete
 from sqlalchemy.orm import selectinload
 import logging
 
+from app.models.planejamento.etp_model import ETP
 from app.models.planejamento.matriz_risco_model import MatrizRisco
 from app.models.planejamento.item_risco_model import ItemRisco
 
@@ -16,7 +18,7 @@ class RiskRepository:
         """Busca a matriz de risco de um ETP (cria se não existir)."""
         try:
             # Check existing
-            query = select(MatrizRisco).options(selectinload(MatrizRisco.riscos)).where(MatrizRisco.etp_id == etp_id)
+            query = select(MatrizRisco).options(selectinload(MatrizRisco.itens)).where(MatrizRisco.etp_id == etp_id)
             result = await self.db_session.execute(query)
             matriz = result.scalars().first()
             
@@ -25,8 +27,8 @@ class RiskRepository:
                 matriz = MatrizRisco(etp_id=etp_id)
                 self.db_session.add(matriz)
                 await self.db_session.commit()
-                await self.db_session.refresh(matriz)
-                # Need to reload to ensure relationships if accessed? Empty for new.
+                # Carrega 'itens' já no refresh: lazy load não funciona com AsyncSession.
+                await self.db_session.refresh(matriz, attribute_names=["itens"])
             
             return matriz
         except Exception as e:
@@ -47,6 +49,47 @@ class RiskRepository:
             logger.error(f"Erro add_risk: {e}")
             raise e
 
+    async def etp_existe(self, etp_id: int) -> bool:
+        result = await self.db_session.execute(select(ETP.id).where(ETP.id == etp_id, ETP.is_deleted == False))
+        return result.scalar() is not None
+
+    async def add_risks_bulk(self, etp_id: int, riscos: list[dict], substituir: bool = False) -> MatrizRisco | None:
+        """
+        Grava vários riscos na matriz do ETP numa única transação
+        (cria a matriz se não existir). Um INSERT em lote e um commit,
+        em vez de um add_risk (e um commit) por item.
+        substituir=True remove os riscos atuais antes de inserir.
+        Retorna None se o ETP não existir.
+        """
+        if not await self.etp_existe(etp_id):
+            return None
+        try:
+            result = await self.db_session.execute(select(MatrizRisco).where(MatrizRisco.etp_id == etp_id))
+            matriz = result.scalars().first()
+            if not matriz:
+                matriz = MatrizRisco(etp_id=etp_id)
+                self.db_session.add(matriz)
+                await self.db_session.flush()
+
+            if substituir:
+                await self.db_session.execute(delete(ItemRisco).where(ItemRisco.matriz_id == matriz.id))
+            if riscos:
+                await self.db_session.execute(insert(ItemRisco), [{**risco, "matriz_id": matriz.id} for risco in riscos])
+            await self.db_session.commit()
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(f"Erro add_risks_bulk: {e}")
+            raise e
+
+        query = (
+            select(MatrizRisco)
+            .options(selectinload(MatrizRisco.itens))
+            .where(MatrizRisco.etp_id == etp_id)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().first()
+
     async def delete_risk(self, risk_id: int):
         """Remove um risco."""
         try:
@@ -1,7 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update
 import logging
-import sys
 
 from app.models.planejamento.template_model import Template
 from app.schemas.planejamento.template_schema import TemplateCreate
@@ -13,13 +13,13 @@ class TemplateRepository(BaseRepository[Template, TemplateCreate, TemplateCreate
     def __init__(self, db_session: AsyncSession):
         super().__init__(Template, db_session)
 
-    async def create_template(self, schema: TemplateCreate, saved_path: str, owner_id: int):
+    async def create_template(self, schema: TemplateCreate, filename: str, saved_path: str, responsavel_id: int):
         try:
             db_template = Template(
-                filename=schema.filename,
-                description=schema.description,
+                **schema.model_dump(),
+                filename=filename,
                 path=saved_path, # Caminho gerado pelo backend
-                owner_id=owner_id
+                responsavel_id=responsavel_id
             )
             self.db_session.add(db_template)
             await self.db_session.commit()
@@ -30,25 +30,48 @@ class TemplateRepository(BaseRepository[Template, TemplateCreate, TemplateCreate
             logger.error(f"Erro ao criar template: {e}")
             raise e
 
-    async def list_by_user(self, owner_id: int):
-        """Lista apenas templates ativos (não deletados) de um usuário."""
+    async def list_ativos(self, tipo: str | None = None):
+        """Lista templates ativos (não deletados), opcionalmente por tipo."""
+        query = select(Template).where(Template.is_deleted == False, Template.ativo == True)
+        if tipo:
+            query = query.where(Template.tipo == tipo.upper())
+        result = await self.db_session.execute(query.order_by(Template.tipo, Template.nome))
+        return result.scalars().all()
+
+    async def get_variaveis(self, template_id: int):
+        """Índice de variáveis direto do banco (sem carregar o template nem abrir o .docx)."""
         result = await self.db_session.execute(
-            select(Template).where(
-                Template.owner_id == owner_id,
-                Template.is_deleted == False
-            )
+            select(Template.id, Template.variaveis_esperadas, Template.hash_conteudo, Template.path)
+            .where(Template.id == template_id, Template.is_deleted == False)
         )
-        return result.scalars().all()
+        return result.first()
+
+    async def get_indexed_by_hash(self, hash_conteudo: str) -> list[str] | None:
+        """Variáveis de outro template já indexado com o mesmo arquivo."""
+        result = await self.db_session.execute(
+            select(Template.variaveis_esperadas)
+            .where(Template.hash_conteudo == hash_conteudo, Template.variaveis_esperadas.is_not(None))
+            .limit(1)
+        )
+        return result.scalars().first()
 
-    async def get_by_id(self, template_id: int):
-        # Override to ensure we can get by ID using generic BaseRepo if needed, or keeping custom.
-        # But BaseRepo 'get' works. Existing code had get_by_id.
-        return await self.get(template_id)
+    async def save_index(self, template_id: int, variaveis: list[str], hash_conteudo: str):
+        try:
+            await self.db_session.execute(
+                update(Template)
+                .where(Template.id == template_id)
+                .values(variaveis_esperadas=variaveis, hash_conteudo=hash_conteudo)
+            )
+            await self.db_session.commit()
+        except Exception as e:
+            await self.db_session.rollback()
+            logger.error(f"Erro ao salvar índice do template {template_id}: {e}")
+            raise e
 
     async def delete(self, id: int):
         """Soft Delete: Marca como deletado."""
         try:
-            template = await self.get(id)
+            template = await self.get_by_id(id)
             if template:
                 template.is_deleted = True
                 await self.db_session.commit()
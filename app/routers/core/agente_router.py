@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=AgenteResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_agente(
+async def create_agente(
     agente_req: AgenteRequest,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user) 
 ):
     try:
         repo = AgenteRepository(db_conn)
-        novo_agente = repo.create(agente_req)
+        novo_agente = await repo.create(agente_req)
         logger.info(f"Usuário '{current_user.username}' criou Agente ID {novo_agente.id} ('{novo_agente.nome}').")
         return novo_agente
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar agente com nome duplicado: '{agente_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_agente(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[AgenteResponse])
-def get_all_agentes(
-    db_conn: connection = Depends(get_db)
+async def get_all_agentes(
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = AgenteRepository(db_conn)
-        agentes = repo.get_all()
+        agentes = await repo.get_all()
         return agentes
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar agentes: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=AgenteResponse)
-def get_agente_by_id(
+async def get_agente_by_id(
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = AgenteRepository(db_conn)
-        agente = repo.get_by_id(id)
+        agente = await repo.get_by_id(id)
         if not agente:
             logger.warning(f"Agente ID {id} não encontrado.")
             raise HTTPException(
@@ -77,14 +77,14 @@ def get_agente_by_id(
 @router.put("/{id}",
             response_model=AgenteResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_agente(
+async def update_agente(
     id: int,
     agente_req: AgenteRequest,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = AgenteRepository(db_conn)
-    agente_db = repo.get_by_id(id) 
+    agente_db = await repo.get_by_id(id) 
     if not agente_db:
          logger.warning(f"Tentativa de atualizar agente ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -93,14 +93,14 @@ def update_agente(
         )
 
     try:
-        agente_atualizado = repo.update(id, agente_req)
+        agente_atualizado = await repo.update(id, agente_req)
         if not agente_atualizado:
              logger.error(f"Agente ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Agente não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Agente ID {id} de '{agente_db.nome}' para '{agente_atualizado.nome}'.")
         return agente_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar agente ID {id} para nome duplicado '{agente_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -113,13 +113,13 @@ def update_agente(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_agente(
+async def delete_agente(
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = AgenteRepository(db_conn)
-    agente_para_deletar = repo.get_by_id(id)
+    agente_para_deletar = await repo.get_by_id(id)
     if not agente_para_deletar:
         logger.warning(f"Tentativa de deletar agente ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -128,11 +128,11 @@ def delete_agente(
         )
 
     try:
-        repo.delete(id)
+        await repo.delete(id)
         logger.info(f"Usuário '{current_user.username}' deletou Agente ID {id} ('{agente_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Agente Responsável está vinculado a uma ou mais AOCS."
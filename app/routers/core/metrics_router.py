@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.db_metrics import db_metrics
+from app.core.profiling import profiler
+from app.core.security import require_access_level
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Core - Métricas"],
+    dependencies=[Depends(require_access_level(1))]
+)
+
+@router.get("/db")
+def get_db_metrics(
+    top: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|count|max_ms|avg_ms|errors)$"),
+):
+    """
+    Pool (espera no checkout p50/p95/p99, timeouts, conexões em uso, pico e overflow)
+    e as `top` consultas por fingerprint, ordenadas por `order_by`.
+    Valores do processo que atendeu a requisição, desde o início ou o último reset.
+    """
+    return db_metrics.snapshot(top=top, order_by=order_by)
+
+@router.delete("/db", status_code=status.HTTP_204_NO_CONTENT)
+def reset_db_metrics():
+    """Zera os contadores (ex: antes de medir um fechamento de mês)."""
+    db_metrics.reset()
+
+@router.get("/requests")
+def get_sampled_requests(limit: int = Query(50, ge=1, le=500), min_ms: float = 0):
+    """
+    Requisições amostradas pelo ProfilingMiddleware (mais recentes primeiro):
+    tempo total, db/ai/render e SQL repetido (possível N+1).
+    """
+    return profiler.list_recent(limit=limit, min_ms=min_ms)
+
+@router.get("/profiles")
+def list_profiles():
+    """Perfis de pilha gravados (requisições com X-Profile-Token)."""
+    return profiler.list_profiles()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """
+    Pilhas no formato "folded" (uma pilha por linha + nº de amostras):
+    abrir no speedscope.app ou gerar o SVG com flamegraph.pl.
+    """
+    profile = profiler.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado.")
+    return PlainTextResponse(
+        profile["folded"],
+        headers={"Content-Disposition": f'attachment; filename="perfil-{profile_id}.folded"'},
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=UnidadeResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_unidade( 
+async def create_unidade( 
     unidade_req: UnidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = UnidadeRepository(db_conn)
-        nova_unidade = repo.create(unidade_req) 
+        nova_unidade = await repo.create(unidade_req) 
         logger.info(f"Usuário '{current_user.username}' criou Unidade ID {nova_unidade.id} ('{nova_unidade.nome}').")
         return nova_unidade
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar unidade duplicada: '{unidade_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_unidade(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[UnidadeResponse])
-def get_all_unidades( 
-    db_conn: connection = Depends(get_db)
+async def get_all_unidades( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = UnidadeRepository(db_conn)
-        unidades = repo.get_all() 
+        unidades = await repo.get_all() 
         return unidades
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar unidades: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=UnidadeResponse)
-def get_unidade_by_id( 
+async def get_unidade_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = UnidadeRepository(db_conn)
-        unidade = repo.get_by_id(id) 
+        unidade = await repo.get_by_id(id) 
         if not unidade:
             logger.warning(f"Unidade ID {id} não encontrada.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_unidade_by_id(
 @router.put("/{id}",
             response_model=UnidadeResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_unidade( 
+async def update_unidade( 
     id: int,
     unidade_req: UnidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = UnidadeRepository(db_conn)
-    unidade_db = repo.get_by_id(id) 
+    unidade_db = await repo.get_by_id(id) 
     if not unidade_db:
          logger.warning(f"Tentativa de atualizar unidade ID {id} (não encontrada) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_unidade(
         )
 
     try:
-        unidade_atualizada = repo.update(id, unidade_req) 
+        unidade_atualizada = await repo.update(id, unidade_req) 
         if not unidade_atualizada:
              logger.error(f"Unidade ID {id} não encontrada DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Unidade não encontrada durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Unidade ID {id} de '{unidade_db.nome}' para '{unidade_atualizada.nome}'.")
         return unidade_atualizada
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar unidade ID {id} para nome duplicado '{unidade_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_unidade(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_unidade( 
+async def delete_unidade( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = UnidadeRepository(db_conn)
-    unidade_para_deletar = repo.get_by_id(id) 
+    unidade_para_deletar = await repo.get_by_id(id) 
     if not unidade_para_deletar:
         logger.warning(f"Tentativa de deletar unidade ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_unidade(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Unidade ID {id} ('{unidade_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Esta Unidade está vinculada a AOCS ou CIs."
@@ -1,16 +1,24 @@
 import os
-import shutil
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from psycopg2.extensions import connection
+import uuid
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
 from app.core.security import get_current_user, require_access_level
 from app.models.core.user_model import User
-from app.schemas.gestao.anexo_schema import AnexoCreate, AnexoResponse
+from app.schemas.gestao.anexo_schema import AnexoCreate, AnexoResponse, AnexoUploadInicio, AnexoUploadStatus
 from app.repositories.gestao.anexo_repository import AnexoRepository
+from app.services.core.download_service import serve_stored, strong_etag
+from app.services.core.storage_service import get_storage
+from app.services.core.zip_service import ZipService
+from app.services.gestao.anexo_upload_service import (
+    AnexoUploadService, ArquivoRecebido, BLOCK_SIZE,
+    UploadNaoEncontradoError, UploadOffsetError, UploadTamanhoError,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +28,56 @@ router = APIRouter(
     dependencies=[Depends(require_access_level(2))] # Requer nível 2 para gerenciar
 )
 
-# Defina o diretório de upload (ajuste conforme sua estrutura)
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-UPLOAD_DIR = os.path.join(BASE_DIR, "static", "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+TIPOS_ENTIDADE = ("contrato", "aocs")
+
+# Arquivos no armazenamento configurado (pasta local, volume compartilhado ou S3)
+storage = get_storage("anexos")
+upload_service = AnexoUploadService(storage)
+
+def _validar_entidade(tipo_entidade: str):
+    if tipo_entidade not in TIPOS_ENTIDADE:
+        raise HTTPException(status_code=400, detail=f"Tipo de entidade inválido. Use: {', '.join(TIPOS_ENTIDADE)}.")
+
+def _chave(anexo) -> str:
+    # Anexos deduplicados apontam para o blob; os antigos, para o próprio nome_seguro
+    return anexo.caminho_arquivo or anexo.nome_seguro
+
+async def _ler_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        block = await file.read(BLOCK_SIZE)
+        if not block:
+            break
+        yield block
+
+async def _registrar_anexo(
+    db: AsyncSession, recebido: ArquivoRecebido, nome_original: str,
+    tipo_entidade: str, id_entidade: int, tipo_documento: str | None, mimetype: str | None
+):
+    """
+    Cria o anexo apontando para o blob do conteúdo (ref_count + 1 na mesma transação)
+    e só depois do commit move o arquivo para o lugar. Se o blob já existia,
+    o arquivo recebido é descartado.
+    """
+    nome_limpo = os.path.basename(nome_original).replace(" ", "_")
+    anexo_data = AnexoCreate(
+        nome_original=nome_original,
+        # Nome lógico único; o conteúdo pode ser compartilhado com outros anexos
+        nome_seguro=f"{tipo_entidade}/{id_entidade}/{uuid.uuid4().hex[:12]}_{nome_limpo}"[:255],
+        caminho_arquivo=AnexoUploadService.blob_relpath(recebido.hash_sha256),
+        hash_sha256=recebido.hash_sha256,
+        tamanho_bytes=recebido.tamanho_bytes,
+        mimetype=mimetype,
+        tipo_documento=tipo_documento,
+        tipo_entidade=tipo_entidade,
+        id_entidade=id_entidade
+    )
+    try:
+        novo_anexo = await AnexoRepository(db).create(anexo_data)
+    except BaseException:
+        await upload_service.descartar(recebido)
+        raise
+    await upload_service.guardar(recebido)
+    return novo_anexo
 
 @router.post("/upload/", status_code=status.HTTP_201_CREATED)
 async def upload_file(
@@ -32,78 +86,135 @@ async def upload_file(
     tipo_documento: str = Form(...),
     tipo_documento_novo: str = Form(None),
     file: UploadFile = File(...),
-    db_conn: connection = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Upload em uma requisição. O arquivo é gravado em blocos fora do event loop,
+    com o SHA-256 calculado durante a escrita; conteúdo repetido não ocupa disco de novo.
+    Para arquivos grandes ou conexões instáveis use /anexos/uploads (em partes).
+    """
+    _validar_entidade(tipo_entidade)
+    # Lógica para tipo de documento "NOVO"
+    tipo_doc_final = tipo_documento
+    if tipo_documento == "NOVO" and tipo_documento_novo:
+        tipo_doc_final = tipo_documento_novo
+
     try:
-        # Lógica para tipo de documento "NOVO"
-        tipo_doc_final = tipo_documento
-        if tipo_documento == "NOVO" and tipo_documento_novo:
-            tipo_doc_final = tipo_documento_novo
-            # Opcional: Salvar o novo tipo na tabela tipos_documento se desejar
-        
-        # 1. Salvar arquivo no disco
-        # Cria estrutura de pastas organizada: uploads/contrato/123/arquivo.pdf
-        entidade_dir = os.path.join(UPLOAD_DIR, tipo_entidade, str(id_entidade))
-        os.makedirs(entidade_dir, exist_ok=True)
-        
-        # Gera nome seguro e único para evitar sobrescrita
-        import time
-        timestamp = int(time.time())
-        nome_seguro = f"{timestamp}_{file.filename.replace(' ', '_')}"
-        file_path = os.path.join(entidade_dir, nome_seguro)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Caminho relativo para salvar no banco (para ser servido depois)
-        # Ex: contrato/123/169876543_arquivo.pdf
-        caminho_relativo = f"{tipo_entidade}/{id_entidade}/{nome_seguro}"
-
-        # 2. Salvar metadados no Banco
-        anexo_data = AnexoCreate(
-            nome_original=file.filename,
-            nome_seguro=caminho_relativo, # Salvamos o caminho relativo aqui
-            tipo_documento=tipo_doc_final,
-            tipo_entidade=tipo_entidade,
-            id_entidade=id_entidade
-        )
-        
-        repo = AnexoRepository(db_conn)
-        novo_anexo = repo.create(anexo_data)
-        
-        logger.info(f"Usuário '{current_user.username}' fez upload Anexo ID {novo_anexo.id} ('{novo_anexo.nome_original}')")
-        return {"mensagem": "Upload realizado com sucesso", "anexo": novo_anexo}
+        recebido = await upload_service.receber_stream(_ler_upload(file))
+    except UploadTamanhoError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
+    try:
+        novo_anexo = await _registrar_anexo(
+            db, recebido, file.filename, tipo_entidade, id_entidade, tipo_doc_final, file.content_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception(f"Erro ao criar registro do anexo '{file.filename}' no BD por '{current_user.username}': {e}")
         raise HTTPException(status_code=500, detail=f"Erro ao salvar anexo: {str(e)}")
 
+    logger.info(f"Usuário '{current_user.username}' fez upload Anexo ID {novo_anexo.id} ('{novo_anexo.nome_original}')")
+    return {"mensagem": "Upload realizado com sucesso", "anexo": AnexoResponse.model_validate(novo_anexo)}
+
+# --- UPLOAD EM PARTES (RETOMÁVEL) ---
+@router.post("/uploads", response_model=AnexoUploadStatus, status_code=status.HTTP_201_CREATED)
+async def iniciar_upload(
+    dados: AnexoUploadInicio,
+    current_user: User = Depends(get_current_user)
+):
+    """Abre um upload em partes. Envie as partes com PATCH /anexos/uploads/{upload_id}?offset=N."""
+    _validar_entidade(dados.tipo_entidade)
+    try:
+        return await upload_service.iniciar({**dados.model_dump(), "usuario": current_user.username})
+    except UploadTamanhoError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@router.get("/uploads/{upload_id}", response_model=AnexoUploadStatus)
+async def status_upload(upload_id: str):
+    """Quanto do upload o servidor já tem: o cliente retoma a partir de recebido_bytes."""
+    try:
+        return await upload_service.status(upload_id)
+    except UploadNaoEncontradoError:
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado.")
+
+@router.patch("/uploads/{upload_id}", response_model=AnexoUploadStatus)
+async def enviar_parte(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Posição da parte no arquivo (= recebido_bytes)")
+):
+    """
+    Recebe uma parte (corpo bruto da requisição, até chunk_max_bytes).
+    Offset diferente do que o servidor tem devolve 409 com o valor correto.
+    """
+    try:
+        return await upload_service.receber_parte(upload_id, offset, request.stream())
+    except UploadNaoEncontradoError:
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado.")
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail={"mensagem": str(e), "recebido_bytes": e.recebido})
+    except UploadTamanhoError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@router.post("/uploads/{upload_id}/concluir", status_code=status.HTTP_201_CREATED)
+async def concluir_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Fecha o upload completo e cria o anexo (deduplicado pelo SHA-256)."""
+    try:
+        meta, recebido = await upload_service.concluir(upload_id)
+    except UploadNaoEncontradoError:
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado.")
+    except UploadTamanhoError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    try:
+        novo_anexo = await _registrar_anexo(
+            db, recebido, meta["nome_original"], meta["tipo_entidade"], meta["id_entidade"],
+            meta.get("tipo_documento"), meta.get("mimetype")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Erro ao concluir upload {upload_id} ('{meta['nome_original']}'): {e}")
+        raise HTTPException(status_code=500, detail=f"Erro ao salvar anexo: {str(e)}")
+
+    logger.info(f"Usuário '{current_user.username}' concluiu upload em partes: Anexo ID {novo_anexo.id} ('{novo_anexo.nome_original}')")
+    return {"mensagem": "Upload realizado com sucesso", "anexo": AnexoResponse.model_validate(novo_anexo)}
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancelar_upload(upload_id: str):
+    try:
+        await upload_service.cancelar(upload_id)
+    except UploadNaoEncontradoError:
+        raise HTTPException(status_code=404, detail="Upload não encontrado ou expirado.")
+
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_anexo(
+async def delete_anexo(
     id: int,
-    db_conn: connection = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    repo = AnexoRepository(db_conn)
-    anexo = repo.get_by_id(id)
-    
+    repo = AnexoRepository(db)
+    anexo = await repo.get_by_id(id)
+
     if not anexo:
         raise HTTPException(status_code=404, detail="Anexo não encontrado")
-        
+
     try:
-        # 1. Remove do Banco
-        repo.delete(id)
-        
-        # 2. Remove do Disco
-        # Reconstrói o caminho completo
-        file_path = os.path.join(UPLOAD_DIR, anexo.nome_seguro) # nome_seguro guarda o caminho relativo
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logger.info(f"Arquivo físico '{file_path}' removido.")
-        else:
-            logger.warning(f"Arquivo físico não encontrado para remoção: {file_path}")
-            
+        # 1. Remove do Banco (e tira uma referência do blob)
+        orfao = await repo.delete_anexo(anexo)
+
+        # 2. Remove do Disco só se nenhum outro anexo usa o mesmo conteúdo.
+        # Confere de novo após o commit: um upload do mesmo arquivo pode ter recriado o blob
+        if orfao and not (anexo.hash_sha256 and await repo.blob_existe(anexo.hash_sha256)):
+            await upload_service.remover_arquivo(orfao)
+            logger.info(f"Arquivo físico '{orfao}' removido.")
+
         logger.info(f"Usuário '{current_user.username}' deletou Anexo ID {id}.")
         return
 
@@ -112,28 +223,79 @@ def delete_anexo(
         raise HTTPException(status_code=500, detail="Erro interno ao excluir anexo.")
 
 # --- NOVA ROTA PARA DOWNLOAD ---
-@router.get("/{id}/download", name="download_anexo_file")
-def download_anexo(
+@router.api_route("/{id}/download", methods=["GET", "HEAD"], name="download_anexo_file")
+async def download_anexo(
     id: int,
-    db_conn: connection = Depends(get_db),
+    request: Request,
+    inline: bool = Query(False, description="Exibir no navegador (visualizador de PDF) em vez de baixar"),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(get_current_user) # Opcional: proteger download
 ):
-    repo = AnexoRepository(db_conn)
-    anexo = repo.get_by_id(id)
-    
+    """
+    Download com ETag forte (SHA-256 do conteúdo), 304 para If-None-Match /
+    If-Modified-Since e suporte a Range (o visualizador de PDF busca só as páginas).
+    """
+    anexo = await AnexoRepository(db).get_by_id(id)
+
     if not anexo:
         raise HTTPException(status_code=404, detail="Anexo não encontrado")
-    
-    # Reconstrói o caminho completo
-    # O campo nome_seguro no banco deve conter algo como: aocs/79/1764611548_arquivo.pdf
-    file_path = os.path.join(UPLOAD_DIR, anexo.nome_seguro)
-    
-    if not os.path.exists(file_path):
-        logger.error(f"Arquivo físico não encontrado no disco: {file_path}")
+
+    try:
+        return await serve_stored(
+            request,
+            storage,
+            _chave(anexo),
+            filename=anexo.nome_original, # Nome original para o usuário baixar
+            etag=strong_etag(anexo.hash_sha256) if anexo.hash_sha256 else None,
+            # Sem inline, força download
+            media_type=(anexo.mimetype or None) if inline else 'application/octet-stream',
+            inline=inline,
+            accel_prefix=settings.ANEXO_ACCEL_REDIRECT_PREFIX or None,
+        )
+    except FileNotFoundError:
+        logger.error(f"Arquivo não encontrado no armazenamento: {_chave(anexo)}")
         raise HTTPException(status_code=404, detail="Arquivo físico não encontrado no servidor.")
-        
-    return FileResponse(
-        path=file_path, 
-        filename=anexo.nome_original, # Nome original para o usuário baixar
-        media_type='application/octet-stream' # Força download
+
+@router.get("/{tipo_entidade}/{id_entidade}/zip", name="download_anexos_zip")
+async def download_anexos_zip(
+    tipo_entidade: str,
+    id_entidade: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exporta todos os anexos de um contrato/AOCS num ZIP gerado em streaming:
+    os arquivos são lidos em blocos e enviados conforme entram no ZIP, sem
+    montar o arquivo inteiro em memória. PDFs e imagens vão sem recompressão.
+    """
+    _validar_entidade(tipo_entidade)
+    anexos = await AnexoRepository(db).get_by_entidade(id_entidade=id_entidade, tipo_entidade=tipo_entidade)
+
+    arquivos, usados = [], set()
+    for anexo in anexos:
+        info = await storage.stat(_chave(anexo))
+        if info is None:
+            logger.warning(f"Anexo ID {anexo.id} sem arquivo no armazenamento: {_chave(anexo)}")
+            continue
+        # Nomes repetidos no zip ganham sufixo (ex: certidao (2).pdf)
+        base, ext = os.path.splitext(os.path.basename(anexo.nome_original) or f"anexo_{anexo.id}")
+        arcname, n = f"{base}{ext}", 1
+        while arcname in usados:
+            n += 1
+            arcname = f"{base} ({n}){ext}"
+        usados.add(arcname)
+        arquivos.append((arcname, info.size, _chave(anexo)))
+
+    if not arquivos:
+        raise HTTPException(status_code=404, detail="Nenhum anexo encontrado para esta entidade.")
+
+    async def objetos():
+        for arcname, size, key in arquivos:
+            yield arcname, size, storage.get_stream(key)
+
+    logger.info(f"Usuário '{current_user.username}' exportou os anexos de {tipo_entidade} {id_entidade}.")
+    return StreamingResponse(
+        ZipService().stream_objects_async(objetos()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="anexos_{tipo_entidade}_{id_entidade}.zip"'}
     )
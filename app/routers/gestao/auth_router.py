@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from psycopg2.extensions import connection
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from app.schemas.core.auth_schema import LoginRequest, Token
@@ -15,9 +15,9 @@ router = APIRouter(prefix="/auth", tags=["Gestão - Autenticação"])
 logger = logging.getLogger(__name__)
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     credentials_exception = HTTPException(
@@ -27,12 +27,12 @@ def login_for_access_token(
     )
     
     user_repo = UserRepository(db_conn)
-    user = user_repo.get_by_username(form_data.username) 
+    user = await user_repo.get_by_username(form_data.username)
     
     if not user:
         raise credentials_exception
     
-    if not user.verificar_senha(form_data.password):
+    if not verify_password(form_data.password, user.password_hash):
         raise credentials_exception
 
     access_token = create_access_token(user=user)
@@ -40,22 +40,22 @@ def login_for_access_token(
     return Token(access_token=access_token, token_type="bearer")
 
 @router.get("/users/me", response_model=UserResponse)
-def read_users_me(
+async def read_users_me(
     current_user: User = Depends(get_current_user)
     ):
 
     return current_user
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
-def change_password(
+async def change_password(
     payload: UserChangePasswordRequest,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = UserRepository(db_conn)
     
     # 1. Busca o usuário atual no banco para ter o hash atualizado
-    user_db = repo.get_by_id(current_user.id)
+    user_db = await repo.get_by_id(current_user.id)
     
     if not user_db:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
@@ -68,7 +68,7 @@ def change_password(
     new_hash = get_password_hash(payload.new_password)
     
     # 4. Salva
-    success = repo.update_password(current_user.id, new_hash)
+    success = await repo.update_password(current_user.id, new_hash)
     
     if not success:
         raise HTTPException(status_code=500, detail="Erro ao atualizar a senha no banco de dados.")
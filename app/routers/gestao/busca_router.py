@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import logging
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_user, require_access_level
+from app.models.core.user_model import User
+from app.repositories.gestao.busca_repository import BuscaRepository, TIPOS_BUSCA
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/busca",
+    tags=["Gestão - Busca"],
+    dependencies=[Depends(require_access_level(3))]
+)
+
+@router.get("/")
+async def buscar(
+    q: str = Query(..., min_length=2, description="Termo (sem diferenciar acentos; tolera erros de digitação)"),
+    tipos: Optional[str] = Query(None, description=f"Separados por vírgula: {', '.join(TIPOS_BUSCA)}. Padrão: todos."),
+    limite: int = Query(10, ge=1, le=50, description="Máximo de resultados por tipo"),
+    db_conn: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Busca unificada em itens do catálogo, contratos, fornecedores e AOCS, ordenada por relevância."""
+    selecionados = tuple(t.strip() for t in tipos.split(",") if t.strip()) if tipos else TIPOS_BUSCA
+    invalidos = [t for t in selecionados if t not in TIPOS_BUSCA]
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipos inválidos: {', '.join(invalidos)}. Use: {', '.join(TIPOS_BUSCA)}."
+        )
+
+    try:
+        repo = BuscaRepository(db_conn)
+        resultados = await repo.buscar(
+            q, selecionados, limite=limite, similaridade_minima=settings.BUSCA_SIMILARIDADE_MINIMA
+        )
+        return {"termo": q, "resultados": resultados}
+    except Exception as e:
+        logger.exception(f"Erro inesperado na busca '{q}' por '{current_user.username}': {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
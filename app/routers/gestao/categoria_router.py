@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -8,6 +8,7 @@ from app.models.core.user_model import User
 from app.models.gestao.categoria_model import Categoria
 from app.schemas.gestao.categoria_schema import CategoriaRequest, CategoriaResponse
 from app.repositories.gestao.categoria_repository import CategoriaRepository
+from app.repositories.gestao.item_repository import ItemRepository
 
 from typing import List, Dict, Any
 from app.schemas.gestao.item_schema import ItemResponse 
@@ -15,7 +16,6 @@ from fastapi import Query
 
 import math
 from decimal import Decimal
-from psycopg2.extras import DictCursor
 
 logger = logging.getLogger(__name__)
 
@@ -29,17 +29,17 @@ router = APIRouter(
              response_model=CategoriaResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_categoria(
+async def create_categoria(
     categoria_req: CategoriaRequest,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = CategoriaRepository(db_conn)
-        nova_categoria = repo.create(categoria_req)
+        nova_categoria = await repo.create(categoria_req)
         logger.info(f"Usuário '{current_user.username}' criou Categoria ID {nova_categoria.id} ('{nova_categoria.nome}').")
         return nova_categoria
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar categoria duplicada: '{categoria_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -50,26 +50,26 @@ def create_categoria(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[CategoriaResponse])
-def get_all_categorias(
+async def get_all_categorias(
     mostrar_inativos: bool = False, 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = CategoriaRepository(db_conn)
-        categorias = repo.get_all(mostrar_inativos)
+        categorias = await repo.get_all(mostrar_inativos=mostrar_inativos)
         return categorias
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar categorias (inativos={mostrar_inativos}): {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=CategoriaResponse)
-def get_categoria_by_id(
+async def get_categoria_by_id(
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = CategoriaRepository(db_conn)
-        categoria = repo.get_by_id(id)
+        categoria = await repo.get_by_id(id)
         if not categoria:
             logger.warning(f"Categoria ID {id} não encontrada.")
             raise HTTPException(
@@ -87,14 +87,14 @@ def get_categoria_by_id(
 @router.put("/{id}",
             response_model=CategoriaResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_categoria(
+async def update_categoria(
     id: int,
     categoria_req: CategoriaRequest,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CategoriaRepository(db_conn)
-    categoria_db = repo.get_by_id(id)
+    categoria_db = await repo.get_by_id(id)
     if not categoria_db:
          logger.warning(f"Tentativa de atualizar categoria ID {id} (não encontrada) por '{current_user.username}'.")
          raise HTTPException(
@@ -103,14 +103,14 @@ def update_categoria(
         )
 
     try:
-        categoria_atualizada = repo.update(id, categoria_req)
+        categoria_atualizada = await repo.update(id, categoria_req)
         if not categoria_atualizada:
              logger.error(f"Categoria ID {id} não encontrada DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Categoria não encontrada durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Categoria ID {id} de '{categoria_db.nome}' para '{categoria_atualizada.nome}'.")
         return categoria_atualizada
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar categoria ID {id} para nome duplicado '{categoria_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -124,15 +124,15 @@ def update_categoria(
               response_model=CategoriaResponse,
               status_code=status.HTTP_200_OK,
               dependencies=[Depends(require_access_level(2))])
-def update_categoria_status(
+async def update_categoria_status(
     id: int,
     ativo: bool, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CategoriaRepository(db_conn)
     
-    categoria_db = repo.get_by_id(id)
+    categoria_db = await repo.get_by_id(id)
     if not categoria_db:
         logger.warning(f"Tentativa de alterar status da categoria ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -141,7 +141,7 @@ def update_categoria_status(
         )
     
     try:
-        categoria_atualizada = repo.change_status(id, ativo)
+        categoria_atualizada = await repo.set_active_status(id, ativo)
         
         status_log = "ATIVADA" if ativo else "DESATIVADA"
         logger.info(f"Usuário '{current_user.username}' alterou o status da Categoria ID {id} para {status_log}.")
@@ -154,14 +154,14 @@ def update_categoria_status(
 @router.patch("/{id}/status", 
              response_model=CategoriaResponse,
              dependencies=[Depends(require_access_level(2))])
-def toggle_categoria_status(
+async def toggle_categoria_status(
     id: int,
     activate: bool, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CategoriaRepository(db_conn)
-    categoria_atualizada = repo.set_active_status(id, activate) 
+    categoria_atualizada = await repo.set_active_status(id, activate) 
 
     if not categoria_atualizada:
         raise HTTPException(
@@ -176,13 +176,13 @@ def toggle_categoria_status(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_categoria(
+async def delete_categoria(
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CategoriaRepository(db_conn)
-    categoria_para_deletar = repo.get_by_id(id)
+    categoria_para_deletar = await repo.get_by_id(id)
     if not categoria_para_deletar:
         logger.warning(f"Tentativa de deletar categoria ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -191,11 +191,11 @@ def delete_categoria(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Categoria ID {id} ('{categoria_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Esta Categoria está vinculada a Contratos."
@@ -205,81 +205,32 @@ def delete_categoria(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
     
 @router.get("/{id_categoria}/itens", response_model=Dict[str, Any])
-def get_itens_por_categoria(
+async def get_itens_por_categoria(
     id_categoria: int,
     page: int = Query(1),
     busca: str = Query(""),
     sort_by: str = Query("descricao"),
     order: str = Query("asc"),
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     ITENS_POR_PAGINA = 10
-    cursor = None
 
     try:
-        cursor = db_conn.cursor(cursor_factory=DictCursor)
-
-        cursor.execute('SELECT * FROM Categorias WHERE id = %s AND ativo = TRUE', (id_categoria,))
-        categoria = cursor.fetchone()
-        if not categoria:
+        categoria = await CategoriaRepository(db_conn).get_by_id(id_categoria)
+        if not categoria or not categoria.ativo:
             logger.warning(f"Tentativa de buscar itens para categoria ID {id_categoria} (não encontrada ou inativa) por '{current_user.username}'.")
             raise HTTPException(status_code=404, detail="Categoria não encontrada ou inativa.")
 
-        params = [id_categoria]
-        where_clause = "WHERE c.id_categoria = %s AND c.ativo = TRUE AND ic.ativo = TRUE"
-
-        if busca:
-            where_clause += " AND ic.descricao ILIKE %s"
-            params.append(f"%{busca}%")
-
-        colunas_ordenaveis = {
-            'descricao': 'ic.descricao', 
-            'contrato': 'c.numero_contrato',
-            'saldo': 'saldo', 
-            'valor_unitario': 'ic.valor_unitario', 
-            'numero_item': 'ic.numero_item'
-        }
-        coluna_ordenacao = colunas_ordenaveis.get(sort_by, 'ic.descricao')
-        direcao_ordenacao = 'DESC' if order == 'desc' else 'ASC'
-        order_by_clause = f"ORDER BY {coluna_ordenacao} {direcao_ordenacao}"
-
-        offset = (page - 1) * ITENS_POR_PAGINA
-        limit_offset_clause = "LIMIT %s OFFSET %s"
-        params.extend([ITENS_POR_PAGINA, offset])
-
-        sql_select = f"""
-            SELECT
-                ic.*, 
-                c.id AS id_contrato, 
-                c.numero_contrato, 
-                c.fornecedor,
-                COALESCE(pedidos_sum.total_pedido, 0) AS total_pedido,
-                (ic.quantidade - COALESCE(pedidos_sum.total_pedido, 0)) AS saldo,
-                COUNT(*) OVER() as total_geral
-            FROM itenscontrato ic
-            JOIN contratos c ON ic.id_contrato = c.id
-            LEFT JOIN (
-                SELECT id_item_contrato, SUM(quantidade_pedida) as total_pedido
-                FROM pedidos GROUP BY id_item_contrato
-            ) AS pedidos_sum ON ic.id = pedidos_sum.id_item_contrato
-            {where_clause} 
-            {order_by_clause} 
-            {limit_offset_clause}
-        """
-
-        cursor.execute(sql_select, params)
-        itens_com_saldo = cursor.fetchall()
-
-        total_itens = 0
-        if itens_com_saldo:
-            total_itens = itens_com_saldo[0]['total_geral']
+        itens_com_saldo, total_itens = await ItemRepository(db_conn).get_com_saldo_por_categoria(
+            id_categoria, page, ITENS_POR_PAGINA, busca=busca, sort_by=sort_by, order=order
+        )
         total_paginas = math.ceil(total_itens / ITENS_POR_PAGINA)
 
         itens_formatados = []
-        for item_row in itens_com_saldo:
-            item_dict = dict(item_row)
-            item_dict['descricao'] = {"descricao": item_row['descricao']}
+        for item_dict in itens_com_saldo:
+            item_dict.pop('total_geral', None)
+            item_dict['descricao'] = {"descricao": item_dict['descricao']}
             itens_formatados.append(item_dict)
 
         return {
@@ -288,9 +239,8 @@ def get_itens_por_categoria(
             "pagina_atual": page
         }
 
-    except (Exception, psycopg2.DatabaseError) as error:
-         if cursor: cursor.close() 
+    except HTTPException:
+        raise
+    except Exception as error:
          logger.exception(f"Erro ao buscar itens com saldo para Categoria ID {id_categoria}: {error}")
          raise HTTPException(status_code=500, detail="Erro interno do servidor ao consultar itens.")
-    finally:
-        if cursor: cursor.close()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,21 +21,21 @@ router = APIRouter(
              response_model=CiPagamentoResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_ci_pagamento( 
+async def create_ci_pagamento( 
     ci_req: CiPagamentoCreateRequest, 
     id_pedido: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = CiPagamentoRepository(db_conn)
-        nova_ci = repo.create(ci_req, id_pedido)
+        nova_ci = await repo.create(ci_req, id_pedido)
         logger.info(f"Usuário '{current_user.username}' criou CI Pagamento ID {nova_ci.id} ('{nova_ci.numero_ci}').")
         return nova_ci
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao criar CI por '{current_user.username}': {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar CI duplicada (Num CI/NF?): '{ci_req.numero_ci}' / '{ci_req.numero_nota_fiscal}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -46,25 +46,25 @@ def create_ci_pagamento(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[CiPagamentoResponse])
-def get_all_ci_pagamentos( 
-    db_conn: connection = Depends(get_db)
+async def get_all_ci_pagamentos( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = CiPagamentoRepository(db_conn)
-        ci_list = repo.get_all() 
+        ci_list = await repo.get_all() 
         return ci_list
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar CIs de Pagamento: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=CiPagamentoResponse)
-def get_ci_pagamento_by_id( 
+async def get_ci_pagamento_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = CiPagamentoRepository(db_conn)
-        ci = repo.get_by_id(id) 
+        ci = await repo.get_by_id(id) 
         if not ci:
             logger.warning(f"CI Pagamento ID {id} não encontrada.")
             raise HTTPException(
@@ -81,13 +81,13 @@ def get_ci_pagamento_by_id(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/por-pedido/{id_pedido}", response_model=CiPagamentoResponse)
-def get_ci_pagamento_by_pedido_id( 
+async def get_ci_pagamento_by_pedido_id( 
     id_pedido: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = CiPagamentoRepository(db_conn)
-        ci = repo.get_by_pedido_id(id_pedido) 
+        ci = await repo.get_by_pedido_id(id_pedido) 
         if not ci:
             logger.warning(f"CI Pagamento para Pedido ID {id_pedido} não encontrada.")
             raise HTTPException(
@@ -106,14 +106,14 @@ def get_ci_pagamento_by_pedido_id(
 @router.put("/{id}",
             response_model=CiPagamentoResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_ci_pagamento( 
+async def update_ci_pagamento( 
     id: int,
     ci_req: CiPagamentoUpdateRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CiPagamentoRepository(db_conn)
-    ci_db = repo.get_by_id(id)
+    ci_db = await repo.get_by_id(id)
     if not ci_db:
          logger.warning(f"Tentativa de atualizar CI Pagamento ID {id} (não encontrada) por '{current_user.username}'.")
          raise HTTPException(
@@ -122,7 +122,7 @@ def update_ci_pagamento(
         )
 
     try:
-        ci_atualizada = repo.update(id, ci_req)
+        ci_atualizada = await repo.update(id, ci_req)
         if not ci_atualizada:
              logger.error(f"CI Pagamento ID {id} não encontrada DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="CI Pagamento não encontrada durante a atualização.")
@@ -132,7 +132,7 @@ def update_ci_pagamento(
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao atualizar CI ID {id} por '{current_user.username}': {e}")
         raise HTTPException(status_code=400, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Erro de integridade ao atualizar CI ID {id} (Num CI/NF duplicado?) por '{current_user.username}'. Req: {ci_req.model_dump(exclude_unset=True)}")
         detail = "Erro de integridade ao atualizar CI."
         if ci_req.numero_ci: detail += f" O número CI '{ci_req.numero_ci}' pode já estar em uso."
@@ -145,13 +145,13 @@ def update_ci_pagamento(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_ci_pagamento( 
+async def delete_ci_pagamento( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = CiPagamentoRepository(db_conn)
-    ci_para_deletar = repo.get_by_id(id)
+    ci_para_deletar = await repo.get_by_id(id)
     if not ci_para_deletar:
         logger.warning(f"Tentativa de deletar CI Pagamento ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -160,11 +160,11 @@ def delete_ci_pagamento(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou CI Pagamento ID {id} ('{ci_para_deletar.numero_ci}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir esta CI de Pagamento (Erro de integridade)."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.deps import get_db, get_current_user
 from app.core.security import require_access_level
@@ -23,7 +23,7 @@ router = APIRouter(
              dependencies=[Depends(require_access_level(2))])
 async def create_contrato( 
     contrato_req: ContratoCreateRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
@@ -34,7 +34,7 @@ async def create_contrato(
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao criar Contrato por '{current_user.username}': {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar Contrato duplicado: '{contrato_req.numero_contrato}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -47,11 +47,11 @@ async def create_contrato(
 @router.get("/", response_model=list[ContratoResponse])
 async def get_all_contratos( 
     mostrar_inativos: bool = False, 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ContratoRepository(db_conn)
-        contratos = await repo.get_all(mostrar_inativos) 
+        contratos = await repo.get_all(mostrar_inativos=mostrar_inativos) 
         return contratos
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar Contratos (inativos={mostrar_inativos}): {e}")
@@ -60,7 +60,7 @@ async def get_all_contratos(
 @router.get("/{id}", response_model=ContratoResponse)
 async def get_contrato_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ContratoRepository(db_conn)
@@ -83,7 +83,7 @@ async def get_contrato_by_id(
 @router.get("/numero/{numero_contrato:path}", response_model=ContratoResponse)
 async def get_contrato_by_numero(
     numero_contrato: str,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ContratoRepository(db_conn)
@@ -105,7 +105,7 @@ async def get_contrato_by_numero(
 async def update_contrato( 
     id: int,
     contrato_req: ContratoUpdateRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ContratoRepository(db_conn)
@@ -128,7 +128,7 @@ async def update_contrato(
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao atualizar Contrato ID {id} por '{current_user.username}': {e}")
         raise HTTPException(status_code=400, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Erro de integridade ao atualizar Contrato ID {id} (Num Contrato duplicado?) por '{current_user.username}'. Req: {contrato_req.model_dump(exclude_unset=True)}")
         detail = "Erro de integridade ao atualizar Contrato."
         if contrato_req.numero_contrato:
@@ -144,7 +144,7 @@ async def update_contrato(
 async def set_contrato_status(
     id: int,
     activate: bool, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ContratoRepository(db_conn)
@@ -165,7 +165,7 @@ async def set_contrato_status(
                dependencies=[Depends(require_access_level(2))])
 async def delete_contrato( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ContratoRepository(db_conn)
@@ -182,7 +182,7 @@ async def delete_contrato(
         logger.info(f"Usuário '{current_user.username}' deletou Contrato ID {id} ('{contrato_para_deletar.numero_contrato}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Contrato possui Itens vinculados."
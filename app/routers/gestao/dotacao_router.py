@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=DotacaoResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_dotacao( 
+async def create_dotacao( 
     dotacao_req: DotacaoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = DotacaoRepository(db_conn)
-        nova_dotacao = repo.create(dotacao_req) 
+        nova_dotacao = await repo.create(dotacao_req) 
         logger.info(f"Usuário '{current_user.username}' criou Dotação ID {nova_dotacao.id} ('{nova_dotacao.info_orcamentaria}').")
         return nova_dotacao
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar dotação duplicada: '{dotacao_req.info_orcamentaria}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_dotacao(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[DotacaoResponse])
-def get_all_dotacoes( 
-    db_conn: connection = Depends(get_db)
+async def get_all_dotacoes( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = DotacaoRepository(db_conn)
-        dotacoes = repo.get_all() 
+        dotacoes = await repo.get_all() 
         return dotacoes
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar dotações: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=DotacaoResponse)
-def get_dotacao_by_id( 
+async def get_dotacao_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = DotacaoRepository(db_conn)
-        dotacao = repo.get_by_id(id) 
+        dotacao = await repo.get_by_id(id) 
         if not dotacao:
             logger.warning(f"Dotação ID {id} não encontrada.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_dotacao_by_id(
 @router.put("/{id}",
             response_model=DotacaoResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_dotacao( 
+async def update_dotacao( 
     id: int,
     dotacao_req: DotacaoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = DotacaoRepository(db_conn)
-    dotacao_db = repo.get_by_id(id) 
+    dotacao_db = await repo.get_by_id(id) 
     if not dotacao_db:
          logger.warning(f"Tentativa de atualizar dotação ID {id} (não encontrada) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_dotacao(
         )
 
     try:
-        dotacao_atualizada = repo.update(id, dotacao_req) 
+        dotacao_atualizada = await repo.update(id, dotacao_req) 
         if not dotacao_atualizada:
              logger.error(f"Dotação ID {id} não encontrada DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Dotação não encontrada durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Dotação ID {id} de '{dotacao_db.info_orcamentaria}' para '{dotacao_atualizada.info_orcamentaria}'.")
         return dotacao_atualizada
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar dotação ID {id} para valor duplicado '{dotacao_req.info_orcamentaria}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_dotacao(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_dotacao( 
+async def delete_dotacao( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = DotacaoRepository(db_conn)
-    dotacao_para_deletar = repo.get_by_id(id) 
+    dotacao_para_deletar = await repo.get_by_id(id) 
     if not dotacao_para_deletar:
         logger.warning(f"Tentativa de deletar dotação ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_dotacao(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Dotação ID {id} ('{dotacao_para_deletar.info_orcamentaria}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Esta Dotação está vinculada a AOCS ou CIs."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from typing import List
 from app.core.database import get_db
@@ -22,17 +22,17 @@ router = APIRouter(
              response_model=InstrumentoResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_instrumento( 
+async def create_instrumento( 
     instrumento_req: InstrumentoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = InstrumentoRepository(db_conn)
-        novo_instrumento = repo.create(instrumento_req) 
+        novo_instrumento = await repo.create(instrumento_req) 
         logger.info(f"Usuário '{current_user.username}' criou Instrumento ID {novo_instrumento.id} ('{novo_instrumento.nome}').")
         return novo_instrumento
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar instrumento duplicado: '{instrumento_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -43,14 +43,14 @@ def create_instrumento(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=List[InstrumentoResponse])
-def get_all_instrumentos( 
-    db_conn: connection = Depends(get_db)
+async def get_all_instrumentos( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     try:
         repo = InstrumentoRepository(db_conn)
         
-        instrumentos = repo.get_all() 
+        instrumentos = await repo.get_all() 
         
         return instrumentos
     
@@ -59,13 +59,13 @@ def get_all_instrumentos(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=InstrumentoResponse)
-def get_instrumento_by_id( 
+async def get_instrumento_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = InstrumentoRepository(db_conn)
-        instrumento = repo.get_by_id(id) 
+        instrumento = await repo.get_by_id(id) 
         if not instrumento:
             logger.warning(f"Instrumento ID {id} não encontrado.")
             raise HTTPException(
@@ -84,14 +84,14 @@ def get_instrumento_by_id(
 @router.put("/{id}",
             response_model=InstrumentoResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_instrumento( 
+async def update_instrumento( 
     id: int,
     instrumento_req: InstrumentoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = InstrumentoRepository(db_conn)
-    instrumento_db = repo.get_by_id(id) 
+    instrumento_db = await repo.get_by_id(id) 
     if not instrumento_db:
          logger.warning(f"Tentativa de atualizar instrumento ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -100,14 +100,14 @@ def update_instrumento(
         )
 
     try:
-        instrumento_atualizado = repo.update(id, instrumento_req) 
+        instrumento_atualizado = await repo.update(id, instrumento_req) 
         if not instrumento_atualizado:
              logger.error(f"Instrumento ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Instrumento não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Instrumento ID {id} de '{instrumento_db.nome}' para '{instrumento_atualizado.nome}'.")
         return instrumento_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar instrumento ID {id} para nome duplicado '{instrumento_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -120,13 +120,13 @@ def update_instrumento(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_instrumento( 
+async def delete_instrumento( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = InstrumentoRepository(db_conn)
-    instrumento_para_deletar = repo.get_by_id(id) 
+    instrumento_para_deletar = await repo.get_by_id(id) 
     if not instrumento_para_deletar:
         logger.warning(f"Tentativa de deletar instrumento ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -135,11 +135,11 @@ def delete_instrumento(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Instrumento ID {id} ('{instrumento_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Instrumento Contratual está vinculado a Contratos."
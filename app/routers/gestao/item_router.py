@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -8,6 +8,7 @@ from app.models.core.user_model import User
 from app.models.gestao.item_model import ItemContrato
 from app.schemas.gestao.item_schema import ItemRequest, ItemResponse
 from app.repositories.gestao.item_repository import ItemRepository
+from app.repositories.gestao.saldo_item_repository import SaldoItemRepository
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +22,20 @@ router = APIRouter(
              response_model=ItemResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_item( 
+async def create_item( 
     item_req: ItemRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = ItemRepository(db_conn)
-        novo_item = repo.create(item_req) 
+        novo_item = await repo.create(item_req) 
         logger.info(f"Usuário '{current_user.username}' criou Item ID {novo_item.id} (Num: {novo_item.numero_item}) para Contrato ID {novo_item.id_contrato}.")
         return novo_item
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao criar Item por '{current_user.username}': {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar Item duplicado (Num Item?) para Contrato '{item_req.contrato_nome}' por '{current_user.username}'. Req: {item_req.model_dump()}")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -45,28 +46,24 @@ def create_item(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[ItemResponse])
-def get_itens( 
+async def get_itens( 
     contrato_id: int | None = None,
     descricao: str | None = None, 
     mostrar_inativos: bool = False,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     repo = ItemRepository(db_conn)
     items_list = [] 
     try:
         if descricao:
-            item = repo.get_by_descricao(descricao)
+            item = await repo.get_by_descricao(descricao)
             items_list = [item] if item else []
             if not mostrar_inativos and items_list:
-                items_list = [i for i in items_list if i.ativo]
+                items_list = [i for i in items_list if not i.is_deleted]
         elif contrato_id:
-            items_contrato = repo.get_by_contrato_id(contrato_id)
-            if not mostrar_inativos:
-                items_list = [item for item in items_contrato if item.ativo]
-            else:
-                items_list = items_contrato
+            items_list = await repo.get_by_contrato_id(contrato_id, mostrar_inativos=mostrar_inativos)
         else:
-            items_list = repo.get_all(mostrar_inativos)
+            items_list = await repo.get_all(mostrar_inativos=mostrar_inativos)
 
         return items_list
     except Exception as e:
@@ -74,14 +71,43 @@ def get_itens(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 
+@router.post("/saldos/reconciliar", dependencies=[Depends(require_access_level(1))])
+async def reconciliar_saldos(
+    corrigir: bool = True,
+    db_conn: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Confere o razão de saldo com os pedidos; com corrigir=true regrava os itens divergentes."""
+    try:
+        divergencias = await SaldoItemRepository(db_conn).reconciliar(corrigir=corrigir)
+        logger.info(f"Usuário '{current_user.username}' reconciliou os saldos: {len(divergencias)} itens divergentes (corrigir={corrigir}).")
+        return {"divergencias": divergencias, "corrigido": corrigir}
+    except Exception as e:
+        logger.exception(f"Erro inesperado ao reconciliar saldos: {e}")
+        raise HTTPException(status_code=500, detail="Erro interno do servidor.")
+
+@router.get("/{id}/saldo")
+async def get_saldo_item(
+    id: int,
+    db_conn: AsyncSession = Depends(get_db)
+):
+    """Saldo do item (contratado, pedido, entregue e disponível), lido do razão pela PK."""
+    saldo = await SaldoItemRepository(db_conn).get_saldo(id)
+    if not saldo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item de Contrato não encontrado."
+        )
+    return saldo
+
 @router.get("/{id}", response_model=ItemResponse)
-def get_item_by_id( 
+async def get_item_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ItemRepository(db_conn)
-        item = repo.get_by_id(id) 
+        item = await repo.get_by_id(id) 
         if not item:
             logger.warning(f"Item ID {id} não encontrado.")
             raise HTTPException(
@@ -101,14 +127,14 @@ def get_item_by_id(
 @router.put("/{id}",
             response_model=ItemResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_item( 
+async def update_item( 
     id: int,
     item_req: ItemRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ItemRepository(db_conn)
-    item_db = repo.get_by_id(id) 
+    item_db = await repo.get_by_id(id) 
     if not item_db:
          logger.warning(f"Tentativa de atualizar Item ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -117,7 +143,7 @@ def update_item(
         )
 
     try:
-        item_atualizado = repo.update(id, item_req) 
+        item_atualizado = await repo.update(id, item_req) 
         if not item_atualizado:
              logger.error(f"Item ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Item não encontrado durante a atualização.")
@@ -127,7 +153,7 @@ def update_item(
     except ValueError as e: 
         logger.warning(f"Erro de validação (ValueError) ao atualizar Item ID {id} por '{current_user.username}': {e}")
         raise HTTPException(status_code=400, detail=str(e))
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Erro de integridade ao atualizar Item ID {id} (Num Item duplicado?) por '{current_user.username}'. Req: {item_req.model_dump()}")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -140,14 +166,14 @@ def update_item(
 @router.patch("/{id}/status",
              response_model=ItemResponse,
              dependencies=[Depends(require_access_level(2))])
-def set_item_status(
+async def set_item_status(
     id: int,
     activate: bool,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ItemRepository(db_conn)
-    item_atualizado = repo.set_active_status(id, activate)
+    item_atualizado = await repo.set_active_status(id, activate)
 
     if not item_atualizado:
         raise HTTPException(
@@ -162,13 +188,13 @@ def set_item_status(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_item( 
+async def delete_item( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ItemRepository(db_conn)
-    item_para_deletar = repo.get_by_id(id) 
+    item_para_deletar = await repo.get_by_id(id) 
     if not item_para_deletar:
         logger.warning(f"Tentativa de deletar Item ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -177,11 +203,11 @@ def delete_item(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Item ID {id} (Num: {item_para_deletar.numero_item}, Contrato ID: {item_para_deletar.id_contrato}).")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Item está vinculado a Pedidos."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=LocalResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_local( 
+async def create_local( 
     local_req: LocalRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = LocalRepository(db_conn)
-        novo_local = repo.create(local_req) 
+        novo_local = await repo.create(local_req) 
         logger.info(f"Usuário '{current_user.username}' criou Local ID {novo_local.id} ('{novo_local.descricao}').")
         return novo_local
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar local duplicado: '{local_req.descricao}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_local(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[LocalResponse])
-def get_all_locais( 
-    db_conn: connection = Depends(get_db)
+async def get_all_locais( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = LocalRepository(db_conn)
-        locais = repo.get_all() 
+        locais = await repo.get_all() 
         return locais
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar locais: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=LocalResponse)
-def get_local_by_id( 
+async def get_local_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = LocalRepository(db_conn)
-        local = repo.get_by_id(id) 
+        local = await repo.get_by_id(id) 
         if not local:
             logger.warning(f"Local ID {id} não encontrado.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_local_by_id(
 @router.put("/{id}",
             response_model=LocalResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_local( 
+async def update_local( 
     id: int,
     local_req: LocalRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = LocalRepository(db_conn)
-    local_db = repo.get_by_id(id) 
+    local_db = await repo.get_by_id(id) 
     if not local_db:
          logger.warning(f"Tentativa de atualizar local ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_local(
         )
 
     try:
-        local_atualizado = repo.update(id, local_req) 
+        local_atualizado = await repo.update(id, local_req) 
         if not local_atualizado:
              logger.error(f"Local ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Local não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Local ID {id} de '{local_db.descricao}' para '{local_atualizado.descricao}'.")
         return local_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar local ID {id} para descrição duplicada '{local_req.descricao}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_local(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_local( 
+async def delete_local( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = LocalRepository(db_conn)
-    local_para_deletar = repo.get_by_id(id) 
+    local_para_deletar = await repo.get_by_id(id) 
     if not local_para_deletar:
         logger.warning(f"Tentativa de deletar local ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_local(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Local ID {id} ('{local_para_deletar.descricao}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Local de Entrega está vinculado a AOCS."
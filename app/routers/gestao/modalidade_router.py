@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=ModalidadeResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_modalidade( 
+async def create_modalidade( 
     modalidade_req: ModalidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = ModalidadeRepository(db_conn)
-        nova_modalidade = repo.create(modalidade_req) 
+        nova_modalidade = await repo.create(modalidade_req) 
         logger.info(f"Usuário '{current_user.username}' criou Modalidade ID {nova_modalidade.id} ('{nova_modalidade.nome}').")
         return nova_modalidade
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar modalidade duplicada: '{modalidade_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_modalidade(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[ModalidadeResponse])
-def get_all_modalidades( 
-    db_conn: connection = Depends(get_db)
+async def get_all_modalidades( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ModalidadeRepository(db_conn)
-        modalidades = repo.get_all() 
+        modalidades = await repo.get_all() 
         return modalidades
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar modalidades: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=ModalidadeResponse)
-def get_modalidade_by_id( 
+async def get_modalidade_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ModalidadeRepository(db_conn)
-        modalidade = repo.get_by_id(id) 
+        modalidade = await repo.get_by_id(id) 
         if not modalidade:
             logger.warning(f"Modalidade ID {id} não encontrada.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_modalidade_by_id(
 @router.put("/{id}",
             response_model=ModalidadeResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_modalidade( 
+async def update_modalidade( 
     id: int,
     modalidade_req: ModalidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ModalidadeRepository(db_conn)
-    modalidade_db = repo.get_by_id(id) 
+    modalidade_db = await repo.get_by_id(id) 
     if not modalidade_db:
          logger.warning(f"Tentativa de atualizar modalidade ID {id} (não encontrada) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_modalidade(
         )
 
     try:
-        modalidade_atualizada = repo.update(id, modalidade_req) 
+        modalidade_atualizada = await repo.update(id, modalidade_req) 
         if not modalidade_atualizada:
              logger.error(f"Modalidade ID {id} não encontrada DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Modalidade não encontrada durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Modalidade ID {id} de '{modalidade_db.nome}' para '{modalidade_atualizada.nome}'.")
         return modalidade_atualizada
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar modalidade ID {id} para nome duplicado '{modalidade_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_modalidade(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_modalidade( 
+async def delete_modalidade( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ModalidadeRepository(db_conn)
-    modalidade_para_deletar = repo.get_by_id(id) 
+    modalidade_para_deletar = await repo.get_by_id(id) 
     if not modalidade_para_deletar:
         logger.warning(f"Tentativa de deletar modalidade ID {id} (não encontrada) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_modalidade(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Modalidade ID {id} ('{modalidade_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Esta Modalidade está vinculada a Contratos."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=NumeroModalidadeResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_numero_modalidade( 
+async def create_numero_modalidade( 
     num_mod_req: NumeroModalidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = NumeroModalidadeRepository(db_conn)
-        novo_num_mod = repo.create(num_mod_req) 
+        novo_num_mod = await repo.create(num_mod_req) 
         logger.info(f"Usuário '{current_user.username}' criou NumeroModalidade ID {novo_num_mod.id} ('{novo_num_mod.numero_ano}').")
         return novo_num_mod
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar numero_modalidade duplicado: '{num_mod_req.numero_ano}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_numero_modalidade(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[NumeroModalidadeResponse])
-def get_all_numeros_modalidade( 
-    db_conn: connection = Depends(get_db)
+async def get_all_numeros_modalidade( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = NumeroModalidadeRepository(db_conn)
-        numeros_modalidade = repo.get_all() 
+        numeros_modalidade = await repo.get_all() 
         return numeros_modalidade
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar numeros_modalidade: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=NumeroModalidadeResponse)
-def get_numero_modalidade_by_id( 
+async def get_numero_modalidade_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = NumeroModalidadeRepository(db_conn)
-        num_mod = repo.get_by_id(id) 
+        num_mod = await repo.get_by_id(id) 
         if not num_mod:
             logger.warning(f"NumeroModalidade ID {id} não encontrado.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_numero_modalidade_by_id(
 @router.put("/{id}",
             response_model=NumeroModalidadeResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_numero_modalidade( 
+async def update_numero_modalidade( 
     id: int,
     num_mod_req: NumeroModalidadeRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = NumeroModalidadeRepository(db_conn)
-    num_mod_db = repo.get_by_id(id) 
+    num_mod_db = await repo.get_by_id(id) 
     if not num_mod_db:
          logger.warning(f"Tentativa de atualizar numero_modalidade ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_numero_modalidade(
         )
 
     try:
-        num_mod_atualizado = repo.update(id, num_mod_req) 
+        num_mod_atualizado = await repo.update(id, num_mod_req) 
         if not num_mod_atualizado:
              logger.error(f"NumeroModalidade ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Número/Ano de Modalidade não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou NumeroModalidade ID {id} de '{num_mod_db.numero_ano}' para '{num_mod_atualizado.numero_ano}'.")
         return num_mod_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar numero_modalidade ID {id} para valor duplicado '{num_mod_req.numero_ano}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_numero_modalidade(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_numero_modalidade( 
+async def delete_numero_modalidade( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = NumeroModalidadeRepository(db_conn)
-    num_mod_para_deletar = repo.get_by_id(id) 
+    num_mod_para_deletar = await repo.get_by_id(id) 
     if not num_mod_para_deletar:
         logger.warning(f"Tentativa de deletar numero_modalidade ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_numero_modalidade(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou NumeroModalidade ID {id} ('{num_mod_para_deletar.numero_ano}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Número/Ano de Modalidade está vinculado a Contratos."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=ProcessoLicitatorioResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_processo_licitatorio( 
+async def create_processo_licitatorio( 
     proc_req: ProcessoLicitatorioRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = ProcessoLicitatorioRepository(db_conn)
-        novo_proc = repo.create(proc_req) 
+        novo_proc = await repo.create(proc_req) 
         logger.info(f"Usuário '{current_user.username}' criou Processo Licitatório ID {novo_proc.id} ('{novo_proc.numero}').")
         return novo_proc
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar processo licitatório duplicado: '{proc_req.numero}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_processo_licitatorio(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[ProcessoLicitatorioResponse])
-def get_all_processos_licitatorios( 
-    db_conn: connection = Depends(get_db)
+async def get_all_processos_licitatorios( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ProcessoLicitatorioRepository(db_conn)
-        processos = repo.get_all() 
+        processos = await repo.get_all() 
         return processos
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar processos licitatórios: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=ProcessoLicitatorioResponse)
-def get_processo_licitatorio_by_id( 
+async def get_processo_licitatorio_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = ProcessoLicitatorioRepository(db_conn)
-        processo = repo.get_by_id(id) 
+        processo = await repo.get_by_id(id) 
         if not processo:
             logger.warning(f"Processo Licitatório ID {id} não encontrado.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_processo_licitatorio_by_id(
 @router.put("/{id}",
             response_model=ProcessoLicitatorioResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_processo_licitatorio( 
+async def update_processo_licitatorio( 
     id: int,
     proc_req: ProcessoLicitatorioRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ProcessoLicitatorioRepository(db_conn)
-    proc_db = repo.get_by_id(id) 
+    proc_db = await repo.get_by_id(id) 
     if not proc_db:
          logger.warning(f"Tentativa de atualizar processo licitatório ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_processo_licitatorio(
         )
 
     try:
-        proc_atualizado = repo.update(id, proc_req) 
+        proc_atualizado = await repo.update(id, proc_req) 
         if not proc_atualizado:
              logger.error(f"Processo Licitatório ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Processo Licitatório não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou Processo Licitatório ID {id} de '{proc_db.numero}' para '{proc_atualizado.numero}'.")
         return proc_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar processo licitatório ID {id} para número duplicado '{proc_req.numero}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_processo_licitatorio(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_processo_licitatorio( 
+async def delete_processo_licitatorio( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = ProcessoLicitatorioRepository(db_conn)
-    proc_para_deletar = repo.get_by_id(id) 
+    proc_para_deletar = await repo.get_by_id(id) 
     if not proc_para_deletar:
         logger.warning(f"Tentativa de deletar processo licitatório ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_processo_licitatorio(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou Processo Licitatório ID {id} ('{proc_para_deletar.numero}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Processo Licitatório está vinculado a Contratos."
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import logging
 from app.core.database import get_db
 from app.core.security import get_current_user, require_access_level
@@ -21,17 +21,17 @@ router = APIRouter(
              response_model=TipoDocumentoResponse,
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(require_access_level(2))])
-def create_tipo_documento( 
+async def create_tipo_documento( 
     tipo_doc_req: TipoDocumentoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
         repo = TipoDocumentoRepository(db_conn)
-        novo_tipo_doc = repo.create(tipo_doc_req) 
+        novo_tipo_doc = await repo.create(tipo_doc_req) 
         logger.info(f"Usuário '{current_user.username}' criou TipoDocumento ID {novo_tipo_doc.id} ('{novo_tipo_doc.nome}').")
         return novo_tipo_doc
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de criar tipo de documento duplicado: '{tipo_doc_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -42,25 +42,25 @@ def create_tipo_documento(
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/", response_model=list[TipoDocumentoResponse])
-def get_all_tipos_documento( 
-    db_conn: connection = Depends(get_db)
+async def get_all_tipos_documento( 
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = TipoDocumentoRepository(db_conn)
-        tipos_documento = repo.get_all() 
+        tipos_documento = await repo.get_all() 
         return tipos_documento
     except Exception as e:
         logger.exception(f"Erro inesperado ao listar tipos de documento: {e}")
         raise HTTPException(status_code=500, detail="Erro interno do servidor.")
 
 @router.get("/{id}", response_model=TipoDocumentoResponse)
-def get_tipo_documento_by_id( 
+async def get_tipo_documento_by_id( 
     id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     try:
         repo = TipoDocumentoRepository(db_conn)
-        tipo_documento = repo.get_by_id(id) 
+        tipo_documento = await repo.get_by_id(id) 
         if not tipo_documento:
             logger.warning(f"TipoDocumento ID {id} não encontrado.")
             raise HTTPException(
@@ -79,14 +79,14 @@ def get_tipo_documento_by_id(
 @router.put("/{id}",
             response_model=TipoDocumentoResponse,
             dependencies=[Depends(require_access_level(2))])
-def update_tipo_documento( 
+async def update_tipo_documento( 
     id: int,
     tipo_doc_req: TipoDocumentoRequest, 
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = TipoDocumentoRepository(db_conn)
-    tipo_doc_db = repo.get_by_id(id) 
+    tipo_doc_db = await repo.get_by_id(id) 
     if not tipo_doc_db:
          logger.warning(f"Tentativa de atualizar tipo de documento ID {id} (não encontrado) por '{current_user.username}'.")
          raise HTTPException(
@@ -95,14 +95,14 @@ def update_tipo_documento(
         )
 
     try:
-        tipo_doc_atualizado = repo.update(id, tipo_doc_req) 
+        tipo_doc_atualizado = await repo.update(id, tipo_doc_req) 
         if not tipo_doc_atualizado:
              logger.error(f"TipoDocumento ID {id} não encontrado DURANTE atualização por '{current_user.username}'.")
              raise HTTPException(status_code=404, detail="Tipo de Documento não encontrado durante a atualização.")
 
         logger.info(f"Usuário '{current_user.username}' atualizou TipoDocumento ID {id} de '{tipo_doc_db.nome}' para '{tipo_doc_atualizado.nome}'.")
         return tipo_doc_atualizado
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         logger.warning(f"Tentativa de atualizar tipo de documento ID {id} para nome duplicado '{tipo_doc_req.nome}' por '{current_user.username}'.")
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -115,13 +115,13 @@ def update_tipo_documento(
 @router.delete("/{id}",
                status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(require_access_level(2))])
-def delete_tipo_documento( 
+async def delete_tipo_documento( 
     id: int,
-    db_conn: connection = Depends(get_db),
+    db_conn: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     repo = TipoDocumentoRepository(db_conn)
-    tipo_doc_para_deletar = repo.get_by_id(id) 
+    tipo_doc_para_deletar = await repo.get_by_id(id) 
     if not tipo_doc_para_deletar:
         logger.warning(f"Tentativa de deletar tipo de documento ID {id} (não encontrado) por '{current_user.username}'.")
         raise HTTPException(
@@ -130,11 +130,11 @@ def delete_tipo_documento(
         )
 
     try:
-        repo.delete(id) 
+        await repo.delete(id) 
         logger.info(f"Usuário '{current_user.username}' deletou TipoDocumento ID {id} ('{tipo_doc_para_deletar.nome}').")
         return
 
-    except psycopg2.IntegrityError:
+    except IntegrityError:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Não é possível excluir. Este Tipo de Documento está vinculado a Anexos."
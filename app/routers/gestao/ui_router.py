@@ -1,8 +1,6 @@
 import os
 import logging
 import math
-import psycopg2 
-from psycopg2.extras import DictCursor
 from datetime import date, datetime, timezone, timedelta
 from decimal import Decimal
 from pydantic import BaseModel
@@ -12,17 +10,20 @@ from fastapi import (APIRouter, Depends, Form, HTTPException, Query, Request,
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi import Body
-from psycopg2.extensions import connection
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import (ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token,
-                               get_current_user, require_access_level)
+                               get_current_user, require_access_level, verify_password)
 from app.models.core.user_model import User
 from app.repositories.core.user_repository import UserRepository 
 
 from types import SimpleNamespace
 
 from app.core.database import get_db
+from app.core.profiling import TimedTemplate
 # Repositories (Gestão)
+from app.models.gestao.contrato_model import Contrato
 from app.repositories.gestao.categoria_repository import CategoriaRepository
 from app.repositories.gestao.contrato_repository import ContratoRepository
 from app.repositories.gestao.item_repository import ItemRepository
@@ -77,6 +78,8 @@ if not os.path.exists(TEMPLATES_DIR):
      pass
 
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
+# Tempo de render dos templates entra no Server-Timing das requisições amostradas
+templates.env.template_class = TimedTemplate
 
 try:
     from num2words import num2words
@@ -166,13 +169,13 @@ async def login_post(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db_conn: connection = Depends(get_db) 
+    db_conn: AsyncSession = Depends(get_db) 
 ):
     """Processa o formulário de login, autentica e define o cookie."""
     user_repo = UserRepository(db_conn)
-    user = user_repo.get_by_username(username)
+    user = await user_repo.get_by_username(username)
 
-    if not user or not user.verificar_senha(password):
+    if not user or not verify_password(password, user.password_hash):
         login_url = request.app.url_path_for("login")
         return RedirectResponse(
             url=f"{login_url}?msg=Usuário ou senha inválidos.&category=error",
@@ -215,7 +218,7 @@ async def home_ui(
     request: Request, 
     page: int = Query(1, alias="page"), # Recebe o número da página
     current_user=Depends(get_current_user), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     indicadores = {"contratos_ativos": 0, "pedidos_mes": 0, "contratos_a_vencer": 0}
     
@@ -226,14 +229,13 @@ async def home_ui(
     
     try:
          # 1. Indicadores (Lógica existente mantida)
-         cursor = db_conn.cursor()
-         cursor.execute("SELECT COUNT(id) FROM Contratos WHERE ativo = TRUE")
-         indicadores["contratos_ativos"] = cursor.fetchone()[0]
-         cursor.close()
+         indicadores["contratos_ativos"] = await db_conn.scalar(
+             select(func.count(Contrato.id)).where(Contrato.ativo == True)
+         )
          
          # 2. Pedidos Pendentes Paginados (NOVA LÓGICA)
          pedido_repo = PedidoRepository(db_conn)
-         resultado = pedido_repo.get_pendentes_paginados(page=page, limit=ITENS_DASHBOARD)
+         resultado = await pedido_repo.get_pendentes_paginados(page=page, limit=ITENS_DASHBOARD)
          
          pedidos_pendentes = resultado['itens']
          total_registros = resultado['total']
@@ -270,13 +272,13 @@ async def categorias_ui(
     sort_by: str = Query('id'),
     order: str = Query('asc'),
     current_user=Depends(get_current_user),
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     repo = CategoriaRepository(db_conn)
     categorias_db = []
     total_paginas = 1
     try:
-        categorias_db = repo.get_all(mostrar_inativos=mostrar_inativos)
+        categorias_db = await repo.get_all(limit=None, mostrar_inativos=mostrar_inativos)
         offset = (page - 1) * ITENS_POR_PAGINA
         total_itens = len(categorias_db)
         categorias_paginadas = categorias_db[offset:offset + ITENS_POR_PAGINA]
@@ -304,6 +306,7 @@ async def categorias_ui(
 async def contratos_ui(
     request: Request,
     page: int = Query(1, alias="page"),
+    cursor: str | None = Query(None),
     busca: str | None = Query(None),
     status: str | None = Query(None),
     sort_by: str = Query('numero_contrato'),
@@ -311,77 +314,42 @@ async def contratos_ui(
     mostrar_vencidos: str | None = Query(None),
     data_vencimento_filtro: str | None = Query(None),
     current_user=Depends(get_current_user),
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     contratos_view = [] 
     total_paginas = 1
     hoje = date.today()
+    pagina = {"proximo_cursor": None, "cursor_anterior": None, "tem_proxima": False, "tem_anterior": False}
 
     try:
-        logger.info(f"Buscando contratos: page={page}, busca={busca}, status={status}, sort={sort_by}, order={order}, mv={mostrar_vencidos}, dvf={data_vencimento_filtro}")
-
-        repo = ContratoRepository(db_conn)
-        todos_contratos = repo.get_all(mostrar_inativos=True)
-
-        contratos_filtrados = todos_contratos
-
-        if busca:
-            termo = busca.lower()
-            contratos_filtrados = [
-                c for c in contratos_filtrados
-                if termo in c.numero_contrato.lower() or (c.fornecedor and termo in c.fornecedor.nome.lower())
-            ]
-
-        if status == 'ativo':
-            contratos_filtrados = [c for c in contratos_filtrados if c.ativo and c.data_fim >= hoje]
-        elif status == 'inativo':
-            contratos_filtrados = [c for c in contratos_filtrados if not c.ativo or (c.ativo and c.data_fim < hoje)]
-        elif status == 'expirado':
-             contratos_filtrados = [c for c in contratos_filtrados if c.data_fim < hoje]
-
-        if mostrar_vencidos == 'false':
-             contratos_filtrados = [c for c in contratos_filtrados if c.data_fim >= hoje]
-
-        if data_vencimento_filtro == '60d':
-             limite_vencimento = hoje + timedelta(days=60)
-             contratos_filtrados = [c for c in contratos_filtrados if c.ativo and c.data_fim >= hoje and c.data_fim <= limite_vencimento]
-
-        reverse_order = (order == 'desc')
-        if sort_by == 'numero_contrato':
-             contratos_filtrados.sort(key=lambda c: c.numero_contrato, reverse=reverse_order)
-        elif sort_by == 'fornecedor':
-             contratos_filtrados.sort(key=lambda c: c.fornecedor.nome if c.fornecedor else "", reverse=reverse_order)
-        elif sort_by == 'data_vigencia_fim':
-             contratos_filtrados.sort(key=lambda c: c.data_fim, reverse=reverse_order)
-        elif sort_by == 'status_ativo':
-             contratos_filtrados.sort(key=lambda c: c.ativo, reverse=reverse_order)
-        offset = (page - 1) * ITENS_POR_PAGINA
-        total_itens = len(contratos_filtrados)
-        contratos_paginados = contratos_filtrados[offset:offset + ITENS_POR_PAGINA]
-        total_paginas = math.ceil(total_itens / ITENS_POR_PAGINA) if total_itens > 0 else 1
-
-        cat_repo = CategoriaRepository(db_conn)
-        proc_repo = ProcessoLicitatorioRepository(db_conn)
-        for c in contratos_paginados:
-             proc = proc_repo.get_by_id(c.id_processo_licitatorio) 
-             
-             dt_fim_normalizada = c.data_fim
-             if isinstance(dt_fim_normalizada, datetime):
-                 dt_fim_normalizada = dt_fim_normalizada.date()
-             elif isinstance(dt_fim_normalizada, str):
-                 try:
-                     dt_fim_normalizada = datetime.strptime(dt_fim_normalizada, '%Y-%m-%d').date()
-                 except:
-                     dt_fim_normalizada = None
-                     
-             contratos_view.append({
-                 'id': c.id,
-                 'numero_contrato': c.numero_contrato,
-                 'processo_licitatorio': proc.numero if proc else 'N/D',
-                 'fornecedor': c.fornecedor.nome if c.fornecedor else 'N/D',
-                 'data_vigencia_fim': c.data_fim,
-                 'status_ativo': c.ativo,
-             })
+        logger.info(f"Buscando contratos: page={page}, cursor={bool(cursor)}, busca={busca}, status={status}, sort={sort_by}, order={order}, mv={mostrar_vencidos}, dvf={data_vencimento_filtro}")
+
+        # Filtro, ordenação e paginação (por cursor) no banco; processo e fornecedor
+        # vêm na mesma consulta. page sem cursor continua valendo para links antigos
+        pagina = await ContratoRepository(db_conn).listar_paginado(
+            busca=busca,
+            status=status,
+            mostrar_vencidos=mostrar_vencidos != 'false',
+            vencendo_em_dias=60 if data_vencimento_filtro == '60d' else None,
+            sort_by=sort_by,
+            order=order,
+            limit=ITENS_POR_PAGINA,
+            cursor=cursor,
+            offset=0 if cursor else max(page - 1, 0) * ITENS_POR_PAGINA,
+            hoje=hoje,
+        )
+        # Sem COUNT (custo proporcional ao total): o paginador só sabe se há próxima
+        total_paginas = page + 1 if pagina["tem_proxima"] else page
+
+        for c in pagina["itens"]:
+            contratos_view.append({
+                'id': c['id'],
+                'numero_contrato': c['numero_contrato'],
+                'processo_licitatorio': f"{c['numero_processo']}/{c['ano_processo']}" if c['numero_processo'] else 'N/D',
+                'fornecedor': c['fornecedor'] or 'N/D',
+                'data_vigencia_fim': c['data_fim_vigencia'],
+                'status_ativo': c['ativo'],
+            })
 
     except Exception as e:
         logger.exception(f"Erro ao buscar contratos para UI: {e}")
@@ -394,6 +362,8 @@ async def contratos_ui(
         "contratos": contratos_view,
         "pagina_atual": page,
         "total_paginas": total_paginas,
+        "proximo_cursor": pagina["proximo_cursor"],
+        "cursor_anterior": pagina["cursor_anterior"],
         "query_params": query_params,
         "sort_by": sort_by,
         "order": order,
@@ -410,90 +380,16 @@ async def pedidos_ui(
     sort_by: str = Query('data'), 
     order: str = Query('desc'),
     current_user=Depends(get_current_user), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
-    aocs_repo = AocsRepository(db_conn) 
-    pedido_repo = PedidoRepository(db_conn)
-    item_repo = ItemRepository(db_conn)
-    contrato_repo = ContratoRepository(db_conn)
-    
-    todas_aocs = aocs_repo.get_all()
-    
-    aocs_view = []
-    
-    for aocs in todas_aocs:
-        itens_pedidos = pedido_repo.get_by_aocs_id(aocs.id)
-        
-        valor_total_aocs = Decimal('0.0')
-        nome_fornecedor = "N/D"
-        status_consolidado = "Pendente"
-        
-        total_qtd_pedida = Decimal('0.0')
-        total_qtd_entregue = Decimal('0.0')
-
-        for p in itens_pedidos:
-            item = item_repo.get_by_id(p.id_item_contrato)
-            if item:
-                subtotal = p.quantidade_pedida * item.valor_unitario
-                valor_total_aocs += subtotal
-                
-                total_qtd_pedida += p.quantidade_pedida
-                total_qtd_entregue += p.quantidade_entregue
-
-                if nome_fornecedor == "N/D":
-                    contrato = contrato_repo.get_by_id(item.id_contrato)
-                    if contrato and contrato.fornecedor:
-                        nome_fornecedor = contrato.fornecedor.nome
-
-        if total_qtd_pedida > 0:
-            if total_qtd_entregue >= total_qtd_pedida:
-                status_consolidado = "Entregue"
-            elif total_qtd_entregue > 0:
-                status_consolidado = "Parcial"
-            else:
-                status_consolidado = "Pendente"
-        elif not itens_pedidos:
-             status_consolidado = "Vazio" 
-
-        if busca:
-            termo = busca.lower()
-            match_aocs = (termo in aocs.numero_aocs.lower())
-            match_forn = (termo in nome_fornecedor.lower())
-            
-            if not (match_aocs or match_forn):
-                continue
-        
-        aocs_view.append({
-            "id": aocs.id,
-            "numero_aocs": aocs.numero_aocs,
-            "numero_pedido": aocs.numero_pedido, 
-            "fornecedor": nome_fornecedor,
-            "valor_total": valor_total_aocs,
-            "status_entrega": status_consolidado,
-            "data_pedido": aocs.data_criacao
-        })
-
-    reverse_order = (order == 'desc')
-    
-    def get_sort_key(item, key_name, default_val=''):
-        val = item.get(key_name)
-        if val is None: val = default_val
-        return (val, item['id'])
-
-    if sort_by == 'aocs':
-        aocs_view.sort(key=lambda x: get_sort_key(x, 'numero_aocs'), reverse=reverse_order)
-    elif sort_by == 'fornecedor':
-        aocs_view.sort(key=lambda x: get_sort_key(x, 'fornecedor'), reverse=reverse_order)
-    elif sort_by == 'valor':
-        aocs_view.sort(key=lambda x: (x['valor_total'], x['id']), reverse=reverse_order)
-    elif sort_by == 'status':
-        aocs_view.sort(key=lambda x: get_sort_key(x, 'status_entrega'), reverse=reverse_order)
-    else: 
-        aocs_view.sort(key=lambda x: (x['data_pedido'] if x['data_pedido'] else date.min, x['id']), reverse=reverse_order)
-
-    total_itens = len(aocs_view)
-    offset = (page - 1) * ITENS_POR_PAGINA
-    pedidos_paginados = aocs_view[offset:offset + ITENS_POR_PAGINA]
+    # Totais, fornecedor e status por AOCS agregados no banco (uma consulta por página)
+    pedidos_paginados, total_itens = await AocsRepository(db_conn).get_painel(
+        page=page,
+        per_page=ITENS_POR_PAGINA,
+        busca=busca or "",
+        sort_by=sort_by,
+        order=order,
+    )
     total_paginas = math.ceil(total_itens / ITENS_POR_PAGINA) if total_itens > 0 else 1
 
     query_params = dict(request.query_params)
@@ -540,7 +436,7 @@ async def importar_ui(request: Request, current_user=Depends(get_current_user)):
 async def novo_contrato_ui(
     request: Request, 
     current_user=Depends(get_current_user),
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     cat_repo = CategoriaRepository(db_conn)
     inst_repo = InstrumentoRepository(db_conn)
@@ -551,11 +447,11 @@ async def novo_contrato_ui(
     context = {
         "request": request,
         "current_user": current_user,
-        "categorias": cat_repo.get_all(),
-        "instrumentos": inst_repo.get_all(),
-        "modalidades": mod_repo.get_all(),
-        "numeros_modalidade": num_mod_repo.get_all(),
-        "processos": proc_repo.get_all(),
+        "categorias": await cat_repo.get_all(limit=None),
+        "instrumentos": await inst_repo.get_all(limit=None),
+        "modalidades": await mod_repo.get_all(limit=None),
+        "numeros_modalidade": await num_mod_repo.get_all(limit=None),
+        "processos": await proc_repo.get_all(limit=None),
         "get_flashed_messages": lambda **kwargs: []
     }
     
@@ -571,11 +467,11 @@ async def gerenciar_tabelas_ui(request: Request, current_user=Depends(get_curren
     return templates.TemplateResponse(request, "gerenciar_tabelas.html", context)
 
 @router.get("/admin/usuarios", response_class=HTMLResponse, name="gerenciar_usuarios_ui", dependencies=[Depends(require_access_level(1))])
-async def gerenciar_usuarios_ui(request: Request, current_user=Depends(get_current_user), db_conn: connection = Depends(get_db)):
+async def gerenciar_usuarios_ui(request: Request, current_user=Depends(get_current_user), db_conn: AsyncSession = Depends(get_db)):
     repo = UserRepository(db_conn)
     usuarios = []
     try:
-        usuarios = repo.get_all(mostrar_inativos=True)
+        usuarios = await repo.get_all(limit=None, mostrar_inativos=True)
     except Exception as e:
         logger.error(f"Erro ao buscar usuários para UI admin: {e}")
 
@@ -587,18 +483,18 @@ async def gerenciar_usuarios_ui(request: Request, current_user=Depends(get_curre
     return templates.TemplateResponse(request, "gerenciar_usuarios.html", context)
 
 @router.get("/contrato/{id_contrato}", response_class=HTMLResponse, name="detalhe_contrato", dependencies=[Depends(require_access_level(3))])
-async def detalhe_contrato(request: Request, id_contrato: int, current_user=Depends(get_current_user), db_conn: connection = Depends(get_db)):
+async def detalhe_contrato(request: Request, id_contrato: int, current_user=Depends(get_current_user), db_conn: AsyncSession = Depends(get_db)):
     contrato_repo = ContratoRepository(db_conn)
     item_repo = ItemRepository(db_conn)
     anexo_repo = AnexoRepository(db_conn)
     tipo_doc_repo = TipoDocumentoRepository(db_conn)
 
-    contrato = contrato_repo.get_by_id(id_contrato)
+    contrato = await contrato_repo.get_by_id(id_contrato)
     if not contrato: raise HTTPException(status_code=404, detail="Contrato não encontrado")
 
-    itens = item_repo.get_by_contrato_id(id_contrato)
-    anexos = anexo_repo.get_by_entidade(id_entidade=id_contrato, tipo_entidade='contrato')
-    tipos_documento = [td.nome for td in tipo_doc_repo.get_all()] 
+    itens = await item_repo.get_by_contrato_id(id_contrato)
+    anexos = await anexo_repo.get_by_entidade(id_entidade=id_contrato, tipo_entidade='contrato')
+    tipos_documento = [td.nome for td in await tipo_doc_repo.get_all(limit=None)] 
 
     cat_repo = CategoriaRepository(db_conn)
     inst_repo = InstrumentoRepository(db_conn)
@@ -606,11 +502,11 @@ async def detalhe_contrato(request: Request, id_contrato: int, current_user=Depe
     num_mod_repo = NumeroModalidadeRepository(db_conn)
     proc_repo = ProcessoLicitatorioRepository(db_conn)
 
-    categoria = cat_repo.get_by_id(contrato.id_categoria)
-    instrumento = inst_repo.get_by_id(contrato.id_instrumento_contratual)
-    modalidade = mod_repo.get_by_id(contrato.id_modalidade)
-    num_modalidade = num_mod_repo.get_by_id(contrato.id_numero_modalidade)
-    processo = proc_repo.get_by_id(contrato.id_processo_licitatorio)
+    categoria = await cat_repo.get_by_id(contrato.id_categoria)
+    instrumento = await inst_repo.get_by_id(contrato.id_instrumento_contratual)
+    modalidade = await mod_repo.get_by_id(contrato.id_modalidade)
+    num_modalidade = await num_mod_repo.get_by_id(contrato.id_numero_modalidade)
+    processo = await proc_repo.get_by_id(contrato.id_processo_licitatorio)
 
     contrato_view = {
         "id": contrato.id,
@@ -645,10 +541,10 @@ async def importar_itens_ui(
     request: Request, 
     id_contrato: int, 
     current_user=Depends(get_current_user), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     contrato_repo = ContratoRepository(db_conn)
-    contrato = contrato_repo.get_by_id(id_contrato)
+    contrato = await contrato_repo.get_by_id(id_contrato)
     if not contrato:
         raise HTTPException(status_code=404, detail="Contrato não encontrado")
 
@@ -674,10 +570,10 @@ async def contratos_por_categoria(
     sort_by: str = Query("descricao"),
     order: str = Query("asc"),
     current_user=Depends(get_current_user), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     cat_repo = CategoriaRepository(db_conn)
-    categoria = cat_repo.get_by_id(id_categoria)
+    categoria = await cat_repo.get_by_id(id_categoria)
     if not categoria: 
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
@@ -686,69 +582,18 @@ async def contratos_por_categoria(
     query_params = dict(request.query_params)
 
     ITENS_POR_PAGINA = 10 
-    cursor = None
 
     try:
-        cursor = db_conn.cursor(cursor_factory=DictCursor)
-
-        params = [id_categoria]
-        where_clause = "WHERE c.id_categoria = %s AND c.ativo = TRUE AND ic.ativo = TRUE"
-
-        if busca:
-            where_clause += " AND ic.descricao ILIKE %s"
-            params.append(f"%{busca}%")
-
-        colunas_ordenaveis = {
-            'descricao': 'ic.descricao', 
-            'contrato': 'c.numero_contrato',
-            'saldo': 'saldo', 
-            'valor': 'ic.valor_unitario', 
-            'numero_item': 'ic.numero_item'
-        }
-        coluna_ordenacao = colunas_ordenaveis.get(sort_by, 'ic.descricao')
-        direcao_ordenacao = 'DESC' if order == 'desc' else 'ASC'
-        order_by_clause = f"ORDER BY {coluna_ordenacao} {direcao_ordenacao}"
-
-        offset = (page - 1) * ITENS_POR_PAGINA
-        limit_offset_clause = "LIMIT %s OFFSET %s"
-        params.extend([ITENS_POR_PAGINA, offset])
-
-        sql_select = f"""
-            SELECT
-                ic.*, 
-                c.id AS id_contrato, 
-                c.numero_contrato, 
-                c.fornecedor,
-                COALESCE(pedidos_sum.total_pedido, 0) AS total_pedido,
-                (ic.quantidade - COALESCE(pedidos_sum.total_pedido, 0)) AS saldo,
-                COUNT(*) OVER() as total_geral
-            FROM itenscontrato ic
-            JOIN contratos c ON ic.id_contrato = c.id
-            LEFT JOIN (
-                SELECT id_item_contrato, SUM(quantidade_pedida) as total_pedido
-                FROM pedidos GROUP BY id_item_contrato
-            ) AS pedidos_sum ON ic.id = pedidos_sum.id_item_contrato
-            {where_clause} 
-            {order_by_clause} 
-            {limit_offset_clause}
-        """
-
-        cursor.execute(sql_select, params)
-        itens_db = cursor.fetchall()
-
-        total_itens = 0
-        if itens_db:
-            total_itens = itens_db[0]['total_geral']
+        if sort_by == 'valor':
+            sort_by = 'valor_unitario'
+        itens, total_itens = await ItemRepository(db_conn).get_com_saldo_por_categoria(
+            id_categoria, page, ITENS_POR_PAGINA, busca=busca or "", sort_by=sort_by, order=order
+        )
         total_paginas = math.ceil(total_itens / ITENS_POR_PAGINA)
 
-        itens = [dict(item) for item in itens_db]
-
-    except (Exception, psycopg2.DatabaseError) as error:
-         if cursor: cursor.close()
+    except Exception as error:
          logger.exception(f"Erro ao buscar itens com saldo para UI Categoria ID {id_categoria}: {error}")
          query_params["erro"] = "Erro ao consultar o banco de dados."
-    finally:
-        if cursor: cursor.close()
 
     context = {
         "current_user": current_user,
@@ -765,9 +610,9 @@ async def contratos_por_categoria(
 
 
 @router.get("/categoria/{id_categoria}/novo-pedido", response_class=HTMLResponse, name="novo_pedido_pagina", dependencies=[Depends(require_access_level(2))])
-async def novo_pedido_pagina(request: Request, id_categoria: int, current_user=Depends(get_current_user), db_conn: connection = Depends(get_db)):
+async def novo_pedido_pagina(request: Request, id_categoria: int, current_user=Depends(get_current_user), db_conn: AsyncSession = Depends(get_db)):
     cat_repo = CategoriaRepository(db_conn)
-    categoria = cat_repo.get_by_id(id_categoria)
+    categoria = await cat_repo.get_by_id(id_categoria)
     if not categoria: raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
     unidade_repo = UnidadeRepository(db_conn)
@@ -778,10 +623,10 @@ async def novo_pedido_pagina(request: Request, id_categoria: int, current_user=D
     context = {
         "current_user": current_user,
         "categoria": categoria,
-        "unidades": [u.nome for u in unidade_repo.get_all()],
-        "locais": [l.descricao for l in local_repo.get_all()],
-        "responsaveis": [a.nome for a in agente_repo.get_all()],
-        "dotacoes": [d.info_orcamentaria for d in dotacao_repo.get_all()],
+        "unidades": [u.nome for u in await unidade_repo.get_all(limit=None)],
+        "locais": [l.descricao for l in await local_repo.get_all(limit=None)],
+        "responsaveis": [a.nome for a in await agente_repo.get_all(limit=None)],
+        "dotacoes": [d.info_orcamentaria for d in await dotacao_repo.get_all(limit=None)],
         "get_flashed_messages": lambda **kwargs: []
     }
     return templates.TemplateResponse(request, "novo_pedido.html", context)
@@ -791,14 +636,14 @@ async def nova_ci_ui(
     request: Request, 
     numero_aocs: str, 
     current_user=Depends(get_current_user), 
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
     aocs_repo = AocsRepository(db_conn)
     dotacao_repo = DotacaoRepository(db_conn)
     agente_repo = AgenteRepository(db_conn)
     unidade_repo = UnidadeRepository(db_conn)
     
-    aocs = aocs_repo.get_by_numero_aocs(numero_aocs)
+    aocs = await aocs_repo.get_by_numero_aocs(numero_aocs)
     if not aocs:
         raise HTTPException(status_code=404, detail="AOCS não encontrada.")
 
@@ -808,10 +653,10 @@ async def nova_ci_ui(
     item_repo = ItemRepository(db_conn)
     contrato_repo = ContratoRepository(db_conn)
     
-    pedidos = pedido_repo.get_by_aocs_id(aocs.id)
+    pedidos = await pedido_repo.get_by_aocs_id(aocs.id)
     if pedidos:
-        item = item_repo.get_by_id(pedidos[0].id_item_contrato)
-        contrato = contrato_repo.get_by_id(item.id_contrato) if item else None
+        item = await item_repo.get_by_id(pedidos[0].id_item_contrato)
+        contrato = await contrato_repo.get_by_id(item.id_contrato) if item else None
         if contrato and contrato.fornecedor:
             primeiro_fornecedor = contrato.fornecedor.nome
             primeiro_cnpj = contrato.fornecedor.cpf_cnpj
@@ -826,9 +671,9 @@ async def nova_ci_ui(
         "id_dotacao": aocs.id_dotacao
     }
 
-    dotacoes = dotacao_repo.get_all()
-    solicitantes = agente_repo.get_all()
-    secretarias = unidade_repo.get_all()
+    dotacoes = await dotacao_repo.get_all(limit=None)
+    solicitantes = await agente_repo.get_all(limit=None)
+    secretarias = await unidade_repo.get_all(limit=None)
 
     context = {
         "current_user": current_user,
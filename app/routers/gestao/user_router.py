@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from psycopg2.extensions import connection
-import psycopg2
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 import secrets 
 import secrets
 import string
@@ -14,7 +14,7 @@ from app.schemas.core.user_schema import (UserCreateRequest, UserResponse,
 from app.repositories.core.user_repository import UserRepository
 from functools import wraps
 
-def require_admin(current_user: User = Depends(get_current_user)):
+async def require_admin(current_user: User = Depends(get_current_user)):
     if current_user.nivel_acesso != 1:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -28,22 +28,22 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=UserAdminResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user_create: UserCreateRequest,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
-    existing_user = repo.get_by_username(user_create.username)
+    existing_user = await repo.get_by_username(user_create.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Nome de usuário já está em uso."
         )
     try:
-        new_user = repo.create(user_create)
+        new_user = await repo.create(user_create)
         return new_user
-    except psycopg2.IntegrityError: 
+    except IntegrityError: 
          raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Erro ao criar usuário. Verifique os dados fornecidos."
@@ -53,49 +53,49 @@ def create_user(
 
 
 @router.get("/", response_model=list[UserAdminResponse])
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
     mostrar_inativos: bool = False,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
-    users = repo.get_all(skip=skip, limit=limit, mostrar_inativos=mostrar_inativos)
+    users = await repo.get_all(skip=skip, limit=limit, mostrar_inativos=mostrar_inativos)
     return users
 
 
 @router.get("/{user_id}", response_model=UserAdminResponse)
-def read_user(
+async def read_user(
     user_id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
-    user = repo.get_by_id(user_id)
+    user = await repo.get_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
     return user
 
 
 @router.put("/{user_id}", response_model=UserAdminResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: UserUpdateRequest,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
-    user_db = repo.get_by_id(user_id)
+    user_db = await repo.get_by_id(user_id)
     if not user_db:
          raise HTTPException(status_code=404, detail="Usuário não encontrado para atualização.")
 
     try:
-        updated_user = repo.update(user_id, user_update)
+        updated_user = await repo.update(user_id, user_update)
         if not updated_user:
              raise HTTPException(status_code=404, detail="Usuário não encontrado após atualização.")
         return updated_user
-    except psycopg2.IntegrityError: 
+    except IntegrityError: 
          raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Nome de usuário já está em uso por outro usuário."
@@ -105,25 +105,25 @@ def update_user(
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
 
-    success = repo.delete(user_id)
+    success = await repo.delete(user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Usuário não encontrado para desativação.")
 
 @router.post("/{user_id}/reset-password", status_code=status.HTTP_200_OK)
-def reset_user_password(
+async def reset_user_password(
     user_id: int,
-    db_conn: connection = Depends(get_db)
+    db_conn: AsyncSession = Depends(get_db)
 ):
 
     repo = UserRepository(db_conn)
-    user_db = repo.get_by_id(user_id)
+    user_db = await repo.get_by_id(user_id)
     if not user_db:
         raise HTTPException(status_code=404, detail="Usuário não encontrado para reset de senha.")
 
@@ -131,7 +131,7 @@ def reset_user_password(
     nova_senha = ''.join(secrets.choice(alfabeto) for i in range(12))
     novo_hash = generate_password_hash(nova_senha)
 
-    success = repo.reset_password(user_id, novo_hash)
+    success = await repo.reset_password(user_id, novo_hash)
     if not success:
          raise HTTPException(status_code=500, detail="Erro interno ao resetar a senha.")
 
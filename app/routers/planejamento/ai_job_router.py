@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db
+from app.repositories.planejamento.ai_job_repository import AIJobRepository
+from app.schemas.planejamento.ai_job_schema import AIJobBatchCreate, AIJobBatchCreated, AIJobBatchStatus
+from app.services.planejamento.ai_job_service import JOB_SECTIONS
+
+router = APIRouter(
+    prefix="/ai/jobs",
+    tags=["Planejamento - AI (Lote)"]
+)
+
+@router.post("/", response_model=AIJobBatchCreated, status_code=status.HTTP_202_ACCEPTED)
+async def create_ai_jobs(lote: AIJobBatchCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Enfileira a geração das seções informadas para cada DFD/ETP da lista.
+    O processamento é assíncrono: acompanhe pelo GET /ai/jobs/{lote_id}.
+    """
+    validas = JOB_SECTIONS[lote.tipo_alvo]
+    invalidas = [s for s in lote.secoes if s not in validas]
+    if invalidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Seções inválidas para {lote.tipo_alvo.upper()}: {invalidas}. Aceitas: {list(validas)}"
+        )
+    if not lote.ids or not lote.secoes:
+        raise HTTPException(status_code=400, detail="Informe ao menos um documento e uma seção.")
+
+    repo = AIJobRepository(db)
+    lote_id, total = await repo.create_batch(lote.tipo_alvo, list(dict.fromkeys(lote.ids)), list(dict.fromkeys(lote.secoes)))
+    return AIJobBatchCreated(lote_id=lote_id, total=total)
+
+@router.get("/{lote_id}", response_model=AIJobBatchStatus)
+async def get_ai_jobs(lote_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Progresso do lote e resultado de cada job (polling).
+    """
+    repo = AIJobRepository(db)
+    jobs = await repo.get_lote(lote_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Lote não encontrado.")
+
+    contagem = {}
+    for job in jobs:
+        contagem[job.status] = contagem.get(job.status, 0) + 1
+
+    return AIJobBatchStatus(
+        lote_id=lote_id,
+        total=len(jobs),
+        pendentes=contagem.get("pendente", 0),
+        executando=contagem.get("executando", 0),
+        concluidos=contagem.get("concluido", 0),
+        erros=contagem.get("erro", 0),
+        jobs=jobs
+    )
@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.sse import text_event_stream
+from app.core.deps import get_ai_service
+from app.repositories.planejamento.etp_repository import ETPRepository
+from app.repositories.core.log_repository import LogRepository
 from app.schemas.planejamento.ai_schema import (GenerateObjectRequest, GenerateObjectResponse, GenerateJustificationRequest, 
                                    GenerateETPNeedRequest, GenerateETPRequirementsRequest, GenerateETPMotivationRequest,
                                    GenerateETPMarketAnalysisRequest, GenerateETPChoiceJustificationRequest, GenerateETPSolutionDescriptionRequest,
                                    GenerateETPParcelingJustificationRequest, GenerateETPResultsRequest, GenerateETPPriorMeasuresRequest,
-                                   GenerateETPEnvironmentalImpactsRequest, GenerateETPViabilityRequest, GenerateConsolidatedRequest)
+                                   GenerateETPEnvironmentalImpactsRequest, GenerateETPViabilityRequest, GenerateConsolidatedRequest,
+                                   AIRequestBase, GenerateETPFullRequest, GenerateETPFullResponse, AIUsageStat)
 from app.services.planejamento.ai_service import AIService
+from app.services.planejamento.ai_client_registry import ai_registry
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -12,16 +21,18 @@ router = APIRouter(
     tags=["Planejamento - AI"]
 )
 
-# Instanciamos o serviço (Singleton simples)
-ai_service = AIService()
+# O AIService é único no processo e criado no primeiro uso (ver ai_client_registry):
+# cada rota recebe a instância compartilhada via Depends(get_ai_service).
 
 @router.post("/generate/dfd-object", response_model=GenerateObjectResponse)
-def generate_dfd_object(request: GenerateObjectRequest):
+async def generate_dfd_object(request: GenerateObjectRequest, ai_service: AIService = Depends(get_ai_service)):
     """
     Recebe um rascunho e retorna o texto do Objeto formatado no padrão Braúnas.
     """
     try:
-        result_text = ai_service.generate_dfd_object(
+        result_text = await ai_service.generate_async(
+            "dfd_object",
+            bypass_cache=request.bypass_cache,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
         )
@@ -33,12 +44,14 @@ def generate_dfd_object(request: GenerateObjectRequest):
         )
         
 @router.post("/generate/dfd-justification", response_model=GenerateObjectResponse)
-def generate_dfd_justification(request: GenerateJustificationRequest):
+async def generate_dfd_justification(request: GenerateJustificationRequest, ai_service: AIService = Depends(get_ai_service)):
     """
     Gera a Justificativa baseada no Objeto e Rascunho, aplicando a Lei 14.133/2021.
     """
     try:
-        result_text = ai_service.generate_dfd_justification(
+        result_text = await ai_service.generate_async(
+            "dfd_justification",
+            bypass_cache=request.bypass_cache,
             object_text=request.object_text,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -51,12 +64,14 @@ def generate_dfd_justification(request: GenerateJustificationRequest):
         )
 
 @router.post("/generate/etp-need", response_model=GenerateObjectResponse)
-def generate_etp_need(request: GenerateETPNeedRequest):
+async def generate_etp_need(request: GenerateETPNeedRequest, ai_service: AIService = Depends(get_ai_service)):
     """
     Gera a Descrição da Necessidade do ETP (Foco em Riscos e Capacidade de Resposta).
     """
     try:
-        result = ai_service.generate_etp_need(
+        result = await ai_service.generate_async(
+            "etp_need",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             dfd_justification=request.dfd_justification,
             draft_text=request.draft_text,
@@ -67,10 +82,12 @@ def generate_etp_need(request: GenerateETPNeedRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-requirements", response_model=GenerateObjectResponse)
-def generate_etp_requirements(request: GenerateETPRequirementsRequest):
+async def generate_etp_requirements(request: GenerateETPRequirementsRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
         # Atualizamos a assinatura da chamada aqui
-        result = ai_service.generate_etp_requirements(
+        result = await ai_service.generate_async(
+            "etp_requirements",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text, # <--- Passando o rascunho
             user_instructions=request.user_instructions
@@ -80,9 +97,11 @@ def generate_etp_requirements(request: GenerateETPRequirementsRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-motivation", response_model=GenerateObjectResponse)
-def generate_etp_motivation(request: GenerateETPMotivationRequest):
+async def generate_etp_motivation(request: GenerateETPMotivationRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_motivation(
+        result = await ai_service.generate_async(
+            "etp_motivation",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -92,9 +111,11 @@ def generate_etp_motivation(request: GenerateETPMotivationRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-market-analysis", response_model=GenerateObjectResponse)
-def generate_etp_market_analysis(request: GenerateETPMarketAnalysisRequest):
+async def generate_etp_market_analysis(request: GenerateETPMarketAnalysisRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_market_analysis(
+        result = await ai_service.generate_async(
+            "etp_market_analysis",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -104,9 +125,11 @@ def generate_etp_market_analysis(request: GenerateETPMarketAnalysisRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-choice-justification", response_model=GenerateObjectResponse)
-def generate_etp_choice_justification(request: GenerateETPChoiceJustificationRequest):
+async def generate_etp_choice_justification(request: GenerateETPChoiceJustificationRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_choice_justification(
+        result = await ai_service.generate_async(
+            "etp_choice_justification",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             market_analysis_context=request.market_analysis_context,
             draft_text=request.draft_text,
@@ -117,9 +140,11 @@ def generate_etp_choice_justification(request: GenerateETPChoiceJustificationReq
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-solution-description", response_model=GenerateObjectResponse)
-def generate_etp_solution_description(request: GenerateETPSolutionDescriptionRequest):
+async def generate_etp_solution_description(request: GenerateETPSolutionDescriptionRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_solution_description(
+        result = await ai_service.generate_async(
+            "etp_solution_description",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             requirements_text=request.requirements_text,
             draft_text=request.draft_text,
@@ -130,9 +155,11 @@ def generate_etp_solution_description(request: GenerateETPSolutionDescriptionReq
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-parceling-justification", response_model=GenerateObjectResponse)
-def generate_etp_parceling_justification(request: GenerateETPParcelingJustificationRequest):
+async def generate_etp_parceling_justification(request: GenerateETPParcelingJustificationRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_parceling_justification(
+        result = await ai_service.generate_async(
+            "etp_parceling_justification",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -142,9 +169,11 @@ def generate_etp_parceling_justification(request: GenerateETPParcelingJustificat
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-results", response_model=GenerateObjectResponse)
-def generate_etp_results(request: GenerateETPResultsRequest):
+async def generate_etp_results(request: GenerateETPResultsRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_results(
+        result = await ai_service.generate_async(
+            "etp_results",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -154,9 +183,11 @@ def generate_etp_results(request: GenerateETPResultsRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-prior-measures", response_model=GenerateObjectResponse)
-def generate_etp_prior_measures(request: GenerateETPPriorMeasuresRequest):
+async def generate_etp_prior_measures(request: GenerateETPPriorMeasuresRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_prior_measures(
+        result = await ai_service.generate_async(
+            "etp_prior_measures",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -166,9 +197,11 @@ def generate_etp_prior_measures(request: GenerateETPPriorMeasuresRequest):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-environmental-impacts", response_model=GenerateObjectResponse)
-def generate_etp_environmental_impacts(request: GenerateETPEnvironmentalImpactsRequest):
+async def generate_etp_environmental_impacts(request: GenerateETPEnvironmentalImpactsRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_environmental_impacts(
+        result = await ai_service.generate_async(
+            "etp_environmental_impacts",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -178,9 +211,11 @@ def generate_etp_environmental_impacts(request: GenerateETPEnvironmentalImpactsR
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/generate/etp-viability", response_model=GenerateObjectResponse)
-def generate_etp_viability(request: GenerateETPViabilityRequest):
+async def generate_etp_viability(request: GenerateETPViabilityRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_etp_viability(
+        result = await ai_service.generate_async(
+            "etp_viability",
+            bypass_cache=request.bypass_cache,
             dfd_object=request.dfd_object,
             draft_text=request.draft_text,
             user_instructions=request.user_instructions
@@ -189,30 +224,153 @@ def generate_etp_viability(request: GenerateETPViabilityRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@router.post("/generate/etp-full", response_model=GenerateETPFullResponse)
+async def generate_etp_full(request: GenerateETPFullRequest, db: AsyncSession = Depends(get_async_db), ai_service: AIService = Depends(get_ai_service)):
+    """
+    Gera todas as seções do ETP em uma única chamada, a partir dos DFDs vinculados,
+    e grava o resultado no ETP com um único update.
+    Seções que falharem não sobrescrevem o conteúdo atual do ETP.
+    """
+    repo = ETPRepository(db)
+    etp = await repo.get_by_id(request.etp_id)
+    if not etp:
+        raise HTTPException(status_code=404, detail="ETP não encontrado.")
+    if not etp.dfds:
+        raise HTTPException(status_code=400, detail="O ETP não possui DFDs vinculados.")
+
+    dfd_object, dfd_justification = ai_service.dfd_context(etp.dfds)
+
+    try:
+        sections = await ai_service.generate_etp_full(
+            dfd_object=dfd_object,
+            dfd_justification=dfd_justification,
+            draft_text=request.draft_text or "",
+            user_instructions=request.user_instructions or "",
+            bypass_cache=request.bypass_cache
+        )
+
+        updates = {}
+        failed = []
+        for section, text in sections.items():
+            if ai_service.is_error(text):
+                failed.append(section)
+            else:
+                updates[ai_service.ETP_FULL_PLAN[section][0]] = text
+
+        if updates:
+            await repo.update(etp.id, updates)
+
+        return GenerateETPFullResponse(
+            etp_id=etp.id,
+            sections=sections,
+            updated_fields=list(updates.keys()),
+            failed_sections=failed
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/generate/consolidated-object", response_model=GenerateObjectResponse)
-def generate_consolidated_object(request: GenerateConsolidatedRequest):
+async def generate_consolidated_object(request: GenerateConsolidatedRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_consolidated_object(request.text_list)
+        result = await ai_service.generate_async("consolidated_object", bypass_cache=request.bypass_cache, objects_list=request.text_list)
         return GenerateObjectResponse(result=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate/consolidated-justification", response_model=GenerateObjectResponse)
-def generate_consolidated_justification(request: GenerateConsolidatedRequest):
+async def generate_consolidated_justification(request: GenerateConsolidatedRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_consolidated_justification(request.text_list)
+        result = await ai_service.generate_async("consolidated_justification", bypass_cache=request.bypass_cache, justifications_list=request.text_list)
         return GenerateObjectResponse(result=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-class ConsolidatedRequest(BaseModel):
+class ConsolidatedRequest(AIRequestBase):
     text_list: list[str]
     type: str # 'objeto' ou 'justificativa'
 
 @router.post("/generate/consolidated", response_model=GenerateObjectResponse)
-def generate_consolidated(request: ConsolidatedRequest):
+async def generate_consolidated(request: ConsolidatedRequest, ai_service: AIService = Depends(get_ai_service)):
     try:
-        result = ai_service.generate_consolidated_text(request.text_list, request.type)
+        result = await ai_service.generate_async("consolidated_text", bypass_cache=request.bypass_cache, text_list=request.text_list, type=request.type)
         return GenerateObjectResponse(result=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# --- Streaming (SSE) ---
+# Mesmas seções das rotas acima, devolvendo o texto em partes (text/event-stream).
+# Cada entrada: caminho -> (seção do AIService, schema da requisição, campos -> kwargs do prompt).
+def _etp_kwargs(request) -> dict:
+    return {"dfd_object": request.dfd_object, "draft_text": request.draft_text, "user_instructions": request.user_instructions}
+
+STREAM_ROUTES = {
+    "dfd-object": ("dfd_object", GenerateObjectRequest,
+                   lambda r: {"draft_text": r.draft_text, "user_instructions": r.user_instructions}),
+    "dfd-justification": ("dfd_justification", GenerateJustificationRequest,
+                          lambda r: {"object_text": r.object_text, "draft_text": r.draft_text, "user_instructions": r.user_instructions}),
+    "etp-need": ("etp_need", GenerateETPNeedRequest,
+                 lambda r: {**_etp_kwargs(r), "dfd_justification": r.dfd_justification}),
+    "etp-requirements": ("etp_requirements", GenerateETPRequirementsRequest, _etp_kwargs),
+    "etp-motivation": ("etp_motivation", GenerateETPMotivationRequest, _etp_kwargs),
+    "etp-market-analysis": ("etp_market_analysis", GenerateETPMarketAnalysisRequest, _etp_kwargs),
+    "etp-choice-justification": ("etp_choice_justification", GenerateETPChoiceJustificationRequest,
+                                 lambda r: {**_etp_kwargs(r), "market_analysis_context": r.market_analysis_context}),
+    "etp-solution-description": ("etp_solution_description", GenerateETPSolutionDescriptionRequest,
+                                 lambda r: {**_etp_kwargs(r), "requirements_text": r.requirements_text}),
+    "etp-parceling-justification": ("etp_parceling_justification", GenerateETPParcelingJustificationRequest, _etp_kwargs),
+    "etp-results": ("etp_results", GenerateETPResultsRequest, _etp_kwargs),
+    "etp-prior-measures": ("etp_prior_measures", GenerateETPPriorMeasuresRequest, _etp_kwargs),
+    "etp-environmental-impacts": ("etp_environmental_impacts", GenerateETPEnvironmentalImpactsRequest, _etp_kwargs),
+    "etp-viability": ("etp_viability", GenerateETPViabilityRequest, _etp_kwargs),
+    "consolidated-object": ("consolidated_object", GenerateConsolidatedRequest,
+                            lambda r: {"objects_list": r.text_list}),
+    "consolidated-justification": ("consolidated_justification", GenerateConsolidatedRequest,
+                                   lambda r: {"justifications_list": r.text_list}),
+    "consolidated": ("consolidated_text", ConsolidatedRequest,
+                     lambda r: {"text_list": r.text_list, "type": r.type}),
+}
+
+def _add_stream_route(path: str, section: str, request_model, to_kwargs):
+    async def endpoint(request: request_model, ai_service: AIService = Depends(get_ai_service)):
+        chunks = ai_service.stream_async(section, bypass_cache=request.bypass_cache, **to_kwargs(request))
+        return text_event_stream(chunks)
+
+    endpoint.__name__ = f"stream_{section}"
+    router.add_api_route(
+        f"/generate/{path}/stream",
+        endpoint,
+        methods=["POST"],
+        summary=f"Streaming (SSE) de /ai/generate/{path}",
+        response_class=StreamingResponse,
+    )
+
+for _path, (_section, _model, _to_kwargs) in STREAM_ROUTES.items():
+    _add_stream_route(_path, _section, _model, _to_kwargs)
+
+@router.get("/usage/stats", response_model=list[AIUsageStat])
+async def get_usage_stats(days: int = 7, db: AsyncSession = Depends(get_async_db)):
+    """
+    Latência p50/p95 e tokens por seção e por dia (últimos `days` dias).
+    Registros ainda na fila de escrita aparecem em até AI_USAGE_FLUSH_SECONDS.
+    """
+    return await LogRepository(db).ai_usage_stats(days=days)
+
+@router.get("/health")
+def get_ai_health():
+    """
+    Estado do cliente de IA: inicializado, warm-up, disjuntor (closed/open/half_open).
+    Não inicializa o cliente nem chama o provedor.
+    """
+    return ai_registry.health()
+
+@router.get("/cache/stats")
+def get_cache_stats(ai_service: AIService = Depends(get_ai_service)):
+    """
+    Contadores do cache de respostas (hits, misses, entradas).
+    """
+    return ai_service.cache_stats()
+
+@router.delete("/cache", status_code=status.HTTP_204_NO_CONTENT)
+def clear_cache(ai_service: AIService = Depends(get_ai_service)):
+    if ai_service.cache is not None:
+        ai_service.cache.clear()
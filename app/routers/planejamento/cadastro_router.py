@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.core.database import get_db
@@ -15,22 +15,22 @@ router = APIRouter(prefix="/cadastros", tags=["Planejamento - Cadastros"])
 
 # Note a mudança: UnidadeRequisitanteResponse em vez de SecretariaResponse
 @router.get("/secretarias/", response_model=List[UnidadeRequisitanteResponse])
-def listar_secretarias(db: Session = Depends(get_db)):
+async def listar_secretarias(db: AsyncSession = Depends(get_db)):
     """
     Retorna a lista de Unidades Requisitantes (Secretarias/Departamentos).
     Mantivemos a rota /secretarias/ para não quebrar o frontend agora, 
     mas o ideal seria mudar para /unidades/.
     """
-    return CadastroRepository.get_all_unidades(db)
+    return await CadastroRepository(db).get_all_unidades()
 
 @router.get("/agentes/", response_model=List[AgenteResponsavelResponse])
-def listar_agentes(db: Session = Depends(get_db)):
-    return CadastroRepository.get_all_agentes(db)
+async def listar_agentes(db: AsyncSession = Depends(get_db)):
+    return await CadastroRepository(db).get_all_agentes()
 
 @router.get("/itens/", response_model=List[ItemCatalogoResponse])
-def listar_itens(db: Session = Depends(get_db)):
-    return CadastroRepository.get_all_itens(db)
+async def listar_itens(db: AsyncSession = Depends(get_db)):
+    return await CadastroRepository(db).get_all_itens()
 
 @router.get("/dotacoes/", response_model=List[DotacaoResponse])
-def listar_dotacoes(db: Session = Depends(get_db)):
-    return CadastroRepository.get_all_dotacoes(db)
+async def listar_dotacoes(db: AsyncSession = Depends(get_db)):
+    return await CadastroRepository(db).get_all_dotacoes()
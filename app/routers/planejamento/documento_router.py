@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+import asyncio
+import logging
+import os
+import re
+import unicodedata
+
+from app.core.database import get_async_db
+from app.models.planejamento.processo_documento_model import ProcessoDocumento
+from app.models.planejamento.template_model import Template
+from app.schemas.planejamento.documento_schema import DocumentKitRequest
+from app.services.core.document_batch_service import DocumentBatchService
+from app.services.core.docx_template_service import template_hash_cache
+from app.services.core.download_service import CACHE_CONTROL, not_modified, serve_stored, strong_etag
+from app.services.core.file_service import FileService
+from app.services.core.pdf_service import PdfUnavailableError, cache_key, pdf_service
+from app.services.core.storage_service import StorageError, get_storage
+from app.services.core.zip_service import ZipService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/documentos", tags=["Planejamento - Documentos"])
+
+def _nome_arquivo(template: Template, extensao: str) -> str:
+    nome = unicodedata.normalize("NFKD", template.nome).encode("ascii", "ignore").decode()
+    nome = re.sub(r"[^A-Za-z0-9]+", "_", nome).strip("_") or "documento"
+    return f"{template.tipo.upper()}_{nome}.{extensao}"
+
+def _arcname(ordem: int, template: Template) -> str:
+    return f"{ordem:02d}_{_nome_arquivo(template, 'docx')}"
+
+def _variaveis_processo(processo_doc: ProcessoDocumento) -> dict:
+    """Valores padrão das tags do kit + variaveis_modelo (que têm prioridade)."""
+    processo = processo_doc.processo_licitatorio
+    tr = processo.tr if processo else None
+    data = {
+        "numero_processo": processo_doc.numero_processo_completo,
+        "objeto": getattr(tr, "objeto", None) or "Objeto não definido",
+        "fundamentacao_legal": processo_doc.fundamentacao_legal_artigo or "",
+    }
+    data.update(processo_doc.variaveis_modelo or {})
+    return data
+
+@router.post("/processo/{processo_documento_id}/kit")
+async def gerar_kit_documentos(
+    processo_documento_id: int,
+    request: DocumentKitRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Gera os documentos do processo (um por template) e devolve um ZIP em streaming.
+    Os .docx são renderizados em paralelo no pool de processos e entram no ZIP
+    conforme ficam prontos; nada é gravado em disco nem montado inteiro em memória.
+    Templates que falharem aparecem em ERROS.txt dentro do ZIP.
+    """
+    processo_doc = await db.get(ProcessoDocumento, processo_documento_id)
+    if not processo_doc or processo_doc.is_deleted:
+        raise HTTPException(status_code=404, detail="Dados do processo para geração não encontrados")
+
+    result = await db.execute(
+        select(Template).where(Template.id.in_(request.template_ids), Template.is_deleted == False)
+    )
+    templates = {t.id: t for t in result.scalars().all()}
+    faltando = [tid for tid in request.template_ids if tid not in templates]
+    if faltando:
+        raise HTTPException(status_code=404, detail=f"Templates não encontrados: {faltando}")
+
+    data = _variaveis_processo(processo_doc)
+    data.update(request.variaveis or {})
+    ordem = [templates[tid] for tid in dict.fromkeys(request.template_ids)]
+    # Templates no S3 são baixados uma vez para o cache local (em paralelo);
+    # um arquivo ausente vira erro do próprio job e aparece em ERROS.txt
+    caminhos = await asyncio.gather(*(FileService("templates").local_path(t.path) for t in ordem), return_exceptions=True)
+    jobs = [
+        (_arcname(i, t), t.path if isinstance(caminho, Exception) else caminho)
+        for i, (t, caminho) in enumerate(zip(ordem, caminhos), start=1)
+    ]
+    numero = re.sub(r"[^0-9A-Za-z]+", "-", processo_doc.numero_processo_completo).strip("-")
+
+    async def entries():
+        erros = []
+        async for name, content in DocumentBatchService().render_many(jobs, data):
+            if isinstance(content, Exception):
+                erros.append(f"{name}: {content}")
+                continue
+            yield name, content
+        if erros:
+            yield "ERROS.txt", ("\n".join(erros) + "\n").encode("utf-8")
+
+    return StreamingResponse(
+        ZipService().stream_zip_async(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="kit_processo_{numero}.zip"'}
+    )
+
+@router.get("/processo/{processo_documento_id}/template/{template_id}/pdf")
+async def baixar_documento_pdf(
+    processo_documento_id: int,
+    template_id: int,
+    request: Request,
+    inline: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    PDF de um documento do processo (template preenchido com as variáveis do processo).
+    O PDF fica no armazenamento de documentos endereçado por (hash do template, hash
+    dos dados): baixar de novo um documento que não mudou é só servir o arquivo (ou
+    redirecionar para a URL pré-assinada), sem renderizar.
+    A ETag é a própria chave do cache, então If-None-Match responde 304 sem ler o disco.
+    """
+    processo_doc = await db.get(ProcessoDocumento, processo_documento_id)
+    if not processo_doc or processo_doc.is_deleted:
+        raise HTTPException(status_code=404, detail="Dados do processo para geração não encontrados")
+    template = await db.get(Template, template_id)
+    if not template or template.is_deleted:
+        raise HTTPException(status_code=404, detail="Template não encontrado")
+    try:
+        template_path = await FileService("templates").local_path(template.path)
+    except (FileNotFoundError, StorageError):
+        raise HTTPException(status_code=404, detail="Arquivo do template não encontrado no servidor.")
+    if not os.path.exists(template_path):
+        raise HTTPException(status_code=404, detail="Arquivo do template não encontrado no servidor.")
+
+    # Hash do arquivo em disco, não o hash_conteudo gravado no upload: um template
+    # substituído no armazenamento não pode continuar servindo o PDF antigo
+    template_hash = await asyncio.to_thread(template_hash_cache.get, template_path)
+    data = _variaveis_processo(processo_doc)
+    key = cache_key("docx", template_hash, data)
+    etag = strong_etag(key)
+    if not_modified(request, etag, None):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    try:
+        pdf_key = await pdf_service.docx_pdf(template_path, template_hash, data)
+    except PdfUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception:
+        logger.exception(f"Falha ao gerar PDF (processo_documento={processo_documento_id}, template={template_id})")
+        raise HTTPException(status_code=500, detail="Falha ao gerar PDF.")
+
+    try:
+        return await serve_stored(
+            request,
+            get_storage("documentos"),
+            pdf_key,
+            filename=_nome_arquivo(template, "pdf"),
+            etag=etag,
+            media_type="application/pdf",
+            inline=inline,
+        )
+    except FileNotFoundError:
+        # Removido do cache entre a geração e o envio: o próximo pedido gera de novo
+        raise HTTPException(status_code=503, detail="PDF indisponível no momento, tente novamente.")
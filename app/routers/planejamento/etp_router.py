@@ -1,6 +1,6 @@
 from typing import List  # <--- O erro sumirá com este import
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.repositories.planejamento.etp_repository import ETPRepository
@@ -14,57 +14,57 @@ from app.schemas.planejamento.etp_schema import (
 router = APIRouter(prefix="/etps", tags=["Planejamento - ETP"])
 
 @router.get("/dfd/{dfd_id}", response_model=ETPResponse)
-def obter_etp_por_dfd(dfd_id: int, db: Session = Depends(get_db)):
+async def obter_etp_por_dfd(dfd_id: int, db: AsyncSession = Depends(get_db)):
     """
     Busca o ETP vinculado a um DFD.
     """
-    etp = ETPRepository.get_by_dfd(db, dfd_id)
+    etp = await ETPRepository(db).get_by_dfd(dfd_id)
     if not etp:
         raise HTTPException(status_code=404, detail="ETP não encontrado para este DFD.")
     return etp
 
 @router.post("/consolidar", response_model=ETPResponse, status_code=status.HTTP_201_CREATED)
-def consolidar_etp(request: ETPConsolidarRequest, db: Session = Depends(get_db)):
+async def consolidar_etp(request: ETPConsolidarRequest, db: AsyncSession = Depends(get_db)):
     """
     Recebe uma lista de IDs de DFDs e cria um ETP unificado.
     """
     try:
-        return ETPRepository.consolidar_dfds(db, request.dfd_ids)
+        return await ETPRepository(db).consolidar_dfds(request.dfd_ids)
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/{etp_id}", response_model=ETPResponse)
-def atualizar_etp(etp_id: int, etp_data: ETPUpdate, db: Session = Depends(get_db)):
+async def atualizar_etp(etp_id: int, etp_data: ETPUpdate, db: AsyncSession = Depends(get_db)):
     """
     Atualiza os campos de texto do ETP (IA ou Manual).
     """
-    etp = ETPRepository.update(db, etp_id, etp_data.model_dump(exclude_unset=True))
+    etp = await ETPRepository(db).update(etp_id, etp_data.model_dump(exclude_unset=True))
     if not etp:
         raise HTTPException(status_code=404, detail="ETP não encontrado")
     return etp
 
 @router.put("/itens/precos")
-def atualizar_precos_itens_etp(itens: List[ItemETPUpdatePrice], db: Session = Depends(get_db)):
+async def atualizar_precos_itens_etp(itens: List[ItemETPUpdatePrice], db: AsyncSession = Depends(get_db)):
     """
     Atualiza em lote os preços de referência dos itens do ETP.
     """
     try:
-        ETPRepository.update_item_prices(db, itens)
+        await ETPRepository(db).update_item_prices(itens)
         return {"message": "Preços atualizados com sucesso"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.delete("/{etp_id}")
-def deletar_etp(etp_id: int, db: Session = Depends(get_db)):
-    ETPRepository.delete(db, etp_id)
+async def deletar_etp(etp_id: int, db: AsyncSession = Depends(get_db)):
+    await ETPRepository(db).delete(etp_id)
     return {"message": "ETP excluído e DFDs liberados."}
 
 @router.delete("/{etp_id}/unlink/{dfd_id}")
-def desvincular_dfd(etp_id: int, dfd_id: int, db: Session = Depends(get_db)):
+async def desvincular_dfd(etp_id: int, dfd_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        ETPRepository.unlink_dfd(db, etp_id, dfd_id)
+        await ETPRepository(db).unlink_dfd(etp_id, dfd_id)
         return {"message": "DFD desvinculado com sucesso."}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
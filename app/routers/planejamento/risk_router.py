@@ -1,41 +1,71 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-import json
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.deps import get_ai_service
 from app.repositories.planejamento.risk_repository import RiskRepository
-from app.services.planejamento.ai_service import AIService
-from app.schemas.planejamento.risk_schema import MatrizRiscoResponse, ItemRiscoCreate, ItemRiscoResponse, GenerateRisksRequest
+from app.services.planejamento.ai_service import AIService, AIGenerationError
+from app.services.planejamento.ai_client_registry import CircuitOpenError
+from app.schemas.planejamento.risk_schema import (
+    MatrizRiscoResponse, ItemRiscoCreate, ItemRiscoResponse, RiscoSugerido,
+    GenerateRisksRequest, GenerateRisksIntoMatrixRequest
+)
 
 router = APIRouter(prefix="/riscos", tags=["Planejamento - Riscos"])
-ai_service = AIService()
 
 @router.get("/etp/{etp_id}", response_model=MatrizRiscoResponse)
-def obter_matriz(etp_id: int, db: Session = Depends(get_db)):
-    return RiskRepository.get_by_etp(db, etp_id)
+async def obter_matriz(etp_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await RiskRepository(db).get_by_etp(etp_id)
 
 @router.post("/item/{matriz_id}", response_model=ItemRiscoResponse)
-def adicionar_risco(matriz_id: int, risco: ItemRiscoCreate, db: Session = Depends(get_db)):
-    return RiskRepository.add_risk(db, matriz_id, risco.model_dump())
+async def adicionar_risco(matriz_id: int, risco: ItemRiscoCreate, db: AsyncSession = Depends(get_async_db)):
+    return await RiskRepository(db).add_risk(matriz_id, risco.model_dump())
 
 @router.delete("/item/{risk_id}")
-def remover_risco(risk_id: int, db: Session = Depends(get_db)):
-    success = RiskRepository.delete_risk(db, risk_id)
+async def remover_risco(risk_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await RiskRepository(db).delete_risk(risk_id)
     if not success:
         raise HTTPException(status_code=404, detail="Risco não encontrado")
     return {"message": "Risco removido"}
 
-@router.post("/generate", response_model=List[dict])
-def gerar_sugestoes_risco(request: GenerateRisksRequest):
-    """
-    Gera sugestões de risco via IA. Retorna uma lista de objetos, não salva no banco ainda.
-    """
+async def _sugerir_riscos(ai_service: AIService, request: GenerateRisksRequest) -> list[RiscoSugerido]:
     try:
-        raw_text = ai_service.generate_risks(request.etp_object)
-        # Limpeza básica caso a IA mande markdown
-        clean_text = raw_text.replace("```json", "").replace("```", "").strip()
-        riscos = json.loads(clean_text)
-        return riscos
+        return await ai_service.generate_structured("risks", RiscoSugerido, bypass_cache=request.bypass_cache,
+                                                    etp_object=request.etp_object)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except AIGenerationError as e:
+        raise HTTPException(status_code=502, detail=f"Erro na IA: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro na IA: {str(e)}")
+
+@router.post("/generate", response_model=List[ItemRiscoCreate])
+async def gerar_sugestoes_risco(request: GenerateRisksRequest, ai_service: AIService = Depends(get_ai_service)):
+    """
+    Gera sugestões de risco via IA (JSON validado). Não salva no banco.
+    """
+    return await _sugerir_riscos(ai_service, request)
+
+@router.post("/etp/{etp_id}/generate", response_model=MatrizRiscoResponse)
+async def gerar_riscos_na_matriz(
+    etp_id: int,
+    request: GenerateRisksIntoMatrixRequest,
+    db: AsyncSession = Depends(get_async_db),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Gera os riscos via IA e grava direto na matriz do ETP, numa única transação.
+    """
+    repo = RiskRepository(db)
+    # Antes da IA: ETP inexistente não gasta chamada ao modelo
+    if not await repo.etp_existe(etp_id):
+        raise HTTPException(status_code=404, detail="ETP não encontrado")
+
+    riscos = await _sugerir_riscos(ai_service, request)
+    matriz = await repo.add_risks_bulk(
+        etp_id, [risco.model_dump() for risco in riscos], substituir=request.substituir
+    )
+    if matriz is None:
+        raise HTTPException(status_code=404, detail="ETP não encontrado")
+    return matriz
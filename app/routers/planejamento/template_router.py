@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.core.deps import get_db, get_current_user
+from app.models.core.user_model import User
+from app.repositories.planejamento.template_repository import TemplateRepository
+from app.schemas.planejamento.template_schema import TemplateCreate, TemplateResponse, TemplateVariaveisResponse
+from app.services.core.file_service import FileService
+from app.services.core.storage_service import StorageError
+from app.services.planejamento.template_index_service import TemplateIndexService
+
+router = APIRouter(
+    prefix="/templates",
+    tags=["Planejamento - Templates"]
+)
+
+@router.post("/", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
+async def upload_template(
+    background_tasks: BackgroundTasks,
+    nome: str = Form(...),
+    tipo: str = Form(...),
+    descricao: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Cadastra um template .docx. O índice de variáveis ((tag)) é gerado em segundo
+    plano logo após a resposta e fica disponível em GET /templates/{id}/variaveis.
+    """
+    if not file.filename or not file.filename.lower().endswith(".docx"):
+        raise HTTPException(status_code=400, detail="Envie um arquivo .docx")
+
+    # Template.path guarda a chave no armazenamento de templates
+    key = await FileService("templates").save_upload(file)
+    schema = TemplateCreate(nome=nome, tipo=tipo.upper(), descricao=descricao)
+    template = await TemplateRepository(db).create_template(schema, file.filename, key, current_user.id)
+
+    background_tasks.add_task(TemplateIndexService().index_in_background, template.id, key)
+    return template
+
+@router.get("/", response_model=List[TemplateResponse])
+async def list_templates(tipo: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    return await TemplateRepository(db).list_ativos(tipo)
+
+@router.get("/{template_id}/variaveis", response_model=TemplateVariaveisResponse)
+async def get_template_variables(template_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Variáveis que o template espera, lidas do índice no banco.
+    Se o índice ainda não existir (upload acabou de acontecer), é gerado agora.
+    """
+    repo = TemplateRepository(db)
+    row = await repo.get_variaveis(template_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Template não encontrado")
+
+    if row.hash_conteudo is None:
+        try:
+            variaveis, hash_conteudo = await TemplateIndexService().build(repo, template_id, row.path)
+        except (OSError, StorageError):
+            raise HTTPException(status_code=404, detail="Arquivo do template não encontrado no servidor.")
+        return TemplateVariaveisResponse(id=template_id, variaveis=variaveis, hash_conteudo=hash_conteudo)
+
+    return TemplateVariaveisResponse(
+        id=template_id, variaveis=row.variaveis_esperadas or [], hash_conteudo=row.hash_conteudo
+    )
+
+@router.post("/{template_id}/reindex", response_model=TemplateVariaveisResponse)
+async def reindex_template(template_id: int, db: AsyncSession = Depends(get_db)):
+    """Gera o índice de novo (ex: arquivo substituído no disco)."""
+    repo = TemplateRepository(db)
+    row = await repo.get_variaveis(template_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Template não encontrado")
+    variaveis, hash_conteudo = await TemplateIndexService().build(repo, template_id, row.path)
+    return TemplateVariaveisResponse(id=template_id, variaveis=variaveis, hash_conteudo=hash_conteudo)
+
+@router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_template(template_id: int, db: AsyncSession = Depends(get_db)):
+    if not await TemplateRepository(db).delete(template_id):
+        raise HTTPException(status_code=404, detail="Template não encontrado")
@@ -1,41 +1,77 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
+from app.core.sse import text_event_stream
+from app.core.deps import get_ai_service
 from app.repositories.planejamento.tr_repository import TRRepository
 from app.repositories.planejamento.etp_repository import ETPRepository
 from app.repositories.planejamento.risk_repository import RiskRepository
 from app.services.planejamento.ai_service import AIService
+from app.services.planejamento.ai_context_service import ContextBuilder
 from app.schemas.planejamento.tr_schema import TRResponse, TRUpdate, GenerateTRRequest
 
 router = APIRouter(prefix="/trs", tags=["Planejamento - TR"])
-ai_service = AIService()
 
 @router.get("/etp/{etp_id}", response_model=TRResponse)
-def obter_tr_por_etp(etp_id: int, db: Session = Depends(get_db)):
-    tr = TRRepository.get_by_etp(db, etp_id)
+async def obter_tr_por_etp(etp_id: int, db: AsyncSession = Depends(get_db)):
+    tr = await TRRepository(db).get_by_etp(etp_id)
     if not tr:
         raise HTTPException(status_code=404, detail="Matriz de Riscos não encontrada. Crie a Matriz antes de gerar o TR.")
     return tr
 
 @router.put("/{tr_id}", response_model=TRResponse)
-def atualizar_tr(tr_id: int, tr_data: TRUpdate, db: Session = Depends(get_db)):
-    return TRRepository.update(db, tr_id, tr_data.model_dump(exclude_unset=True))
+async def atualizar_tr(tr_id: int, tr_data: TRUpdate, db: AsyncSession = Depends(get_db)):
+    return await TRRepository(db).update(tr_id, tr_data.model_dump(exclude_unset=True))
 
-@router.post("/generate/clause")
-def gerar_clausula_ia(request: GenerateTRRequest, db: Session = Depends(get_db)):
+async def _tr_clause_context(db: AsyncSession, ai_service: AIService, etp_id: int) -> tuple[str, str]:
+    """Monta (resumo do ETP, resumo dos riscos) usados no prompt da cláusula."""
     # 1. Buscar Contexto (ETP Completo + Riscos)
-    etp = ETPRepository.get_by_id(db, request.etp_id)
+    etp = await ETPRepository(db).get_by_id(etp_id)
     if not etp:
         raise HTTPException(status_code=404, detail="ETP não encontrado")
     
-    # Prepara resumo do ETP para a IA
-    etp_summary = f"Objeto: {etp.dfds[0].objeto if etp.dfds else 'N/A'}\nJustificativa: {etp.justificativa_escolha}\nSolução: {etp.descricao_solucao}"
+    # Prepara resumo do ETP para a IA (cada campo limitado ao orçamento por item)
+    item_tokens = ai_service.context.item_tokens
+    dfd_object, _ = ai_service.dfd_context(etp.dfds)
+    etp_summary = (
+        f"Objeto: {ContextBuilder.trim(dfd_object, item_tokens) or 'N/A'}\n"
+        f"Justificativa: {ContextBuilder.trim(etp.justificativa_escolha, item_tokens)}\n"
+        f"Solução: {ContextBuilder.trim(etp.descricao_solucao, item_tokens)}"
+    )
     
-    # Prepara resumo dos Riscos
-    matriz = RiskRepository.get_by_etp(db, request.etp_id)
-    risks_summary = "\n".join([f"- Risco: {r.descricao_risco} (Mitigação: {r.medida_preventiva})" for r in matriz.riscos])
+    # Prepara resumo dos Riscos (dedup + orçamento; matrizes grandes são resumidas)
+    matriz = await RiskRepository(db).get_by_etp(etp_id)
+    riscos = [f"Risco: {r.descricao} (Mitigação: {r.acao_preventiva})" for r in matriz.itens] if matriz else []
+    riscos = await ai_service.compact_texts(riscos, kind="riscos e medidas de mitigação")
+    risks_summary = "\n".join([f"- {r}" for r in riscos])
+    return etp_summary, risks_summary
+
+@router.post("/generate/clause")
+async def gerar_clausula_ia(request: GenerateTRRequest, db: AsyncSession = Depends(get_async_db), ai_service: AIService = Depends(get_ai_service)):
+    etp_summary, risks_summary = await _tr_clause_context(db, ai_service, request.etp_id)
     
-    # 2. Chamar IA
-    texto_gerado = ai_service.generate_tr_clause(request.section, etp_summary, risks_summary)
+    # 2. Chamar IA (não bloqueia o worker enquanto o modelo responde)
+    texto_gerado = await ai_service.generate_async(
+        "tr_clause",
+        clausula=request.section,
+        etp_data=etp_summary,
+        risks_data=risks_summary
+    )
     
     return {"result": texto_gerado}
+
+@router.post("/generate/clause/stream")
+async def gerar_clausula_ia_stream(request: GenerateTRRequest, db: AsyncSession = Depends(get_async_db), ai_service: AIService = Depends(get_ai_service)):
+    """
+    Versão SSE de /generate/clause: o texto chega em partes (text/event-stream).
+    O contexto é carregado antes de abrir o stream, então 404 continua sendo 404.
+    """
+    etp_summary, risks_summary = await _tr_clause_context(db, ai_service, request.etp_id)
+
+    chunks = ai_service.stream_async(
+        "tr_clause",
+        clausula=request.section,
+        etp_data=etp_summary,
+        risks_data=risks_summary
+    )
+    return text_event_stream(chunks)
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict
 
 class AnexoBase(BaseModel):
@@ -10,16 +10,37 @@ class AnexoCreate(AnexoBase):
     nome_original: str
     nome_seguro: str 
     data_upload: date = Field(default_factory=date.today)
+    caminho_arquivo: str | None = None
+    hash_sha256: str | None = None
+    tamanho_bytes: int | None = None
+    mimetype: str | None = None
 
 class AnexoResponse(BaseModel): 
     id: int
     nome_original: str
     nome_seguro: str 
-    data_upload: date
-    tipo_documento: str | None
-    tipo_entidade: str
+    data_upload: datetime
+    tipo_documento: str | None = None
+    tipo_entidade: str | None = None
+    tamanho_bytes: int | None = None
+    mimetype: str | None = None
+    hash_sha256: str | None = None
     
     id_contrato: int | None = None 
     id_aocs: int | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+class AnexoUploadInicio(AnexoBase):
+    """Abertura de um upload em partes: metadados do anexo + tamanho total."""
+    nome_original: str = Field(..., min_length=1, max_length=255)
+    tamanho_total: int = Field(..., ge=1)
+    mimetype: str | None = None
+
+class AnexoUploadStatus(BaseModel):
+    """Estado de um upload em partes: o cliente continua a partir de recebido_bytes."""
+    upload_id: str
+    recebido_bytes: int
+    tamanho_total: int
+    chunk_max_bytes: int
+    completo: bool
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, Literal
+from datetime import datetime
+
+class AIJobBatchCreate(BaseModel):
+    tipo_alvo: Literal["dfd", "etp"]
+    ids: list[int]
+    secoes: list[str]  # Ex: ["dfd_object", "dfd_justification"]
+
+class AIJobBatchCreated(BaseModel):
+    lote_id: str
+    total: int
+
+class AIJobResponse(BaseModel):
+    id: int
+    tipo_alvo: str
+    alvo_id: int
+    secao: str
+    status: str
+    tentativas: int
+    proxima_tentativa_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[str] = None
+    erro: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class AIJobBatchStatus(BaseModel):
+    lote_id: str
+    total: int
+    pendentes: int
+    executando: int
+    concluidos: int
+    erros: int
+    jobs: list[AIJobResponse]
@@ -1,70 +1,75 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
+from datetime import date
 
-class GenerateObjectRequest(BaseModel):
+class AIRequestBase(BaseModel):
+    # True ignora o cache de respostas e força uma nova geração
+    bypass_cache: bool = False
+
+class GenerateObjectRequest(AIRequestBase):
     draft_text: str
     user_instructions: Optional[str] = None
 
-class GenerateJustificationRequest(BaseModel):
+class GenerateJustificationRequest(AIRequestBase):
     object_text: str  # Obrigatório: A IA precisa saber O QUE está comprando
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
 
-class GenerateETPNeedRequest(BaseModel):
+class GenerateETPNeedRequest(AIRequestBase):
     dfd_object: str        # Contexto: O que é?
     dfd_justification: str # Contexto: Por que pediu no DFD?
     draft_text: Optional[str] = None       # Fatos novos (ex: surto de dengue)
     user_instructions: Optional[str] = None # Refinamento
 
-class GenerateETPRequirementsRequest(BaseModel):
+class GenerateETPRequirementsRequest(AIRequestBase):
     dfd_object: str
     solution_description: str # Mantemos para compatibilidade, mesmo que o prompt foque no objeto
     draft_text: Optional[str] = None  # <--- CAMPO NOVO (Ex: "garantia de 5 anos")
     user_instructions: Optional[str] = None
 
-class GenerateETPMotivationRequest(BaseModel):
+class GenerateETPMotivationRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
     
-class GenerateETPMarketAnalysisRequest(BaseModel):
+class GenerateETPMarketAnalysisRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None       # Ex: "Pesquisa no Banco de Preços"
     user_instructions: Optional[str] = None # Ex: "Justificar não adesão"
 
-class GenerateETPChoiceJustificationRequest(BaseModel):
+class GenerateETPChoiceJustificationRequest(AIRequestBase):
     dfd_object: str
     market_analysis_context: Optional[str] = None # O texto do tópico anterior ajuda a dar coerência
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
     
-class GenerateETPSolutionDescriptionRequest(BaseModel):
+class GenerateETPSolutionDescriptionRequest(AIRequestBase):
     dfd_object: str
     requirements_text: Optional[str] = None # Contexto novo: O que foi exigido?
     draft_text: Optional[str] = None        # Logística/Operação
     user_instructions: Optional[str] = None
 
-class GenerateETPParcelingJustificationRequest(BaseModel):
+class GenerateETPParcelingJustificationRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
 
-class GenerateETPResultsRequest(BaseModel):
+class GenerateETPResultsRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
     
-class GenerateETPPriorMeasuresRequest(BaseModel):
+class GenerateETPPriorMeasuresRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
     
-class GenerateETPEnvironmentalImpactsRequest(BaseModel):
+class GenerateETPEnvironmentalImpactsRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
     
-class GenerateETPViabilityRequest(BaseModel):
+class GenerateETPViabilityRequest(AIRequestBase):
     dfd_object: str
     draft_text: Optional[str] = None
     user_instructions: Optional[str] = None
@@ -74,5 +79,27 @@ class GenerateObjectResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
     
-class GenerateConsolidatedRequest(BaseModel):
+class GenerateConsolidatedRequest(AIRequestBase):
     text_list: list[str]
+
+class GenerateETPFullRequest(AIRequestBase):
+    etp_id: int
+    draft_text: Optional[str] = None        # Contexto extra aplicado a todas as seções
+    user_instructions: Optional[str] = None
+
+class GenerateETPFullResponse(BaseModel):
+    etp_id: int
+    sections: dict[str, str]          # seção -> texto gerado (ou mensagem de erro)
+    updated_fields: list[str]         # campos do ETP efetivamente gravados
+    failed_sections: list[str] = []
+
+class AIUsageStat(BaseModel):
+    dia: date
+    secao: str
+    chamadas: int
+    latencia_p50_ms: float | None = None
+    latencia_p95_ms: float | None = None
+    tokens_prompt: int
+    tokens_resposta: int
+    cache_hits: int
+    erros: int
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional
+
+class DocumentKitRequest(BaseModel):
+    template_ids: list[int] = Field(min_length=1)  # Ex: capa, edital, TR, contrato, ata
+    # Valores extras/sobrescritos só para esta geração (somados a variaveis_modelo)
+    variaveis: Optional[Dict[str, Any]] = None
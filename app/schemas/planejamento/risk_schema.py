@@ -1,13 +1,17 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, AliasChoices, field_validator
 from typing import List, Optional
+import unicodedata
 
 # --- Item de Risco Individual ---
+# Campos espelham o modelo ItemRisco (escala 5x5: probabilidade e impacto de 1 a 5)
 class ItemRiscoBase(BaseModel):
-    descricao_risco: str
-    probabilidade: str # Baixa, Média, Alta
-    impacto: str       # Baixo, Médio, Alto
-    medida_preventiva: str
-    responsavel: str   # Fiscal, Gestor, Contratada
+    tipo: str = Field(max_length=50)   # Técnico, Externo, Administrativo...
+    descricao: str
+    probabilidade: int = Field(ge=1, le=5)  # 1 (Raro) a 5 (Quase Certo)
+    impacto: int = Field(ge=1, le=5)        # 1 (Insignificante) a 5 (Catastrófico)
+    acao_preventiva: Optional[str] = None
+    acao_contingencia: Optional[str] = None
+    responsavel: Optional[str] = Field(default=None, max_length=100)  # Fiscal, Gestor, Contratada
 
 class ItemRiscoCreate(ItemRiscoBase):
     pass
@@ -15,6 +19,7 @@ class ItemRiscoCreate(ItemRiscoBase):
 class ItemRiscoResponse(ItemRiscoBase):
     id: int
     matriz_id: int
+    nivel_risco: Optional[int] = None
     model_config = ConfigDict(from_attributes=True)
 
 # --- Matriz de Risco (Container) ---
@@ -26,9 +31,63 @@ class MatrizRiscoCreate(MatrizRiscoBase):
 
 class MatrizRiscoResponse(MatrizRiscoBase):
     id: int
-    riscos: List[ItemRiscoResponse] = []
+    itens: List[ItemRiscoResponse] = []
     model_config = ConfigDict(from_attributes=True)
 
+# --- Saída estruturada da IA ---
+# Escala textual -> 1 a 5 (o modelo às vezes responde "Alta" em vez do número)
+ESCALA_TEXTO = {
+    "muito baixa": 1, "muito baixo": 1, "rara": 1, "raro": 1, "insignificante": 1,
+    "baixa": 2, "baixo": 2, "improvavel": 2, "menor": 2,
+    "media": 3, "medio": 3, "moderada": 3, "moderado": 3, "possivel": 3,
+    "alta": 4, "alto": 4, "provavel": 4, "maior": 4,
+    "muito alta": 5, "muito alto": 5, "quase certo": 5, "critico": 5, "catastrofico": 5,
+}
+
+def _sem_acento(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto.strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+class RiscoSugerido(ItemRiscoCreate):
+    """
+    Risco sugerido pela IA, validado antes de ir para o banco.
+    Repara as variações mais comuns da resposta: nomes antigos dos campos
+    (descricao_risco, medida_preventiva), escala em texto ("Alta") ou fora
+    de 1..5, e textos longos demais para as colunas.
+    """
+    descricao: str = Field(min_length=3, validation_alias=AliasChoices("descricao", "descricao_risco"))
+    acao_preventiva: Optional[str] = Field(default=None, validation_alias=AliasChoices("acao_preventiva", "medida_preventiva"))
+    tipo: str = Field(default="Técnico", max_length=50)
+
+    @field_validator("probabilidade", "impacto", mode="before")
+    @classmethod
+    def escala_1_a_5(cls, value):
+        if isinstance(value, str):
+            texto = _sem_acento(value)
+            if texto in ESCALA_TEXTO:
+                return ESCALA_TEXTO[texto]
+            try:
+                value = float(texto.replace(",", "."))
+            except ValueError:
+                return value  # deixa o pydantic acusar o erro
+        if isinstance(value, (int, float)):
+            return min(5, max(1, round(value)))
+        return value
+
+    @field_validator("tipo", mode="before")
+    @classmethod
+    def corta_tipo(cls, value):
+        return value.strip()[:50] if isinstance(value, str) and value.strip() else "Técnico"
+
+    @field_validator("responsavel", mode="before")
+    @classmethod
+    def corta_responsavel(cls, value):
+        return value.strip()[:100] if isinstance(value, str) else value
+
 # --- IA Request ---
 class GenerateRisksRequest(BaseModel):
     etp_object: str # O objeto do ETP para a IA analisar
+    bypass_cache: bool = False
+
+class GenerateRisksIntoMatrixRequest(GenerateRisksRequest):
+    substituir: bool = False  # True: remove os riscos atuais da matriz antes de gravar os novos
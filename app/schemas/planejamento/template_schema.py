@@ -1,20 +1,30 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 class TemplateBase(BaseModel):
-    filename: str
-    description: Optional[str] = None
+    nome: str
+    tipo: str  # EDITAL, CONTRATO, ATA, TR, CAPA
+    descricao: Optional[str] = None
 
 class TemplateCreate(TemplateBase):
     pass
 
 class TemplateResponse(TemplateBase):
     id: int
+    filename: str
     path: str
-    owner_id: int
+    responsavel_id: int
+    ativo: bool
+    variaveis_esperadas: Optional[List[str]] = None
+    hash_conteudo: Optional[str] = None
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
+
+class TemplateVariaveisResponse(BaseModel):
+    id: int
+    variaveis: List[str]
+    hash_conteudo: Optional[str] = None
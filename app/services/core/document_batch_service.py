@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.core.docx_template_service import docx_template_cache
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def get_render_executor() -> ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado para renderizar .docx (CPU + GIL).
+    Criado no primeiro uso. 'spawn' evita herdar por fork as threads da API
+    (telemetria, event loop). Cada processo mantém o próprio cache de templates
+    compilados, então o custo de compilação é pago uma vez por processo.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.DOCX_RENDER_WORKERS or os.cpu_count() or 1
+                _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                logger.info(f"Pool de renderização de documentos: {workers} processos.")
+    return _executor
+
+def shutdown_render_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _discard_broken_executor(executor: Executor):
+    """Um processo morto (ex: OOM) inutiliza o pool: o próximo uso cria outro."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def render_docx(template_path: str, data: Dict[str, object]) -> bytes:
+    """Executado dentro do processo do pool (precisa ser função de módulo para o pickle)."""
+    return docx_template_cache.get(template_path).render_bytes(data)
+
+class DocumentBatchService:
+    """
+    Renderização em lote de templates .docx (ex: kit capa/edital/TR/contrato/ata).
+
+    Os documentos são renderizados em paralelo no pool de processos e entregues
+    na ordem em que ficam prontos. No máximo `window` renderizações ficam em voo:
+    se o consumidor (ex: download lento) atrasar, o lote espera em vez de acumular
+    documentos prontos em memória.
+    """
+
+    def __init__(self, executor: Executor | None = None, window: int | None = None):
+        self.executor = executor
+        self.window = window
+
+    async def render_many(self, jobs: List[Tuple[str, str]], data: Dict[str, object]) -> AsyncIterator[Tuple[str, bytes | Exception]]:
+        """
+        jobs: lista de (nome no zip, caminho do template).
+        Produz (nome, bytes do .docx) ou (nome, exceção) quando um template falha,
+        sem interromper os demais.
+        """
+        executor = self.executor or get_render_executor()
+        window = self.window or 2 * (getattr(executor, "_max_workers", None) or os.cpu_count() or 1)
+        loop = asyncio.get_running_loop()
+
+        queue = iter(jobs)
+        pending: dict[asyncio.Future, str] = {}
+
+        def submit_next() -> bool:
+            job = next(queue, None)
+            if job is None:
+                return False
+            name, path = job
+            try:
+                future = loop.run_in_executor(executor, render_docx, path, data)
+            except BrokenProcessPool as e:
+                _discard_broken_executor(executor)
+                future = loop.create_future()
+                future.set_exception(e)
+            pending[future] = name
+            return True
+
+        try:
+            while len(pending) < window and submit_next():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        yield name, future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            _discard_broken_executor(executor)
+                        logger.error(f"Falha ao renderizar '{name}': {e}")
+                        yield name, e
+                    submit_next()
+        finally:
+            # Cliente desconectou: descarta o que ainda não começou
+            for future in pending:
+                future.cancel()
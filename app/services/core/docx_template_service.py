@@ -0,0 +1,261 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Union
+from xml.sax.saxutils import escape
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.part import XmlPart
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.text.run import Run
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tag ((Chave)). O lookahead (?!\() evita capturar parênteses triplos (((...))).
+PLACEHOLDER_PATTERN = re.compile(r"\(\((?!\()\s*(.*?)\s*\)\)")
+
+# Marcador interno gravado no XML no lugar de cada tag: _SLOT_INICIO + número + _SLOT_FIM.
+# Caracteres de uso privado (U+E000, U+E001), válidos em XML e que não aparecem
+# em documentos reais
+_SLOT_INICIO = "\ue000"
+_SLOT_FIM = "\ue001"
+_SLOT = re.compile(f"{_SLOT_INICIO}(\\d+){_SLOT_FIM}")
+
+# Partes do pacote onde as tags são procuradas: corpo, cabeçalhos, rodapés e notas
+# (tabelas aninhadas e caixas de texto ficam dentro dessas partes)
+_TEMPLATE_PARTS = (CT.WML_DOCUMENT_MAIN, CT.WML_HEADER, CT.WML_FOOTER, CT.WML_FOOTNOTES, CT.WML_ENDNOTES)
+
+# Runs que pertencem diretamente ao parágrafo (inclui hyperlinks e revisões),
+# sem descer em caixas de texto, que têm parágrafos próprios
+_PARAGRAPH_RUNS = "./w:r | ./w:hyperlink/w:r | ./w:ins/w:r | ./w:smartTag/w:r"
+
+# Caracteres de controle inválidos em XML (comuns em texto colado de outros sistemas)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+_TAB = '</w:t><w:tab/><w:t xml:space="preserve">'
+
+class DocxTemplate:
+    """
+    Template .docx compilado.
+
+    A compilação (uma vez por arquivo/versão) abre o documento, localiza cada tag
+    ((Chave)) no nível dos runs e concentra a tag inteira no primeiro run em que
+    ela começa (tags quebradas pelo Word em vários runs ficam num só, mantendo a
+    formatação desse run). O XML de cada parte vira uma lista de trechos fixos
+    intercalados com os slots das tags.
+
+    Renderizar é só juntar os trechos com os valores (escapados) e gravar o zip:
+    nada é reaberto nem reprocessado por documento gerado.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.slots: List[tuple[str, str]] = []  # (chave, tag original)
+        self.variables: List[str] = []
+        # Entradas do zip em ordem: nome -> (ZipInfo, bytes) ou (ZipInfo, trechos da parte)
+        self._entries: List[tuple[zipfile.ZipInfo, Union[bytes, List[str]]]] = []
+        self._compile()
+
+    # --- Compilação ---
+    def _compile(self):
+        doc = Document(self.path)
+        parts = {}
+        variables = {}
+
+        for part in doc.part.package.iter_parts():
+            if part.content_type not in _TEMPLATE_PARTS:
+                continue
+            # Notas de rodapé/fim não têm classe própria no python-docx (Part genérico,
+            # sem .element): o XML vem do blob
+            element = part.element if isinstance(part, XmlPart) else parse_xml(part.blob)
+            for p in element.iter(qn("w:p")):
+                for key in self._compile_paragraph(p):
+                    variables.setdefault(key, None)
+            parts[part.partname.lstrip("/")] = _SLOT.split(serialize_part_xml(element).decode("utf-8"))
+
+        self.variables = list(variables)
+
+        with zipfile.ZipFile(self.path) as source:
+            for info in source.infolist():
+                content = parts.get(info.filename)
+                self._entries.append((info, content if content is not None else source.read(info)))
+
+    def _compile_paragraph(self, p) -> List[str]:
+        """Troca as tags do parágrafo por slots. Retorna as chaves na ordem do texto."""
+        runs = [Run(r, None) for r in p.xpath(_PARAGRAPH_RUNS)]
+        if not runs:
+            return []
+        texts = [run.text for run in runs]
+        full = "".join(texts)
+        if "((" not in full:
+            return []
+        matches = list(PLACEHOLDER_PATTERN.finditer(full))
+        if not matches:
+            return []
+
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+
+        def run_at(pos: int) -> int:
+            i = 0
+            while i + 1 < len(starts) and starts[i + 1] <= pos:
+                i += 1
+            return i
+
+        slot_ids = []
+        for match in matches:
+            slot_ids.append(len(self.slots))
+            self.slots.append((match.group(1).strip(), match.group(0)))
+
+        # De trás para frente: os offsets dos matches anteriores continuam válidos
+        changed = set()
+        for match, slot in zip(reversed(matches), reversed(slot_ids)):
+            start, end = match.span()
+            i, j = run_at(start), run_at(end - 1)
+            marker = f"{_SLOT_INICIO}{slot}{_SLOT_FIM}"
+            if i == j:
+                texts[i] = texts[i][:start - starts[i]] + marker + texts[i][end - starts[i]:]
+            else:
+                texts[i] = texts[i][:start - starts[i]] + marker
+                for k in range(i + 1, j):
+                    texts[k] = ""
+                texts[j] = texts[j][end - starts[j]:]
+            changed.update(range(i, j + 1))
+
+        for i in changed:
+            runs[i].text = texts[i]
+            for t in runs[i]._r.iter(qn("w:t")):
+                t.set(qn("xml:space"), "preserve")
+
+        return [key for key, _ in self.slots[slot_ids[0]:slot_ids[-1] + 1]]
+
+    # --- Renderização ---
+    @staticmethod
+    def _xml_value(value) -> str:
+        text = _INVALID_XML_CHARS.sub("", "" if value is None else str(value))
+        text = escape(text.replace("\r\n", "\n"))
+        return text.replace("\n", _BREAK).replace("\t", _TAB)
+
+    def _render_part(self, segments: List[str], values: Dict[int, str]) -> bytes:
+        out = segments[:]
+        # Índices ímpares de _SLOT.split são os números dos slots
+        for n in range(1, len(out), 2):
+            out[n] = values[int(out[n])]
+        return "".join(out).encode("utf-8")
+
+    def render(self, data: Dict[str, object], target: Union[str, BinaryIO]):
+        """Grava o documento preenchido em target (caminho ou arquivo binário)."""
+        values = {
+            n: self._xml_value(data[key]) if key in data else escape(original)
+            for n, (key, original) in enumerate(self.slots)
+        }
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as out:
+            for info, content in self._entries:
+                if isinstance(content, list):
+                    out.writestr(info, self._render_part(content, values), compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    out.writestr(info, content)
+
+    def render_bytes(self, data: Dict[str, object]) -> bytes:
+        buffer = io.BytesIO()
+        self.render(data, buffer)
+        return buffer.getvalue()
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FileHashCache:
+    """
+    sha256 de arquivos por caminho, validado pelo mtime/tamanho como no
+    DocxTemplateCache: um arquivo substituído no disco é lido de novo no próximo uso.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, tuple[tuple, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> str:
+        real_path = os.path.abspath(path)
+        stat = os.stat(real_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._items.get(real_path)
+            if cached and cached[0] == signature:
+                self._items.move_to_end(real_path)
+                return cached[1]
+
+        digest = file_sha256(real_path)
+        with self._lock:
+            self._items[real_path] = (signature, digest)
+            self._items.move_to_end(real_path)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return digest
+
+class DocxTemplateCache:
+    """
+    Templates compilados por caminho, validados pelo mtime/tamanho do arquivo:
+    um template substituído no disco é recompilado no próximo uso.
+    LRU limitado a max_entries; seguro para uso entre threads.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, tuple[tuple, DocxTemplate]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> DocxTemplate:
+        real_path = os.path.abspath(path)
+        stat = os.stat(real_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._items.get(real_path)
+            if cached and cached[0] == signature:
+                self._items.move_to_end(real_path)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        # Compila fora do lock: dois usos simultâneos do mesmo template novo
+        # só compilam em dobro, sem travar os demais
+        template = DocxTemplate(real_path)
+        with self._lock:
+            self._items[real_path] = (signature, template)
+            self._items.move_to_end(real_path)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return template
+
+    def invalidate(self, path: str):
+        with self._lock:
+            self._items.pop(os.path.abspath(path), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+# Instância única do processo
+docx_template_cache = DocxTemplateCache(max_entries=settings.DOCX_TEMPLATE_CACHE_SIZE)
+template_hash_cache = FileHashCache()
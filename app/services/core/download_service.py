@@ -0,0 +1,127 @@
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+
+from app.services.core.storage_service import StorageBackend
+
+# Revalidar sempre: a cópia do navegador vale enquanto a ETag bater (304 barato)
+CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+def strong_etag(content_hash: str) -> str:
+    return f'"{content_hash}"'
+
+def stat_etag(stat: os.stat_result) -> str:
+    """Mesma ETag que o FileResponse gera (mtime + tamanho), para arquivos sem hash."""
+    base = f"{stat.st_mtime}-{stat.st_size}"
+    return f'"{hashlib.md5(base.encode(), usedforsecurity=False).hexdigest()}"'
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match: lista de ETags ou '*'; comparação fraca (W/ ignorado), como manda a RFC 9110."""
+    if header.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == alvo for tag in header.split(","))
+
+def not_modified(request: Request, etag: Optional[str], mtime: Optional[float]) -> bool:
+    """
+    Avalia If-None-Match (prioritário) e If-Modified-Since.
+    Só GET/HEAD: nos demais métodos a pré-condição não se aplica.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and mtime is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP-date tem resolução de segundos
+        return int(mtime) <= int(desde)
+    return False
+
+def _content_disposition(filename: str, disposition: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+def serve_file(
+    request: Request,
+    path: str,
+    filename: str,
+    etag: Optional[str] = None,
+    media_type: Optional[str] = None,
+    inline: bool = False,
+    accel_path: Optional[str] = None,
+) -> Response:
+    """
+    Resposta de download com cache condicional e leitura parcial:
+    - 304 (sem abrir o arquivo) quando If-None-Match / If-Modified-Since batem;
+    - Range / If-Range atendidos pelo FileResponse (só o trecho pedido é lido,
+      em blocos; servidores com a extensão ASGI pathsend usam sendfile);
+    - accel_path: com um nginx na frente, devolve só o cabeçalho X-Accel-Redirect
+      e o próprio nginx envia o arquivo (sendfile, Range) sem passar pelo Python.
+    Sem etag (arquivos antigos sem hash) vale a ETag de mtime/tamanho.
+    """
+    stat = os.stat(path)
+    etag = etag or stat_etag(stat)
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+
+    if not_modified(request, etag, stat.st_mtime):
+        headers["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+        return Response(status_code=304, headers=headers)
+
+    disposition = "inline" if inline else "attachment"
+    if accel_path:
+        headers["X-Accel-Redirect"] = accel_path
+        headers["Content-Disposition"] = _content_disposition(filename, disposition)
+        headers["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+        return Response(status_code=200, headers=headers, media_type=media_type or "application/octet-stream")
+
+    return FileResponse(
+        path,
+        filename=filename,
+        media_type=media_type,
+        headers=headers,
+        stat_result=stat,
+        content_disposition_type=disposition,
+    )
+
+async def serve_stored(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    filename: str,
+    etag: Optional[str] = None,
+    media_type: Optional[str] = None,
+    inline: bool = False,
+    accel_prefix: Optional[str] = None,
+) -> Response:
+    """
+    Download de um arquivo do armazenamento.
+    Backends com URL pré-assinada (S3) redirecionam o cliente para baixar direto
+    do bucket (que atende Range/ETag); o app só autoriza. No backend local o
+    arquivo é servido por serve_file. FileNotFoundError se a chave não existir.
+    """
+    url = storage.presigned_url(key, filename=filename, inline=inline, content_type=media_type)
+    if url:
+        if etag and not_modified(request, etag, None):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+        # A URL expira: o redirecionamento em si não pode ir para cache
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+
+    path = await storage.local_path(key)
+    if not os.path.exists(path):
+        raise FileNotFoundError(key)
+    accel_path = None
+    if accel_prefix:
+        accel_path = accel_prefix.rstrip("/") + "/" + key.lstrip("/")
+    return serve_file(request, path, filename, etag=etag, media_type=media_type, inline=inline, accel_path=accel_path)
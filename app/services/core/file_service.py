@@ -1,31 +1,43 @@
-import shutil
 import os
 from fastapi import UploadFile
 from uuid import uuid4
 
+from app.services.core.storage_service import get_storage
+
 class FileService:
-    def __init__(self, upload_dir: str = "uploads"):
-        # Garante que a pasta de uploads existe
-        self.upload_dir = upload_dir
-        os.makedirs(self.upload_dir, exist_ok=True)
+    def __init__(self, namespace: str = "templates"):
+        # Namespace do armazenamento (pasta local, volume compartilhado ou bucket S3)
+        self.storage = get_storage(namespace)
 
-    def save_upload(self, file: UploadFile) -> str:
+    async def save_upload(self, file: UploadFile) -> str:
         """
-        Salva o arquivo recebido no disco e retorna o caminho salvo.
+        Grava o arquivo recebido no armazenamento e retorna a chave gravada.
         Gera um nome único para evitar conflitos (ex: dois arquivos 'contrato.docx').
         """
         # 1. Gera nome único (uuid) mantendo a extensão original
         extension = os.path.splitext(file.filename)[1]
-        new_filename = f"{uuid4()}{extension}"
-        file_path = os.path.join(self.upload_dir, new_filename)
+        key = f"{uuid4()}{extension}"
+
+        # 2. Envia o conteúdo em blocos, sem bloquear o event loop
+        async def chunks():
+            while True:
+                block = await file.read(1024 * 1024)
+                if not block:
+                    break
+                yield block
+
+        await self.storage.put_stream(key, chunks(), content_type=file.content_type)
+        return key
+
+    async def local_path(self, key: str) -> str:
+        """
+        Caminho local do arquivo (no S3, cópia em cache). Registros anteriores ao
+        armazenamento plugável guardavam o caminho no disco: continuam valendo.
+        """
+        if os.path.isfile(key):
+            return key
+        return await self.storage.local_path(key)
 
-        # 2. Salva o conteúdo físico
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        return file_path
-        
-    def delete_file(self, path: str):
-        """Remove o arquivo físico (usado quando deletamos o template)."""
-        if os.path.exists(path):
-            os.remove(path)
+    async def delete_file(self, key: str):
+        """Remove o arquivo (usado quando deletamos o template)."""
+        await self.storage.delete(key)
@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.profiling import timed
+from app.services.core.document_batch_service import get_render_executor, render_docx
+from app.services.core.storage_service import LocalStorage, StorageBackend, get_storage, prune_dir
+
+logger = logging.getLogger(__name__)
+
+class PdfUnavailableError(RuntimeError):
+    """Conversor de PDF ausente no servidor (LibreOffice ou WeasyPrint)."""
+
+def data_sha256(data: Dict[str, object]) -> str:
+    """Hash estável dos dados de preenchimento (ordem das chaves não importa)."""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def cache_key(kind: str, template_hash: str, data: Dict[str, object]) -> str:
+    return hashlib.sha256(f"{kind}:{template_hash}:{data_sha256(data)}".encode("utf-8")).hexdigest()
+
+# --- Conversores (executados fora do event loop) ---
+
+def convert_docx_to_pdf(docx_bytes: bytes, profile_dir: str) -> bytes:
+    """
+    Converte um .docx em PDF com o LibreOffice headless.
+    Cada slot do pool usa um perfil próprio: duas instâncias do soffice com o
+    mesmo perfil brigam pelo lock e uma delas falha.
+    O LibreOffice já embute só o subconjunto usado de cada fonte.
+    """
+    binary = shutil.which(settings.PDF_SOFFICE_BINARY)
+    if not binary:
+        raise PdfUnavailableError(f"LibreOffice ('{settings.PDF_SOFFICE_BINARY}') não encontrado.")
+
+    with tempfile.TemporaryDirectory(prefix="pdf_") as workdir:
+        source = os.path.join(workdir, "documento.docx")
+        with open(source, "wb") as f:
+            f.write(docx_bytes)
+        cmd = [
+            binary, "--headless", "--norestore", "--nologo",
+            f"-env:UserInstallation=file://{os.path.abspath(profile_dir)}",
+            "--convert-to", "pdf", "--outdir", workdir, source,
+        ]
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, timeout=settings.PDF_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Conversão para PDF excedeu {settings.PDF_TIMEOUT_SECONDS}s")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"LibreOffice falhou: {e.stderr.decode(errors='ignore')[:500]}")
+
+        target = os.path.join(workdir, "documento.pdf")
+        if not os.path.exists(target):
+            raise RuntimeError("LibreOffice não gerou o PDF.")
+        with open(target, "rb") as f:
+            return f.read()
+
+def render_html_pdf(html: str, base_url: Optional[str] = None) -> bytes:
+    """
+    Executado no pool de processos (layout do WeasyPrint é CPU puro).
+    full_fonts=False embute só os glifos usados (subsetting).
+    """
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as e:
+        # OSError: pacote instalado, mas sem as bibliotecas nativas (pango)
+        raise PdfUnavailableError(f"WeasyPrint indisponível: {e}")
+    return HTML(string=html, base_url=base_url).write_pdf(full_fonts=False, optimize_images=True)
+
+# --- Cache de PDFs ---
+
+class PdfCache:
+    """
+    PDFs renderizados no armazenamento de documentos ('documentos'), endereçados
+    pelo conteúdo: chave = sha256(tipo + hash do template + hash dos dados).
+    Mesmo documento com os mesmos dados é sempre o mesmo objeto.
+
+    A escrita do backend é atômica: um leitor nunca vê PDF pela metade.
+    No backend local, acima de max_bytes os arquivos menos usados (mtime,
+    atualizado a cada acerto) são removidos; no S3 a expiração fica com a
+    regra de ciclo de vida do bucket.
+    """
+
+    def __init__(self, storage: StorageBackend, max_bytes: int):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(key: str) -> str:
+        return f"{key[:2]}/{key}.pdf"
+
+    async def get(self, key: str) -> Optional[str]:
+        """Chave do PDF no armazenamento, ou None se ainda não foi gerado."""
+        object_key = self.key_for(key)
+        if isinstance(self.storage, LocalStorage):
+            try:
+                await asyncio.to_thread(os.utime, self.storage.path(object_key))
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+        elif not await self.storage.exists(object_key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return object_key
+
+    async def put(self, key: str, content: bytes) -> str:
+        object_key = self.key_for(key)
+        await self.storage.put_bytes(object_key, content, content_type="application/pdf")
+        if isinstance(self.storage, LocalStorage):
+            await asyncio.to_thread(self.prune)
+        return object_key
+
+    def prune(self):
+        with self._lock:
+            prune_dir(self.storage.root, self.max_bytes, ".pdf")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.storage).__name__,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+# --- Serviço ---
+
+class PdfService:
+    """
+    Etapa de PDF para os documentos gerados:
+    - DOCX (DocumentService/templates): renderiza no pool de processos e converte
+      com o LibreOffice, no máximo PDF_WORKERS conversões simultâneas;
+    - HTML (templates Jinja): WeasyPrint no pool de processos.
+
+    Antes de renderizar consulta o cache; pedidos iguais simultâneos esperam a
+    mesma renderização em vez de repeti-la. Retorna a chave do PDF no
+    armazenamento de documentos (servir com download_service.serve_stored).
+    """
+
+    def __init__(self, cache: PdfCache, workers: int = 2, profiles_dir: str = ".profiles"):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.profiles_dir = profiles_dir
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._profiles: Optional[asyncio.Queue] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _slots(self):
+        # Criados no primeiro uso, dentro do event loop da aplicação
+        if self._profiles is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+            self._profiles = asyncio.Queue()
+            for n in range(self.workers):
+                self._profiles.put_nowait(os.path.join(self.profiles_dir, f"slot{n}"))
+        return self._semaphore, self._profiles
+
+    async def _cached(self, key: str, produce: Callable[[], Awaitable[bytes]]) -> str:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        # Registrado antes de consultar o cache: a consulta já cede o event loop,
+        # e pedidos iguais que chegassem nesse meio tempo renderizariam em dobro
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            object_key = await self.cache.get(key)
+            if not object_key:
+                with timed("render"):
+                    content = await produce()
+                object_key = await self.cache.put(key, content)
+            future.set_result(object_key)
+            return object_key
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita "exception was never retrieved" quando ninguém mais esperava
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def docx_pdf(self, template_path: str, template_hash: str, data: Dict[str, object]) -> str:
+        """PDF do template .docx preenchido com data (tags ((Chave)))."""
+        async def produce() -> bytes:
+            loop = asyncio.get_running_loop()
+            docx_bytes = await loop.run_in_executor(get_render_executor(), render_docx, template_path, data)
+            semaphore, profiles = self._slots()
+            async with semaphore:
+                profile = await profiles.get()
+                try:
+                    return await asyncio.to_thread(convert_docx_to_pdf, docx_bytes, profile)
+                finally:
+                    profiles.put_nowait(profile)
+
+        return await self._cached(cache_key("docx", template_hash, data), produce)
+
+    async def html_pdf(self, html: str, template_hash: str, data: Dict[str, object], base_url: Optional[str] = None) -> str:
+        """PDF de um HTML já renderizado; template_hash + data identificam o conteúdo no cache."""
+        async def produce() -> bytes:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_render_executor(), render_html_pdf, html, base_url)
+
+        return await self._cached(cache_key("html", template_hash, data), produce)
+
+    async def jinja_pdf(self, env, template_name: str, context: Dict[str, object], base_url: Optional[str] = None) -> str:
+        """
+        PDF de um template Jinja (ex: impressão de AOCS/CI de pagamento).
+        A chave usa o fonte do template, então editar o .html invalida o cache.
+        No acerto o HTML nem é renderizado.
+        """
+        source, _, _ = env.loader.get_source(env, template_name)
+        template_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+        async def produce() -> bytes:
+            html = env.get_template(template_name).render(**context)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_render_executor(), render_html_pdf, html, base_url)
+
+        return await self._cached(cache_key("html", template_hash, context), produce)
+
+# Instância única do processo
+pdf_service = PdfService(
+    PdfCache(get_storage("documentos"), settings.PDF_CACHE_MAX_MB * 1024 * 1024),
+    workers=settings.PDF_WORKERS,
+    profiles_dir=os.path.join(settings.PDF_CACHE_DIR, ".profiles"),
+)
@@ -0,0 +1,505 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import quote
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Pastas locais de cada namespace (as mesmas de antes do armazenamento plugável,
+# para que os arquivos já gravados continuem válidos)
+DEFAULT_LOCAL_DIRS = {
+    "anexos": os.path.join(APP_DIR, "routers", "static", "uploads"),
+    "templates": os.path.join("uploads", "templates"),
+    "documentos": settings.PDF_CACHE_DIR,
+}
+
+class StorageError(RuntimeError):
+    """Falha ao ler/gravar no backend de armazenamento."""
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    mtime: float
+
+def _check_key(key: str) -> str:
+    key = key.replace("\\", "/").lstrip("/")
+    if not key or any(part in ("", ".", "..") for part in key.split("/")):
+        raise ValueError(f"Chave de armazenamento inválida: {key!r}")
+    return key
+
+def prune_dir(directory: str, max_bytes: int, suffix: str = ""):
+    """Remove os arquivos menos usados (mtime mais antigo) até a pasta caber em max_bytes."""
+    files, total = [], 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if suffix and not name.endswith(suffix):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(files):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        if total <= max_bytes:
+            break
+
+class StorageBackend:
+    """
+    Armazenamento de arquivos por chave (ex: 'blobs/ab/ab12...', 'x.docx').
+    Cada instância atende um namespace (anexos, templates, documentos).
+
+    Quem precisa de um arquivo no disco (python-docx, LibreOffice, FileResponse)
+    usa local_path: no backend local é o próprio arquivo; no S3 é uma cópia no
+    cache local, baixada uma vez (as chaves são imutáveis: conteúdo novo = chave nova).
+    """
+
+    namespace: str
+
+    async def put_file(self, key: str, source_path: str, content_type: Optional[str] = None, move: bool = False):
+        raise NotImplementedError
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None):
+        fd, tmp = tempfile.mkstemp(suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                await asyncio.to_thread(f.write, data)
+            await self.put_file(key, tmp, content_type, move=True)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str] = None) -> int:
+        """Grava o stream (via temporário local: o S3 exige o tamanho). Retorna os bytes gravados."""
+        fd, tmp = tempfile.mkstemp(suffix=".tmp")
+        total = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for block in chunks:
+                    total += len(block)
+                    await asyncio.to_thread(f.write, block)
+            await self.put_file(key, tmp, content_type, move=True)
+            return total
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    async def get_stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Conteúdo em blocos; start/end (inclusivo) leem só um trecho."""
+        raise NotImplementedError
+        yield b""
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def local_path(self, key: str) -> str:
+        raise NotImplementedError
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, inline: bool = False,
+                      content_type: Optional[str] = None, expires: Optional[int] = None) -> Optional[str]:
+        """URL temporária para o cliente baixar direto do armazenamento (None se o backend não tiver)."""
+        return None
+
+class LocalStorage(StorageBackend):
+    """Arquivos numa pasta do servidor (volume local ou compartilhado entre nós)."""
+
+    def __init__(self, namespace: str, root: str):
+        self.namespace = namespace
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *_check_key(key).split("/"))
+
+    async def put_file(self, key: str, source_path: str, content_type: Optional[str] = None, move: bool = False):
+        target = self.path(key)
+
+        def write():
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if move:
+                try:
+                    os.replace(source_path, target)
+                    return
+                except OSError:
+                    pass  # outro sistema de arquivos: copia
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out, open(source_path, "rb") as src:
+                    shutil.copyfileobj(src, out, CHUNK_SIZE)
+                os.replace(tmp, target)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+        await asyncio.to_thread(write)
+
+    async def get_stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        path = self.path(key)
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            if start:
+                await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                block = await asyncio.to_thread(f.read, size)
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                yield block
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = await asyncio.to_thread(os.stat, self.path(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(key, st.st_size, st.st_mtime)
+
+    async def delete(self, key: str):
+        try:
+            await asyncio.to_thread(os.remove, self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def local_path(self, key: str) -> str:
+        return self.path(key)
+
+# --- S3 (AWS, MinIO e compatíveis) ---
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+class SigV4:
+    """Assinatura AWS Signature Version 4 (cabeçalho Authorization e URL pré-assinada)."""
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+
+    def _scope(self, date: str) -> str:
+        return f"{date}/{self.region}/{self.service}/aws4_request"
+
+    def _signature(self, amz_date: str, canonical_request: str) -> str:
+        date = amz_date[:8]
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, self._scope(date), _sha256_hex(canonical_request.encode("utf-8"))
+        ])
+        key = _hmac(("AWS4" + self.secret_key).encode("utf-8"), date)
+        for part in (self.region, self.service, "aws4_request"):
+            key = _hmac(key, part)
+        return hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _canonical_query(params: Dict[str, str]) -> str:
+        return "&".join(
+            f"{quote(k, safe='-_.~')}={quote(str(v), safe='-_.~')}" for k, v in sorted(params.items())
+        )
+
+    def sign_headers(self, method: str, host: str, path: str, params: Dict[str, str],
+                     headers: Dict[str, str], payload_hash: str, now: datetime) -> Dict[str, str]:
+        """Retorna os cabeçalhos a enviar (os recebidos + x-amz-date, x-amz-content-sha256, Authorization)."""
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        signed = {k.lower(): str(v).strip() for k, v in headers.items()}
+        signed.update({"host": host, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+        names = sorted(signed)
+        canonical_request = "\n".join([
+            method, path, self._canonical_query(params),
+            "".join(f"{n}:{signed[n]}\n" for n in names), ";".join(names), payload_hash,
+        ])
+        signature = self._signature(amz_date, canonical_request)
+        result = {k: v for k, v in signed.items() if k != "host"}
+        result["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{self._scope(amz_date[:8])}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+        return result
+
+    def presign(self, method: str, host: str, path: str, params: Dict[str, str], expires: int, now: datetime) -> str:
+        """Query string completa (com X-Amz-Signature) de uma URL pré-assinada."""
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        query = dict(params)
+        query.update({
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{self._scope(amz_date[:8])}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+        })
+        canonical_query = self._canonical_query(query)
+        canonical_request = "\n".join([method, path, canonical_query, f"host:{host}\n", "host", "UNSIGNED-PAYLOAD"])
+        return f"{canonical_query}&X-Amz-Signature={self._signature(amz_date, canonical_request)}"
+
+class S3Storage(StorageBackend):
+    """
+    Bucket S3 ou compatível (MinIO, Ceph, ...), falando HTTP direto com httpx.
+    Chaves ficam em <prefixo><namespace>/<chave>. Leituras que precisam de
+    arquivo local passam pelo cache (read-through) em STORAGE_CACHE_DIR.
+    """
+
+    def __init__(self, namespace: str, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", prefix: str = "", path_style: bool = True,
+                 cache_dir: str = "cache/storage", cache_max_bytes: int = 2 * 1024 ** 3,
+                 presign_seconds: int = 300, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.namespace = namespace
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.path_style = path_style
+        self.signer = SigV4(access_key, secret_key, region)
+        self.cache_dir = os.path.join(cache_dir, namespace)
+        self.cache_max_bytes = cache_max_bytes
+        self.presign_seconds = presign_seconds
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._prune_lock = threading.Lock()
+
+    # --- HTTP ---
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self._transport, timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _location(self, key: str) -> tuple[str, str, str]:
+        """(scheme://host, host, caminho canônico) do objeto."""
+        scheme, _, host = self.endpoint.partition("://")
+        object_key = quote(f"{self.prefix}{self.namespace}/{_check_key(key)}", safe="/-_.~")
+        if self.path_style:
+            return f"{scheme}://{host}", host, f"/{self.bucket}/{object_key}"
+        host = f"{self.bucket}.{host}"
+        return f"{scheme}://{host}", host, f"/{object_key}"
+
+    async def _request(self, method: str, key: str, headers: Optional[Dict[str, str]] = None,
+                       content=None, stream: bool = False):
+        base, host, path = self._location(key)
+        signed = self.signer.sign_headers(
+            method, host, path, {}, headers or {}, "UNSIGNED-PAYLOAD", datetime.now(timezone.utc)
+        )
+        client = self._get_client()
+        request = client.build_request(method, base + path, headers=signed, content=content)
+        try:
+            return await client.send(request, stream=stream)
+        except httpx.HTTPError as e:
+            raise StorageError(f"S3 {method} {key}: {e}") from e
+
+    @staticmethod
+    def _raise_for(response: httpx.Response, key: str):
+        if response.status_code >= 300:
+            raise StorageError(f"S3 respondeu {response.status_code} para '{key}'")
+
+    # --- Operações ---
+    async def put_file(self, key: str, source_path: str, content_type: Optional[str] = None, move: bool = False):
+        size = await asyncio.to_thread(os.path.getsize, source_path)
+        headers = {"content-length": str(size)}
+        if content_type:
+            headers["content-type"] = content_type
+
+        async def body():
+            f = await asyncio.to_thread(open, source_path, "rb")
+            try:
+                while True:
+                    block = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                    if not block:
+                        break
+                    yield block
+            finally:
+                await asyncio.to_thread(f.close)
+
+        response = await self._request("PUT", key, headers, content=body())
+        self._raise_for(response, key)
+        if move:
+            await asyncio.to_thread(os.remove, source_path)
+
+    async def get_stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self._request("GET", key, headers, stream=True)
+        try:
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            self._raise_for(response, key)
+            async for block in response.aiter_bytes(CHUNK_SIZE):
+                yield block
+        finally:
+            await response.aclose()
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        response = await self._request("HEAD", key)
+        if response.status_code == 404:
+            return None
+        self._raise_for(response, key)
+        mtime = 0.0
+        if "last-modified" in response.headers:
+            mtime = parsedate_to_datetime(response.headers["last-modified"]).timestamp()
+        return StoredObject(key, int(response.headers.get("content-length", 0)), mtime)
+
+    async def delete(self, key: str):
+        response = await self._request("DELETE", key)
+        if response.status_code not in (200, 204, 404):
+            self._raise_for(response, key)
+        cached = self._cache_path(key)
+        if os.path.exists(cached):
+            await asyncio.to_thread(os.remove, cached)
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, inline: bool = False,
+                      content_type: Optional[str] = None, expires: Optional[int] = None) -> Optional[str]:
+        base, host, path = self._location(key)
+        params = {}
+        if filename:
+            disposition = "inline" if inline else "attachment"
+            params["response-content-disposition"] = f"{disposition}; filename*=utf-8''{quote(filename)}"
+        if content_type:
+            params["response-content-type"] = content_type
+        query = self.signer.presign(
+            "GET", host, path, params, expires or self.presign_seconds, datetime.now(timezone.utc)
+        )
+        return f"{base}{path}?{query}"
+
+    # --- Cache local (read-through) ---
+    def _cache_path(self, key: str) -> str:
+        digest = hashlib.sha256(_check_key(key).encode("utf-8")).hexdigest()
+        ext = os.path.splitext(key)[1]
+        return os.path.join(self.cache_dir, digest[:2], digest + ext)
+
+    async def local_path(self, key: str) -> str:
+        target = self._cache_path(key)
+        try:
+            await asyncio.to_thread(os.utime, target)
+            return target
+        except FileNotFoundError:
+            pass
+
+        inflight = self._inflight.get(target)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[target] = future
+        try:
+            await self._download(key, target)
+            future.set_result(target)
+            await asyncio.to_thread(self._prune)
+            return target
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(target, None)
+
+    async def _download(self, key: str, target: str):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for block in self.get_stream(key):
+                    await asyncio.to_thread(f.write, block)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _prune(self):
+        with self._prune_lock:
+            prune_dir(self.cache_dir, self.cache_max_bytes)
+
+# --- Fábrica ---
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+def _local_root(namespace: str) -> str:
+    if settings.STORAGE_LOCAL_ROOT:
+        return os.path.join(settings.STORAGE_LOCAL_ROOT, namespace)
+    return DEFAULT_LOCAL_DIRS.get(namespace) or os.path.join("storage", namespace)
+
+def _build(namespace: str) -> StorageBackend:
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalStorage(namespace, _local_root(namespace))
+    if backend == "s3":
+        if not (settings.STORAGE_S3_ENDPOINT and settings.STORAGE_S3_BUCKET):
+            raise StorageError("STORAGE_BACKEND=s3 exige STORAGE_S3_ENDPOINT e STORAGE_S3_BUCKET.")
+        return S3Storage(
+            namespace,
+            endpoint=settings.STORAGE_S3_ENDPOINT,
+            bucket=settings.STORAGE_S3_BUCKET,
+            access_key=settings.STORAGE_S3_ACCESS_KEY or "",
+            secret_key=settings.STORAGE_S3_SECRET_KEY or "",
+            region=settings.STORAGE_S3_REGION,
+            prefix=settings.STORAGE_S3_PREFIX,
+            path_style=settings.STORAGE_S3_PATH_STYLE,
+            cache_dir=settings.STORAGE_CACHE_DIR,
+            cache_max_bytes=settings.STORAGE_CACHE_MAX_MB * 1024 * 1024,
+            presign_seconds=settings.STORAGE_PRESIGN_SECONDS,
+        )
+    raise StorageError(f"STORAGE_BACKEND desconhecido: {settings.STORAGE_BACKEND}")
+
+def get_storage(namespace: str) -> StorageBackend:
+    """Backend do namespace ('anexos', 'templates', 'documentos'), criado no primeiro uso."""
+    backend = _backends.get(namespace)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(namespace)
+            if backend is None:
+                backend = _backends[namespace] = _build(namespace)
+                logger.info(f"Armazenamento '{namespace}': {type(backend).__name__}")
+    return backend
+
+async def close_storages(backends: Iterable[StorageBackend] = ()):
+    for backend in list(backends) or list(_backends.values()):
+        if isinstance(backend, S3Storage):
+            await backend.aclose()
@@ -1,21 +1,147 @@
+import time
 import zipfile
 import os
-import io
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator
+
+class _StreamSink:
+    """
+    Destino de escrita sem seek para o zipfile: acumula só o que foi escrito
+    desde a última leitura. O zipfile detecta a falta de seek e grava cada
+    entrada com data descriptor, então nada precisa ser reescrito depois.
+    """
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 class ZipService:
-    def create_zip_from_folder(self, folder_path: str) -> io.BytesIO:
-        """
-        Lê todos os arquivos de uma pasta e cria um arquivo ZIP na memória RAM.
-        Retorna o objeto de bytes pronto para download.
-        """
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # Adiciona o arquivo ao zip usando apenas o nome relativo (sem pastas do sistema)
-                    zip_file.write(file_path, arcname=file)
-                    
-        zip_buffer.seek(0) # Volta o ponteiro para o início para leitura
-        return zip_buffer
+    """
+    Geração de arquivos ZIP em streaming.
+    Cada parte é devolvida assim que é escrita; a memória usada por exportação
+    fica limitada a CHUNK_SIZE (mais o buffer do deflate), qualquer que seja o
+    tamanho do arquivo. ZIP64 é usado automaticamente para arquivos > 4 GB ou
+    com mais de 65.535 entradas.
+    """
+
+    # Leitura dos arquivos do disco em blocos deste tamanho
+    CHUNK_SIZE = 64 * 1024
+
+    # Formatos já comprimidos: deflate de novo só gasta CPU (e às vezes aumenta o arquivo)
+    STORED_EXTENSIONS = {
+        ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp",
+        ".docx", ".xlsx", ".pptx", ".odt", ".ods",
+        ".zip", ".7z", ".rar", ".gz", ".mp4", ".mp3",
+    }
+
+    def create_zip_from_folder(self, folder_path: str, target: BinaryIO):
+        """
+        Grava em target (arquivo ou stream) um ZIP com todos os arquivos da pasta.
+        Para respostas HTTP, prefira stream_folder (não precisa de destino).
+        """
+        for chunk in self.stream_folder(folder_path):
+            target.write(chunk)
+
+    def _compress_type(self, arcname: str) -> int:
+        if os.path.splitext(arcname)[1].lower() in self.STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def _new_writer(self) -> tuple[_StreamSink, zipfile.ZipFile]:
+        sink = _StreamSink()
+        return sink, zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    def stream_folder(self, folder_path: str) -> Iterator[bytes]:
+        """
+        ZIP de todos os arquivos da pasta (subpastas incluídas, com caminho relativo),
+        lido do disco em blocos e devolvido em partes para um StreamingResponse.
+        """
+        def files():
+            for root, dirs, names in os.walk(folder_path):
+                dirs.sort()
+                for name in sorted(names):
+                    file_path = os.path.join(root, name)
+                    yield file_path, os.path.relpath(file_path, folder_path).replace(os.sep, "/")
+
+        return self.stream_files(files())
+
+    def stream_files(self, files: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+        """
+        ZIP dos arquivos (caminho no disco, nome no zip), lidos em blocos.
+        Usado quando os nomes no zip não são os do disco (ex: anexos deduplicados).
+        """
+        sink, zip_file = self._new_writer()
+        with zip_file:
+            for file_path, arcname in files:
+                yield from self._write_file(zip_file, sink, file_path, arcname)
+        # Diretório central (escrito no close)
+        yield sink.drain()
+
+    def _write_file(self, zip_file: zipfile.ZipFile, sink: _StreamSink, file_path: str, arcname: str) -> Iterator[bytes]:
+        # from_file já traz o tamanho: o zipfile liga o ZIP64 da entrada se necessário
+        info = zipfile.ZipInfo.from_file(file_path, arcname)
+        info.compress_type = self._compress_type(arcname)
+        with open(file_path, "rb") as source, zip_file.open(info, "w") as dest:
+            while True:
+                block = source.read(self.CHUNK_SIZE)
+                if not block:
+                    break
+                dest.write(block)
+                data = sink.drain()
+                if data:
+                    yield data
+        data = sink.drain()
+        if data:
+            yield data
+
+    def stream_zip(self, entries: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+        """
+        Gera o ZIP em partes, uma por entrada (arcname, conteúdo), à medida que
+        as entradas chegam. Só a entrada atual fica em memória, nunca o arquivo inteiro.
+        """
+        sink, zip_file = self._new_writer()
+        with zip_file:
+            for arcname, content in entries:
+                zip_file.writestr(arcname, content, compress_type=self._compress_type(arcname))
+                yield sink.drain()
+        yield sink.drain()
+
+    async def stream_zip_async(self, entries: AsyncIterator[tuple[str, bytes]]) -> AsyncIterator[bytes]:
+        """Versão de stream_zip para entradas produzidas de forma assíncrona (ex: render em lote)."""
+        sink, zip_file = self._new_writer()
+        with zip_file:
+            async for arcname, content in entries:
+                zip_file.writestr(arcname, content, compress_type=self._compress_type(arcname))
+                yield sink.drain()
+        yield sink.drain()
+
+    async def stream_objects_async(self, objects: AsyncIterator[tuple[str, int, AsyncIterator[bytes]]]) -> AsyncIterator[bytes]:
+        """
+        ZIP de arquivos lidos em blocos de uma fonte assíncrona (ex: armazenamento S3):
+        cada item é (arcname, tamanho, blocos). O tamanho decide o ZIP64 da entrada.
+        """
+        sink, zip_file = self._new_writer()
+        with zip_file:
+            async for arcname, size, blocks in objects:
+                info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.file_size = size
+                info.compress_type = self._compress_type(arcname)
+                with zip_file.open(info, "w") as dest:
+                    async for block in blocks:
+                        dest.write(block)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                data = sink.drain()
+                if data:
+                    yield data
+        yield sink.drain()
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+from app.services.core.storage_service import LocalStorage, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Blocos de leitura/escrita/hash
+BLOCK_SIZE = 1024 * 1024
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+class UploadNaoEncontradoError(LookupError):
+    """Upload em partes inexistente ou expirado."""
+
+class UploadOffsetError(ValueError):
+    """A parte enviada não começa onde o servidor parou (cliente deve retomar de recebido)."""
+    def __init__(self, recebido: int):
+        super().__init__(f"Offset inválido: o servidor já recebeu {recebido} bytes.")
+        self.recebido = recebido
+
+class UploadTamanhoError(ValueError):
+    """Parte ou arquivo acima do limite, ou arquivo incompleto na conclusão."""
+
+@dataclass
+class ArquivoRecebido:
+    """Arquivo já gravado num temporário, com hash e tamanho calculados durante a escrita."""
+    caminho_temp: str
+    hash_sha256: str
+    tamanho_bytes: int
+
+def _write_block(f, hasher, block: bytes):
+    # Executado em thread: write e sha256 (que solta o GIL) fora do event loop
+    f.write(block)
+    hasher.update(block)
+
+def _hash_file(path: str, limit: int):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = limit
+        while remaining > 0:
+            block = f.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+class AnexoUploadService:
+    """
+    Recebimento de anexos sem bloquear o event loop e com conteúdo deduplicado.
+
+    - Toda escrita em disco roda em thread, em blocos de 1 MB; o SHA-256 é
+      calculado no mesmo passo (o arquivo nunca é relido para gerar o hash).
+    - Uploads grandes podem ser feitos em partes: iniciar -> enviar partes com
+      o offset -> concluir. Se a conexão cair, o cliente consulta o status e
+      continua de recebido_bytes.
+    - O arquivo final vai para blobs/<aa>/<sha256> no armazenamento de anexos:
+      certidões e notas fiscais repetidas ocupam um só arquivo (ver AnexoBlob.ref_count).
+
+    As partes ficam em disco (partes_dir) até a conclusão; com vários nós, partes_dir
+    deve ser um volume compartilhado (ANEXO_PARTES_DIR) para o upload poder
+    continuar em qualquer nó.
+    """
+
+    def __init__(self, storage: StorageBackend, partes_dir: Optional[str] = None):
+        self.storage = storage
+        if not partes_dir:
+            partes_dir = settings.ANEXO_PARTES_DIR or (
+                os.path.join(storage.root, ".parciais") if isinstance(storage, LocalStorage)
+                else os.path.join(settings.STORAGE_CACHE_DIR, "anexos_parciais")
+            )
+        self.partes_dir = partes_dir
+        self.chunk_max_bytes = settings.ANEXO_CHUNK_MAX_MB * 1024 * 1024
+        self.max_bytes = settings.ANEXO_MAX_MB * 1024 * 1024
+        self.expire_seconds = settings.ANEXO_UPLOAD_EXPIRE_HOURS * 3600
+        # Hash parcial por upload (offset, sha256) para não reler o que já chegou.
+        # Outro processo (ou um restart) recalcula a partir do arquivo .part
+        self._hashers: Dict[str, tuple[int, "hashlib._Hash"]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        os.makedirs(self.partes_dir, exist_ok=True)
+
+    # --- Caminhos ---
+    @staticmethod
+    def blob_relpath(hash_sha256: str) -> str:
+        return f"blobs/{hash_sha256[:2]}/{hash_sha256}"
+
+    def _paths(self, upload_id: str) -> tuple[str, str]:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            raise UploadNaoEncontradoError(upload_id)
+        base = os.path.join(self.partes_dir, upload_id)
+        return base + ".json", base + ".part"
+
+    # --- Upload em uma requisição ---
+    async def receber_stream(self, chunks: AsyncIterator[bytes]) -> ArquivoRecebido:
+        """Grava o stream num temporário calculando o hash. Limitado a ANEXO_MAX_MB."""
+        fd, tmp = tempfile.mkstemp(dir=self.partes_dir, suffix=".tmp")
+        hasher, total = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for block in chunks:
+                    total += len(block)
+                    if total > self.max_bytes:
+                        raise UploadTamanhoError(f"Arquivo acima do limite de {settings.ANEXO_MAX_MB} MB.")
+                    await asyncio.to_thread(_write_block, f, hasher, block)
+        except BaseException:
+            await asyncio.to_thread(self._remove, tmp)
+            raise
+        return ArquivoRecebido(tmp, hasher.hexdigest(), total)
+
+    # --- Upload em partes ---
+    async def iniciar(self, metadados: dict) -> dict:
+        if metadados["tamanho_total"] > self.max_bytes:
+            raise UploadTamanhoError(f"Arquivo acima do limite de {settings.ANEXO_MAX_MB} MB.")
+        await asyncio.to_thread(self.limpar_expirados)
+
+        upload_id = uuid.uuid4().hex
+        meta_path, part_path = self._paths(upload_id)
+        metadados = {**metadados, "upload_id": upload_id, "criado_em": time.time()}
+
+        def criar():
+            open(part_path, "wb").close()
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(metadados, f, ensure_ascii=False)
+
+        await asyncio.to_thread(criar)
+        self._hashers[upload_id] = (0, hashlib.sha256())
+        return self._status(metadados, 0)
+
+    def _ler_metadados(self, upload_id: str) -> tuple[dict, int]:
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                metadados = json.load(f)
+            return metadados, os.path.getsize(part_path)
+        except FileNotFoundError:
+            raise UploadNaoEncontradoError(upload_id)
+
+    def _status(self, metadados: dict, recebido: int) -> dict:
+        return {
+            "upload_id": metadados["upload_id"],
+            "recebido_bytes": recebido,
+            "tamanho_total": metadados["tamanho_total"],
+            "chunk_max_bytes": self.chunk_max_bytes,
+            "completo": recebido == metadados["tamanho_total"],
+        }
+
+    async def status(self, upload_id: str) -> dict:
+        metadados, recebido = await asyncio.to_thread(self._ler_metadados, upload_id)
+        return self._status(metadados, recebido)
+
+    async def receber_parte(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Anexa uma parte ao upload. offset deve ser igual ao que o servidor já tem
+        (partes repetidas ou fora de ordem recebem UploadOffsetError com o valor certo).
+        """
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            metadados, recebido = await asyncio.to_thread(self._ler_metadados, upload_id)
+            if offset != recebido:
+                raise UploadOffsetError(recebido)
+
+            _, part_path = self._paths(upload_id)
+            hasher = await self._hasher(upload_id, part_path, recebido)
+            limite_parte = min(self.chunk_max_bytes, metadados["tamanho_total"] - recebido)
+            escrito = 0
+            f = await asyncio.to_thread(open, part_path, "ab")
+            try:
+                async for block in chunks:
+                    if escrito + len(block) > limite_parte:
+                        raise UploadTamanhoError(
+                            f"Parte acima do limite ({limite_parte} bytes restantes nesta parte)."
+                        )
+                    await asyncio.to_thread(_write_block, f, hasher, block)
+                    escrito += len(block)
+            except UploadTamanhoError:
+                # Parte rejeitada: volta ao ponto em que ela começou
+                await asyncio.to_thread(f.truncate, recebido)
+                self._hashers.pop(upload_id, None)
+                raise
+            except BaseException:
+                # Conexão caiu no meio da parte: o que já foi gravado vale,
+                # o cliente retoma de recebido_bytes
+                self._hashers[upload_id] = (recebido + escrito, hasher)
+                raise
+            finally:
+                await asyncio.to_thread(f.close)
+
+            self._hashers[upload_id] = (recebido + escrito, hasher)
+            return self._status(metadados, recebido + escrito)
+
+    async def _hasher(self, upload_id: str, part_path: str, recebido: int):
+        cached = self._hashers.get(upload_id)
+        if cached and cached[0] == recebido:
+            return cached[1]
+        return await asyncio.to_thread(_hash_file, part_path, recebido)
+
+    async def concluir(self, upload_id: str) -> tuple[dict, ArquivoRecebido]:
+        """Fecha o upload completo: retorna os metadados e o arquivo com o hash final."""
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            metadados, recebido = await asyncio.to_thread(self._ler_metadados, upload_id)
+            if recebido != metadados["tamanho_total"]:
+                raise UploadTamanhoError(
+                    f"Upload incompleto: {recebido} de {metadados['tamanho_total']} bytes recebidos."
+                )
+            meta_path, part_path = self._paths(upload_id)
+            hasher = await self._hasher(upload_id, part_path, recebido)
+            await asyncio.to_thread(self._remove, meta_path)
+            self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        return metadados, ArquivoRecebido(part_path, hasher.hexdigest(), recebido)
+
+    async def cancelar(self, upload_id: str):
+        meta_path, part_path = self._paths(upload_id)
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        await asyncio.to_thread(self._remove, meta_path)
+        await asyncio.to_thread(self._remove, part_path)
+
+    # --- Blobs ---
+    async def guardar(self, recebido: ArquivoRecebido) -> str:
+        """
+        Envia o temporário para o blob do seu hash (chamar depois do commit do anexo).
+        Se o blob já existe o conteúdo é idêntico: o temporário é descartado.
+        """
+        key = self.blob_relpath(recebido.hash_sha256)
+        if await self.storage.exists(key):
+            await self.descartar(recebido)
+        else:
+            await self.storage.put_file(key, recebido.caminho_temp, move=True)
+        return key
+
+    async def descartar(self, recebido: ArquivoRecebido):
+        await asyncio.to_thread(self._remove, recebido.caminho_temp)
+
+    async def remover_arquivo(self, key: str):
+        """Apaga um arquivo que ficou sem referências (blob com ref_count 0 ou anexo antigo)."""
+        await self.storage.delete(key)
+
+    @staticmethod
+    def _remove(path: Optional[str]):
+        try:
+            if path:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def limpar_expirados(self):
+        """Remove uploads abandonados (sem escrita há mais de ANEXO_UPLOAD_EXPIRE_HOURS)."""
+        limite = time.time() - self.expire_seconds
+        for nome in os.listdir(self.partes_dir):
+            base, ext = os.path.splitext(nome)
+            path = os.path.join(self.partes_dir, nome)
+            # O .json não muda durante o upload: a atividade é medida pelo .part
+            if ext == ".json":
+                path = os.path.join(self.partes_dir, base + ".part")
+            try:
+                if os.path.getmtime(path) >= limite:
+                    continue
+            except FileNotFoundError:
+                pass
+            self._remove(os.path.join(self.partes_dir, nome))
+            logger.info(f"Upload parcial expirado removido: {nome}")
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.gestao.contrato_repository import ContratoRepository
+from app.repositories.gestao.saldo_item_repository import SaldoItemRepository
 # from app.schemas.gestao.contrato_schema import ContratoCreate # TODO: Verify schema
 # from app.models.gestao.contrato_model import Contrato
 
@@ -19,9 +21,7 @@ class ContratoService:
         # This would require a repository method like get_expiring(days)
         return [] 
 
-    def calcular_saldo(self, db: Session, contrato_id: int):
-        repo = ContratoRepository(db)
-        # Placeholder for calculating balance
-        # contrato = repo.get_by_id(contrato_id)
-        # ... logic ...
-        return 0.0
+    async def calcular_saldo(self, db: AsyncSession, contrato_id: int):
+        # Saldo em R$ (contratado - pedido) dos itens ativos, lido do razão de saldo
+        totais = await SaldoItemRepository(db).saldo_contrato(contrato_id)
+        return totais["saldo"]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.repositories.gestao.saldo_item_repository import SaldoItemRepository
+
+logger = logging.getLogger(__name__)
+
+async def reconciliar_saldos(corrigir: bool = True, session_factory=AsyncSessionLocal) -> list[dict]:
+    """Uma rodada de reconciliação do razão de saldo com os pedidos."""
+    async with session_factory() as db:
+        divergencias = await SaldoItemRepository(db).reconciliar(corrigir=corrigir)
+    if divergencias:
+        acao = "corrigidos" if corrigir else "não corrigidos"
+        logger.warning(
+            f"Razão de saldo divergente em {len(divergencias)} itens ({acao}): "
+            f"{[d['id_item_contrato'] for d in divergencias[:20]]}"
+        )
+    return divergencias
+
+class SaldoReconciliacaoJob:
+    """
+    Reconciliação periódica do razão de saldo, na mesma linha do AIJobWorker
+    (tarefa no processo da API, iniciada no startup). Cada rodada soma os
+    pedidos por item e compara com saldos_itens_contrato; divergências vão
+    para o log e, com corrigir=True, são regravadas a partir dos pedidos.
+    """
+
+    def __init__(self, intervalo_minutos: int, corrigir: bool = True, session_factory=AsyncSessionLocal):
+        self.intervalo = intervalo_minutos * 60
+        self.corrigir = corrigir
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "SaldoReconciliacaoJob":
+        return cls(settings.SALDO_RECONCILIACAO_MINUTOS, corrigir=settings.SALDO_RECONCILIACAO_CORRIGIR)
+
+    async def start(self):
+        if self._task is None and self.intervalo > 0:
+            self._task = asyncio.create_task(self._run(), name="saldo-reconciliacao")
+            logger.info(f"Reconciliação de saldos a cada {self.intervalo // 60} min.")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.intervalo)
+            try:
+                await reconciliar_saldos(self.corrigir, self.session_factory)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Banco fora do ar etc.: tenta de novo na próxima rodada
+                logger.error(f"Reconciliação de saldos falhou: {e}")
+
+if __name__ == "__main__":
+    # Execução avulsa (cron ou logo após a migração, para preencher o razão):
+    # python -m app.services.gestao.saldo_service [--so-verificar]
+    import sys
+    import app.models  # noqa: F401 (registra todos os mapeamentos)
+
+    logging.basicConfig(level=logging.INFO)
+    resultado = asyncio.run(reconciliar_saldos(corrigir="--so-verificar" not in sys.argv))
+    print(f"{len(resultado)} itens divergentes.")
+    sys.exit(1 if resultado and "--so-verificar" in sys.argv else 0)
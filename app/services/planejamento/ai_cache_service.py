@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AICache:
+    """
+    Cache de respostas da IA endereçado por conteúdo.
+    A chave é o hash de (modelo + prompt + safety_settings): o mesmo prompt
+    enviado ao mesmo modelo devolve o texto já gerado, sem custo de tokens.
+
+    Subclasses implementam apenas _get/_set/_clear/_size. No event loop use
+    aget/aset: backends com I/O de disco as sobrescrevem para rodar em thread.
+    """
+    backend = "base"
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 1000):
+        # ttl_seconds <= 0 desativa a expiração por tempo
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, safety_settings: dict | None = None) -> str:
+        safety = {str(int(k)): int(v) for k, v in (safety_settings or {}).items()}
+        payload = json.dumps([model_name, prompt, safety], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._set(key, value)
+
+    async def aget(self, key: str) -> str | None:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str):
+        self.set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "entries": self._size(),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and (time.time() - created_at) > self.ttl_seconds
+
+    def _get(self, key: str) -> str | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _size(self) -> int:
+        raise NotImplementedError
+
+class MemoryAICache(AICache):
+    """
+    LRU em memória (por processo). Entradas mais antigas saem quando
+    max_entries é atingido; entradas vencidas saem na leitura.
+    """
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 1000):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def _get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if self._is_expired(created_at):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: str):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _clear(self):
+        self._entries.clear()
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+class SQLiteAICache(AICache):
+    """
+    Cache em disco (SQLite local). Sobrevive a restart e é compartilhado
+    pelos workers da mesma máquina. Eviction por TTL e por LRU (last_access).
+
+    A conexão é única e usada por várias threads: toda operação passa pelo
+    _lock da base. aget/aset rodam em thread (asyncio.to_thread) para que a
+    leitura e a escrita em disco não travem o event loop.
+
+    O número de entradas é aproximado (contado por processo; um REPLACE de
+    chave existente também soma). Ao passar de max_entries, a limpeza conta a
+    tabela e corta até 90% do limite, então o COUNT(*) só roda a cada ~10%
+    de novas escritas, e não em todo set.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str, ttl_seconds: int = 3600, max_entries: int = 1000):
+        super().__init__(ttl_seconds, max_entries)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_ai_cache_last_access ON ai_cache (last_access)")
+        self._entries = self._count()
+
+    async def aget(self, key: str) -> str | None:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: str):
+        await asyncio.to_thread(self.set, key, value)
+
+    def _get(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value, created_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self._is_expired(created_at):
+            self._conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            self._entries = max(self._entries - 1, 0)
+            return None
+        self._conn.execute("UPDATE ai_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return value
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ai_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, now, now)
+        )
+        self._entries += 1
+        if self._entries > self.max_entries:
+            self._evict(now)
+
+    def _evict(self, now: float):
+        if self.ttl_seconds > 0:
+            self._conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        # Outros workers também escrevem no arquivo: aqui a contagem é refeita de verdade
+        target = self.max_entries - self.max_entries // 10
+        total = self._count()
+        if total > target:
+            self._conn.execute(
+                "DELETE FROM ai_cache WHERE key IN (SELECT key FROM ai_cache ORDER BY last_access ASC LIMIT ?)",
+                (total - target,)
+            )
+        self._entries = min(total, target)
+
+    def _clear(self):
+        self._conn.execute("DELETE FROM ai_cache")
+        self._entries = 0
+
+    def _size(self) -> int:
+        return self._entries
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+
+def build_ai_cache() -> AICache | None:
+    """
+    Cria o backend configurado em AI_CACHE_BACKEND ('memory', 'sqlite' ou 'none').
+    """
+    backend = settings.AI_CACHE_BACKEND.lower()
+    ttl = settings.AI_CACHE_TTL_SECONDS
+    max_entries = settings.AI_CACHE_MAX_ENTRIES
+
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteAICache(settings.AI_CACHE_PATH, ttl_seconds=ttl, max_entries=max_entries)
+    if backend != "memory":
+        logger.warning(f"AI_CACHE_BACKEND '{backend}' desconhecido. Usando cache em memória.")
+    return MemoryAICache(ttl_seconds=ttl, max_entries=max_entries)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Chamada recusada sem ir ao provedor: o circuito está aberto."""
+
+class AIUnavailableError(Exception):
+    """O cliente de IA não pôde ser criado (ex: GEMINI_API_KEY ausente)."""
+
+class CircuitBreaker:
+    """
+    Disjuntor para o provedor de IA.
+
+    closed    -> chamadas normais; falhas consecutivas são contadas.
+    open      -> após failure_threshold falhas seguidas, recusa tudo na hora
+                 (CircuitOpenError) durante reset_seconds, em vez de deixar cada
+                 requisição esperar o timeout.
+    half_open -> passado reset_seconds, libera UMA chamada de teste. Sucesso fecha
+                 o circuito; falha reabre por mais reset_seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._trial_started = now
+                return True
+            # half_open: a chamada de teste pode ter sido cancelada sem resultado;
+            # depois de reset_seconds libera outra tentativa
+            if self.state == "half_open" and now - self._trial_started >= self.reset_seconds:
+                self._trial_started = now
+                return True
+            return False
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError("Serviço de IA indisponível no momento (circuito aberto). Tente novamente em instantes.")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuito da IA fechado: provedor respondeu normalmente.")
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                logger.warning(f"Circuito da IA aberto após {self.failures} falhas. Recusando chamadas por {self.reset_seconds}s.")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == "open":
+                retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+            return {"state": self.state, "failures": self.failures, "retry_in_seconds": round(retry_in, 1)}
+
+class AIClientRegistry:
+    """
+    Ponto único de acesso ao AIService.
+
+    - Criação preguiçosa e única por processo: genai.configure e o GenerativeModel
+      são montados uma vez, no primeiro uso, e o mesmo cliente (conexões, cache,
+      semáforo, telemetria) é reaproveitado por todas as rotas e pela fila de jobs.
+    - Importar os routers não depende mais do provedor: sem GEMINI_API_KEY a API
+      sobe normalmente e só as rotas de IA respondem 503.
+    - warm_up() faz uma chamada mínima para abrir a conexão antes do primeiro usuário.
+    """
+
+    def __init__(self):
+        self._service = None
+        self._lock = threading.Lock()
+        self.last_error: str | None = None
+        self.warmed_up_at: datetime | None = None
+
+    def get(self):
+        if self._service is not None:
+            return self._service
+        with self._lock:
+            if self._service is None:
+                # Import local: ai_service importa este módulo (CircuitBreaker)
+                from app.services.planejamento.ai_service import AIService
+                try:
+                    self._service = AIService()
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.error(f"Cliente de IA indisponível: {e}")
+                    raise AIUnavailableError(str(e)) from e
+        return self._service
+
+    @property
+    def initialized(self) -> bool:
+        return self._service is not None
+
+    async def warm_up(self) -> bool:
+        """
+        Inicializa o cliente e faz uma geração mínima (sem cache) para abrir a conexão.
+        Falhas só são registradas: a API continua de pé mesmo sem o provedor.
+        """
+        try:
+            service = self.get()
+            await asyncio.wait_for(
+                service.model.generate_content_async("ping", request_options={"timeout": service.timeout}),
+                timeout=service.timeout
+            )
+            service.breaker.record_success()
+            self.warmed_up_at = datetime.now(timezone.utc)
+            logger.info(f"Cliente de IA aquecido ({service.model_name}).")
+            return True
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Warm-up da IA falhou: {self.last_error}")
+            return False
+
+    def health(self) -> dict:
+        status = {
+            "initialized": self.initialized,
+            "warmed_up_at": self.warmed_up_at,
+            "last_error": self.last_error,
+        }
+        if self._service is not None:
+            status["model"] = self._service.model_name
+            status["circuit"] = self._service.breaker.snapshot()
+            status["healthy"] = self._service.breaker.state != "open"
+        else:
+            status["healthy"] = False
+        return status
+
+# Instância única do processo
+ai_registry = AIClientRegistry()
+
+def build_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.AI_BREAKER_FAILURES,
+        reset_seconds=settings.AI_BREAKER_RESET_SECONDS,
+    )
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import re
+import unicodedata
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Aproximação usada em todo o orçamento de contexto: ~4 caracteres por token
+# (português no Gemini). Evita uma chamada de count_tokens por item.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+class ContextBuilder:
+    """
+    Monta listas de contexto (objetos/justificativas de DFDs, riscos, campos do ETP)
+    com tamanho limitado antes de irem para o prompt.
+
+    Etapas:
+    1. Deduplicação: textos iguais ou quase iguais (similaridade de Jaccard entre
+       trigramas de palavras >= dedup_threshold) viram um só, com a contagem.
+    2. Corte por item: cada texto é limitado a item_tokens (no fim de frase/palavra).
+    3. Orçamento total: se a lista ainda passa de budget_tokens, é resumida em
+       árvore (map-reduce): grupos de até group_tokens são resumidos em paralelo
+       e o processo se repete sobre os resumos até caber no orçamento.
+    """
+
+    MAX_REDUCE_LEVELS = 3
+
+    def __init__(self, item_tokens: int = 400, budget_tokens: int = 6000,
+                 group_tokens: int = 3000, dedup_threshold: float = 0.85):
+        self.item_tokens = item_tokens
+        self.budget_tokens = budget_tokens
+        self.group_tokens = group_tokens
+        self.dedup_threshold = dedup_threshold
+
+    @classmethod
+    def from_settings(cls) -> "ContextBuilder":
+        return cls(
+            item_tokens=settings.AI_CONTEXT_ITEM_TOKENS,
+            budget_tokens=settings.AI_CONTEXT_BUDGET_TOKENS,
+            group_tokens=settings.AI_CONTEXT_GROUP_TOKENS,
+            dedup_threshold=settings.AI_CONTEXT_DEDUP_THRESHOLD,
+        )
+
+    # --- Etapa 1: deduplicação ---
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+    @staticmethod
+    def _shingles(normalized: str) -> set[str]:
+        words = normalized.split()
+        if len(words) < 3:
+            return {normalized}
+        return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def dedupe(self, texts: list[str]) -> list[str]:
+        """Remove vazios e quase-duplicados, mantendo a ordem e anotando a contagem."""
+        kept: list[tuple[str, str, set[str], int]] = []  # (texto, normalizado, shingles, ocorrências)
+        for text in texts:
+            if not text or not text.strip():
+                continue
+            normalized = self._normalize(text)
+            shingles = self._shingles(normalized)
+            for i, (k_text, k_norm, k_sh, count) in enumerate(kept):
+                if normalized == k_norm or self._jaccard(shingles, k_sh) >= self.dedup_threshold:
+                    kept[i] = (k_text, k_norm, k_sh, count + 1)
+                    break
+            else:
+                kept.append((text.strip(), normalized, shingles, 1))
+
+        return [text if count == 1 else f"{text} (repetido {count}x)" for text, _, _, count in kept]
+
+    @staticmethod
+    def _jaccard(a: set[str], b: set[str]) -> float:
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    # --- Etapa 2: corte por item ---
+    @staticmethod
+    def trim(text: str | None, max_tokens: int) -> str:
+        """Limita o texto a max_tokens, cortando no fim de frase (ou palavra) mais próximo."""
+        if not text:
+            return ""
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max_chars]
+        end = max(cut.rfind(". "), cut.rfind(".\n"))
+        if end < max_chars // 2:
+            end = cut.rfind(" ")
+        return cut[:end + 1 if end > 0 else max_chars].rstrip() + " [...]"
+
+    def fit(self, texts: list[str]) -> list[str]:
+        """Etapas 1 e 2 (determinísticas, sem chamada à IA)."""
+        return [self.trim(t, self.item_tokens) for t in self.dedupe(texts)]
+
+    def total_tokens(self, texts: list[str]) -> int:
+        # +2 por item: marcador "- " e quebra de linha na lista do prompt
+        return sum(estimate_tokens(t) + 2 for t in texts)
+
+    def hard_cap(self, texts: list[str]) -> list[str]:
+        """Último recurso: mantém os primeiros itens que cabem no orçamento."""
+        kept, used = [], 0
+        for text in texts:
+            cost = estimate_tokens(text) + 2
+            if used + cost > self.budget_tokens:
+                kept.append(f"(+{len(texts) - len(kept)} itens omitidos por limite de contexto)")
+                break
+            kept.append(text)
+            used += cost
+        return kept
+
+    # --- Etapa 3: map-reduce ---
+    def _groups(self, texts: list[str]) -> list[list[str]]:
+        groups, current, used = [], [], 0
+        for text in texts:
+            cost = estimate_tokens(text) + 2
+            if current and used + cost > self.group_tokens:
+                groups.append(current)
+                current, used = [], 0
+            current.append(text)
+            used += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    async def compact(self, texts: list[str], summarize: Callable[[list[str]], Awaitable[str | None]]) -> list[str]:
+        """
+        Devolve a lista pronta para o prompt, dentro de budget_tokens.
+        summarize(grupo) resume um grupo de textos (None se a geração falhar).
+        """
+        items = self.fit(texts)
+        level = 0
+        while self.total_tokens(items) > self.budget_tokens and level < self.MAX_REDUCE_LEVELS and len(items) > 1:
+            level += 1
+            groups = self._groups(items)
+            # Map: resumos parciais em paralelo (o semáforo do AIService limita a concorrência)
+            summaries = await asyncio.gather(*(summarize(group) for group in groups))
+            reduced = []
+            for group, summary in zip(groups, summaries):
+                if summary:
+                    reduced.append(self.trim(summary, self.item_tokens))
+                else:
+                    # Falha no resumo: mantém o grupo cortado, o hard_cap garante o limite
+                    reduced.extend(self.trim(t, self.item_tokens // 2) for t in group)
+            logger.info(f"Contexto reduzido: {len(items)} -> {len(reduced)} itens (nível {level}).")
+            items = reduced
+
+        if self.total_tokens(items) > self.budget_tokens:
+            items = self.hard_cap(items)
+        return items
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import random
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.planejamento.ai_job_model import AIJob
+from app.repositories.planejamento.ai_job_repository import AIJobRepository
+from app.repositories.planejamento.dfd_repository import DFDRepository
+from app.repositories.planejamento.etp_repository import ETPRepository
+from app.services.planejamento.ai_service import AIService
+from app.services.planejamento.ai_client_registry import AIClientRegistry, AIUnavailableError, CircuitOpenError, ai_registry
+
+logger = logging.getLogger(__name__)
+
+# Seções aceitas por tipo de documento -> campo que recebe o texto gerado
+DFD_JOB_SECTIONS = {
+    "dfd_object": "descricao_sucinta",
+    "dfd_justification": "justificativa_necessidade",
+}
+ETP_JOB_SECTIONS = {section: field for section, (field, _) in AIService.ETP_FULL_PLAN.items()}
+JOB_SECTIONS = {"dfd": DFD_JOB_SECTIONS, "etp": ETP_JOB_SECTIONS}
+
+# Erros que valem nova tentativa (rede, timeout, cota, indisponibilidade)
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    CircuitOpenError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# descricao_sucinta do DFD é String(255)
+DFD_OBJECT_MAX_LEN = 255
+
+# Teto da espera entre tentativas de criar o cliente de IA (chave inválida, provedor fora)
+AI_UNAVAILABLE_MAX_WAIT_SECONDS = 300
+
+class RateLimiter:
+    """
+    Limite de chamadas por minuto compartilhado pelos workers de um processo.
+    Espaça as chamadas em intervalos de 60/rate segundos.
+    O estado fica na memória do processo: com N processos (ex: uvicorn
+    --workers N), o limite efetivo é N x AI_JOBS_RATE_PER_MINUTE. Para
+    respeitar a cota do provedor, divida o valor pelo número de processos.
+    """
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class AIJobWorker:
+    """
+    Pool de workers que consome a fila ia_jobs.
+    Cada worker reserva um job (SKIP LOCKED), respeita o rate limit global,
+    chama o AIService e grava o texto no DFD/ETP de destino.
+    Erros transitórios voltam para a fila com backoff exponencial (com jitter)
+    até AI_JOBS_MAX_ATTEMPTS; os demais encerram o job com status 'erro'.
+
+    Sem ai_service fixo, o cliente vem do ai_registry a cada job: o startup não
+    cria o cliente, e se a criação falhar (AIUnavailableError) nenhum job é
+    reservado; o worker espera (backoff até AI_UNAVAILABLE_MAX_WAIT_SECONDS) e
+    tenta de novo, voltando a consumir a fila assim que o provedor responder.
+    """
+
+    def __init__(self, ai_service: AIService | None = None, workers: int = 4, rate_per_minute: int = 60,
+                 max_attempts: int = 5, backoff_seconds: float = 5.0, poll_seconds: float = 2.0,
+                 session_factory=AsyncSessionLocal, registry: AIClientRegistry = ai_registry):
+        self.ai_service = ai_service
+        self.registry = registry
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory
+        self.rate_limiter = RateLimiter(rate_per_minute)
+        self._tasks: list[asyncio.Task] = []
+
+    @classmethod
+    def from_settings(cls, ai_service: AIService | None = None) -> "AIJobWorker":
+        return cls(
+            ai_service,
+            workers=settings.AI_JOBS_WORKERS,
+            rate_per_minute=settings.AI_JOBS_RATE_PER_MINUTE,
+            max_attempts=settings.AI_JOBS_MAX_ATTEMPTS,
+            backoff_seconds=settings.AI_JOBS_BACKOFF_SECONDS,
+            poll_seconds=settings.AI_JOBS_POLL_SECONDS,
+        )
+
+    async def start(self):
+        if self._tasks:
+            return
+        # Jobs que ficaram em 'executando' num processo que caiu voltam para a fila
+        async with self.session_factory() as db:
+            requeued = await AIJobRepository(db).requeue_stale(older_than_seconds=settings.AI_TIMEOUT_SECONDS * 2)
+        if requeued:
+            logger.warning(f"{requeued} jobs de IA presos em execução foram reenfileirados.")
+
+        self._tasks = [asyncio.create_task(self._run(n), name=f"ai-job-worker-{n}") for n in range(self.workers)]
+        logger.info(f"Fila de IA: {self.workers} workers iniciados.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_until_empty(self):
+        """Processa a fila até não haver jobs liberados (scripts e testes offline)."""
+        while await self.process_next():
+            pass
+
+    async def process_next(self) -> bool:
+        """
+        Reserva e processa um job. False quando não há nada liberado na fila.
+        AIUnavailableError (sem cliente de IA) sai antes de reservar o job.
+        """
+        ai_service = self.ai_service or self.registry.get()
+        async with self.session_factory() as db:
+            repo = AIJobRepository(db)
+            job = await repo.claim_next()
+            if job is None:
+                return False
+            await self._process(db, repo, job, ai_service)
+            return True
+
+    async def _run(self, n: int):
+        indisponivel = 0
+        while True:
+            try:
+                if not await self.process_next():
+                    await asyncio.sleep(self.poll_seconds)
+                indisponivel = 0
+            except asyncio.CancelledError:
+                raise
+            except AIUnavailableError as e:
+                indisponivel += 1
+                delay = min(self.poll_seconds * 2 ** indisponivel, AI_UNAVAILABLE_MAX_WAIT_SECONDS)
+                logger.warning(f"Worker de IA {n}: cliente indisponível ({e}). Nova tentativa em {delay:.0f}s.")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # Falha de infraestrutura (ex: banco fora): espera e tenta de novo
+                logger.error(f"Worker de IA {n}: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _process(self, db, repo: AIJobRepository, job: AIJob, ai_service: AIService):
+        try:
+            field, kwargs, target_repo = await self._prepare(db, job)
+            await self.rate_limiter.acquire()
+            text = await ai_service.generate_async(job.secao, raise_errors=True, **kwargs)
+
+            aviso = None
+            if field == "descricao_sucinta" and len(text) > DFD_OBJECT_MAX_LEN:
+                aviso = f"Texto com mais de {DFD_OBJECT_MAX_LEN} caracteres: não aplicado ao DFD, revise o resultado."
+            else:
+                await target_repo.update(job.alvo_id, {field: text})
+            await repo.mark_done(job, text, aviso)
+
+        except TRANSIENT_ERRORS as e:
+            erro = f"{type(e).__name__}: {e}"
+            if job.tentativas >= self.max_attempts:
+                await repo.mark_failed(job, f"{erro} (após {job.tentativas} tentativas)")
+                return
+            delay = self.backoff_seconds * (2 ** (job.tentativas - 1)) * random.uniform(0.5, 1.5)
+            logger.warning(f"Job de IA {job.id}: {erro}. Nova tentativa em {delay:.0f}s.")
+            await repo.mark_retry(job, erro, delay)
+        except Exception as e:
+            logger.error(f"Job de IA {job.id} falhou: {e}")
+            await db.rollback()
+            await repo.mark_failed(job, f"{type(e).__name__}: {e}")
+
+    async def _prepare(self, db, job: AIJob):
+        """Carrega o documento e monta (campo de destino, kwargs do prompt, repositório)."""
+        if job.tipo_alvo == "dfd":
+            dfd_repo = DFDRepository(db)
+            dfd = await dfd_repo.get_by_id(job.alvo_id)
+            if not dfd:
+                raise LookupError(f"DFD {job.alvo_id} não encontrado")
+            if job.secao == "dfd_object":
+                kwargs = {"draft_text": dfd.descricao_sucinta or ""}
+            else:
+                kwargs = {"object_text": dfd.descricao_sucinta or "", "draft_text": dfd.justificativa_necessidade or ""}
+            return DFD_JOB_SECTIONS[job.secao], kwargs, dfd_repo
+
+        etp_repo = ETPRepository(db)
+        etp = await etp_repo.get_by_id(job.alvo_id)
+        if not etp:
+            raise LookupError(f"ETP {job.alvo_id} não encontrado")
+        dfd_object, dfd_justification = AIService.dfd_context(etp.dfds)
+        kwargs = {"dfd_object": dfd_object}
+        if job.secao == "etp_need":
+            kwargs["dfd_justification"] = dfd_justification
+        # Dependências usam o texto já gravado no ETP (ex: levantamento de mercado)
+        for source, param in AIService.ETP_FULL_PLAN[job.secao][1]:
+            kwargs[param] = getattr(etp, ETP_JOB_SECTIONS[source]) or ""
+        return ETP_JOB_SECTIONS[job.secao], kwargs, etp_repo
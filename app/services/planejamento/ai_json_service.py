@@ -0,0 +1,73 @@
+import json
+import re
+from typing import Any, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+# Chaves comuns quando o modelo embrulha a lista num objeto: {"riscos": [...]}
+LIST_WRAPPER_KEYS = ("itens", "riscos", "items", "data", "resultado")
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([\]}])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"'})
+
+def extract_json(text: str) -> Any:
+    """
+    Lê o JSON devolvido pela IA, reparando os defeitos mais comuns:
+    cercas de markdown, texto antes/depois do JSON, aspas tipográficas e
+    vírgula sobrando antes de ] ou }. Levanta ValueError se não houver JSON.
+    """
+    if not text or not text.strip():
+        raise ValueError("Resposta vazia")
+
+    candidate = _FENCE.sub("", text.strip())
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    # Recorta do primeiro [ ou { até o último ] ou } correspondente
+    starts = [i for i in (candidate.find("["), candidate.find("{")) if i >= 0]
+    if not starts:
+        raise ValueError("Nenhum JSON encontrado na resposta")
+    start = min(starts)
+    end = candidate.rfind("]" if candidate[start] == "[" else "}")
+    if end <= start:
+        raise ValueError("JSON incompleto na resposta")
+
+    repaired = _TRAILING_COMMA.sub(r"\1", candidate[start:end + 1].translate(_SMART_QUOTES))
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido: {e.msg} (posição {e.pos})") from e
+
+def validate_items(data: Any, schema: Type[T]) -> tuple[list[T], list[str]]:
+    """
+    Valida cada item de uma lista contra o schema.
+    Retorna (itens válidos, mensagens de erro dos itens descartados).
+    Aceita também um objeto único ou uma lista embrulhada ({"riscos": [...]}).
+    """
+    if isinstance(data, dict):
+        wrapped = next((data[k] for k in LIST_WRAPPER_KEYS if isinstance(data.get(k), list)), None)
+        data = wrapped if wrapped is not None else [data]
+    if not isinstance(data, list):
+        return [], [f"Esperada uma lista, recebido {type(data).__name__}"]
+
+    valid, errors = [], []
+    for i, raw in enumerate(data):
+        try:
+            valid.append(schema.model_validate(raw))
+        except ValidationError as e:
+            detalhes = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+            errors.append(f"item {i}: {detalhes}")
+    return valid, errors
+
+def parse_items(text: str, schema: Type[T]) -> tuple[list[T], list[str]]:
+    """extract_json + validate_items; erros de parsing voltam na lista de erros."""
+    try:
+        data = extract_json(text)
+    except ValueError as e:
+        return [], [str(e)]
+    return validate_items(data, schema)
@@ -1,25 +1,151 @@
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 import os
 from dotenv import load_dotenv
 
+from app.core.config import settings
+from app.core.profiling import timed
+from app.services.planejamento.ai_cache_service import AICache, build_ai_cache
+from app.services.planejamento.ai_usage_service import build_ai_usage_recorder
+from app.services.planejamento.ai_stub_model import LocalStubModel
+from app.services.planejamento.ai_context_service import ContextBuilder
+from app.services.planejamento.ai_client_registry import CircuitOpenError, build_circuit_breaker
+from app.services.planejamento.ai_json_service import parse_items
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Configuração de Segurança (Blindagem)
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+# Schema de saída da matriz de riscos (modo JSON do Gemini).
+# Campos e escala iguais ao modelo ItemRisco / RiscoSugerido.
+RISKS_RESPONSE_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "tipo": {"type": "string", "enum": ["Técnico", "Externo", "Administrativo", "Financeiro", "Legal"]},
+            "descricao": {"type": "string"},
+            "probabilidade": {"type": "integer"},
+            "impacto": {"type": "integer"},
+            "acao_preventiva": {"type": "string"},
+            "acao_contingencia": {"type": "string"},
+            "responsavel": {"type": "string", "enum": ["Fiscal do Contrato", "Gestor do Contrato", "Contratada", "Área Demandante"]},
+        },
+        "required": ["tipo", "descricao", "probabilidade", "impacto", "acao_preventiva", "responsavel"],
+    },
+}
+
+class AIGenerationError(Exception):
+    """Falha da geração quando o chamador pede exceção em vez de texto de erro."""
+
 class AIService:
+    # Seções disponíveis para a API assíncrona (generate_async).
+    # Cada seção aponta para o método que monta o prompt correspondente.
+    SECTIONS = {
+        "dfd_object": "_prompt_dfd_object",
+        "dfd_justification": "_prompt_dfd_justification",
+        "etp_need": "_prompt_etp_need",
+        "etp_requirements": "_prompt_etp_requirements",
+        "etp_motivation": "_prompt_etp_motivation",
+        "etp_market_analysis": "_prompt_etp_market_analysis",
+        "etp_choice_justification": "_prompt_etp_choice_justification",
+        "etp_solution_description": "_prompt_etp_solution_description",
+        "etp_parceling_justification": "_prompt_etp_parceling_justification",
+        "etp_results": "_prompt_etp_results",
+        "etp_prior_measures": "_prompt_etp_prior_measures",
+        "etp_environmental_impacts": "_prompt_etp_environmental_impacts",
+        "etp_viability": "_prompt_etp_viability",
+        "consolidated_object": "_prompt_consolidated_object",
+        "consolidated_justification": "_prompt_consolidated_justification",
+        "consolidated_text": "_prompt_consolidated_text",
+        "risks": "_prompt_risks",
+        "tr_clause": "_prompt_tr_clause",
+        "context_summary": "_prompt_context_summary",
+        "json_repair": "_prompt_json_repair",
+    }
+
+    # Seções com saída estruturada: pedem JSON ao modelo (response_mime_type)
+    # já com o schema, em vez de texto livre tratado no frontend.
+    JSON_SECTIONS = {
+        "risks": RISKS_RESPONSE_SCHEMA,
+    }
+
+    # Seções cujo parâmetro é uma lista de textos de DFDs: passam pelo
+    # ContextBuilder (dedup + corte + map-reduce) antes de montar o prompt.
+    COMPACT_LIST_PARAMS = {
+        "consolidated_object": "objects_list",
+        "consolidated_justification": "justifications_list",
+        "consolidated_text": "text_list",
+    }
+
+    # Plano do ETP completo: seção -> (campo do ETP, dependências).
+    # Dependência = (seção de origem, parâmetro do prompt que recebe o texto gerado).
+    ETP_FULL_PLAN = {
+        "etp_need": ("descricao_necessidade", ()),
+        "etp_requirements": ("requisitos_tecnicos", ()),
+        "etp_motivation": ("motivacao_contratacao", ()),
+        "etp_market_analysis": ("levantamento_mercado", ()),
+        "etp_choice_justification": ("justificativa_escolha", (("etp_market_analysis", "market_analysis_context"),)),
+        "etp_solution_description": ("descricao_solucao", (("etp_requirements", "requirements_text"),)),
+        "etp_parceling_justification": ("justificativa_parcelamento", ()),
+        "etp_results": ("demonstrativo_resultados", ()),
+        "etp_prior_measures": ("providencias_previas", ()),
+        "etp_environmental_impacts": ("impactos_ambientais", ()),
+        "etp_viability": ("conclusao_viabilidade", ()),
+    }
+
+    # Prefixos das mensagens devolvidas no lugar do texto quando a geração falha
+    ERROR_PREFIXES = ("Erro na geração", "IA retornou vazio")
+
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("A variável GEMINI_API_KEY não está configurada.")
-        
-        genai.configure(api_key=api_key)
-        
-        # MUDANÇA CRÍTICA: Voltamos para o alias estável.
-        # Agora ele vai funcionar porque temos o 'safety_settings' abaixo.
-        self.model_name = 'gemini-flash-latest' 
-        self.model = genai.GenerativeModel(self.model_name)
+        if settings.AI_MODEL_BACKEND.lower() == "stub":
+            # Modelo local (sem rede nem chave): desenvolvimento e testes offline
+            self.model = LocalStubModel(latency_seconds=settings.AI_STUB_LATENCY_SECONDS)
+            self.model_name = self.model.model_name
+        else:
+            api_key = settings.GEMINI_API_KEY or os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("A variável GEMINI_API_KEY não está configurada.")
+            
+            genai.configure(api_key=api_key)
+            
+            # MUDANÇA CRÍTICA: Voltamos para o alias estável.
+            # Agora ele vai funcionar porque temos o 'safety_settings' abaixo.
+            self.model_name = 'gemini-flash-latest' 
+            self.model = genai.GenerativeModel(self.model_name)
+
+        # Limite de chamadas simultâneas ao modelo e tempo máximo por chamada.
+        # O semáforo é compartilhado por todas as rotas que usam esta instância.
+        self.timeout = settings.AI_TIMEOUT_SECONDS
+        self._semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+
+        # Disjuntor: após falhas seguidas do provedor, recusa na hora em vez de esperar timeouts
+        self.breaker = build_circuit_breaker()
+
+        # Cache de respostas (None quando AI_CACHE_BACKEND='none')
+        self.cache = build_ai_cache()
+
+        # Telemetria de tokens/latência por chamada (None quando desligada)
+        self.usage = build_ai_usage_recorder()
+
+        # Orçamento de contexto para listas longas (ETP consolidado, riscos)
+        self.context = ContextBuilder.from_settings()
 
     # --- Método 1: Objeto ---
-    def generate_dfd_object(self, draft_text: str, user_instructions: str = "") -> str:
+    def _prompt_dfd_object(self, draft_text: str, user_instructions: str = "") -> str:
         prompt = f"""
         Role: Você é um Especialista em Licitações Públicas da Prefeitura de Braúnas/MG.
         Tarefa: Sua função é reescrever o texto do usuário para criar o campo 'Objeto' de um Documento de Formalização de Demanda (DFD).
@@ -34,10 +160,10 @@ class AIService:
         
         Saída (Apenas o texto final):
         """
-        return self._generate_safe_content(prompt)
+        return prompt
 
     # --- Método 2: Justificativa ---
-    def generate_dfd_justification(self, object_text: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_dfd_justification(self, object_text: str, draft_text: str = "", user_instructions: str = "") -> str:
         
         rascunho_usuario = draft_text if draft_text else "Não informado. Crie uma justificativa genérica baseada no objeto."
 
@@ -63,9 +189,9 @@ class AIService:
         
         Saída (Apenas o texto final):
         """
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_need(self, dfd_object: str, dfd_justification: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_need(self, dfd_object: str, dfd_justification: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a 'Descrição da Necessidade' do ETP, focando em riscos e capacidade de resposta.
         """
@@ -95,9 +221,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_etp_requirements(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_requirements(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera os Requisitos Técnicos em texto corrido (blindagem jurídica e sustentabilidade).
         """
@@ -123,9 +249,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_motivation(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_motivation(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a Motivação da contratação (Princípios da Adm. Pública).
         """
@@ -151,9 +277,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_market_analysis(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_market_analysis(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera o Levantamento de Mercado citando o Decreto 21/2023 e defendendo o SRP.
         """
@@ -179,9 +305,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_choice_justification(self, dfd_object: str, market_analysis_context: str = "", draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_choice_justification(self, dfd_object: str, market_analysis_context: str = "", draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a Justificativa da Escolha defendendo Pregão Eletrônico + SRP.
         """
@@ -211,9 +337,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_solution_description(self, dfd_object: str, requirements_text: str = "", draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_solution_description(self, dfd_object: str, requirements_text: str = "", draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a Descrição da Solução cobrindo o Ciclo de Vida (Aquisição -> Uso -> Descarte).
         """
@@ -242,9 +368,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_etp_parceling_justification(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_parceling_justification(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a Justificativa do Parcelamento (Regra: Súmula 247 TCU).
         """
@@ -273,9 +399,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_etp_results(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_results(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera o Demonstrativo de Resultados (Quantitativo vs Qualitativo).
         """
@@ -300,9 +426,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_prior_measures(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_prior_measures(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera as Providências Prévias (Foco em celeridade vs necessidades específicas).
         """
@@ -329,9 +455,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_etp_environmental_impacts(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_environmental_impacts(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera os Impactos Ambientais (Mitigação normativa CONAMA/ANVISA).
         """
@@ -358,9 +484,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_etp_viability(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+    def _prompt_etp_viability(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
         """
         Gera a Conclusão da Viabilidade (O 'De Acordo' final).
         """
@@ -390,9 +516,9 @@ class AIService:
         Saída (Apenas o texto final):
         """
         
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_consolidated_object(self, objects_list: list[str]) -> str:
+    def _prompt_consolidated_object(self, objects_list: list[str]) -> str:
         """
         Recebe uma lista de objetos de vários DFDs e cria um texto unificado para o ETP.
         """
@@ -413,9 +539,9 @@ class AIService:
 
         Saída (Apenas o texto do Objeto Unificado):
         """
-        return self._generate_safe_content(prompt)
+        return prompt
 
-    def generate_consolidated_justification(self, justifications_list: list[str]) -> str:
+    def _prompt_consolidated_justification(self, justifications_list: list[str]) -> str:
         """
         Sintetiza as justificativas dos DFDs em uma justificativa global de ganho de escala.
         """
@@ -435,9 +561,9 @@ class AIService:
 
         Saída (Texto corrido, 1 ou 2 parágrafos):
         """
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_consolidated_text(self, text_list: list[str], type: str) -> str:
+    def _prompt_consolidated_text(self, text_list: list[str], type: str) -> str:
         """
         Gera texto unificado. type pode ser 'objeto' ou 'justificativa'.
         """
@@ -462,38 +588,59 @@ class AIService:
             Saída (Texto corrido, 1 parágrafo):
             """
             
-        return self._generate_safe_content(prompt)
+        return prompt
     
-    def generate_risks(self, etp_object: str) -> str:
+    def _prompt_risks(self, etp_object: str) -> str:
         """
-        Gera uma lista de riscos prováveis em formato JSON para o frontend.
+        Gera os riscos prováveis da contratação em JSON (modo estruturado, ver JSON_SECTIONS).
         """
         prompt = f"""
         Role: Especialista em Gestão de Riscos em Contratações Públicas (Lei 14.133/21).
-        Tarefa: Identificar 3 a 5 riscos principais para o objeto abaixo e sugerir medidas preventivas.
+        Tarefa: Identificar 3 a 5 riscos principais para o objeto abaixo e sugerir medidas preventivas e de contingência.
         
         Objeto da Contratação: "{etp_object}"
         
         Formato de Saída (JSON Array estrito, sem markdown):
         [
             {{
-                "descricao_risco": "Descrição curta do risco",
-                "probabilidade": "Baixa" | "Média" | "Alta",
-                "impacto": "Baixo" | "Médio" | "Alto",
-                "medida_preventiva": "Ação para mitigar",
-                "responsavel": "Fiscal do Contrato" | "Gestor" | "Contratada"
+                "tipo": "Técnico" | "Externo" | "Administrativo" | "Financeiro" | "Legal",
+                "descricao": "Descrição curta do evento de risco",
+                "probabilidade": 1 a 5 (1 = raro, 5 = quase certo),
+                "impacto": 1 a 5 (1 = insignificante, 5 = catastrófico),
+                "acao_preventiva": "Ação para evitar que aconteça",
+                "acao_contingencia": "Ação caso aconteça",
+                "responsavel": "Fiscal do Contrato" | "Gestor do Contrato" | "Contratada" | "Área Demandante"
             }}
         ]
         """
-        # Nota: O 'generation_config={"response_mime_type": "application/json"}' 
-        # seria ideal aqui se estivéssemos usando a SDK mais nova, 
-        # mas vamos pedir texto puro e tratar no front ou backend.
-        
-        return self._generate_safe_content(prompt)
+        return prompt
+
+    def _prompt_json_repair(self, raw_output: str, errors: str, schema: str) -> str:
+        """
+        Segunda tentativa da saída estruturada: pede a correção do JSON inválido.
+        """
+        prompt = f"""
+        Tarefa: Corrigir o JSON abaixo para que siga exatamente o schema indicado.
+        Mantenha o conteúdo; ajuste apenas estrutura, nomes de campos e tipos.
+
+        Schema:
+        {schema}
+
+        Erros encontrados:
+        {errors}
+
+        JSON recebido:
+        {raw_output}
 
-    def generate_tr_clause(self, section: str, etp_data: str, risks_data: str) -> str:
+        Saída: apenas o JSON corrigido, sem markdown.
+        """
+        return prompt
+
+    def _prompt_tr_clause(self, clausula: str, etp_data: str, risks_data: str) -> str:
         """
         Gera uma cláusula específica do TR baseada no ETP e Riscos.
+        clausula: obrigacoes, pagamento, execucao ou qualificacao (não confundir
+        com a seção de IA 'tr_clause' de generate_async/stream_async).
         """
         prompts = {
             "obrigacoes": "Escreva as 'Obrigações da Contratada' e 'Obrigações da Contratante' detalhadas, focando em prazos, qualidade e garantias.",
@@ -502,7 +649,7 @@ class AIService:
             "qualificacao": "Escreva os requisitos de 'Habilitação Técnica' e 'Qualificação Econômica' necessários para este objeto."
         }
         
-        instruction = prompts.get(section, "Escreva uma cláusula técnica e jurídica adequada para Termo de Referência.")
+        instruction = prompts.get(clausula, "Escreva uma cláusula técnica e jurídica adequada para Termo de Referência.")
 
         prompt = f"""
         Role: Advogado Especialista em Licitações e Contratos Administrativos.
@@ -519,34 +666,457 @@ class AIService:
         
         Saída: Texto formatado em Markdown, pronto para copiar e colar no documento. Use linguagem formal jurídica.
         """
-        return self._generate_safe_content(prompt)
-    
+        return prompt
+
+    def _prompt_context_summary(self, items: list[str], kind: str = "textos") -> str:
+        """
+        Etapa 'map' da compactação de contexto: resume um grupo de textos de DFDs/riscos.
+        """
+        lista_formatada = "\n".join([f"- {item}" for item in items])
+
+        prompt = f"""
+        Role: Especialista em Licitações Públicas.
+        Tarefa: Condensar a lista de {kind} abaixo em um único parágrafo curto, que será usado como contexto em outro documento.
+
+        Regras:
+        1. Preserve todos os itens/objetos distintos, finalidades, unidades demandantes e quantidades citadas.
+        2. Elimine repetições e redação redundante.
+        3. Não invente informações. Não use tópicos.
+        4. Máximo de 120 palavras.
+
+        Lista:
+        {lista_formatada}
+
+        Saída (Apenas o parágrafo):
+        """
+        return prompt
+
+    # --- API Assíncrona ---
+    def build_prompt(self, section: str, **kwargs) -> str:
+        """
+        Monta o prompt de uma seção (ex: 'etp_need') com os mesmos
+        construtores usados pelos métodos síncronos.
+        """
+        builder = self.SECTIONS.get(section)
+        if builder is None:
+            raise ValueError(f"Seção de IA desconhecida: '{section}'")
+        return getattr(self, builder)(**kwargs)
+
+    async def generate_async(self, section: str, bypass_cache: bool = False, raise_errors: bool = False,
+                             response_schema: dict | None = None, **kwargs) -> str:
+        """
+        Versão não bloqueante dos métodos generate_*.
+        Ex: await ai_service.generate_async("etp_need", dfd_object=..., dfd_justification=...)
+        bypass_cache=True força uma nova chamada ao modelo (o resultado novo substitui o do cache).
+        raise_errors=True propaga a exceção original (timeout, 429...) em vez de devolver
+        o texto de erro; usado pela fila de jobs para decidir se tenta de novo.
+        response_schema pede saída JSON nesse schema (padrão: JSON_SECTIONS da seção).
+        """
+        kwargs = await self._compact_kwargs(section, kwargs, bypass_cache)
+        prompt = self.build_prompt(section, **kwargs)
+        return await self._generate_safe_content_async(
+            prompt, bypass_cache=bypass_cache, section=section, raise_errors=raise_errors,
+            generation_config=self._generation_config(section, response_schema)
+        )
+
+    async def generate_structured(self, section: str, schema, bypass_cache: bool = False, **kwargs) -> list:
+        """
+        Geração estruturada: resposta em JSON validada contra o schema Pydantic.
+        Itens inválidos são descartados; se nenhum item for válido, o modelo recebe
+        a resposta e os erros para corrigir o JSON (uma tentativa).
+        Levanta AIGenerationError se mesmo assim não houver itens válidos.
+        """
+        response_schema = self.JSON_SECTIONS.get(section)
+        text = await self.generate_async(section, bypass_cache=bypass_cache, raise_errors=True, **kwargs)
+        items, errors = parse_items(text, schema)
+
+        if not items:
+            logger.warning(f"Saída JSON inválida na seção '{section}', pedindo correção: {errors[:3]}")
+            text = await self.generate_async(
+                "json_repair", bypass_cache=bypass_cache, raise_errors=True, response_schema=response_schema,
+                raw_output=text, errors="\n".join(errors[:10]),
+                schema=json.dumps(response_schema or schema.model_json_schema(), ensure_ascii=False)
+            )
+            items, errors = parse_items(text, schema)
+            if not items:
+                raise AIGenerationError(f"Resposta da IA fora do formato esperado: {'; '.join(errors[:3])}")
+
+        if errors:
+            logger.info(f"Seção '{section}': {len(errors)} itens descartados na validação: {errors[:3]}")
+        return items
+
+    async def stream_async(self, section: str, bypass_cache: bool = False, **kwargs) -> AsyncIterator[str]:
+        """
+        Versão em streaming de generate_async: devolve o texto em partes à medida
+        que o modelo gera. Usa os mesmos construtores de prompt e safety settings.
+        Ex: async for parte in ai_service.stream_async("etp_market_analysis", dfd_object=...)
+        """
+        kwargs = await self._compact_kwargs(section, kwargs, bypass_cache)
+        prompt = self.build_prompt(section, **kwargs)
+        async for chunk in self._stream_safe_content_async(prompt, bypass_cache=bypass_cache, section=section):
+            yield chunk
+
+    async def compact_texts(self, texts: list[str], kind: str = "textos", bypass_cache: bool = False) -> list[str]:
+        """
+        Lista de textos dentro do orçamento de contexto (ver ContextBuilder).
+        Os resumos parciais usam a seção 'context_summary' e passam pelo cache.
+        """
+        async def summarize(group: list[str]) -> str | None:
+            text = await self.generate_async("context_summary", bypass_cache=bypass_cache, items=group, kind=kind)
+            return None if self.is_error(text) else text
+
+        return await self.context.compact(texts, summarize)
+
+    async def _compact_kwargs(self, section: str, kwargs: dict, bypass_cache: bool) -> dict:
+        param = self.COMPACT_LIST_PARAMS.get(section)
+        if param is None or not kwargs.get(param):
+            return kwargs
+        kind = "justificativas" if section == "consolidated_justification" or kwargs.get("type") == "justificativa" else "objetos"
+        return {**kwargs, param: await self.compact_texts(kwargs[param], kind=kind, bypass_cache=bypass_cache)}
+
+    async def generate_etp_full(self, dfd_object: str, dfd_justification: str, draft_text: str = "",
+                                user_instructions: str = "", bypass_cache: bool = False) -> dict[str, str]:
+        """
+        Gera todas as seções do ETP de uma vez. Retorna {seção: texto}.
+        Seções independentes rodam em paralelo (até AI_ETP_FANOUT por requisição);
+        as dependentes aguardam apenas a seção de origem (ex: justificativa da
+        escolha espera o levantamento de mercado). O tempo total fica próximo
+        da maior cadeia de dependência, e não da soma das seções.
+        """
+        fanout = asyncio.Semaphore(settings.AI_ETP_FANOUT)
+        tasks: dict[str, asyncio.Task] = {}
+
+        base_kwargs = {"dfd_object": dfd_object, "draft_text": draft_text, "user_instructions": user_instructions}
+
+        async def run_section(section: str, dependencies: tuple) -> str:
+            kwargs = dict(base_kwargs)
+            if section == "etp_need":
+                kwargs["dfd_justification"] = dfd_justification
+            for source, param in dependencies:
+                source_text = await tasks[source]
+                # Falha na seção de origem não bloqueia a dependente: segue sem o contexto
+                kwargs[param] = "" if self.is_error(source_text) else source_text
+
+            async with fanout:
+                return await self.generate_async(section, bypass_cache=bypass_cache, **kwargs)
+
+        # O plano está em ordem topológica: a origem é criada antes da dependente
+        for section, (_, dependencies) in self.ETP_FULL_PLAN.items():
+            tasks[section] = asyncio.create_task(run_section(section, dependencies))
+
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks.keys(), results))
+
+    @staticmethod
+    def dfd_context(dfds) -> tuple[str, str]:
+        """(objeto, justificativa) consolidados dos DFDs de um ETP, usados nos prompts do ETP."""
+        dfd_object = "\n".join(d.descricao_sucinta for d in dfds if d.descricao_sucinta)
+        dfd_justification = "\n\n".join(d.justificativa_necessidade for d in dfds if d.justificativa_necessidade)
+        return dfd_object, dfd_justification
+
+    @classmethod
+    def is_error(cls, text: str | None) -> bool:
+        """True quando o texto é uma mensagem de falha da geração, não conteúdo."""
+        return not text or text.startswith(cls.ERROR_PREFIXES)
+
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {"backend": "none"}
+        return self.cache.stats()
+
+    # --- API Síncrona (Compatibilidade) ---
+    def generate_dfd_object(self, draft_text: str, user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_dfd_object(draft_text, user_instructions), section="dfd_object")
+
+    def generate_dfd_justification(self, object_text: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_dfd_justification(object_text, draft_text, user_instructions), section="dfd_justification")
+
+    def generate_etp_need(self, dfd_object: str, dfd_justification: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_need(dfd_object, dfd_justification, draft_text, user_instructions), section="etp_need")
+
+    def generate_etp_requirements(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_requirements(dfd_object, draft_text, user_instructions), section="etp_requirements")
+
+    def generate_etp_motivation(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_motivation(dfd_object, draft_text, user_instructions), section="etp_motivation")
+
+    def generate_etp_market_analysis(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_market_analysis(dfd_object, draft_text, user_instructions), section="etp_market_analysis")
+
+    def generate_etp_choice_justification(self, dfd_object: str, market_analysis_context: str = "", draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_choice_justification(dfd_object, market_analysis_context, draft_text, user_instructions), section="etp_choice_justification")
+
+    def generate_etp_solution_description(self, dfd_object: str, requirements_text: str = "", draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_solution_description(dfd_object, requirements_text, draft_text, user_instructions), section="etp_solution_description")
+
+    def generate_etp_parceling_justification(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_parceling_justification(dfd_object, draft_text, user_instructions), section="etp_parceling_justification")
+
+    def generate_etp_results(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_results(dfd_object, draft_text, user_instructions), section="etp_results")
+
+    def generate_etp_prior_measures(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_prior_measures(dfd_object, draft_text, user_instructions), section="etp_prior_measures")
+
+    def generate_etp_environmental_impacts(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_environmental_impacts(dfd_object, draft_text, user_instructions), section="etp_environmental_impacts")
+
+    def generate_etp_viability(self, dfd_object: str, draft_text: str = "", user_instructions: str = "") -> str:
+        return self._generate_safe_content(self._prompt_etp_viability(dfd_object, draft_text, user_instructions), section="etp_viability")
+
+    # Listas consolidadas: no caminho síncrono só dedup + corte (sem resumo map-reduce)
+    def generate_consolidated_object(self, objects_list: list[str]) -> str:
+        return self._generate_safe_content(self._prompt_consolidated_object(self._fit_list(objects_list)), section="consolidated_object")
+
+    def generate_consolidated_justification(self, justifications_list: list[str]) -> str:
+        return self._generate_safe_content(self._prompt_consolidated_justification(self._fit_list(justifications_list)), section="consolidated_justification")
+
+    def generate_consolidated_text(self, text_list: list[str], type: str) -> str:
+        return self._generate_safe_content(self._prompt_consolidated_text(self._fit_list(text_list), type), section="consolidated_text")
+
+    def generate_risks(self, etp_object: str) -> str:
+        return self._generate_safe_content(self._prompt_risks(etp_object), section="risks",
+                                           generation_config=self._generation_config("risks"))
+
+    def generate_tr_clause(self, clausula: str, etp_data: str, risks_data: str) -> str:
+        return self._generate_safe_content(self._prompt_tr_clause(clausula, etp_data, risks_data), section="tr_clause")
+
     # --- Método Auxiliar Privado (DRY) ---
-    def _generate_safe_content(self, prompt: str) -> str:
+    def _fit_list(self, texts: list[str]) -> list[str]:
+        items = self.context.fit(texts)
+        if self.context.total_tokens(items) > self.context.budget_tokens:
+            items = self.context.hard_cap(items)
+        return items
+
+    def _generation_config(self, section: str | None, response_schema: dict | None = None) -> dict | None:
+        schema = response_schema or self.JSON_SECTIONS.get(section)
+        if schema is None:
+            return None
+        return {"response_mime_type": "application/json", "response_schema": schema}
+
+    def _cache_lookup(self, prompt: str, bypass_cache: bool) -> tuple[str | None, str | None]:
+        """Retorna (chave, texto em cache). Chave None quando o cache está desligado."""
+        if self.cache is None:
+            return None, None
+        key = AICache.make_key(self.model_name, prompt, SAFETY_SETTINGS)
+        if bypass_cache:
+            return key, None
+        return key, self.cache.get(key)
+
+    async def _cache_lookup_async(self, prompt: str, bypass_cache: bool) -> tuple[str | None, str | None]:
+        """_cache_lookup para os caminhos assíncronos: o backend em disco lê fora do event loop."""
+        if self.cache is None:
+            return None, None
+        key = AICache.make_key(self.model_name, prompt, SAFETY_SETTINGS)
+        if bypass_cache:
+            return key, None
+        return key, await self.cache.aget(key)
+
+    def _cache_store(self, key: str | None, text: str):
+        # Só respostas válidas entram no cache (erros e respostas vazias não)
+        if key is not None:
+            self.cache.set(key, text)
+
+    async def _cache_store_async(self, key: str | None, text: str):
+        if key is not None:
+            await self.cache.aset(key, text)
+
+    def _record_usage(self, section: str | None, prompt: str, started: float, response=None,
+                      cache_hit: bool = False, error: str | None = None):
+        """Enfileira a telemetria da chamada (não faz I/O no caminho da requisição)."""
+        if self.usage is None:
+            return
+        usage = getattr(response, "usage_metadata", None)
+        self.usage.record(
+            section=section,
+            model_name=self.model_name,
+            latency_ms=int((time.perf_counter() - started) * 1000),
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+            cache_hit=cache_hit,
+            error=error,
+            params={"prompt_chars": len(prompt)},
+        )
+
+    def _generate_safe_content(self, prompt: str, bypass_cache: bool = False, section: str | None = None,
+                               generation_config: dict | None = None) -> str:
         """
         Método centralizado para chamar a IA com configurações de segurança.
         Evita repetir código de try/except e safety_settings.
         """
-        # Configuração de Segurança (Blindagem)
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
+        started = time.perf_counter()
+        cache_key, cached = self._cache_lookup(prompt, bypass_cache)
+        if cached is not None:
+            self._record_usage(section, prompt, started, cache_hit=True)
+            return cached
 
+        response = None
         try:
-            response = self.model.generate_content(
-                prompt, 
-                safety_settings=safety_settings
-            )
+            self.breaker.check()
+            with timed("ai"):
+                response = self.model.generate_content(
+                    prompt, 
+                    safety_settings=SAFETY_SETTINGS,
+                    generation_config=generation_config
+                )
+            self.breaker.record_success()
             
             if response.text:
-                return response.text.strip()
+                text = response.text.strip()
+                self._cache_store(cache_key, text)
+                self._record_usage(section, prompt, started, response)
+                return text
             else:
+                self._record_usage(section, prompt, started, response, error="EmptyResponse")
                 return "IA retornou vazio (Verifique filtros ou prompt)."
                 
+        except CircuitOpenError as e:
+            self._record_usage(section, prompt, started, error="CircuitOpen")
+            return f"Erro na geração: {str(e)}"
         except Exception as e:
-            print(f"❌ Erro na IA ({self.model_name}): {e}")
+            logger.error(f"Erro na IA ({self.model_name}): {e}")
+            if response is None:
+                self.breaker.record_failure()
+            self._record_usage(section, prompt, started, response, error=type(e).__name__)
             # Retorna o erro para o frontend ver o que houve
             return f"Erro na geração: {str(e)}"
+
+    async def _generate_safe_content_async(self, prompt: str, bypass_cache: bool = False, section: str | None = None,
+                                           raise_errors: bool = False, generation_config: dict | None = None) -> str:
+        """
+        Equivalente assíncrono de _generate_safe_content.
+        Não ocupa worker do threadpool: a espera pela IA é I/O puro no event loop.
+        O semáforo limita as chamadas simultâneas e cada chamada respeita self.timeout.
+        """
+        started = time.perf_counter()
+        cache_key, cached = await self._cache_lookup_async(prompt, bypass_cache)
+        if cached is not None:
+            self._record_usage(section, prompt, started, cache_hit=True)
+            return cached
+
+        response = None
+        try:
+            self.breaker.check()
+            async with self._semaphore:
+                with timed("ai"):
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(
+                            prompt,
+                            safety_settings=SAFETY_SETTINGS,
+                            generation_config=generation_config,
+                            request_options={"timeout": self.timeout}
+                        ),
+                        timeout=self.timeout
+                    )
+            self.breaker.record_success()
+
+            if response.text:
+                text = response.text.strip()
+                await self._cache_store_async(cache_key, text)
+                self._record_usage(section, prompt, started, response)
+                return text
+            else:
+                self._record_usage(section, prompt, started, response, error="EmptyResponse")
+                if raise_errors:
+                    raise AIGenerationError("IA retornou vazio (Verifique filtros ou prompt).")
+                return "IA retornou vazio (Verifique filtros ou prompt)."
+
+        except CircuitOpenError as e:
+            self._record_usage(section, prompt, started, error="CircuitOpen")
+            if raise_errors:
+                raise
+            return f"Erro na geração: {str(e)}"
+        except asyncio.TimeoutError:
+            logger.warning(f"Tempo limite de {self.timeout}s excedido na IA ({self.model_name}).")
+            self.breaker.record_failure()
+            self._record_usage(section, prompt, started, error="TimeoutError")
+            if raise_errors:
+                raise
+            return f"Erro na geração: tempo limite de {self.timeout}s excedido."
+        except AIGenerationError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro na IA ({self.model_name}): {e}")
+            if response is None:
+                self.breaker.record_failure()
+            self._record_usage(section, prompt, started, response, error=type(e).__name__)
+            if raise_errors:
+                raise
+            return f"Erro na geração: {str(e)}"
+
+    async def _stream_safe_content_async(self, prompt: str, bypass_cache: bool = False, section: str | None = None) -> AsyncIterator[str]:
+        """
+        Equivalente em streaming de _generate_safe_content_async.
+        Cache hit devolve o texto inteiro de uma vez. self.timeout vale para a
+        primeira parte e para o intervalo entre partes.
+        Se quem consome parar de iterar (cliente desconectou), o cancelamento chega
+        ao await pendente e a chamada ao modelo é encerrada, liberando o semáforo.
+        Erros são registrados e propagados: no meio de um stream não há como
+        devolvê-los como texto.
+        """
+        started = time.perf_counter()
+        cache_key, cached = await self._cache_lookup_async(prompt, bypass_cache)
+        if cached is not None:
+            self._record_usage(section, prompt, started, cache_hit=True)
+            yield cached
+            return
+
+        try:
+            self.breaker.check()
+        except CircuitOpenError:
+            self._record_usage(section, prompt, started, error="CircuitOpen")
+            raise
+
+        parts: list[str] = []
+        # A contagem de tokens chega no último chunk do stream
+        last_chunk = None
+        async with self._semaphore:
+            try:
+                # Só as esperas pelo modelo contam como "ai": o tempo entre partes
+                # é de quem consome o stream (envio ao cliente)
+                with timed("ai"):
+                    response = await asyncio.wait_for(
+                        self.model.generate_content_async(
+                            prompt,
+                            safety_settings=SAFETY_SETTINGS,
+                            stream=True,
+                            request_options={"timeout": self.timeout}
+                        ),
+                        timeout=self.timeout
+                    )
+
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        with timed("ai"):
+                            chunk = await asyncio.wait_for(anext(chunks), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    last_chunk = chunk
+                    text = chunk.text
+                    if text:
+                        parts.append(text)
+                        yield text
+
+            except asyncio.TimeoutError:
+                logger.warning(f"Tempo limite de {self.timeout}s excedido no streaming da IA ({self.model_name}).")
+                self.breaker.record_failure()
+                self._record_usage(section, prompt, started, last_chunk, error="TimeoutError")
+                raise
+            except (asyncio.CancelledError, GeneratorExit):
+                logger.info(f"Streaming da IA ({self.model_name}) interrompido pelo cliente.")
+                self._record_usage(section, prompt, started, last_chunk, error="Cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Erro no streaming da IA ({self.model_name}): {e}")
+                self.breaker.record_failure()
+                self._record_usage(section, prompt, started, last_chunk, error=type(e).__name__)
+                raise
+
+        self.breaker.record_success()
+        text = "".join(parts).strip()
+        if text:
+            await self._cache_store_async(cache_key, text)
+            self._record_usage(section, prompt, started, last_chunk)
+        else:
+            self._record_usage(section, prompt, started, last_chunk, error="EmptyResponse")
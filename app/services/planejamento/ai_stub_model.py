@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+@dataclass
+class StubUsage:
+    prompt_token_count: int
+    candidates_token_count: int
+
+    @property
+    def total_token_count(self) -> int:
+        return self.prompt_token_count + self.candidates_token_count
+
+@dataclass
+class StubResponse:
+    text: str
+    usage_metadata: StubUsage
+
+class StubStream:
+    """Imita o AsyncGenerateContentResponse do Gemini com stream=True."""
+    def __init__(self, chunks: list[StubResponse], latency_seconds: float):
+        self.chunks = chunks
+        self.latency_seconds = latency_seconds
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds / len(self.chunks))
+            yield chunk
+
+class LocalStubModel:
+    """
+    Modelo local determinístico com a mesma interface usada do GenerativeModel
+    (generate_content / generate_content_async, com e sem stream).
+    Não acessa a rede: serve para desenvolvimento e testes offline
+    (AI_MODEL_BACKEND='stub'). O mesmo prompt sempre gera o mesmo texto.
+    Com generation_config em modo JSON, devolve um exemplo válido do response_schema.
+    """
+    model_name = "local-stub"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
+    def _build(self, prompt: str, generation_config: dict | None = None) -> StubResponse:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        text = f"[Texto gerado pelo modelo local {digest}] Conteúdo de rascunho para revisão."
+        schema = (generation_config or {}).get("response_schema")
+        if schema:
+            text = json.dumps(self._example(schema, text), ensure_ascii=False)
+        usage = StubUsage(prompt_token_count=max(1, len(prompt) // 4), candidates_token_count=max(1, len(text) // 4))
+        return StubResponse(text=text, usage_metadata=usage)
+
+    @classmethod
+    def _example(cls, schema: dict, text: str):
+        """Instância mínima do schema (formato do response_schema do Gemini)."""
+        kind = schema.get("type", "string").lower()
+        if schema.get("enum"):
+            return schema["enum"][0]
+        if kind == "array":
+            return [cls._example(schema.get("items", {}), text)]
+        if kind == "object":
+            return {name: cls._example(prop, text) for name, prop in schema.get("properties", {}).items()}
+        if kind in ("integer", "number"):
+            return 3
+        if kind == "boolean":
+            return True
+        return text
+
+    def generate_content(self, prompt: str, generation_config: dict | None = None, **kwargs) -> StubResponse:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return self._build(prompt, generation_config)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, generation_config: dict | None = None, **kwargs):
+        response = self._build(prompt, generation_config)
+        if stream:
+            words = response.text.split(" ")
+            chunks = [
+                StubResponse(text=word + ("" if i == len(words) - 1 else " "),
+                             usage_metadata=response.usage_metadata)
+                for i, word in enumerate(words)
+            ]
+            return StubStream(chunks, self.latency_seconds)
+
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return response
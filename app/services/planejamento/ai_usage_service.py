@@ -0,0 +1,124 @@
+import atexit
+import logging
+import queue
+import threading
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.core.log_documento_model import LogDocumento
+
+logger = logging.getLogger(__name__)
+
+class AIUsageRecorder:
+    """
+    Grava a telemetria das chamadas à IA (tokens, latência, cache hit, erro)
+    em LogDocumento sem tocar no caminho da requisição.
+
+    record() só enfileira (O(1), nunca bloqueia). Uma thread daemon esvazia a
+    fila em lotes de até AI_USAGE_BATCH_SIZE registros, a cada
+    AI_USAGE_FLUSH_SECONDS, com uma única transação por lote. Se a fila
+    lotar (banco fora do ar), os registros excedentes são descartados e contados.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_seconds: float = 2.0, max_queue: int = 10000):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, section: str | None, model_name: str, latency_ms: int, prompt_tokens: int | None = None,
+               response_tokens: int | None = None, cache_hit: bool = False, error: str | None = None,
+               params: dict | None = None):
+        entry = {
+            "nome_arquivo_gerado": f"ia/{section or 'livre'}",
+            "tipo_arquivo": "txt",
+            "ia_model": model_name,
+            "secao": section,
+            "tokens_prompt": prompt_tokens,
+            "tokens_resposta": response_tokens,
+            "tokens_utilizados": (prompt_tokens or 0) + (response_tokens or 0),
+            "latencia_ms": latency_ms,
+            "cache_hit": cache_hit,
+            "erro": error,
+            "parametros_usados": params,
+        }
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        return {"pending": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def flush(self):
+        """Grava tudo o que estiver na fila (usado no desligamento)."""
+        while not self._queue.empty():
+            self._write_batch(self._drain())
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ai-usage-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self._shutdown)
+
+    def _shutdown(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drain(timeout=self.flush_seconds)
+            if batch:
+                self._write_batch(batch)
+
+    def _drain(self, timeout: float | None = None) -> list[dict]:
+        batch = []
+        try:
+            # Espera o primeiro item (ou o intervalo de flush) e pega o resto sem bloquear
+            batch.append(self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait())
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write_batch(self, batch: list[dict]):
+        if not batch:
+            return
+        db = SessionLocal()
+        try:
+            db.add_all([LogDocumento(**entry) for entry in batch])
+            db.commit()
+            self.written += len(batch)
+        except Exception as e:
+            db.rollback()
+            self.dropped += len(batch)
+            logger.error(f"Erro ao gravar telemetria da IA ({len(batch)} registros descartados): {e}")
+        finally:
+            db.close()
+
+_recorder: AIUsageRecorder | None = None
+
+def build_ai_usage_recorder() -> AIUsageRecorder | None:
+    """
+    Instância única por processo (uma thread de escrita, mesmo com vários AIService).
+    None quando AI_USAGE_LOG_ENABLED=False.
+    """
+    global _recorder
+    if not settings.AI_USAGE_LOG_ENABLED:
+        return None
+    if _recorder is None:
+        _recorder = AIUsageRecorder(
+            batch_size=settings.AI_USAGE_BATCH_SIZE,
+            flush_seconds=settings.AI_USAGE_FLUSH_SECONDS,
+            max_queue=settings.AI_USAGE_QUEUE_MAX,
+        )
+    return _recorder
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+
+from app.core.database import AsyncSessionLocal
+from app.repositories.planejamento.template_repository import TemplateRepository
+from app.services.core.docx_template_service import docx_template_cache, file_sha256
+from app.services.core.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+class TemplateIndexService:
+    """
+    Índice de variáveis ((tag)) dos templates, gerado uma vez no upload
+    e gravado em Template.variaveis_esperadas junto com o hash do arquivo.
+    Depois disso, listar as variáveis é uma leitura no banco.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, files: FileService | None = None):
+        self.session_factory = session_factory
+        self.files = files or FileService("templates")
+
+    @staticmethod
+    def _hash(path: str) -> str:
+        return file_sha256(path)
+
+    @staticmethod
+    def _extract(path: str) -> list[str]:
+        # Compila pelo cache: a primeira geração do template já o encontra pronto
+        return list(docx_template_cache.get(path).variables)
+
+    async def build(self, repo: TemplateRepository, template_id: int, key: str) -> tuple[list[str], str]:
+        """
+        Calcula (variáveis, hash) e grava no template. Hash conhecido reaproveita o índice.
+        key é o Template.path (chave no armazenamento ou caminho antigo no disco).
+        """
+        path = await self.files.local_path(key)
+        hash_conteudo = await asyncio.to_thread(self._hash, path)
+        variaveis = await repo.get_indexed_by_hash(hash_conteudo)
+        if variaveis is None:
+            variaveis = await asyncio.to_thread(self._extract, path)
+        await repo.save_index(template_id, variaveis, hash_conteudo)
+        logger.info(f"Template {template_id} indexado: {len(variaveis)} variáveis.")
+        return variaveis, hash_conteudo
+
+    async def index_in_background(self, template_id: int, key: str):
+        """Tarefa de segundo plano do upload (sessão própria: a da requisição já fechou)."""
+        try:
+            async with self.session_factory() as db:
+                await self.build(TemplateRepository(db), template_id, key)
+        except Exception as e:
+            # Sem índice o GET de variáveis gera na hora; o upload não falha por isso
+            logger.error(f"Falha ao indexar template {template_id}: {e}")
@@ -86,4 +86,19 @@ async def client_db(db_session):
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
     
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def ai_service_stub(monkeypatch):
+    """
+    AIService com o modelo local determinístico (AI_MODEL_BACKEND='stub'):
+    sem rede, sem cache e sem gravar telemetria no banco.
+    """
+    from app.core.config import settings
+    from app.services.planejamento.ai_service import AIService
+
+    monkeypatch.setattr(settings, "AI_MODEL_BACKEND", "stub")
+    monkeypatch.setattr(settings, "AI_STUB_LATENCY_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "AI_CACHE_BACKEND", "none")
+    monkeypatch.setattr(settings, "AI_USAGE_LOG_ENABLED", False)
+    return AIService()
@@ -1,10 +1,27 @@
 import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
 from app.models.core.log_documento_model import LogDocumento
 from app.models.core.user_model import User
 
 # Marca o arquivo todo para rodar com asyncio
 pytestmark = pytest.mark.asyncio
 
+@pytest.fixture
+async def db_log():
+    """SQLite em memória só com usuarios e log_geracao_documentos."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        tabelas = [User.__table__, LogDocumento.__table__]
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        yield session
+    await engine.dispose()
+
 async def test_create_log_ia(db_session):
     """
     Testa a criação de um log de geração com dados de IA.
@@ -60,4 +77,29 @@ async def test_log_relationship_user(db_session):
     # Traz o user e verifica se o log está na lista (lazy loading)
     await db_session.refresh(user, attribute_names=["logs"])
     assert len(user.logs) == 1
-    assert user.logs[0].nome_arquivo_gerado == "Teste.pdf"
\ No newline at end of file
+    assert user.logs[0].nome_arquivo_gerado == "Teste.pdf"
+
+async def test_log_telemetria_ia_sem_usuario(db_log):
+    """
+    Testa o registro de uma chamada à IA (telemetria), que não exige usuário.
+    """
+    log = LogDocumento(
+        nome_arquivo_gerado="ia/etp_need",
+        tipo_arquivo="txt",
+        ia_model="gemini-flash-latest",
+        secao="etp_need",
+        tokens_prompt=820,
+        tokens_resposta=410,
+        tokens_utilizados=1230,
+        latencia_ms=3150,
+        erro=None
+    )
+    db_log.add(log)
+    await db_log.commit()
+    await db_log.refresh(log)
+
+    assert log.id is not None
+    assert log.user_id is None
+    assert log.secao == "etp_need"
+    assert log.cache_hit is False
+    assert log.tokens_prompt + log.tokens_resposta == log.tokens_utilizados
@@ -0,0 +1,35 @@
+from app.models.gestao.anexo_blob_model import AnexoBlob
+from app.models.gestao.anexo_model import Anexo
+
+def test_anexo_blob_initialization():
+    """
+    Testa a inicialização de um blob de anexo (conteúdo deduplicado por SHA-256).
+    """
+    sha = "ab" * 32
+
+    blob = AnexoBlob(
+        hash_sha256=sha,
+        tamanho_bytes=1024,
+        caminho=f"blobs/ab/{sha}",
+        ref_count=2,
+        is_deleted=False
+    )
+
+    assert blob.hash_sha256 == sha
+    assert blob.caminho.startswith("blobs/ab/")
+    assert blob.ref_count == 2
+    assert blob.is_deleted is False
+
+def test_anexos_compartilham_blob():
+    """
+    Dois anexos com o mesmo conteúdo têm nomes lógicos diferentes e o mesmo blob.
+    """
+    sha = "cd" * 32
+    caminho = f"blobs/cd/{sha}"
+
+    a1 = Anexo(nome_original="certidao.pdf", nome_seguro="contrato/1/a_certidao.pdf", id_contrato=1, hash_sha256=sha, caminho_arquivo=caminho)
+    a2 = Anexo(nome_original="certidao.pdf", nome_seguro="aocs/7/b_certidao.pdf", id_aocs=7, hash_sha256=sha, caminho_arquivo=caminho)
+
+    assert a1.nome_seguro != a2.nome_seguro
+    assert a1.caminho_arquivo == a2.caminho_arquivo
+    assert a1.hash_sha256 == a2.hash_sha256
@@ -0,0 +1,28 @@
+from decimal import Decimal
+from app.models.gestao.saldo_item_contrato_model import SaldoItemContrato
+
+def test_saldo_item_contrato_initialization():
+    """
+    Testa a inicialização da linha do razão de saldo (uma por item de contrato).
+    """
+    saldo = SaldoItemContrato(
+        id_item_contrato=5,
+        quantidade_pedida=Decimal("40.000"),
+        quantidade_entregue=Decimal("12.500")
+    )
+
+    assert saldo.id_item_contrato == 5
+    assert saldo.quantidade_pedida == Decimal("40.000")
+    assert saldo.quantidade_entregue == Decimal("12.500")
+    assert isinstance(saldo.quantidade_entregue, Decimal)
+
+def test_saldo_item_contrato_pk_e_fk():
+    """
+    A PK é o próprio item: o saldo é lido por índice, sem agregar pedidos.
+    """
+    tabela = SaldoItemContrato.__table__
+
+    assert [c.name for c in tabela.primary_key.columns] == ["id_item_contrato"]
+    fk = next(iter(tabela.c.id_item_contrato.foreign_keys))
+    assert fk.target_fullname == "itens_contrato.id"
+    assert fk.ondelete == "CASCADE"
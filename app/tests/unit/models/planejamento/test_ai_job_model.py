@@ -0,0 +1,31 @@
+from app.models.planejamento.ai_job_model import AIJob
+
+def test_ai_job_initialization():
+    """
+    Testa a inicialização de um job de geração em lote.
+    """
+    job = AIJob(
+        lote_id="6f1c2a9e-0000-4000-8000-000000000001",
+        tipo_alvo="dfd",
+        alvo_id=42,
+        secao="dfd_object",
+        status="pendente",
+        tentativas=0
+    )
+
+    assert job.tipo_alvo == "dfd"
+    assert job.alvo_id == 42
+    assert job.secao == "dfd_object"
+    assert job.status == "pendente"
+    assert job.tentativas == 0
+
+def test_ai_job_nullable():
+    """
+    Resultado, erro e datas de execução só existem depois do processamento.
+    """
+    job = AIJob(lote_id="x", tipo_alvo="etp", alvo_id=1, secao="etp_need")
+
+    assert job.resultado is None
+    assert job.erro is None
+    assert job.proxima_tentativa_em is None
+    assert job.concluido_em is None
@@ -36,4 +36,24 @@ def test_template_nullable_fields():
         description=None
     )
     
-    assert tpl.description is None
\ No newline at end of file
+    assert tpl.description is None
+
+def test_template_variable_index_fields():
+    """
+    Verifica o índice de variáveis gravado no upload (variáveis + hash do arquivo).
+    """
+    variaveis = ["numero_processo", "objeto"]
+    hash_conteudo = "a" * 64
+
+    tpl = Template(
+        nome="Edital Pregão",
+        tipo="EDITAL",
+        filename="edital.docx",
+        path="/tmp/edital.docx",
+        responsavel_id=1,
+        variaveis_esperadas=variaveis,
+        hash_conteudo=hash_conteudo
+    )
+
+    assert tpl.variaveis_esperadas == variaveis
+    assert tpl.hash_conteudo == hash_conteudo
@@ -0,0 +1,111 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.gestao.aocs_model import Aocs
+from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.pedido_model import Pedido
+from app.repositories.gestao.aocs_repository import AocsRepository
+
+def _pedido(id_aocs: int, id_item: int, pedida: str, entregue: str) -> dict:
+    return {
+        "id_aocs": id_aocs, "id_item_contrato": id_item, "quantidade_pedida": Decimal(pedida),
+        "quantidade_entregue": Decimal(entregue), "data_pedido": date(2025, 3, 1), "status_entrega": "Pendente",
+        "is_deleted": False,
+    }
+
+# AOCS -> (valor_total, fornecedor, qtd_pedida, qtd_entregue, status_entrega)
+ESPERADO = {
+    1: (Decimal("0"), "N/D", Decimal("0"), Decimal("0"), "Vazio"),
+    2: (Decimal("30"), "Beta Materiais", Decimal("3"), Decimal("0"), "Pendente"),
+    3: (Decimal("30"), "Alfa Comércio", Decimal("6"), Decimal("3"), "Parcial"),
+    4: (Decimal("10"), "Alfa Comércio", Decimal("4"), Decimal("4"), "Entregue"),
+    5: (Decimal("0"), "N/D", Decimal("0"), Decimal("0"), "Pendente"),  # pedido de item inexistente
+}
+
+@pytest.fixture
+async def repo():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        tabelas = [Fornecedor.__table__, Contrato.__table__, ItemContrato.__table__, Aocs.__table__, Pedido.__table__]
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+        await conn.execute(insert(Fornecedor.__table__), [
+            {"id": 1, "razao_social": "Alfa Comércio", "cpf_cnpj": "1", "is_deleted": False},
+            {"id": 2, "razao_social": "Beta Materiais", "cpf_cnpj": "2", "is_deleted": False},
+        ])
+        await conn.execute(insert(Contrato.__table__), [
+            {"id": id_, "numero_contrato": f"{id_}/2025", "ano_contrato": 2025, "id_processo_licitatorio": 1,
+             "id_fornecedor": fornecedor, "data_assinatura": date(2025, 1, 2), "data_inicio_vigencia": date(2025, 1, 2),
+             "data_fim_vigencia": date(2025, 12, 31), "ativo": True, "is_deleted": False}
+            for id_, fornecedor in ((1, 2), (2, 1))
+        ])
+        await conn.execute(insert(ItemContrato.__table__), [
+            {"id": id_, "id_contrato": id_, "id_item_dfd": id_, "numero_item": 1, "quantidade_contratada": Decimal("100"),
+             "valor_unitario_final": valor, "is_deleted": False}
+            for id_, valor in ((1, Decimal("10.00")), (2, Decimal("2.50")))
+        ])
+        await conn.execute(insert(Aocs.__table__), [
+            {"id": id_, "numero_aocs": f"A-{id_:03d}", "ano_aocs": 2025, "numero_pedido_externo": f"PE-{id_}",
+             "id_unidade_requisitante": 1, "data_criacao": datetime(2025, 3, id_), "is_deleted": id_ == 6}
+            for id_ in range(1, 7)
+        ])
+        await conn.execute(insert(Pedido.__table__), [
+            _pedido(2, 1, "3", "0"),
+            _pedido(3, 1, "2", "2"),
+            _pedido(3, 2, "4", "1"),
+            _pedido(4, 2, "4", "4"),
+            _pedido(5, 999, "5", "0"),
+            _pedido(6, 1, "1", "1"),
+        ])
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        yield AocsRepository(db)
+    await engine.dispose()
+
+def _resumo(row: dict) -> tuple:
+    return (
+        Decimal(str(row["valor_total"])), row["fornecedor"],
+        Decimal(str(row["qtd_pedida"])), Decimal(str(row["qtd_entregue"])), row["status_entrega"],
+    )
+
+async def test_painel_consolida_status_e_valores(repo):
+    """
+    Status por AOCS (Vazio/Pendente/Parcial/Entregue), valor = soma de quantidade x
+    valor unitário, fornecedor do contrato; AOCS excluída fica de fora.
+    """
+    rows, total = await repo.get_painel(1, 10)
+
+    assert total == 5
+    assert {row["id"]: _resumo(row) for row in rows} == ESPERADO
+    assert [row["id"] for row in rows] == [5, 4, 3, 2, 1]  # padrão: data de criação, mais recente primeiro
+    assert rows[-1]["numero_pedido"] == "PE-1"
+
+@pytest.mark.parametrize("sort_by, order, ids", [
+    ("valor", "desc", [3, 2, 4, 5, 1]),  # empate em 30: id decrescente
+    ("valor", "asc", [1, 5, 4, 2, 3]),
+    ("status", "asc", [4, 3, 2, 5, 1]),
+    ("fornecedor", "asc", [3, 4, 2, 1, 5]),
+    ("aocs", "desc", [5, 4, 3, 2, 1]),
+    ("inexistente", "asc", [1, 2, 3, 4, 5]),
+])
+async def test_painel_ordenacao(repo, sort_by, order, ids):
+    """Ordenação pelas colunas agregadas, com o id desempatando; coluna desconhecida cai na data."""
+    rows, _ = await repo.get_painel(1, 10, sort_by=sort_by, order=order)
+
+    assert [row["id"] for row in rows] == ids
+
+async def test_painel_pagina_com_total_geral(repo):
+    """O total vem de COUNT(*) OVER(): é o mesmo em todas as páginas, inclusive a última parcial."""
+    paginas = [await repo.get_painel(page, 2, sort_by="aocs", order="asc") for page in (1, 2, 3)]
+
+    assert [total for _, total in paginas] == [5, 5, 5]
+    assert [[row["id"] for row in rows] for rows, _ in paginas] == [[1, 2], [3, 4], [5]]
+    assert await repo.get_painel(4, 2) == ([], 0)
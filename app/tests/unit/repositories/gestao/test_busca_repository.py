@@ -0,0 +1,113 @@
+from sqlalchemy import create_engine, create_mock_engine, inspect
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.core.database import Base
+from app.models.gestao.catalogo_item_model import CatalogoItem
+from app.models.gestao.contrato_model import Contrato
+from app.repositories.gestao.busca_repository import BuscaRepository, TIPOS_BUSCA, contem
+
+# Dialeto do engine da aplicação (postgresql+asyncpg): parâmetros $1, $2...
+POSTGRESQL = asyncpg.dialect()
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=POSTGRESQL))
+
+class _Resultado:
+    def __init__(self, linhas: list[dict]):
+        self.linhas = linhas
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.linhas
+
+class SessaoGravada:
+    """Guarda os comandos recebidos; cada consulta devolve as próximas linhas de `respostas`."""
+
+    def __init__(self, respostas: list[list[dict]] = ()):
+        self.comandos = []
+        self.respostas = list(respostas)
+
+    async def execute(self, stmt):
+        self.comandos.append(stmt)
+        return _Resultado(self.respostas.pop(0) if self.respostas and len(self.comandos) > 1 else [])
+
+def test_busca_documento_so_no_postgresql():
+    """O tsvector gerado e o GIN dele só entram no DDL do PostgreSQL; no SQLite a tabela é criada sem eles."""
+    tabela = CatalogoItem.__table__
+    ddl = []
+    postgresql = create_mock_engine("postgresql+asyncpg://", lambda stmt, *a, **kw: ddl.append(str(stmt.compile(dialect=POSTGRESQL))))
+    Base.metadata.create_all(postgresql, tables=[tabela], checkfirst=False)
+
+    create_table, *indices, coluna, gin = ddl
+    assert "busca_documento" not in create_table
+    assert coluna.startswith("ALTER TABLE catalogo_itens ADD COLUMN busca_documento tsvector GENERATED ALWAYS AS (setweight(")
+    assert gin == "CREATE INDEX ix_catalogo_itens_busca_documento ON catalogo_itens USING gin (busca_documento)"
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[tabela])
+    colunas = {c["name"] for c in inspect(engine).get_columns("catalogo_itens")}
+    indices = {i["name"] for i in inspect(engine).get_indexes("catalogo_itens")}
+    engine.dispose()
+
+    assert "nome_item" in colunas and "busca_documento" not in colunas
+    assert "ix_catalogo_itens_busca_documento" not in indices
+
+def test_contem_ignora_acentos_e_maiusculas():
+    """contem() compara f_unaccent dos dois lados com ILIKE e o termo aparado entre '%'."""
+    compilado = contem(Contrato.numero_contrato, "  Limpeza ").compile(dialect=POSTGRESQL)
+
+    assert str(compilado) == "f_unaccent(contratos.numero_contrato) ILIKE f_unaccent($1::VARCHAR) ESCAPE '/'"
+    assert list(compilado.params.values()) == ["%Limpeza%"]
+
+def test_contem_escapa_curingas_do_termo():
+    """% e _ digitados são literais (ex: '10%', 'item_1'), não curingas do LIKE."""
+    compilado = contem(Contrato.numero_contrato, "10%_a/b").compile(dialect=POSTGRESQL)
+
+    assert list(compilado.params.values()) == ["%10/%/_a//b%"]
+
+async def test_buscar_compila_para_o_postgresql():
+    """Uma consulta por tipo, com o limiar de similaridade da transação definido antes."""
+    sessao = SessaoGravada()
+
+    assert await BuscaRepository(sessao).buscar("papel a4", limite=5, similaridade_minima=0.3) == []
+
+    limiar, itens, contratos, fornecedores, aocs = (_sql(c) for c in sessao.comandos)
+    assert limiar.startswith("SELECT set_config(")
+    assert list(sessao.comandos[0].compile(dialect=POSTGRESQL).params.values()) == [
+        "pg_trgm.word_similarity_threshold", "0.3", True,
+    ]
+
+    assert "catalogo_itens.busca_documento @@ websearch_to_tsquery('pt_unaccent'::regconfig" in itens
+    assert "ts_rank_cd(catalogo_itens.busca_documento, websearch_to_tsquery('pt_unaccent'::regconfig" in itens
+    assert "<% f_unaccent(catalogo_itens.nome_item)" in itens
+    assert "catalogo_itens.ativo = true" in itens
+
+    assert "LEFT OUTER JOIN fornecedores ON fornecedores.id = contratos.id_fornecedor" in contratos
+    assert "f_unaccent(contratos.numero_contrato) ILIKE f_unaccent(" in contratos
+    assert "contratos.is_deleted = false" in contratos
+    assert "f_unaccent(fornecedores.razao_social) ILIKE f_unaccent(" in fornecedores
+    assert "aocs.is_deleted = false" in aocs
+
+    for sql in (itens, contratos, fornecedores, aocs):
+        assert "ORDER BY score DESC" in sql
+        assert "\n LIMIT $" in sql
+
+async def test_buscar_so_os_tipos_pedidos_e_ordena_por_score():
+    """Tipos fora da lista não consultam o banco; resultados de tipos diferentes saem por score."""
+    sessao = SessaoGravada([
+        [{"tipo": "contrato", "id": 1, "titulo": "001/2025", "detalhe": "Alfa", "score": 0.5}],
+        [{"tipo": "aocs", "id": 7, "titulo": "A-007", "detalhe": "Emitida", "score": 1.8}],
+    ])
+
+    resultados = await BuscaRepository(sessao).buscar("00", tipos=("contrato", "aocs"))
+
+    assert len(sessao.comandos) == 3
+    assert [(r["tipo"], r["id"]) for r in resultados] == [("aocs", 7), ("contrato", 1)]
+
+async def test_buscar_termo_vazio_nao_consulta():
+    sessao = SessaoGravada()
+
+    assert await BuscaRepository(sessao).buscar("   ", TIPOS_BUSCA) == []
+    assert sessao.comandos == []
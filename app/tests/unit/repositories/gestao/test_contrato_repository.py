@@ -0,0 +1,148 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.gestao.contrato_model import Contrato
+from app.models.gestao.fornecedor_model import Fornecedor
+from app.models.planejamento.processo_licitatorio_model import ProcessoLicitatorio
+from app.repositories.gestao.contrato_repository import ContratoRepository
+
+HOJE = date(2026, 10, 18)
+
+FORNECEDORES = {1: "Papelaria Central", 2: "Alfa Limpeza", 3: "Mercantil Zeta"}
+
+# 23 contratos: vigências repetidas (o id desempata) e processo ausente nos pares
+CONTRATOS = [
+    {
+        "id": i, "numero_contrato": f"{i:03d}/2025", "ano_contrato": 2025,
+        "id_processo_licitatorio": 1 if i % 2 else 99, "id_fornecedor": 1 + i % 3,
+        "data_assinatura": HOJE, "data_inicio_vigencia": HOJE,
+        "data_fim_vigencia": HOJE + timedelta(days=30 * (i % 5) - 40), "ativo": i % 7 != 0, "is_deleted": i == 11,
+    }
+    for i in range(1, 24)
+]
+
+def _esperado(sort_by: str, desc: bool, filtro=lambda c: True) -> list[int]:
+    chave = {
+        "numero_contrato": lambda c: (c["numero_contrato"], c["id"]),
+        "fornecedor": lambda c: (FORNECEDORES[c["id_fornecedor"]], c["id"]),
+        "data_vigencia_fim": lambda c: (c["data_fim_vigencia"], c["id"]),
+        "status_ativo": lambda c: (c["ativo"], c["id"]),
+    }[sort_by]
+    visiveis = [c for c in CONTRATOS if not c["is_deleted"] and filtro(c)]
+    return [c["id"] for c in sorted(visiveis, key=chave, reverse=desc)]
+
+def _ids(pagina: dict) -> list[int]:
+    return [item["id"] for item in pagina["itens"]]
+
+@pytest.fixture
+async def repo():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    tabelas = [Fornecedor.__table__, ProcessoLicitatorio.__table__, Contrato.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+        await conn.execute(insert(Fornecedor.__table__), [
+            {"id": id_, "razao_social": nome, "cpf_cnpj": str(id_), "is_deleted": False} for id_, nome in FORNECEDORES.items()
+        ])
+        await conn.execute(insert(ProcessoLicitatorio.__table__), [{
+            "id": 1, "tr_id": 1, "numero_processo": 7, "ano_processo": 2025, "modalidade_id": 1,
+            "objeto": "Material de expediente", "is_deleted": False,
+        }])
+        await conn.execute(insert(Contrato.__table__), CONTRATOS)
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        yield ContratoRepository(db)
+    await engine.dispose()
+
+def test_cursor_ida_e_volta():
+    """O cursor guarda ordenação, valor, id e direção; datas voltam como date."""
+    cursor = ContratoRepository._encode_cursor("data_vigencia_fim", HOJE, 42, "prev")
+
+    assert "=" not in cursor
+    assert ContratoRepository._decode_cursor(cursor, "data_vigencia_fim") == (HOJE, 42, "prev")
+
+@pytest.mark.parametrize("cursor", [
+    ContratoRepository._encode_cursor("numero_contrato", "001/2025", 1, "next"),  # outra ordenação
+    ContratoRepository._encode_cursor("data_vigencia_fim", "ontem", 1, "next"),  # data inválida
+    ContratoRepository._encode_cursor("data_vigencia_fim", HOJE, 1, "lado"),
+    ContratoRepository._encode_cursor("data_vigencia_fim", HOJE, "1", "next"),
+    "não-é-base64",
+    "W10",  # '[]'
+])
+def test_cursor_invalido_e_ignorado(cursor):
+    """Cursor adulterado ou de outra ordenação vira None (lista do início)."""
+    assert ContratoRepository._decode_cursor(cursor, "data_vigencia_fim") is None
+
+@pytest.mark.parametrize("sort_by", ["numero_contrato", "fornecedor", "data_vigencia_fim", "status_ativo"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+async def test_keyset_avanca_e_volta_pelas_paginas(repo, sort_by, order):
+    """
+    Seguindo proximo_cursor até o fim sai a lista inteira na ordem pedida;
+    cursor_anterior (consulta invertida e desvirada) refaz as mesmas páginas de trás para frente.
+    """
+    paginas, cursor = [], None
+    while True:
+        pagina = await repo.listar_paginado(sort_by=sort_by, order=order, limit=5, cursor=cursor, hoje=HOJE)
+        paginas.append(pagina)
+        if not pagina["tem_proxima"]:
+            break
+        cursor = pagina["proximo_cursor"]
+
+    assert [i for p in paginas for i in _ids(p)] == _esperado(sort_by, order == "desc")
+    assert len(paginas) == 5
+    assert not paginas[0]["tem_anterior"] and paginas[0]["cursor_anterior"] is None
+    assert paginas[-1]["proximo_cursor"] is None
+
+    pagina = paginas[-1]
+    for anterior in reversed(paginas[:-1]):
+        pagina = await repo.listar_paginado(sort_by=sort_by, order=order, limit=5, cursor=pagina["cursor_anterior"], hoje=HOJE)
+        assert _ids(pagina) == _ids(anterior)
+        assert pagina["tem_proxima"]
+    assert not pagina["tem_anterior"]
+
+async def test_keyset_com_filtro(repo):
+    """Os filtros valem em todas as páginas: 'ativo' = ativo e ainda vigente."""
+    vigente = lambda c: c["ativo"] and c["data_fim_vigencia"] >= HOJE
+    ids, cursor = [], None
+    while True:
+        pagina = await repo.listar_paginado(status="ativo", sort_by="data_vigencia_fim", limit=4, cursor=cursor, hoje=HOJE)
+        ids += _ids(pagina)
+        if not pagina["tem_proxima"]:
+            break
+        cursor = pagina["proximo_cursor"]
+
+    assert ids == _esperado("data_vigencia_fim", False, vigente)
+
+async def test_offset_para_links_por_numero_de_pagina(repo):
+    """Sem cursor o offset ainda pagina; a página seguinte já continua por cursor."""
+    esperado = _esperado("numero_contrato", False)
+
+    pagina = await repo.listar_paginado(offset=10, limit=5, hoje=HOJE)
+    assert _ids(pagina) == esperado[10:15]
+    assert pagina["tem_anterior"] and pagina["tem_proxima"]
+
+    seguinte = await repo.listar_paginado(cursor=pagina["proximo_cursor"], limit=5, hoje=HOJE)
+    assert _ids(seguinte) == esperado[15:20]
+    anterior = await repo.listar_paginado(cursor=pagina["cursor_anterior"], limit=5, hoje=HOJE)
+    assert _ids(anterior) == esperado[5:10]
+
+async def test_cursor_invalido_lista_do_inicio_ignorando_offset(repo):
+    """Cursor que não decodifica não cai no offset: a lista recomeça da primeira página."""
+    pagina = await repo.listar_paginado(cursor="lixo", limit=5, hoje=HOJE)
+
+    assert _ids(pagina) == _esperado("numero_contrato", False)[:5]
+    assert not pagina["tem_anterior"]
+
+async def test_itens_trazem_fornecedor_e_processo(repo):
+    """Cada item já vem com o fornecedor e o processo (vazio quando não encontrado)."""
+    pagina = await repo.listar_paginado(limit=2, hoje=HOJE)
+
+    primeiro, segundo = pagina["itens"]
+    assert primeiro["fornecedor"] == FORNECEDORES[2]
+    assert (primeiro["numero_processo"], primeiro["ano_processo"]) == (7, 2025)
+    assert segundo["numero_processo"] is None
@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.gestao.aocs_model import Aocs
+from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.pedido_model import Pedido
+from app.models.gestao.saldo_item_contrato_model import SaldoItemContrato
+from app.repositories.gestao.pedido_repository import PedidoRepository
+from app.schemas.gestao.pedido_schema import (EntregaItemLote, PedidoCreateRequest, PedidoUpdateRequest,
+                                              RegistrarEntregaLoteRequest)
+
+@pytest.fixture
+async def db():
+    """SQLite em memória com a AOCS 1 e os itens 1 e 2 (100 unidades contratadas cada)."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        tabelas = [Aocs.__table__, ItemContrato.__table__, SaldoItemContrato.__table__, Pedido.__table__]
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+        await conn.execute(insert(Aocs.__table__), [
+            {"id": 1, "numero_aocs": "A-001", "ano_aocs": 2025, "id_unidade_requisitante": 1, "is_deleted": False},
+        ])
+        await conn.execute(insert(ItemContrato.__table__), [
+            {"id": id_, "id_contrato": 1, "id_item_dfd": id_, "numero_item": id_, "quantidade_contratada": Decimal("100"),
+             "valor_unitario_final": Decimal("2.50"), "is_deleted": False}
+            for id_ in (1, 2)
+        ])
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as session:
+        yield session
+    await engine.dispose()
+
+async def _saldo(repo: PedidoRepository, id_item: int) -> tuple[Decimal, Decimal, Decimal]:
+    saldo = await repo.saldos.get_saldo(id_item)
+    return (Decimal(str(saldo["quantidade_pedida"])), Decimal(str(saldo["quantidade_entregue"])),
+            Decimal(str(saldo["saldo"])))
+
+async def _novo(repo: PedidoRepository, id_item: int, quantidade: str) -> Pedido:
+    return await repo.create_pedido(1, PedidoCreateRequest(item_contrato_id=id_item, quantidade_pedida=Decimal(quantidade)))
+
+async def test_razao_acompanha_todas_as_escritas(db):
+    """
+    Criar, alterar (inclusive trocando de item), entregar, entregar em lote e excluir
+    pedidos mantém o razão igual à soma dos pedidos: reconciliar não acha divergência.
+    """
+    repo = PedidoRepository(db)
+
+    p1 = await _novo(repo, 1, "10")
+    p2 = await _novo(repo, 1, "5")
+    p3 = await _novo(repo, 2, "7")
+    assert p1.status_entrega == "Pendente"
+    assert await _saldo(repo, 1) == (Decimal("15"), Decimal("0"), Decimal("85"))
+    assert await _saldo(repo, 2) == (Decimal("7"), Decimal("0"), Decimal("93"))
+
+    entregue = await repo.registrar_entrega(p1.id, Decimal("4"))
+    assert (entregue.status_entrega, entregue.quantidade_entregue) == ("Entrega Parcial", Decimal("4"))
+
+    await repo.registrar_entrega_lote(RegistrarEntregaLoteRequest(
+        data_entrega=date(2025, 3, 10), nota_fiscal="NF-123",
+        itens=[EntregaItemLote(id_pedido=p1.id, quantidade=Decimal("6")), EntregaItemLote(id_pedido=p3.id, quantidade=Decimal("1"))],
+    ))
+    assert (await repo._reload(p1.id)).status_entrega == "Entregue"
+    assert await _saldo(repo, 1) == (Decimal("15"), Decimal("10"), Decimal("85"))
+    assert await _saldo(repo, 2) == (Decimal("7"), Decimal("1"), Decimal("93"))
+
+    await repo.update(p2.id, PedidoUpdateRequest(quantidade_entregue=Decimal("2")))
+    assert await _saldo(repo, 1) == (Decimal("15"), Decimal("12"), Decimal("85"))
+
+    # Troca de item: sai inteiro do item 1 e entra inteiro (com a nova quantidade) no item 2
+    await repo.update(p2.id, {"quantidade_pedida": Decimal("8"), "id_item_contrato": 2})
+    assert await _saldo(repo, 1) == (Decimal("10"), Decimal("10"), Decimal("90"))
+    assert await _saldo(repo, 2) == (Decimal("15"), Decimal("3"), Decimal("85"))
+
+    assert await repo.delete(p3.id)
+    assert await _saldo(repo, 2) == (Decimal("8"), Decimal("2"), Decimal("92"))
+
+    assert await repo.saldos.reconciliar(corrigir=False) == []
+
+async def test_pedido_inexistente_nao_mexe_no_razao(db):
+    """Entrega, lote, alteração e exclusão de pedido inexistente não tocam o saldo."""
+    repo = PedidoRepository(db)
+    id_pedido = (await _novo(repo, 1, "10")).id  # o rollback expira o objeto: guarda só o id
+
+    assert await repo.registrar_entrega(999, Decimal("1")) is None
+    assert await repo.update(999, {"quantidade_pedida": Decimal("1")}) is None
+    assert await repo.delete(999) is False
+    with pytest.raises(ValueError):
+        # O lote é tudo ou nada: a entrega do pedido existente também é desfeita
+        await repo.registrar_entrega_lote(RegistrarEntregaLoteRequest(
+            data_entrega=date(2025, 3, 10), nota_fiscal="NF-124",
+            itens=[EntregaItemLote(id_pedido=id_pedido, quantidade=Decimal("3")), EntregaItemLote(id_pedido=999, quantidade=Decimal("1"))],
+        ))
+
+    assert await _saldo(repo, 1) == (Decimal("10"), Decimal("0"), Decimal("90"))
+    assert (await repo._reload(id_pedido)).quantidade_entregue == Decimal("0")
+    assert await repo.saldos.reconciliar(corrigir=False) == []
+
+async def test_reconciliar_aponta_e_corrige_divergencia(db):
+    """Razão alterado por fora: reconciliar lista a diferença e, com corrigir, regrava da soma dos pedidos."""
+    repo = PedidoRepository(db)
+    await _novo(repo, 1, "10")
+    await db.execute(update(SaldoItemContrato).values(quantidade_pedida=Decimal("3")))
+    await db.commit()
+
+    divergencias = await repo.saldos.reconciliar(corrigir=False)
+    assert [(d["id_item_contrato"], d["razao_pedida"], d["pedidos_pedida"]) for d in divergencias] == [
+        (1, Decimal("3"), Decimal("10"))
+    ]
+
+    assert await repo.saldos.reconciliar(corrigir=True) == divergencias
+    assert await repo.saldos.reconciliar(corrigir=False) == []
+    assert await _saldo(repo, 1) == (Decimal("10"), Decimal("0"), Decimal("90"))
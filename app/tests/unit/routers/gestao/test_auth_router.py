@@ -0,0 +1,74 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from jose import jwt
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.database import Base, get_async_db
+from app.core.security import ALGORITHM, SECRET_KEY, get_password_hash
+from app.models.core.perfil_model import Perfil
+from app.models.core.unidade_model import Unidade
+from app.models.core.user_model import User
+from app.models.core.usuario_unidade_model import UsuarioUnidade
+
+@pytest.fixture
+async def usuarios_db():
+    """SQLite em memória com o usuário 'fiscal' (senha 'segredo123')."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    tabelas = [Perfil.__table__, Unidade.__table__, User.__table__, UsuarioUnidade.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        db.add(User(
+            username="fiscal", email="fiscal@prefeitura.gov.br", nome_completo="Fiscal de Contrato",
+            password_hash=get_password_hash("segredo123"),
+        ))
+        await db.commit()
+        yield db
+    await engine.dispose()
+
+@pytest.fixture
+async def client_auth(usuarios_db):
+    async def override_get_async_db():
+        yield usuarios_db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+async def test_login_retorna_token(client_auth):
+    """Usuário e senha corretos: token bearer com o username no 'sub'."""
+    response = await client_auth.post("/auth/login", data={"username": "fiscal", "password": "segredo123"})
+
+    assert response.status_code == 200
+    token = response.json()
+    assert token["token_type"] == "bearer"
+    assert jwt.decode(token["access_token"], SECRET_KEY, algorithms=[ALGORITHM])["sub"] == "fiscal"
+
+@pytest.mark.parametrize("username, password", [("fiscal", "errada"), ("inexistente", "segredo123")])
+async def test_login_recusa_credenciais_invalidas(client_auth, username, password):
+    """Senha errada ou usuário inexistente: 401 com a mesma mensagem."""
+    response = await client_auth.post("/auth/login", data={"username": username, "password": password})
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Usuário ou senha incorretos."
+    assert response.headers["www-authenticate"] == "Bearer"
+
+async def test_login_ui_define_cookie(client_auth):
+    """Formulário de login da interface: redireciona e grava o token no cookie."""
+    response = await client_auth.post("/login", data={"username": "fiscal", "password": "segredo123"})
+
+    assert response.status_code == 302
+    assert response.cookies["access_token"].startswith('"bearer ')
+
+async def test_login_ui_senha_errada(client_auth):
+    """Senha errada na interface: volta para o login com a mensagem de erro, sem cookie."""
+    response = await client_auth.post("/login", data={"username": "fiscal", "password": "errada"})
+
+    assert response.status_code == 302
+    assert "msg=" in response.headers["location"]
+    assert "access_token" not in response.cookies
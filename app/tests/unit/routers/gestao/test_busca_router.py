@@ -0,0 +1,61 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.core.database import get_async_db
+from app.core.security import get_current_user
+from app.repositories.gestao.busca_repository import BuscaRepository, TIPOS_BUSCA
+
+@pytest.fixture
+async def client_busca(monkeypatch):
+    """Cliente autenticado; a busca no banco é trocada por uma que só registra os tipos pedidos."""
+    chamadas = []
+
+    async def buscar(self, termo, tipos=TIPOS_BUSCA, limite=10, similaridade_minima=0.4):
+        chamadas.append(tipos)
+        return [{"tipo": tipos[0], "id": 1, "titulo": termo, "detalhe": None, "score": 1.0}]
+
+    async def override_get_async_db():
+        yield None
+
+    monkeypatch.setattr(BuscaRepository, "buscar", buscar)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_user] = lambda: "fiscal"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac, chamadas
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("tipos, esperado", [
+    (None, TIPOS_BUSCA),
+    ("contrato", ("contrato",)),
+    (" aocs , fornecedor ,", ("aocs", "fornecedor")),
+])
+async def test_busca_tipos_validos(client_busca, tipos, esperado):
+    """Sem 'tipos' busca em todos; com a lista, só nos pedidos (espaços e vírgulas sobrando são ignorados)."""
+    client, chamadas = client_busca
+    params = {"q": "papel"} | ({"tipos": tipos} if tipos is not None else {})
+
+    response = await client.get("/busca/", params=params)
+
+    assert response.status_code == 200
+    assert response.json()["termo"] == "papel"
+    assert chamadas == [esperado]
+
+async def test_busca_tipos_invalidos(client_busca):
+    """Tipo desconhecido: 400 listando os inválidos e os aceitos, sem consultar o banco."""
+    client, chamadas = client_busca
+
+    response = await client.get("/busca/", params={"q": "papel", "tipos": "item,processo,dfd"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Tipos inválidos: processo, dfd. Use: {', '.join(TIPOS_BUSCA)}."
+    assert chamadas == []
+
+async def test_busca_termo_curto(client_busca):
+    """O termo precisa de pelo menos 2 caracteres."""
+    client, chamadas = client_busca
+
+    response = await client.get("/busca/", params={"q": "p"})
+
+    assert response.status_code == 422
+    assert chamadas == []
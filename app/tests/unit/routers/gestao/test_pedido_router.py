@@ -0,0 +1,72 @@
+import logging
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.database import Base, get_async_db
+from app.core.security import get_current_user
+from app.models.gestao.aocs_model import Aocs
+from app.models.gestao.item_model import ItemContrato
+from app.models.gestao.pedido_model import Pedido
+from app.models.gestao.saldo_item_contrato_model import SaldoItemContrato
+from app.repositories.gestao.pedido_repository import PedidoRepository
+from app.schemas.gestao.pedido_schema import PedidoCreateRequest
+
+@pytest.fixture
+async def client_pedidos():
+    """Cliente autenticado como 'fiscal' e um pedido de 10 unidades (AOCS 1, item 1)."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        tabelas = [Aocs.__table__, ItemContrato.__table__, SaldoItemContrato.__table__, Pedido.__table__]
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+        await conn.execute(insert(Aocs.__table__), [
+            {"id": 1, "numero_aocs": "A-001", "ano_aocs": 2025, "id_unidade_requisitante": 1, "is_deleted": False},
+        ])
+        await conn.execute(insert(ItemContrato.__table__), [
+            {"id": 1, "id_contrato": 1, "id_item_dfd": 1, "numero_item": 1, "quantidade_contratada": Decimal("100"),
+             "valor_unitario_final": Decimal("2.50"), "is_deleted": False},
+        ])
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        pedido = await PedidoRepository(db).create_pedido(
+            1, PedidoCreateRequest(item_contrato_id=1, quantidade_pedida=Decimal("10"))
+        )
+
+        async def override_get_async_db():
+            yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(username="fiscal")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac, pedido.id
+        app.dependency_overrides.clear()
+    await engine.dispose()
+
+async def test_update_pedido_registra_as_alteracoes(client_pedidos, caplog):
+    """O log compara com os valores de antes do update, não com o objeto já alterado."""
+    client, id_pedido = client_pedidos
+
+    with caplog.at_level(logging.INFO, logger="app.routers.gestao.pedido_router"):
+        response = await client.put(f"/pedidos/{id_pedido}", json={"quantidade_entregue": "4"})
+
+    assert response.status_code == 200
+    assert Decimal(str(response.json()["quantidade_entregue"])) == Decimal("4")
+    assert f"atualizou Pedido ID {id_pedido}: qtd. entregue de 0" in caplog.text
+    assert "para 4" in caplog.text
+    assert "sem alterações efetivas" not in caplog.text
+
+async def test_update_pedido_sem_mudanca(client_pedidos, caplog):
+    client, id_pedido = client_pedidos
+
+    with caplog.at_level(logging.INFO, logger="app.routers.gestao.pedido_router"):
+        response = await client.put(f"/pedidos/{id_pedido}", json={"status_entrega": "Pendente"})
+
+    assert response.status_code == 200
+    assert "sem alterações efetivas" in caplog.text
@@ -0,0 +1,63 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.core.database import Base, get_async_db
+from app.core.deps import get_ai_service
+from app.models.planejamento.etp_model import ETP
+from app.models.planejamento.matriz_risco_model import MatrizRisco
+from app.models.planejamento.item_risco_model import ItemRisco
+
+@pytest.fixture
+async def riscos_db():
+    """SQLite em memória com as tabelas da matriz de riscos e um ETP (id 1)."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    tabelas = [ETP.__table__, MatrizRisco.__table__, ItemRisco.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tabelas))
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        db.add(ETP(id=1, descricao_necessidade="Aquisição de material de limpeza"))
+        await db.commit()
+        yield db
+    await engine.dispose()
+
+@pytest.fixture
+async def client_riscos(riscos_db, ai_service_stub):
+    async def override_get_async_db():
+        yield riscos_db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_ai_service] = lambda: ai_service_stub
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+async def test_gerar_riscos_na_matriz(client_riscos):
+    """
+    Riscos gerados (JSON do modelo local) vão direto para a matriz do ETP.
+    """
+    response = await client_riscos.post("/riscos/etp/1/generate", json={"etp_object": "Material de limpeza"})
+
+    assert response.status_code == 200
+    matriz = response.json()
+    assert matriz["etp_id"] == 1
+    assert len(matriz["itens"]) == 1
+    assert matriz["itens"][0]["tipo"] == "Técnico"
+
+async def test_gerar_riscos_etp_inexistente(client_riscos, ai_service_stub, monkeypatch):
+    """
+    ETP inexistente: 404 (e não IntegrityError/500), sem chamar a IA.
+    """
+    async def nao_chamar(*args, **kwargs):
+        raise AssertionError("a IA não deveria ser chamada")
+
+    monkeypatch.setattr(ai_service_stub, "generate_structured", nao_chamar)
+
+    response = await client_riscos.post("/riscos/etp/999/generate", json={"etp_object": "Material de limpeza"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "ETP não encontrado"
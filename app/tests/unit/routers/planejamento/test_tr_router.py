@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.core.database import get_async_db
+from app.core.deps import get_ai_service
+from app.routers.planejamento import tr_router
+
+@pytest.fixture
+async def client_ia(ai_service_stub, monkeypatch):
+    """
+    Cliente das rotas de cláusula com o modelo local. O contexto (ETP e riscos)
+    vem do banco; aqui é fixo, para o teste cobrir só a geração.
+    """
+    async def contexto_fixo(db, ai_service, etp_id):
+        return "Objeto: Aquisição de material de limpeza", "- Risco: atraso na entrega"
+
+    async def sem_banco():
+        yield None
+
+    monkeypatch.setattr(tr_router, "_tr_clause_context", contexto_fixo)
+    app.dependency_overrides[get_async_db] = sem_banco
+    app.dependency_overrides[get_ai_service] = lambda: ai_service_stub
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+    app.dependency_overrides.clear()
+
+def _eventos(corpo: str) -> list[tuple[str, dict]]:
+    """Lista de (evento, payload) de uma resposta text/event-stream."""
+    eventos = []
+    for bloco in corpo.strip().split("\n\n"):
+        evento, dados = "message", {}
+        for linha in bloco.splitlines():
+            if linha.startswith("event: "):
+                evento = linha[len("event: "):]
+            elif linha.startswith("data: "):
+                dados = json.loads(linha[len("data: "):])
+        eventos.append((evento, dados))
+    return eventos
+
+async def test_gerar_clausula(client_ia):
+    response = await client_ia.post("/trs/generate/clause", json={"etp_id": 1, "section": "pagamento"})
+
+    assert response.status_code == 200
+    assert response.json()["result"].startswith("[Texto gerado pelo modelo local")
+
+async def test_gerar_clausula_stream(client_ia):
+    """
+    O SSE entrega o texto em eventos 'message' e termina com 'done', sem 'error'.
+    """
+    response = await client_ia.post("/trs/generate/clause/stream", json={"etp_id": 1, "section": "obrigacoes"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    eventos = _eventos(response.text)
+    assert [nome for nome, _ in eventos if nome != "message"] == ["done"]
+    texto = "".join(dados["delta"] for nome, dados in eventos if nome == "message")
+    assert texto.startswith("[Texto gerado pelo modelo local")
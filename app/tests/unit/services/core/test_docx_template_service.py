@@ -0,0 +1,112 @@
+import io
+import zipfile
+
+import pytest
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from app.services.core.docx_template_service import DocxTemplate, FileHashCache, file_sha256
+
+FOOTNOTES_XML = (
+    f'<w:footnotes {nsdecls("w")}>'
+    '<w:footnote w:id="1"><w:p><w:r><w:t>Fonte: ((Fonte))</w:t></w:r></w:p></w:footnote>'
+    '</w:footnotes>'
+)
+FOOTNOTES_CT = "application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"
+FOOTNOTES_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/footnotes"
+
+def _caixa_de_texto(texto: str):
+    """Parágrafo com uma caixa de texto VML (w:pict/v:textbox/w:txbxContent)."""
+    return parse_xml(
+        f'<w:p {nsdecls("w")} xmlns:v="urn:schemas-microsoft-com:vml"><w:r><w:pict>'
+        '<v:shape id="caixa1" style="width:200pt;height:40pt"><v:textbox><w:txbxContent>'
+        f'<w:p><w:r><w:t>{texto}</w:t></w:r></w:p>'
+        '</w:txbxContent></v:textbox></v:shape></w:pict></w:r></w:p>'
+    )
+
+def _com_nota_de_rodape(docx: bytes) -> bytes:
+    """Acrescenta word/footnotes.xml (tipo, relacionamento e conteúdo) ao pacote."""
+    origem, destino = zipfile.ZipFile(io.BytesIO(docx)), io.BytesIO()
+    with zipfile.ZipFile(destino, "w", zipfile.ZIP_DEFLATED) as out:
+        for info in origem.infolist():
+            conteudo = origem.read(info)
+            if info.filename == "[Content_Types].xml":
+                conteudo = conteudo.decode("utf-8").replace(
+                    "</Types>", f'<Override PartName="/word/footnotes.xml" ContentType="{FOOTNOTES_CT}"/></Types>')
+            elif info.filename == "word/_rels/document.xml.rels":
+                conteudo = conteudo.decode("utf-8").replace(
+                    "</Relationships>", f'<Relationship Id="rIdNotas" Type="{FOOTNOTES_REL}" Target="footnotes.xml"/></Relationships>')
+            out.writestr(info, conteudo)
+        out.writestr("word/footnotes.xml", FOOTNOTES_XML)
+    return destino.getvalue()
+
+@pytest.fixture
+def template_completo(tmp_path):
+    """
+    Template com tags no corpo (dividida entre runs), no cabeçalho, numa
+    tabela aninhada, numa caixa de texto e numa nota de rodapé.
+    """
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Processo ((Processo))"
+
+    paragrafo = doc.add_paragraph()
+    paragrafo.add_run("Objeto: ((Obj")
+    paragrafo.add_run("eto))")
+
+    externa = doc.add_table(rows=1, cols=1)
+    interna = externa.cell(0, 0).add_table(rows=1, cols=1)
+    interna.cell(0, 0).paragraphs[0].text = "Valor: ((Valor))"
+
+    doc.element.body.append(_caixa_de_texto("Unidade: ((Unidade))"))
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    path = tmp_path / "template.docx"
+    path.write_bytes(_com_nota_de_rodape(buffer.getvalue()))
+    return str(path)
+
+def _texto_das_partes(docx: bytes) -> str:
+    with zipfile.ZipFile(io.BytesIO(docx)) as z:
+        return "".join(z.read(nome).decode("utf-8") for nome in z.namelist() if nome.startswith("word/") and nome.endswith(".xml"))
+
+def test_extrai_tags_de_todas_as_partes(template_completo):
+    """
+    Variáveis do corpo, cabeçalho, tabela aninhada, caixa de texto e nota de
+    rodapé (Part genérico no python-docx, sem .element).
+    """
+    template = DocxTemplate(template_completo)
+
+    assert sorted(template.variables) == ["Fonte", "Objeto", "Processo", "Unidade", "Valor"]
+
+def test_render_preenche_todas_as_partes(template_completo):
+    dados = {"Processo": "12/2026", "Objeto": "Material de limpeza", "Valor": "R$ 1.000,00",
+             "Unidade": "Secretaria de Saúde", "Fonte": "Pesquisa de preços"}
+
+    saida = DocxTemplate(template_completo).render_bytes(dados)
+
+    Document(io.BytesIO(saida))  # pacote continua válido
+    texto = _texto_das_partes(saida)
+    assert "((" not in texto
+    for valor in dados.values():
+        assert valor in texto
+
+def test_render_mantem_tag_sem_valor(template_completo):
+    """Chave ausente nos dados: a tag original continua no documento."""
+    saida = DocxTemplate(template_completo).render_bytes({"Objeto": "Material de limpeza"})
+
+    texto = _texto_das_partes(saida)
+    assert "((Fonte))" in texto
+    assert "((Unidade))" in texto
+
+def test_hash_do_arquivo_acompanha_substituicao_no_disco(tmp_path):
+    """Arquivo substituído (mtime/tamanho diferentes) é lido de novo; sem mudança, vem do cache."""
+    caminho = tmp_path / "modelo.docx"
+    caminho.write_bytes(b"versao 1")
+    cache = FileHashCache()
+    primeiro = cache.get(str(caminho))
+    assert primeiro == file_sha256(str(caminho))
+    assert cache.get(str(caminho)) == primeiro
+
+    caminho.write_bytes(b"versao 2 (maior)")
+    assert cache.get(str(caminho)) == file_sha256(str(caminho)) != primeiro
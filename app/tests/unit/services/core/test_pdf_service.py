@@ -0,0 +1,84 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.core.pdf_service import PdfCache, PdfService
+from app.services.core.storage_service import LocalStorage
+
+@pytest.fixture
+def cache(tmp_path):
+    return PdfCache(LocalStorage("documentos", str(tmp_path)), max_bytes=250)
+
+async def test_cached_renderiza_uma_vez_para_pedidos_simultaneos(cache):
+    """Pedidos iguais em paralelo esperam a mesma renderização; depois é acerto de cache."""
+    service = PdfService(cache)
+    liberar = asyncio.Event()
+    chamadas = 0
+
+    async def produce() -> bytes:
+        nonlocal chamadas
+        chamadas += 1
+        await liberar.wait()
+        return b"%PDF-1.7"
+
+    tarefas = [asyncio.create_task(service._cached("abc123", produce)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert list(service._inflight) == ["abc123"]
+    liberar.set()
+
+    chaves = await asyncio.gather(*tarefas)
+    assert chaves == ["ab/abc123.pdf"] * 3
+    assert chamadas == 1
+    assert service._inflight == {}
+    assert await service._cached("abc123", produce) == "ab/abc123.pdf"
+    assert chamadas == 1
+
+async def test_cached_propaga_falha_para_todos_e_permite_nova_tentativa(cache):
+    """A falha chega a quem esperava a renderização e não fica presa no cache."""
+    service = PdfService(cache)
+    liberar = asyncio.Event()
+    chamadas = 0
+
+    async def produce() -> bytes:
+        nonlocal chamadas
+        chamadas += 1
+        await liberar.wait()
+        raise RuntimeError("LibreOffice falhou")
+
+    tarefas = [asyncio.create_task(service._cached("def456", produce)) for _ in range(2)]
+    await asyncio.sleep(0)
+    liberar.set()
+
+    resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert chamadas == 1
+    assert service._inflight == {}
+    assert await cache.get("def456") is None
+
+    with pytest.raises(RuntimeError):
+        await service._cached("def456", produce)
+    assert chamadas == 2
+
+async def test_prune_remove_os_menos_usados(cache):
+    """Acima de max_bytes sai o PDF com acesso mais antigo; o acerto renova o mtime."""
+    await cache.put("aa01", b"a" * 100)
+    await cache.put("bb02", b"b" * 100)
+    os.utime(cache.storage.path(cache.key_for("aa01")), (1000, 1000))
+    os.utime(cache.storage.path(cache.key_for("bb02")), (2000, 2000))
+
+    assert await cache.get("aa01") == "aa/aa01.pdf"
+    await cache.put("cc03", b"c" * 100)
+
+    assert await cache.get("bb02") is None
+    assert await cache.get("aa01") == "aa/aa01.pdf"
+    assert await cache.get("cc03") == "cc/cc03.pdf"
+
+def test_prune_ignora_arquivos_que_nao_sao_pdf(cache):
+    """Só os .pdf contam para o limite; arquivos temporários e perfis ficam."""
+    outro = cache.storage.path("tmp/perfil.xcu")
+    os.makedirs(os.path.dirname(outro))
+    with open(outro, "wb") as f:
+        f.write(b"x" * 1000)
+    cache.prune()
+    assert os.path.exists(outro)
@@ -0,0 +1,41 @@
+import threading
+
+from app.services.planejamento.ai_cache_service import SQLiteAICache
+
+async def test_sqlite_aget_aset_rodam_fora_do_event_loop(tmp_path, monkeypatch):
+    """aget/aset do backend em disco executam o SQLite em outra thread."""
+    cache = SQLiteAICache(str(tmp_path / "ai_cache.db"))
+    threads = []
+
+    def na_thread(original):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return original(*args)
+        return wrapper
+
+    monkeypatch.setattr(cache, "_get", na_thread(cache._get))
+    monkeypatch.setattr(cache, "_set", na_thread(cache._set))
+
+    await cache.aset("k", "texto")
+
+    assert await cache.aget("k") == "texto"
+    assert await cache.aget("outra") is None
+    assert len(threads) == 3 and threading.get_ident() not in threads
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_sqlite_evicao_em_lote_pela_contagem_aproximada(tmp_path):
+    """Passando de max_entries, a limpeza corta até 90% do limite, as menos usadas primeiro."""
+    cache = SQLiteAICache(str(tmp_path / "ai_cache.db"), max_entries=10)
+    for i in range(10):
+        cache.set(f"k{i}", "v")
+    cache.get("k0")  # k0 passa a ser a mais recente
+
+    cache.set("k10", "v")
+
+    assert cache.stats()["entries"] == 9
+    assert cache._count() == 9
+    assert cache.get("k0") == "v"
+    assert [cache.get(f"k{i}") for i in (1, 2)] == [None, None]
+
+    # Reabrir o arquivo recomeça a contagem pelo que está na tabela
+    assert SQLiteAICache(cache.path, max_entries=10).stats()["entries"] == 9
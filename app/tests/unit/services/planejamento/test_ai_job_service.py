@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.planejamento.ai_job_model import AIJob
+from app.repositories.planejamento.ai_job_repository import AIJobRepository
+from app.services.planejamento.ai_client_registry import AIUnavailableError
+from app.services.planejamento.ai_job_service import AIJobWorker
+
+class DocumentoFake:
+    """Destino dos textos gerados no lugar do DFD (grava {(id, campo): texto})."""
+    def __init__(self):
+        self.campos = {}
+
+    async def update(self, alvo_id, dados):
+        for campo, texto in dados.items():
+            self.campos[(alvo_id, campo)] = texto
+
+class WorkerTeste(AIJobWorker):
+    """Worker da fila com o documento de destino em memória."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.documento = DocumentoFake()
+
+    async def _prepare(self, db, job):
+        return "justificativa_necessidade", {"object_text": "Material de limpeza", "draft_text": f"DFD {job.alvo_id}"}, self.documento
+
+@pytest.fixture
+async def fila_sessions():
+    """Fábrica de sessões num SQLite em memória só com a tabela ia_jobs."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(AIJob.__table__.create)
+    yield sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+async def _criar_lote(fila_sessions, ids):
+    async with fila_sessions() as db:
+        return await AIJobRepository(db).create_batch("dfd", ids, ["dfd_justification"])
+
+async def _jobs(fila_sessions, lote_id):
+    async with fila_sessions() as db:
+        return await AIJobRepository(db).get_lote(lote_id)
+
+async def test_run_until_empty_conclui_o_lote(ai_service_stub, fila_sessions):
+    """
+    Com o modelo local, todos os jobs do lote terminam 'concluido' e o texto
+    vai para o campo de destino de cada documento.
+    """
+    lote_id, total = await _criar_lote(fila_sessions, [1, 2, 3])
+    worker = WorkerTeste(ai_service_stub, rate_per_minute=0, session_factory=fila_sessions)
+
+    await worker.run_until_empty()
+
+    jobs = await _jobs(fila_sessions, lote_id)
+    assert total == 3
+    assert [(j.alvo_id, j.status, j.tentativas) for j in jobs] == [(1, "concluido", 1), (2, "concluido", 1), (3, "concluido", 1)]
+    assert all(j.resultado and j.concluido_em for j in jobs)
+    assert worker.documento.campos[(2, "justificativa_necessidade")] == jobs[1].resultado
+
+async def test_falha_transitoria_volta_para_fila_com_backoff(ai_service_stub, fila_sessions, monkeypatch):
+    """
+    Erro transitório: o job volta a 'pendente' com proxima_tentativa_em dentro
+    do backoff (backoff_seconds * 2^(tentativas-1) * [0.5, 1.5]) e não é
+    reservado de novo antes disso.
+    """
+    async def indisponivel(*args, **kwargs):
+        raise google_exceptions.ServiceUnavailable("modelo fora do ar")
+
+    monkeypatch.setattr(ai_service_stub, "generate_async", indisponivel)
+    lote_id, _ = await _criar_lote(fila_sessions, [7])
+    worker = WorkerTeste(ai_service_stub, rate_per_minute=0, backoff_seconds=60, session_factory=fila_sessions)
+
+    antes = datetime.now(timezone.utc)
+    await worker.run_until_empty()
+
+    job, = await _jobs(fila_sessions, lote_id)
+    assert job.status == "pendente"
+    assert job.tentativas == 1
+    assert "ServiceUnavailable" in job.erro
+    espera = (job.proxima_tentativa_em.replace(tzinfo=timezone.utc) - antes).total_seconds()
+    assert 30 <= espera <= 91
+    assert await worker.process_next() is False
+
+async def test_falha_transitoria_na_ultima_tentativa_encerra_o_job(ai_service_stub, fila_sessions, monkeypatch):
+    async def indisponivel(*args, **kwargs):
+        raise google_exceptions.ServiceUnavailable("modelo fora do ar")
+
+    monkeypatch.setattr(ai_service_stub, "generate_async", indisponivel)
+    lote_id, _ = await _criar_lote(fila_sessions, [7])
+    worker = WorkerTeste(ai_service_stub, rate_per_minute=0, max_attempts=1, session_factory=fila_sessions)
+
+    await worker.run_until_empty()
+
+    job, = await _jobs(fila_sessions, lote_id)
+    assert job.status == "erro"
+    assert job.tentativas == 1
+    assert "após 1 tentativas" in job.erro
+    assert job.proxima_tentativa_em is None
+
+class RegistroInstavel:
+    """ai_registry cuja criação do cliente falha nas `falhas` primeiras chamadas."""
+    def __init__(self, ai_service, falhas: int):
+        self.ai_service = ai_service
+        self.falhas = falhas
+        self.chamadas = 0
+
+    def get(self):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            raise AIUnavailableError("GEMINI_API_KEY inválida")
+        return self.ai_service
+
+async def test_cliente_indisponivel_nao_reserva_job(ai_service_stub, fila_sessions):
+    """Sem cliente de IA o job fica na fila intacto; quando o cliente volta, é processado."""
+    lote_id, _ = await _criar_lote(fila_sessions, [4])
+    worker = WorkerTeste(rate_per_minute=0, session_factory=fila_sessions,
+                         registry=RegistroInstavel(ai_service_stub, falhas=1))
+
+    with pytest.raises(AIUnavailableError):
+        await worker.process_next()
+    job, = await _jobs(fila_sessions, lote_id)
+    assert (job.status, job.tentativas) == ("pendente", 0)
+
+    await worker.run_until_empty()
+
+    job, = await _jobs(fila_sessions, lote_id)
+    assert job.status == "concluido"
+
+async def test_worker_volta_sozinho_quando_o_cliente_se_recupera(ai_service_stub, fila_sessions):
+    """O loop do worker espera com backoff enquanto o cliente falha e retoma a fila depois."""
+    lote_id, _ = await _criar_lote(fila_sessions, [5])
+    registro = RegistroInstavel(ai_service_stub, falhas=2)
+    worker = WorkerTeste(rate_per_minute=0, poll_seconds=0.01, session_factory=fila_sessions, registry=registro)
+
+    task = asyncio.create_task(worker._run(0))
+    try:
+        for _ in range(100):
+            job, = await _jobs(fila_sessions, lote_id)
+            if job.status == "concluido":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert job.status == "concluido"
+    assert registro.chamadas >= 3
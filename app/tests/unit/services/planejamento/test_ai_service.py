@@ -0,0 +1,56 @@
+from app.core import profiling
+from app.core.profiling import RequestProfile
+from app.services.planejamento.ai_service import AIService
+
+async def test_generate_async_tr_clause(ai_service_stub):
+    """
+    A cláusula do TR vai em 'clausula': 'section' já é o nome da seção de IA.
+    """
+    texto = await ai_service_stub.generate_async(
+        "tr_clause",
+        clausula="pagamento",
+        etp_data="Objeto: Aquisição de material de limpeza",
+        risks_data="- Risco: atraso na entrega"
+    )
+
+    assert texto.startswith("[Texto gerado pelo modelo local")
+    assert not AIService.is_error(texto)
+
+def test_prompt_tr_clause_usa_instrucao_da_clausula(ai_service_stub):
+    """
+    Cada cláusula tem sua instrução; uma desconhecida cai na instrução genérica.
+    """
+    pagamento = ai_service_stub.build_prompt("tr_clause", clausula="pagamento", etp_data="ETP", risks_data="Riscos")
+    generica = ai_service_stub.build_prompt("tr_clause", clausula="outra", etp_data="ETP", risks_data="Riscos")
+
+    assert "Critérios de Pagamento" in pagamento
+    assert "cláusula técnica e jurídica adequada" in generica
+
+async def test_stream_async_tr_clause(ai_service_stub):
+    """
+    O streaming usa o mesmo construtor de prompt e devolve o mesmo texto.
+    """
+    kwargs = {"clausula": "execucao", "etp_data": "ETP", "risks_data": "Riscos"}
+
+    partes = [parte async for parte in ai_service_stub.stream_async("tr_clause", **kwargs)]
+
+    assert partes
+    assert "".join(partes) == await ai_service_stub.generate_async("tr_clause", **kwargs)
+
+async def test_streaming_e_chamada_sincrona_somam_tempo_de_ia(ai_service_stub):
+    """
+    Requisição amostrada: o streaming e o caminho síncrono também somam em "ai",
+    como a geração assíncrona.
+    """
+    profile = RequestProfile()
+    token = profiling._current.set(profile)
+    try:
+        partes = [parte async for parte in ai_service_stub.stream_async("tr_clause", clausula="execucao", etp_data="ETP", risks_data="Riscos")]
+        ms_stream, chamadas_stream = profile.timings["ai"]
+        assert chamadas_stream == len(partes) + 2  # abertura, uma espera por parte e o fim do stream
+
+        ai_service_stub.generate_dfd_object("Compra de papel A4")
+        assert profile.timings["ai"][1] == chamadas_stream + 1
+        assert profile.timings["ai"][0] >= ms_stream
+    finally:
+        profiling._current.reset(token)
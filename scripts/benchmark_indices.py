@@ -0,0 +1,198 @@
+"""
+Planos antes/depois dos índices das migrações 8b2d6c0e5a91 (indices_consultas_frequentes)
+e c3e7a9d1f4b2 (busca_unaccent_tsvector).
+
+Para cada consulta quente da aplicação roda EXPLAIN (ANALYZE, BUFFERS) duas vezes:
+- antes: numa transação que remove os índices da consulta (DROP INDEX é
+  transacional no Postgres) e termina em ROLLBACK, ou seja, nada é alterado;
+- depois: com os índices da migração.
+
+Os parâmetros (item, AOCS, contrato, categoria, termo de busca) são amostrados
+do próprio banco. O DROP INDEX trava a tabela até o ROLLBACK: rode numa cópia
+do banco de produção (pg_dump/pg_restore), nunca no banco em uso.
+
+Uso (na raiz do projeto, com DB_URL apontando para a cópia):
+    python scripts/benchmark_indices.py [--repeticoes 5] [--so-resumo] [consulta ...]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+
+sys.path.append(os.getcwd())  # Adiciona raiz ao path
+
+from sqlalchemy import text
+
+from app.core.database import get_sync_engine
+
+# nome -> (SQL, SQL que amostra os parâmetros, índices usados pela consulta)
+CONSULTAS = {
+    "saldo_do_item": (
+        "SELECT id_item_contrato, SUM(quantidade_pedida), SUM(quantidade_entregue) "
+        "FROM pedido WHERE id_item_contrato = :item GROUP BY id_item_contrato",
+        "SELECT id_item_contrato AS item FROM pedido ORDER BY id DESC LIMIT 1",
+        ["ix_pedido_id_item_contrato"],
+    ),
+    "pedidos_da_aocs": (
+        "SELECT * FROM pedido WHERE id_aocs = :aocs ORDER BY id",
+        "SELECT id_aocs AS aocs FROM pedido ORDER BY id DESC LIMIT 1",
+        ["ix_pedido_id_aocs"],
+    ),
+    "pedidos_pendentes": (
+        "SELECT p.id, p.id_aocs, a.numero_aocs, p.quantidade_pedida, p.data_pedido "
+        "FROM pedido p JOIN aocs a ON a.id = p.id_aocs "
+        "WHERE p.status_entrega <> 'Entregue' AND p.is_deleted = false "
+        "ORDER BY p.data_pedido, p.id LIMIT 10",
+        None,
+        ["ix_pedido_pendentes_data_pedido"],
+    ),
+    "itens_do_contrato": (
+        "SELECT * FROM itens_contrato WHERE id_contrato = :contrato ORDER BY numero_item",
+        "SELECT id_contrato AS contrato FROM itens_contrato ORDER BY id DESC LIMIT 1",
+        ["ix_itens_contrato_id_contrato_numero_item"],
+    ),
+    "contratos_vencendo": (
+        "SELECT id, numero_contrato, data_fim_vigencia FROM contratos "
+        "WHERE ativo AND data_fim_vigencia BETWEEN CURRENT_DATE AND CURRENT_DATE + 30 "
+        "ORDER BY data_fim_vigencia, id LIMIT 20",
+        None,
+        ["ix_contratos_ativo_data_fim_vigencia", "ix_contratos_data_fim_vigencia_id"],
+    ),
+    "itens_por_categoria": (
+        "SELECT i.id, i.numero_item, i.quantidade_contratada - COALESCE(s.quantidade_pedida, 0) AS saldo "
+        "FROM itens_contrato i JOIN contratos c ON c.id = i.id_contrato "
+        "LEFT JOIN saldos_itens_contrato s ON s.id_item_contrato = i.id "
+        "WHERE c.id_categoria = :categoria AND c.ativo "
+        "ORDER BY i.id LIMIT 20",
+        "SELECT id_categoria AS categoria FROM contratos WHERE id_categoria IS NOT NULL AND ativo LIMIT 1",
+        ["ix_contratos_id_categoria_ativos", "ix_itens_contrato_id_contrato_numero_item"],
+    ),
+    "anexos_do_contrato": (
+        "SELECT * FROM anexos WHERE id_contrato = :contrato ORDER BY data_upload DESC",
+        "SELECT id_contrato AS contrato FROM anexos WHERE id_contrato IS NOT NULL LIMIT 1",
+        ["ix_anexos_id_contrato_data_upload"],
+    ),
+    "busca_item_catalogo": (
+        "SELECT id, nome_item FROM catalogo_itens WHERE f_unaccent(nome_item) ILIKE f_unaccent(:termo) LIMIT 20",
+        "SELECT '%' || substr(nome_item, 2, 5) || '%' AS termo FROM catalogo_itens "
+        "WHERE length(nome_item) > 6 LIMIT 1",
+        ["ix_catalogo_itens_nome_item_unaccent_trgm"],
+    ),
+    "busca_item_texto": (
+        "SELECT id, nome_item, ts_rank_cd(busca_documento, q) AS score "
+        "FROM catalogo_itens, websearch_to_tsquery('pt_unaccent', :termo) q "
+        "WHERE busca_documento @@ q ORDER BY score DESC, id LIMIT 10",
+        "SELECT split_part(nome_item, ' ', 1) AS termo FROM catalogo_itens "
+        "WHERE length(split_part(nome_item, ' ', 1)) > 3 LIMIT 1",
+        ["ix_catalogo_itens_busca_documento"],
+    ),
+    "busca_fornecedor": (
+        "SELECT id, razao_social FROM fornecedores WHERE f_unaccent(razao_social) ILIKE f_unaccent(:termo) LIMIT 20",
+        "SELECT '%' || substr(razao_social, 2, 5) || '%' AS termo FROM fornecedores "
+        "WHERE length(razao_social) > 6 LIMIT 1",
+        ["ix_fornecedores_razao_social_unaccent_trgm"],
+    ),
+    "busca_aocs": (
+        "SELECT id, numero_aocs FROM aocs WHERE f_unaccent(numero_aocs) ILIKE f_unaccent(:termo) LIMIT 20",
+        "SELECT '%' || substr(numero_aocs, 2, 4) || '%' AS termo FROM aocs "
+        "WHERE length(numero_aocs) > 5 LIMIT 1",
+        ["ix_aocs_numero_aocs_unaccent_trgm"],
+    ),
+}
+
+_EXECUCAO = re.compile(r"Execution Time: ([\d.]+) ms")
+_ACESSO = re.compile(r"((?:Parallel )?(?:Seq Scan|Index Only Scan|Index Scan|Bitmap Index Scan)(?: using \S+)? on \S+)")
+
+
+def _explain(conn, sql: str, params: dict) -> str:
+    linhas = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+    return "\n".join(linhas)
+
+
+def _medir(conn, sql: str, params: dict, repeticoes: int) -> tuple[str, float]:
+    """Plano da última execução e a mediana do Execution Time (a primeira só aquece o cache)."""
+    _explain(conn, sql, params)
+    tempos, plano = [], ""
+    for _ in range(repeticoes):
+        plano = _explain(conn, sql, params)
+        tempos.append(float(_EXECUCAO.search(plano).group(1)))
+    return plano, statistics.median(tempos)
+
+
+def _indices_existentes(conn, nomes: list[str]) -> list[str]:
+    rows = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE indexname = ANY(:nomes)"), {"nomes": nomes}
+    ).scalars().all()
+    return [n for n in nomes if n in rows]
+
+
+def benchmark(nome: str, repeticoes: int, so_resumo: bool) -> dict | None:
+    sql, amostra, indices = CONSULTAS[nome]
+    engine = get_sync_engine()
+    with engine.connect() as conn:
+        params = {}
+        if amostra:
+            row = conn.execute(text(amostra)).mappings().first()
+            if row is None:
+                print(f"-- {nome}: sem dados para amostrar os parâmetros, pulada")
+                return None
+            params = dict(row)
+
+        existentes = _indices_existentes(conn, indices)
+        if not existentes:
+            print(f"-- {nome}: índices {indices} não existem (migração não aplicada?), pulada")
+            return None
+        conn.rollback()
+
+        try:
+            for indice in existentes:
+                conn.execute(text(f'DROP INDEX "{indice}"'))
+            plano_antes, ms_antes = _medir(conn, sql, params, repeticoes)
+        finally:
+            # Desfaz o DROP INDEX: o banco termina como começou
+            conn.rollback()
+
+        plano_depois, ms_depois = _medir(conn, sql, params, repeticoes)
+        conn.rollback()
+
+    if not so_resumo:
+        print(f"\n===== {nome} {params or ''}")
+        print(f"--- antes (sem {', '.join(existentes)})\n{plano_antes}")
+        print(f"--- depois\n{plano_depois}")
+    return {
+        "consulta": nome,
+        "antes_ms": ms_antes,
+        "depois_ms": ms_depois,
+        "acesso_antes": sorted(set(_ACESSO.findall(plano_antes))),
+        "acesso_depois": sorted(set(_ACESSO.findall(plano_depois))),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("consultas", nargs="*", help=f"padrão: todas ({', '.join(CONSULTAS)})")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--so-resumo", action="store_true", help="não imprime os planos completos")
+    args = parser.parse_args()
+    desconhecidas = [c for c in args.consultas if c not in CONSULTAS]
+    if desconhecidas:
+        parser.error(f"consultas desconhecidas: {desconhecidas}")
+
+    resultados = []
+    for nome in args.consultas or CONSULTAS:
+        resultado = benchmark(nome, args.repeticoes, args.so_resumo)
+        if resultado:
+            resultados.append(resultado)
+
+    print(f"\n{'consulta':<22} {'antes (ms)':>11} {'depois (ms)':>12} {'ganho':>8}")
+    for r in resultados:
+        ganho = r["antes_ms"] / r["depois_ms"] if r["depois_ms"] else float("inf")
+        print(f"{r['consulta']:<22} {r['antes_ms']:>11.3f} {r['depois_ms']:>12.3f} {ganho:>7.1f}x")
+        print(f"{'':<22} antes:  {'; '.join(r['acesso_antes'])}")
+        print(f"{'':<22} depois: {'; '.join(r['acesso_depois'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())